@@ -13,6 +13,7 @@ import {
   Package, // Used for Inventory
   Truck, // Used for Logistics
 } from 'lucide-react';
+import { getDashboardSnapshot, pollAgents } from './agent-api';
 
 // --- MANDATORY FIREBASE/ENV SETUP (Required for Canvas Environment) ---
 // Note: While this simulation doesn't use Firestore, these global variables must be present.
@@ -23,26 +24,48 @@ const firebaseConfig = typeof __firebase_config !== 'undefined' ? JSON.parse(__f
 
 // --- Configuration Constants ---
 const AGENTS = [
-  { name: 'Production Planner', role: 'Optimizing Schedule', icon: LayoutGrid, color: 'sky' },
-  { name: 'Quality Control', role: 'Defect Analysis', icon: Target, color: 'emerald' },
-  { name: 'Maintenance Scheduler', role: 'Predictive Faults', icon: Clock, color: 'rose' },
+  { id: 'production', name: 'Production Planner', role: 'Optimizing Schedule', icon: LayoutGrid, color: 'sky' },
+  { id: 'quality', name: 'Quality Control', role: 'Defect Analysis', icon: Target, color: 'emerald' },
+  { id: 'maintenance', name: 'Maintenance Scheduler', role: 'Predictive Faults', icon: Clock, color: 'rose' },
   // ADDED AGENTS:
-  { name: 'Inventory Manager', role: 'Material Flow Optimization', icon: Package, color: 'amber' },
-  { name: 'Logistics Optimizer', role: 'Supply Chain Routing', icon: Truck, color: 'violet' },
+  { id: 'inventory', name: 'Inventory Manager', role: 'Material Flow Optimization', icon: Package, color: 'amber' },
+  { id: 'logistics', name: 'Logistics Optimizer', role: 'Supply Chain Routing', icon: Truck, color: 'violet' },
 ];
+const AGENT_IDS = [...AGENTS.map(agent => agent.id), 'supervisory'];
+const POLL_RETRY_MS = 5000;
+
+// Backend agent status -> label shown on the agent cards
+const STATUS_LABELS = {
+  operational: 'Online',
+  warning: 'Checking',
+  critical: 'Anomaly Detected',
+};
 
 const initialMetrics = {
-  OEE: 85.2,
-  Throughput: 1250,
-  Uptime: 98.7,
-  AnomalyRate: 0.15,
+  OEE: 0,
+  Throughput: 0,
+  Uptime: 0,
+  AnomalyRate: 0,
 };
 
 const initialAgentStatuses = AGENTS.reduce((acc, agent) => ({
   ...acc,
-  [agent.name]: { status: 'Idle', activity: 'Awaiting Command' }
+  [agent.name]: { status: 'Unknown', activity: 'Connecting' }
 }), {});
 
+const toAgentStatus = (status) => ({
+  status: STATUS_LABELS[status.status] || 'Unknown',
+  activity: status.alerts && status.alerts.length ? status.alerts[0].message : 'No active alerts',
+});
+
+// KPIs come from the agents that own them; keep the last value while one is missing
+const toMetrics = (statuses, previous) => ({
+  OEE: statuses.production?.efficiency ?? previous.OEE,
+  Throughput: statuses.production?.metrics?.production_rate ?? previous.Throughput,
+  Uptime: statuses.maintenance?.efficiency ?? previous.Uptime,
+  AnomalyRate: statuses.quality?.metrics?.defect_rate ?? previous.AnomalyRate,
+});
+
 // Utility to get a responsive background color class
 const getStatusColor = (status) => {
   switch (status) {
@@ -109,7 +132,7 @@ const MetricCard = ({ title, value, unit, icon: Icon, color }) => (
  */
 const AgentStatusCard = ({ agent, status }) => {
   const Icon = agent.icon;
-  const colorClass = getStatusColor(status.activity);
+  const colorClass = getStatusColor(status.status);
 
   return (
     <div className={`p-4 rounded-xl border border-gray-700/50 ${colorClass} transition duration-300`}>
@@ -153,7 +176,6 @@ const App = () => {
   const [metrics, setMetrics] = useState(initialMetrics);
   const [agentStatuses, setAgentStatuses] = useState(initialAgentStatuses);
   const [contextLog, setContextLog] = useState([]);
-  const [simulationIteration, setSimulationIteration] = useState(0);
 
   // Function to add a message to the context log
   const addLogEntry = useCallback((agent, message) => {
@@ -164,97 +186,66 @@ const App = () => {
     });
   }, []);
 
-  // Effect 1: Handles the simulation clock (runs every 3 seconds)
-  useEffect(() => {
-    const interval = setInterval(() => {
-      setSimulationIteration(prev => prev + 1);
-    }, 3000); // Update every 3 seconds
-    return () => clearInterval(interval);
-  }, []);
-
-  // Effect 2: Handles the simulation logic (runs on every clock tick)
-  useEffect(() => {
-    const iteration = simulationIteration;
-
-    // 1. Simulate Metric Fluctuation (LSTM Data)
-    // Generate new metrics locally first
-    const newMetrics = {
-      OEE: parseFloat((80 + Math.random() * 15).toFixed(2)), // 80-95%
-      Throughput: Math.floor(1200 + Math.random() * 200),
-      Uptime: parseFloat((95 + Math.random() * 4).toFixed(2)), // 95-99%
-      AnomalyRate: parseFloat((0.05 + Math.random() * 0.5).toFixed(2)),
-    };
-    // Update metrics state once per tick
-    setMetrics(newMetrics);
+  // Apply agent statuses keyed by agent id, logging the ones whose label changed
+  const applyStatuses = useCallback((statuses) => {
+    setMetrics(prev => toMetrics(statuses, prev));
 
-    // 2. Simulate System Anomaly Detection (LLM/LSTM)
-    const isAnomaly = newMetrics.AnomalyRate > 0.45;
+    const supervisory = statuses.supervisory;
+    if (supervisory) {
+      const next = supervisory.metrics?.system_health === 'good' ? 'Online' : 'Anomaly Detected';
+      setSystemStatus(prev => {
+        if (prev !== next) addLogEntry('System Monitor', `System health is ${supervisory.metrics?.system_health}.`);
+        return next;
+      });
+    }
 
-    // Use functional update for systemStatus to check previous state and update only when necessary
-    setSystemStatus(prevStatus => {
-      if (isAnomaly && prevStatus === 'Online') {
-        addLogEntry('System Monitor', 'HIGH Anomaly Rate detected. Alerting Agents.');
-        return 'Anomaly Detected';
-      }
-      if (!isAnomaly && prevStatus === 'Anomaly Detected') {
-        addLogEntry('System Monitor', 'Anomaly resolved. Returning to standard operations.');
-        return 'Online';
-      }
-      return prevStatus; // Return previous status if no status change is needed
+    setAgentStatuses(prev => {
+      const next = { ...prev };
+      AGENTS.forEach(agent => {
+        const status = statuses[agent.id];
+        if (!status) return;
+        next[agent.name] = toAgentStatus(status);
+        if (prev[agent.name]?.status !== next[agent.name].status) {
+          addLogEntry(agent.name, `${next[agent.name].status}: ${next[agent.name].activity}`);
+        }
+      });
+      return next;
     });
+  }, [addLogEntry]);
 
-    // 3. Simulate Agent Actions (LLM Agentic Reasoning)
-    const updateAgentStatus = (agentName, newStatus, newActivity, logMessage = null) => {
-      // Use functional update to ensure we read the latest agentStatuses state
-      setAgentStatuses(prev => ({
-        ...prev,
-        [agentName]: { status: newStatus, activity: newActivity }
-      }));
-      if (logMessage) addLogEntry(agentName, logMessage);
-    };
-
-    // Cycle through 5 agents now using iteration % 5
-    if (iteration % 5 === 0) {
-      // Production Planner (Optimizing)
-      const action = isAnomaly ? 'Adjusting schedule due to component quality issue' : 'Optimizing Batch Size based on demand forecast (LLM)';
-      updateAgentStatus('Production Planner', 'Active', action, `MCP: Pushing optimized schedule (OEE: ${newMetrics.OEE.toFixed(1)}%)`);
-    } else if (iteration % 5 === 1) {
-      // Quality Control (Checking/Analyzing)
-      const action = isAnomaly ? 'Analyzing sensor data for defect root cause (LSTM)' : 'Running real-time quality check on throughput';
-      updateAgentStatus('Quality Control', 'Active', action, `MCP: Sharing Quality Report (Anomaly Rate: ${newMetrics.AnomalyRate}%)`);
-    } else if (iteration % 5 === 2) {
-      // Maintenance Scheduler (Predictive/Scheduling)
-      const action = isAnomaly ? 'Scheduling immediate intervention for machine Z' : 'Predictive maintenance check for machine Y (LSTM)';
-      updateAgentStatus('Maintenance Scheduler', 'Active', action, `MCP: Confirming intervention schedule with Production Planner`);
-    } else if (iteration % 5 === 3) {
-      // Inventory Manager (New Agent)
-      const stockLevel = Math.floor(Math.random() * 50) + 50;
-      const activity = isAnomaly ? 'Initiating urgent reorder based on production anomaly' : `Checking raw material stock levels (${stockLevel} units)`;
-      updateAgentStatus('Inventory Manager', 'Active', activity, `MCP: Broadcasted current stock levels to Logistics Optimizer.`);
-    } else if (iteration % 5 === 4) {
-      // Logistics Optimizer (New Agent)
-      const deliveryTime = (Math.random() * 0.5 + 1.5).toFixed(1); // 1.5 to 2.0 hours
-      const activity = isAnomaly ? 'Rerouting inbound materials to avoid congestion' : `Calculating optimal delivery route (ETA: ${deliveryTime} hrs)`;
-      updateAgentStatus('Logistics Optimizer', 'Active', activity, `MCP: Updated delivery ETA to Production Planner.`);
-    }
-
-    // Agents return to Idle after a small delay
-    const idleTimeout = setTimeout(() => {
-      setAgentStatuses(prev => {
-        const newState = { ...prev };
-        for (const name in newState) {
-          // Only switch back to Idle if the agent isn't currently mid-activity
-          if (newState[name].status === 'Active') {
-             newState[name] = { status: 'Idle', activity: 'Awaiting Command' };
+  // Every agent's status in one batched MCP request
+  useEffect(() => {
+    getDashboardSnapshot(AGENT_IDS)
+      .then(snapshot => applyStatuses(Object.fromEntries(
+        Object.entries(snapshot).filter(([, status]) => status && !status.error)
+      )))
+      .catch(error => console.error('Dashboard snapshot error:', error));
+  }, [applyStatuses]);
+
+  // Long-poll the agent list instead of a clock: the server answers as soon as
+  // a status changes, or with 304 once the wait runs out
+  useEffect(() => {
+    let cancelled = false;
+
+    const poll = async () => {
+      let etag = null;
+      while (!cancelled) {
+        try {
+          const result = await pollAgents(etag);
+          etag = result.etag;
+          if (result.agents && !cancelled) {
+            applyStatuses(Object.fromEntries(result.agents.map(agent => [agent.id, agent.status])));
           }
+        } catch (error) {
+          console.error('Agent poll error:', error);
+          await new Promise(resolve => setTimeout(resolve, POLL_RETRY_MS));
         }
-        return newState;
-      });
-    }, 1500);
+      }
+    };
 
-    return () => clearTimeout(idleTimeout);
-    
-  }, [simulationIteration, addLogEntry]);
+    poll();
+    return () => { cancelled = true; };
+  }, [applyStatuses]);
 
 
   const agentList = useMemo(() => {
@@ -0,0 +1,73 @@
+/**
+ * Smart Factory MAS - Agent status API
+ * Vite version of the calls the MAS dashboard needs from client/src/services/api.js
+ *
+ * Environment variables use the VITE_ prefix
+ */
+
+const config = {
+  apiBaseUrl: (import.meta.env.VITE_API_URL || 'http://localhost:8000').replace(/\/+$/, ''),
+  mcpEndpoint: import.meta.env.VITE_MCP_ENDPOINT || '/api/mcp',
+};
+
+/**
+ * MCP Protocol - Send several calls in one JSON-RPC batch
+ * `calls` is a list of { method, params }; results come back in the same order.
+ */
+export const sendMCPBatch = async (calls) => {
+  const baseId = Date.now();
+  const payload = calls.map((call, index) => ({
+    jsonrpc: '2.0',
+    id: baseId + index,
+    method: call.method,
+    params: call.params || {},
+  }));
+
+  const response = await fetch(`${config.apiBaseUrl}${config.mcpEndpoint}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(payload),
+  });
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  const responses = await response.json();
+  const byId = new Map(responses.map((item) => [item.id, item]));
+  return payload.map((call) => {
+    const item = byId.get(call.id) || {};
+    return item.error ? { error: item.error } : item.result;
+  });
+};
+
+/**
+ * Get the status of several agents in one round trip
+ */
+export const getDashboardSnapshot = async (agentIds) => {
+  const results = await sendMCPBatch(
+    agentIds.map((agentId) => ({ method: 'agent.status', params: { agent_id: agentId } }))
+  );
+  return Object.fromEntries(agentIds.map((agentId, index) => [agentId, results[index]]));
+};
+
+/**
+ * Long-poll the agent list
+ * Pass the ETag from the previous call; resolves with { etag, agents } once
+ * something changed, or { etag, agents: null } after `waitSeconds` without change.
+ */
+export const pollAgents = async (etag = null, waitSeconds = 30) => {
+  const url = `${config.apiBaseUrl}/api/agents?wait=${waitSeconds}`;
+  const response = await fetch(url, {
+    headers: etag ? { 'If-None-Match': etag } : {},
+  });
+
+  if (response.status === 304) {
+    return { etag, agents: null };
+  }
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  const data = await response.json();
+  return { etag: response.headers.get('ETag'), agents: data.agents };
+};
@@ -0,0 +1,389 @@
+"""
+Durable Action Queue for the MCP Bridge
+SQLite-backed jobs for agent.action, run by a pool of async workers with retries
+
+`agent.action` only enqueues a job and returns its id; workers apply the action
+through the data layer in the background and clients poll `action.status`.
+"""
+
+# File: ManufacturingAgents/action_queue.py
+
+import asyncio
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+MAX_ATTEMPTS_LIMIT = 10  # per-job max_attempts is clamped to 1..MAX_ATTEMPTS_LIMIT
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id              TEXT PRIMARY KEY,
+    idempotency_key TEXT UNIQUE,
+    request_hash    TEXT NOT NULL,
+    agent_id        TEXT,
+    action          TEXT NOT NULL,
+    params          TEXT NOT NULL,
+    status          TEXT NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    max_attempts    INTEGER NOT NULL,
+    run_after       REAL NOT NULL,
+    lease_until     REAL,
+    result          TEXT,
+    error           TEXT,
+    created_at      REAL NOT NULL,
+    updated_at      REAL NOT NULL,
+    started_at      REAL,
+    finished_at     REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_after);
+CREATE INDEX IF NOT EXISTS jobs_agent ON jobs (agent_id, created_at);
+"""
+
+# Oldest runnable job: queued and due, or running under an expired lease
+# (its worker died) with attempts left. A single UPDATE ... RETURNING claims
+# it atomically, also across processes sharing the database file.
+_CLAIM = """
+UPDATE jobs
+SET status = 'running', attempts = attempts + 1, lease_until = :lease_until,
+    started_at = :now, updated_at = :now
+WHERE id = (
+    SELECT id FROM jobs
+    WHERE (status = 'queued' AND run_after <= :now)
+       OR (status = 'running' AND lease_until < :now AND attempts < max_attempts)
+    ORDER BY run_after
+    LIMIT 1
+)
+RETURNING *
+"""
+
+# Jobs whose worker died on their last attempt: never claimed again
+_EXPIRE = """
+UPDATE jobs
+SET status = 'failed', lease_until = NULL, finished_at = :now, updated_at = :now,
+    error = 'Lease expired on attempt ' || attempts || ' of ' || max_attempts
+WHERE status = 'running' AND lease_until < :now AND attempts >= max_attempts
+RETURNING id
+"""
+
+
+class IdempotencyConflict(Exception):
+    """Idempotency key already used for a different request"""
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+
+def _clamp_attempts(max_attempts: int) -> int:
+    return max(1, min(max_attempts, MAX_ATTEMPTS_LIMIT))
+
+
+def _request_hash(agent_id: Optional[str], action: str, params: Dict[str, Any]) -> str:
+    canonical = json.dumps([agent_id, action, params], sort_keys=True, default=str)
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+class ActionQueue:
+    """
+    Job table plus `workers` asyncio tasks that execute jobs via `run`.
+
+    `run(action, params)` is synchronous and executed in a thread. ValueError
+    means the request itself is bad and fails the job at once; any other
+    exception is retried with exponential backoff up to `max_attempts`.
+
+    A claimed job is leased for `lease_seconds` and the lease is renewed
+    every third of that while it runs; a job whose lease runs out (its
+    worker died) is claimed again, or failed if no attempts are left.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        run: Callable[[str, Dict[str, Any]], Dict[str, Any]],
+        workers: int = 4,
+        max_attempts: int = 3,
+        retry_base: float = 1.0,
+        retry_max: float = 60.0,
+        lease_seconds: float = 300.0,
+        poll_interval: float = 1.0,
+        on_done: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    ):
+        self.path = path
+        self.run = run
+        self.workers = workers
+        self.max_attempts = _clamp_attempts(max_attempts)
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval  # also picks up jobs queued by other processes
+        self.on_done = on_done
+
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self.processed: Dict[str, int] = {"succeeded": 0, "failed": 0, "retried": 0, "db_errors": 0}
+
+    # ------------------------------------------------------------------
+    # Storage (synchronous; called through asyncio.to_thread)
+    # ------------------------------------------------------------------
+
+    def _execute(self, sql: str, args: Any = ()) -> List[sqlite3.Row]:
+        with self._db_lock:
+            return self._db.execute(sql, args).fetchall()
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "job_id": row["id"],
+            "agent_id": row["agent_id"],
+            "action": row["action"],
+            "params": json.loads(row["params"]),
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "max_attempts": row["max_attempts"],
+            "idempotency_key": row["idempotency_key"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": _iso(row["created_at"]),
+            "updated_at": _iso(row["updated_at"]),
+            "started_at": _iso(row["started_at"]),
+            "finished_at": _iso(row["finished_at"]),
+            "next_attempt_at": _iso(row["run_after"]) if row["status"] == "queued" else None,
+        }
+
+    def _submit(
+        self,
+        agent_id: Optional[str],
+        action: str,
+        params: Dict[str, Any],
+        idempotency_key: Optional[str],
+        max_attempts: Optional[int],
+    ) -> Tuple[Dict[str, Any], bool]:
+        request_hash = _request_hash(agent_id, action, params)
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        try:
+            self._execute(
+                "INSERT INTO jobs (id, idempotency_key, request_hash, agent_id, action, params,"
+                " status, max_attempts, run_after, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (
+                    job_id,
+                    idempotency_key,
+                    request_hash,
+                    agent_id,
+                    action,
+                    json.dumps(params, default=str),
+                    self.max_attempts if max_attempts is None else _clamp_attempts(max_attempts),
+                    now,
+                    now,
+                    now,
+                ),
+            )
+        except sqlite3.IntegrityError:
+            rows = self._execute("SELECT * FROM jobs WHERE idempotency_key = ?", (idempotency_key,))
+            if not rows:
+                raise
+            if rows[0]["request_hash"] != request_hash:
+                raise IdempotencyConflict(
+                    f"Idempotency key '{idempotency_key}' was already used for a different request"
+                )
+            return self._job(rows[0]), True
+        return self._job(self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))[0]), False
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return self._job(rows[0]) if rows else None
+
+    def _list(self, agent_id: Optional[str], status: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        clauses, args = [], []
+        if agent_id:
+            clauses.append("agent_id = ?")
+            args.append(agent_id)
+        if status:
+            clauses.append("status = ?")
+            args.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._execute(
+            f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?", (*args, limit)
+        )
+        return [self._job(row) for row in rows]
+
+    def _counts(self) -> Dict[str, int]:
+        rows = self._execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        now = time.time()
+        rows = self._execute(_CLAIM, {"now": now, "lease_until": now + self.lease_seconds})
+        return rows[0] if rows else None
+
+    def _expire(self) -> List[str]:
+        return [row["id"] for row in self._execute(_EXPIRE, {"now": time.time()})]
+
+    def _renew(self, job_id: str) -> None:
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND status = 'running'",
+            (now + self.lease_seconds, now, job_id),
+        )
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, lease_until = NULL,"
+            " finished_at = ?, updated_at = ? WHERE id = ?",
+            (status, json.dumps(result, default=str) if result is not None else None, error, now, now, job_id),
+        )
+
+    def _retry_later(self, job_id: str, delay: float, error: str) -> None:
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET status = 'queued', run_after = ?, error = ?, lease_until = NULL,"
+            " updated_at = ? WHERE id = ?",
+            (now + delay, error, now, job_id),
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def submit(
+        self,
+        agent_id: Optional[str],
+        action: str,
+        params: Dict[str, Any],
+        idempotency_key: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Enqueue a job; returns (job, duplicate). Raises IdempotencyConflict,
+        or ValueError if `max_attempts` is not an integer.
+        """
+        if max_attempts is not None and (isinstance(max_attempts, bool) or not isinstance(max_attempts, int)):
+            raise ValueError(f"max_attempts must be an integer from 1 to {MAX_ATTEMPTS_LIMIT}")
+        job, duplicate = await asyncio.to_thread(
+            self._submit, agent_id, action, params, idempotency_key, max_attempts
+        )
+        if not duplicate:
+            self.start()
+            self._wakeup.set()
+        return job, duplicate
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    async def list(
+        self, agent_id: Optional[str] = None, status: Optional[str] = None, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._list, agent_id, status, limit)
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running_workers": sum(not task.done() for task in self._tasks),
+            "jobs": await asyncio.to_thread(self._counts),
+            "processed_by_this_process": dict(self.processed),
+        }
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the worker pool on the running loop (idempotent)."""
+        if self._tasks and not all(task.done() for task in self._tasks):
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)  # jitter spreads out retry storms
+
+    async def _worker(self) -> None:
+        errors = 0
+        while True:
+            try:
+                for job_id in await asyncio.to_thread(self._expire):
+                    self.processed["failed"] += 1
+                    await self._done(job_id)
+                row = await asyncio.to_thread(self._claim)
+                if row is not None:
+                    await self._process(row)
+            except sqlite3.Error as e:
+                # A locked or briefly unavailable database must not kill the
+                # worker; an interrupted job's lease expires and it is retried
+                errors += 1
+                self.processed["db_errors"] += 1
+                print(f"Action queue worker database error: {e}")
+                await asyncio.sleep(self._backoff(errors))
+                continue
+            errors = 0
+            if row is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self._renew, job_id)
+            except sqlite3.Error as e:
+                print(f"Action queue lease renewal failed for {job_id}: {e}")
+
+    async def _process(self, row: sqlite3.Row) -> None:
+        job_id, attempts = row["id"], row["attempts"]
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await asyncio.to_thread(self.run, row["action"], json.loads(row["params"]))
+        except ValueError as e:
+            await asyncio.to_thread(self._finish, job_id, "failed", None, str(e))
+            self.processed["failed"] += 1
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempts < row["max_attempts"]:
+                await asyncio.to_thread(self._retry_later, job_id, self._backoff(attempts), error)
+                self.processed["retried"] += 1
+                return
+            await asyncio.to_thread(self._finish, job_id, "failed", None, error)
+            self.processed["failed"] += 1
+        else:
+            await asyncio.to_thread(self._finish, job_id, "succeeded", result)
+            self.processed["succeeded"] += 1
+        finally:
+            heartbeat.cancel()
+
+        await self._done(job_id)
+
+    async def _done(self, job_id: str) -> None:
+        if self.on_done:
+            job = await asyncio.to_thread(self._get, job_id)
+            try:
+                await self.on_done(job)
+            except Exception as e:
+                print(f"Action queue on_done hook failed for {job_id}: {e}")
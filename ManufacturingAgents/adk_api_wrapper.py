@@ -5,41 +5,103 @@ Bridges Agent Development Kit backend with React dashboard frontend
 
 # File: ManufacturingAgents/adk_api_wrapper.py
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, Optional, Any
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
+from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
+from functools import lru_cache
+import asyncio
 import json
 import os
-import uvicorn
-import httpx  # for Hugging Face calls
 
-from dotenv import load_dotenv
+from action_queue import JOB_STATUSES, ActionQueue, IdempotencyConflict
+from admission import AdmissionController, AdmissionRejected, default_classes
+from fast_json import FRAME_ORIENTS, frame_to_json, json_response
+from ingestion import Backpressure, Ingestor, SchemaError
+from status_hub import StatusHub, combine_etags, content_etag
+from status_registry import StatusRegistry
+from supervisory_agent.tools.accounting import ledger as usage_ledger, summarize as summarize_usage
+from supervisory_agent.tools.actions import ACTIONS, run_action
+from supervisory_agent.tools.data_store import store as domain_store
+from supervisory_agent.tools.retention import production_retention
+from supervisory_agent.tools.spc import spc
+from supervisory_agent.tools.tools import FRAME_INTENTS, mcp_call, mcp_frame
 
 # ---------------------------------------------------------------------------
 # CONFIG
 # ---------------------------------------------------------------------------
 
-# Load variables from ManufacturingAgents/.env
-load_dotenv()
+# Heavy or side-effecting setup (.env loading, httpx, uvicorn, pandas via the
+# tools) happens on first use, so importing this module stays cheap.
 
 # Choose your HF model here
 HF_MODEL_ID = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
 
-HF_API_URL_ROUTER = (
-    f"https://router.huggingface.co/hf-inference/models/{HF_MODEL_ID}"
-)
-HF_API_URL_LEGACY = (
-    f"https://api-inference.huggingface.co/models/{HF_MODEL_ID}"
-)
+# Base URLs can be overridden (HF_ROUTER_BASE_URL / HF_LEGACY_BASE_URL) to
+# point the bridge at loadtest/hf_standin.py
+HF_ROUTER_BASE_URL = "https://router.huggingface.co/hf-inference"
+HF_LEGACY_BASE_URL = "https://api-inference.huggingface.co"
+
+
+@lru_cache(maxsize=1)
+def get_config() -> Dict[str, Any]:
+    """Settings from the environment, read once on first use"""
+
+    # Load variables from ManufacturingAgents/.env
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    return {
+        "hf_api_token": os.getenv("HF_API_TOKEN"),  # set this in ManufacturingAgents/.env
+        "hf_api_url_router": (
+            os.getenv("HF_ROUTER_BASE_URL", HF_ROUTER_BASE_URL).rstrip("/") + f"/models/{HF_MODEL_ID}"
+        ),
+        "hf_api_url_legacy": (
+            os.getenv("HF_LEGACY_BASE_URL", HF_LEGACY_BASE_URL).rstrip("/") + f"/models/{HF_MODEL_ID}"
+        ),
+        "hf_timeout_seconds": float(os.getenv("HF_TIMEOUT_SECONDS", "30")),
+        # WebSocket status push: seconds between status ticks, per-connection queue size
+        "status_hub_interval": float(os.getenv("STATUS_HUB_INTERVAL", "2.0")),
+        "status_hub_queue_size": int(os.getenv("STATUS_HUB_QUEUE_SIZE", "32")),
+        # Maximum number of calls accepted in one JSON-RPC batch on /api/mcp
+        "mcp_max_batch_size": int(os.getenv("MCP_MAX_BATCH_SIZE", "50")),
+        # MCP responses larger than this are gzip/brotli compressed when the client accepts it
+        "mcp_compress_min_bytes": int(os.getenv("MCP_COMPRESS_MIN_BYTES", "8192")),
+        # Upper bound for ?wait= long-poll requests on the agent endpoints
+        "long_poll_max_seconds": float(os.getenv("LONG_POLL_MAX_SECONDS", "60")),
+        # Admission control: concurrent LLM calls, total in-flight calls, per-client rate
+        "admission_llm_concurrency": int(os.getenv("ADMISSION_LLM_CONCURRENCY", "4")),
+        "admission_max_inflight": int(os.getenv("ADMISSION_MAX_INFLIGHT", "256")),
+        "admission_client_rate": float(os.getenv("ADMISSION_CLIENT_RATE", "20")),
+        "admission_client_burst": float(os.getenv("ADMISSION_CLIENT_BURST", "60")),
+        # agent.action job queue: SQLite file, worker tasks per process, attempts per job
+        "action_db_path": os.getenv(
+            "ACTION_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "actions.db")
+        ),
+        "action_workers": int(os.getenv("ACTION_WORKERS", "4")),
+        "action_max_attempts": int(os.getenv("ACTION_MAX_ATTEMPTS", "3")),
+        "action_retry_base_seconds": float(os.getenv("ACTION_RETRY_BASE_SECONDS", "1.0")),
+        # Sensor ingestion: rows per append, max age of buffered rows, buffer cap, wait for room
+        "ingest_batch_rows": int(os.getenv("INGEST_BATCH_ROWS", "50000")),
+        "ingest_flush_seconds": float(os.getenv("INGEST_FLUSH_SECONDS", "0.25")),
+        "ingest_max_pending_rows": int(os.getenv("INGEST_MAX_PENDING_ROWS", "500000")),
+        "ingest_submit_timeout": float(os.getenv("INGEST_SUBMIT_TIMEOUT", "5.0")),
+        "ingest_notify_seconds": float(os.getenv("INGEST_NOTIFY_SECONDS", "1.0")),
+        # Seconds between production retention passes (roll-ups + compaction); 0 = only on query
+        "retention_interval_seconds": float(os.getenv("RETENTION_INTERVAL_SECONDS", "300")),
+    }
+
 
-HF_API_TOKEN = os.getenv("HF_API_TOKEN")  # set this in ManufacturingAgents/.env
+def print_config() -> None:
+    config = get_config()
+    print("HF_MODEL_ID:", HF_MODEL_ID)
+    print("HF_API_URL_ROUTER:", config["hf_api_url_router"])
+    print("HF_API_URL_LEGACY:", config["hf_api_url_legacy"])
+    print("HF_API_TOKEN loaded:", bool(config["hf_api_token"]))
 
-print("HF_MODEL_ID:", HF_MODEL_ID)
-print("HF_API_URL_ROUTER:", HF_API_URL_ROUTER)
-print("HF_API_URL_LEGACY:", HF_API_URL_LEGACY)
-print("HF_API_TOKEN loaded:", bool(HF_API_TOKEN))
 
 # ---------------------------------------------------------------------------
 # FASTAPI APP & CORS
@@ -57,8 +119,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+
+@app.on_event("startup")
+async def on_startup():
+    print_config()
+    _push_status_changes()
+    # Resume jobs left queued (or orphaned mid-run) by a previous process
+    get_action_queue().start()
+    get_ingestor().start()
+    interval = get_config()["retention_interval_seconds"]
+    if interval > 0:
+        app.state.retention_task = asyncio.create_task(_retention_loop(interval))
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    retention_task = getattr(app.state, "retention_task", None)
+    if retention_task is not None:
+        retention_task.cancel()
+        await asyncio.gather(retention_task, return_exceptions=True)
+    # Flush buffered readings before the process exits
+    await get_ingestor().stop()
+    await get_action_queue().stop()
+
+
 # ---------------------------------------------------------------------------
 # DATA MODELS
 # ---------------------------------------------------------------------------
@@ -66,18 +153,28 @@ app.add_middleware(
 
 class MCPRequest(BaseModel):
     jsonrpc: str = "2.0"
-    id: int
+    id: Optional[Union[int, str]] = None  # omitted for notifications
     method: str
-    params: Dict[str, Any]
+    params: Dict[str, Any] = {}
 
 
 class MCPResponse(BaseModel):
     jsonrpc: str = "2.0"
-    id: int
+    id: Optional[Union[int, str]] = None
     result: Optional[Dict[str, Any]] = None
     error: Optional[Dict[str, Any]] = None
 
 
+class MCPError(Exception):
+    """JSON-RPC error raised by an MCP method; `status_code` is used for single calls"""
+
+    def __init__(self, code: int, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status_code = status_code
+
+
 # ---------------------------------------------------------------------------
 # ADK INTEGRATION
 # ---------------------------------------------------------------------------
@@ -120,10 +217,14 @@ class ADKBridge:
             except Exception as e:
                 print(f"Error reading status file: {e}")
 
-        # Method 2: Call ADK agent directly (if integrated)
-        if self.adk_available:
-            # Implement direct ADK call here
-            pass
+        # Method 2: KPIs derived from the domain data, kept current on change
+        try:
+            status = get_status_registry().get(agent_id)
+        except Exception as e:
+            print(f"Error deriving status for {agent_id}: {e}")
+            status = None
+        if status is not None:
+            return status
 
         # Method 3: Return simulated data for demo
         return self._get_simulated_status(agent_id)
@@ -236,6 +337,96 @@ class ADKBridge:
 # Initialize bridge
 adk_bridge = ADKBridge()
 
+
+@lru_cache(maxsize=1)
+def get_status_hub() -> StatusHub:
+    """One status computation per agent per tick, shared by all WebSocket subscribers"""
+    config = get_config()
+    return StatusHub(
+        adk_bridge.get_agent_status,
+        interval=config["status_hub_interval"],
+        max_queue=config["status_hub_queue_size"],
+    )
+
+
+@lru_cache(maxsize=1)
+def get_admission() -> AdmissionController:
+    """Keeps cheap status reads fast while LLM-backed chat is saturated"""
+    config = get_config()
+    return AdmissionController(
+        classes=default_classes(llm_concurrency=config["admission_llm_concurrency"]),
+        max_inflight=config["admission_max_inflight"],
+        client_rate=config["admission_client_rate"],
+        client_burst=config["admission_client_burst"],
+    )
+
+
+@lru_cache(maxsize=1)
+def get_status_registry() -> StatusRegistry:
+    """Agent KPIs recomputed per domain on DomainStore changes; reads are lookups"""
+    registry = StatusRegistry(domain_store, extras={"quality": spc.overview})
+    # Violations in newly synced inspections change the quality status; the
+    # registry's listeners then push it through the status hub
+    spc.add_listener(lambda violations: registry.on_domain_changed("quality"))
+    return registry
+
+
+def _push_status_changes() -> None:
+    # Data can change on any thread (action workers, to_thread tool calls);
+    # hop onto the event loop before touching the hub
+    loop = asyncio.get_running_loop()
+    hub = get_status_hub()
+
+    def on_change(agent_id: str) -> None:
+        loop.call_soon_threadsafe(hub.refresh, agent_id)
+
+    get_status_registry().add_listener(on_change)
+
+
+@lru_cache(maxsize=1)
+def get_action_queue() -> ActionQueue:
+    """Durable queue behind agent.action; opened per process, after any fork"""
+    config = get_config()
+    return ActionQueue(
+        config["action_db_path"],
+        run_action,
+        workers=config["action_workers"],
+        max_attempts=config["action_max_attempts"],
+        retry_base=config["action_retry_base_seconds"],
+    )
+
+
+@lru_cache(maxsize=1)
+def get_ingestor() -> Ingestor:
+    """Micro-batched appends of streamed sensor readings to production data"""
+    config = get_config()
+    return Ingestor(
+        domain_store,
+        batch_rows=config["ingest_batch_rows"],
+        flush_seconds=config["ingest_flush_seconds"],
+        max_pending_rows=config["ingest_max_pending_rows"],
+        submit_timeout=config["ingest_submit_timeout"],
+        notify_seconds=config["ingest_notify_seconds"],
+    )
+
+
+async def _retention_loop(interval: float) -> None:
+    """Keep the production roll-ups current and compact raw data past its window"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(production_retention.sync)
+        except Exception as e:
+            print(f"Production retention pass failed: {e}")
+
+
+def _client_id(request: Request) -> str:
+    """Rate-limit key: explicit X-Client-Id header, else the peer address"""
+    return request.headers.get("x-client-id") or (
+        request.client.host if request.client else "unknown"
+    )
+
+
 # ---------------------------------------------------------------------------
 # HUGGING FACE LLM CALL
 # ---------------------------------------------------------------------------
@@ -254,11 +445,15 @@ def _extract_generated_text(data: Any) -> str:
 async def call_hf_model(prompt: str) -> str:
     """Call Hugging Face Inference API (router → legacy)."""
 
-    if not HF_API_TOKEN:
+    import httpx  # for Hugging Face calls
+
+    config = get_config()
+    hf_api_token = config["hf_api_token"]
+    if not hf_api_token:
         raise RuntimeError("HF_API_TOKEN environment variable not set")
 
     headers = {
-        "Authorization": f"Bearer {HF_API_TOKEN}",
+        "Authorization": f"Bearer {hf_api_token}",
         "Content-Type": "application/json",
     }
 
@@ -273,11 +468,11 @@ async def call_hf_model(prompt: str) -> str:
         },
     }
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    async with httpx.AsyncClient(timeout=config["hf_timeout_seconds"]) as client:
         # ---- 1) Try router endpoint ----------------------------------------
         try:
-            print("➡️  HF router POST:", HF_API_URL_ROUTER)
-            resp = await client.post(HF_API_URL_ROUTER, headers=headers, json=payload)
+            print("➡️  HF router POST:", config["hf_api_url_router"])
+            resp = await client.post(config["hf_api_url_router"], headers=headers, json=payload)
             try:
                 resp.raise_for_status()
             except httpx.HTTPStatusError:
@@ -293,8 +488,8 @@ async def call_hf_model(prompt: str) -> str:
 
         # ---- 2) Fall back to legacy api-inference --------------------------
         try:
-            print("➡️  HF legacy POST:", HF_API_URL_LEGACY)
-            resp2 = await client.post(HF_API_URL_LEGACY, headers=headers, json=payload)
+            print("➡️  HF legacy POST:", config["hf_api_url_legacy"])
+            resp2 = await client.post(config["hf_api_url_legacy"], headers=headers, json=payload)
             try:
                 resp2.raise_for_status()
             except httpx.HTTPStatusError:
@@ -326,14 +521,43 @@ async def root():
             "health": "/health",
             "mcp": "/api/mcp",
             "agents": "/api/agents",
+            "agent_ws": "/ws/agent/{agent_id}",
             "docs": "/docs",
         },
     }
 
 
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def _if_none_match(request: Request, etag: str) -> bool:
+    """If-None-Match uses weak comparison (RFC 9110): the W/ prefix is ignored."""
+    header = request.headers.get("if-none-match", "")
+    if header.strip() == "*":
+        return True
+    return _opaque_tag(etag) in [_opaque_tag(tag.strip()) for tag in header.split(",")]
+
+
+def _conditional_response(request: Request, content: Any, etag: str) -> Response:
+    """304 when the client already holds `etag`, the full body otherwise."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _if_none_match(request, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=content, headers=headers)
+
+
+async def _long_poll(request: Request, agent_ids: List[str], etag: str, wait: float) -> bool:
+    """Hold a revalidation request until one of the agents changes or `wait` passes."""
+    if wait <= 0 or not _if_none_match(request, etag):
+        return False
+    timeout = min(wait, get_config()["long_poll_max_seconds"])
+    return await get_status_hub().wait_for_change(agent_ids, timeout)
+
+
 @app.get("/health")
-async def health_check():
-    return {
+async def health_check(request: Request):
+    content = {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "backend_type": "ADK",
@@ -341,127 +565,306 @@ async def health_check():
             agent_id: "online" for agent_id in adk_bridge.agent_mapping.keys()
         },
     }
+    return _conditional_response(request, content, content_etag(content))
 
 
-@app.post("/api/mcp")
-async def mcp_endpoint(request: MCPRequest):
-    """MCP Protocol endpoint compatible with React frontend"""
+async def _execute_mcp(method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a single MCP method and return its result"""
 
-    try:
-        method = request.method
-        params = request.params
-
-        if method == "agent.status":
-            agent_id = params.get("agent_id")
-            if agent_id not in adk_bridge.agent_mapping:
-                raise HTTPException(
-                    status_code=404, detail=f"Agent '{agent_id}' not found"
-                )
-
-            result = adk_bridge.get_agent_status(agent_id)
-
-        elif method == "system.status":
-            result = {
-                "system_status": "operational",
-                "timestamp": datetime.now().isoformat(),
-                "backend": "ADK",
-                "agents": {
-                    agent_id: adk_bridge.get_agent_status(agent_id)
-                    for agent_id in adk_bridge.agent_mapping.keys()
-                },
-            }
+    if method == "agent.status":
+        agent_id = params.get("agent_id")
+        if agent_id not in adk_bridge.agent_mapping:
+            raise MCPError(-32602, f"Agent '{agent_id}' not found", status_code=404)
+
+        # The hub's per-tick snapshot, so dashboard batches do not recompute
+        result = get_status_hub().get(agent_id)[0]
+
+    elif method == "system.status":
+        result = {
+            "system_status": "operational",
+            "timestamp": datetime.now().isoformat(),
+            "backend": "ADK",
+            "agents": {
+                agent_id: get_status_hub().get(agent_id)[0]
+                for agent_id in adk_bridge.agent_mapping.keys()
+            },
+        }
 
-        elif method == "agent.message":
-            agent_id = params.get("agent_id")
-            message = params.get("message")
-            context = params.get("context") or {}
-
-            if agent_id not in adk_bridge.agent_mapping:
-                raise HTTPException(
-                    status_code=404, detail=f"Agent '{agent_id}' not found"
-                )
-
-            # Get current agent status for richer prompt
-            status = adk_bridge.get_agent_status(agent_id)
-
-            # Basic prompt construction
-            history = context.get("conversation") or ""
-            prompt = (
-                f"You are the '{agent_id}' agent in a smart factory.\n"
-                f"Here is the latest status JSON:\n{json.dumps(status, indent=2)}\n\n"
-                f"Conversation history (may be empty):\n{history}\n\n"
-                f"User question:\n{message}\n\n"
-                "Answer as the agent, referencing real values from the status when helpful."
+    elif method == "agent.message":
+        agent_id = params.get("agent_id")
+        message = params.get("message")
+        context = params.get("context") or {}
+
+        if agent_id not in adk_bridge.agent_mapping:
+            raise MCPError(-32602, f"Agent '{agent_id}' not found", status_code=404)
+
+        # Get current agent status for richer prompt
+        status = adk_bridge.get_agent_status(agent_id)
+
+        # Basic prompt construction
+        history = context.get("conversation") or ""
+        prompt = (
+            f"You are the '{agent_id}' agent in a smart factory.\n"
+            f"Here is the latest status JSON:\n{json.dumps(status, indent=2)}\n\n"
+            f"Conversation history (may be empty):\n{history}\n\n"
+            f"User question:\n{message}\n\n"
+            "Answer as the agent, referencing real values from the status when helpful."
+        )
+
+        # Try Hugging Face; fall back gracefully
+        try:
+            hf_reply = await call_hf_model(prompt)
+            source = "huggingface"
+        except Exception as e:
+            print(f"HF error: {e}")
+            base = adk_bridge.send_message_to_adk(agent_id, message)
+            hf_reply = (
+                "LLM backend unavailable; falling back to ADK bridge.\n\n"
+                f"{base.get('response')}"
             )
+            source = "fallback"
 
-            # Try Hugging Face; fall back gracefully
-            try:
-                hf_reply = await call_hf_model(prompt)
-                source = "huggingface"
-            except Exception as e:
-                print(f"HF error: {e}")
-                base = adk_bridge.send_message_to_adk(agent_id, message)
-                hf_reply = (
-                    "LLM backend unavailable; falling back to ADK bridge.\n\n"
-                    f"{base.get('response')}"
-                )
-                source = "fallback"
-
-            result = {
-                "agent_id": agent_id,
-                "message_received": message,
-                "response": hf_reply,
-                "status": "ok",
-                "source": source,
-            }
+        result = {
+            "agent_id": agent_id,
+            "message_received": message,
+            "response": hf_reply,
+            "status": "ok",
+            "source": source,
+        }
 
-        elif method == "agent.action":
-            agent_id = params.get("agent_id")
-            action = params.get("action")
+    elif method == "data.query":
+        domain = params.get("domain")
+        intent = params.get("intent", "read")
+        query_data = params.get("data") or {}
+        orient = params.get("orient", "records")
 
-            result = {
-                "success": True,
-                "message": f"Action '{action}' forwarded to ADK for agent '{agent_id}'",
-                "note": "Execute actions through ADK interface for full functionality",
-            }
+        if orient not in FRAME_ORIENTS:
+            raise MCPError(-32602, f"Unknown orient '{orient}'")
 
+        if intent in FRAME_INTENTS:
+            # Rows go straight from the DataFrame to JSON, no per-row dicts
+            try:
+                meta, frame = await asyncio.to_thread(mcp_frame, domain, intent, query_data)
+            except ValueError as e:
+                raise MCPError(-32602, str(e))
+            result = {**meta, "orient": orient, "data": frame_to_json(frame, orient)}
         else:
-            raise HTTPException(status_code=400, detail=f"Unknown method: {method}")
+            result = await asyncio.to_thread(mcp_call, domain, intent, query_data)
+
+    elif method == "agent.action":
+        agent_id = params.get("agent_id")
+        action = params.get("action")
+        # The dashboard client sends "parameters"
+        action_params = params.get("params") or params.get("parameters") or {}
+
+        if agent_id not in adk_bridge.agent_mapping:
+            raise MCPError(-32602, f"Agent '{agent_id}' not found", status_code=404)
+        if action not in ACTIONS:
+            raise MCPError(
+                -32602, f"Unknown action '{action}'. Available: {', '.join(sorted(ACTIONS))}"
+            )
+
+        # Queued, not executed: long-running actions never hold the request open
+        try:
+            job, duplicate = await get_action_queue().submit(
+                agent_id,
+                action,
+                action_params,
+                idempotency_key=params.get("idempotency_key"),
+                max_attempts=params.get("max_attempts"),
+            )
+        except IdempotencyConflict as e:
+            raise MCPError(-32602, str(e), status_code=409)
+        except ValueError as e:
+            raise MCPError(-32602, str(e))
+
+        result = {
+            "success": True,
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "duplicate": duplicate,
+            "job": job,
+        }
 
-        return MCPResponse(jsonrpc="2.0", id=request.id, result=result)
+    elif method == "action.status":
+        job = await get_action_queue().get(str(params.get("job_id")))
+        if job is None:
+            raise MCPError(-32602, f"Job '{params.get('job_id')}' not found", status_code=404)
+        result = job
 
-    except HTTPException:
-        raise
-    except Exception as e:
+    elif method == "action.list":
+        status = params.get("status")
+        if status is not None and status not in JOB_STATUSES:
+            raise MCPError(-32602, f"Unknown status '{status}'")
+        limit = max(1, min(int(params.get("limit", 50)), 500))
+
+        queue = get_action_queue()
+        jobs = await queue.list(agent_id=params.get("agent_id"), status=status, limit=limit)
+        result = {"jobs": jobs, "count": len(jobs), "queue": await queue.stats()}
+
+    else:
+        raise MCPError(-32601, f"Unknown method: {method}", status_code=400)
+
+    return result
+
+
+def _response_body(response: MCPResponse) -> Dict[str, Any]:
+    # Plain dict so large results skip pydantic serialization
+    return {
+        "jsonrpc": response.jsonrpc,
+        "id": response.id,
+        "result": response.result,
+        "error": response.error,
+    }
+
+
+async def _execute_admitted(method: str, params: Dict[str, Any], client_id: str) -> Dict[str, Any]:
+    async with get_admission().admit(method, client_id):
+        return await _execute_mcp(method, params)
+
+
+async def _execute_batch_entry(entry: Any, client_id: str) -> Optional[MCPResponse]:
+    """Run one batch member; errors are isolated to its own response"""
+
+    entry_id = entry.get("id") if isinstance(entry, dict) else None
+    try:
+        call = MCPRequest(**entry) if isinstance(entry, dict) else None
+    except ValidationError:
+        call = None
+    if call is None:
         return MCPResponse(
+            id=entry_id,
+            error={"code": -32600, "message": "Invalid Request"},
+        )
+
+    try:
+        result = await _execute_admitted(call.method, call.params, client_id)
+        response = MCPResponse(id=call.id, result=result)
+    except AdmissionRejected as e:
+        response = MCPResponse(
+            id=call.id,
+            error={
+                "code": -32005,
+                "message": e.reason,
+                "data": {"retry_after": round(e.retry_after, 3)},
+            },
+        )
+    except MCPError as e:
+        response = MCPResponse(id=call.id, error={"code": e.code, "message": e.message})
+    except Exception as e:
+        response = MCPResponse(id=call.id, error={"code": -32603, "message": str(e)})
+
+    # Notifications (no "id" member) are executed but never answered
+    if "id" not in entry:
+        return None
+    return response
+
+
+@app.post("/api/mcp")
+async def mcp_endpoint(request: Request):
+    """MCP Protocol endpoint compatible with React frontend
+
+    Accepts a single JSON-RPC 2.0 call or a batch array of calls. Batch
+    members run concurrently and each gets its own result or error.
+    """
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        return MCPResponse(error={"code": -32700, "message": "Parse error"})
+
+    client_id = _client_id(request)
+
+    if isinstance(payload, list):
+        if not payload:
+            return MCPResponse(error={"code": -32600, "message": "Empty batch"})
+        max_batch_size = get_config()["mcp_max_batch_size"]
+        if len(payload) > max_batch_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch of {len(payload)} calls exceeds limit of {max_batch_size}",
+            )
+
+        responses = await asyncio.gather(
+            *(_execute_batch_entry(entry, client_id) for entry in payload)
+        )
+        responses = [response for response in responses if response is not None]
+        if not responses:
+            return Response(status_code=204)
+        return json_response(
+            [_response_body(response) for response in responses],
+            request,
+            get_config()["mcp_compress_min_bytes"],
+        )
+
+    try:
+        call = MCPRequest(**payload) if isinstance(payload, dict) else MCPRequest()
+    except (ValidationError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        result = await _execute_admitted(call.method, call.params, client_id)
+        response = MCPResponse(jsonrpc="2.0", id=call.id, result=result)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.reason,
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
+        )
+    except MCPError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    except Exception as e:
+        response = MCPResponse(
             jsonrpc="2.0",
-            id=request.id,
+            id=call.id,
             error={"code": -32603, "message": str(e)},
         )
 
+    if "id" not in payload:
+        return Response(status_code=204)
+    return json_response(
+        _response_body(response), request, get_config()["mcp_compress_min_bytes"]
+    )
 
-@app.get("/api/agents")
-async def list_agents():
-    return {
-        "agents": [
+
+def _agents_listing():
+    agents = []
+    etags = []
+    for agent_id, agent_name in adk_bridge.agent_mapping.items():
+        status, etag = get_status_hub().get(agent_id)
+        agents.append(
             {
                 "id": agent_id,
                 "name": agent_name.replace("_", " ").title(),
-                "status": adk_bridge.get_agent_status(agent_id),
+                "status": status,
             }
-            for agent_id, agent_name in adk_bridge.agent_mapping.items()
-        ]
-    }
+        )
+        etags.append(etag)
+    return {"agents": agents}, combine_etags(etags)
+
+
+@app.get("/api/agents")
+async def list_agents(request: Request, wait: float = 0):
+    """All agent statuses; supports If-None-Match and ?wait=<seconds> long-polling"""
+    content, etag = _agents_listing()
+    if await _long_poll(request, list(adk_bridge.agent_mapping), etag, wait):
+        content, etag = _agents_listing()
+    return _conditional_response(request, content, etag)
 
 
 @app.get("/api/agents/{agent_id}")
-async def get_agent(agent_id: str):
+async def get_agent(agent_id: str, request: Request, wait: float = 0):
+    """One agent's status; supports If-None-Match and ?wait=<seconds> long-polling"""
     if agent_id not in adk_bridge.agent_mapping:
         raise HTTPException(
             status_code=404, detail=f"Agent '{agent_id}' not found"
         )
 
-    return adk_bridge.get_agent_status(agent_id)
+    status_hub = get_status_hub()
+    status, etag = status_hub.get(agent_id)
+    if await _long_poll(request, [agent_id], etag, wait):
+        status, etag = status_hub.get(agent_id)
+    return _conditional_response(request, status, etag)
 
 
 @app.get("/api/adk/info")
@@ -474,25 +877,153 @@ async def adk_info():
         "interactive_chat": "Use ADK interface for full agent interaction",
         "dashboard": "React dashboard provides monitoring and visualization",
         "agents_available": list(adk_bridge.agent_mapping.keys()),
+        "data": domain_store.stats(),
+        "status_registry": get_status_registry().stats(),
+        "worker_pid": os.getpid(),
     }
 
 
+@app.get("/api/usage")
+async def usage_summary(session_id: Optional[str] = None):
+    """Token, payload and latency totals per agent and tool, as flushed by the agent runtime"""
+    summary = await asyncio.to_thread(summarize_usage, usage_ledger.path, session_id)
+    return {"session_id": session_id, "budget": vars(usage_ledger.budget), **summary}
+
+
 # ---------------------------------------------------------------------------
-# OPTIONAL: SIMPLE WS FOR /ws/agent/{agent_id}
+# WS FOR /ws/agent/{agent_id} (SERVER PUSH)
 # ---------------------------------------------------------------------------
 
 
+async def _pump_subscription(websocket: WebSocket, subscription) -> None:
+    """Forward queued hub messages to one socket."""
+    while True:
+        message = await subscription.queue.get()
+        await websocket.send_text(message)
+
+
 @app.websocket("/ws/agent/{agent_id}")
 async def agent_ws(websocket: WebSocket, agent_id: str):
+    """Push a status snapshot on connect, then deltas whenever the status changes.
+
+    Any message from the client triggers an immediate refresh and a full
+    snapshot, which keeps request/response style clients working.
+    """
     await websocket.accept()
+    if agent_id not in adk_bridge.agent_mapping:
+        await websocket.close(code=1008, reason=f"Agent '{agent_id}' not found")
+        return
+
+    status_hub = get_status_hub()
+    subscription = status_hub.subscribe(agent_id)
+    sender = asyncio.create_task(_pump_subscription(websocket, subscription))
     try:
         while True:
-            status = adk_bridge.get_agent_status(agent_id)
-            await websocket.send_json(status)
-            # Wait for client message to avoid spamming
             await websocket.receive_text()
+            status_hub.refresh(agent_id)
+            subscription.offer(status_hub.snapshot_message(agent_id))
     except WebSocketDisconnect:
         print(f"WebSocket disconnected for agent {agent_id}")
+    finally:
+        sender.cancel()
+        status_hub.unsubscribe(subscription)
+
+
+@app.get("/api/ws/stats")
+async def ws_stats():
+    """Connection and fan-out counters of the status hub"""
+    return get_status_hub().stats()
+
+
+@app.get("/api/actions/stats")
+async def action_stats():
+    """Job counts by status and worker pool state for the agent.action queue"""
+    return await get_action_queue().stats()
+
+
+@app.get("/api/admission/stats")
+async def admission_stats():
+    """Queue depth, in-flight calls and shed counts per admission class"""
+    return get_admission().stats()
+
+
+# ---------------------------------------------------------------------------
+# SENSOR INGESTION
+# ---------------------------------------------------------------------------
+
+
+@app.post("/api/ingest/production")
+async def ingest_production(request: Request):
+    """Bulk sensor readings in production_data.csv columns
+
+    Body: {"columns": {name: [values]}} (cheapest to parse), {"readings":
+    [...]}, a list of readings or one reading. Valid rows are accepted and
+    written in micro-batches; invalid rows are counted and reported. 422 if
+    the payload does not match the schema at all, 429 while the write
+    buffer is full. `write_error` is set while writes are failing: accepted
+    rows stay buffered and are retried.
+    """
+    ingestor = get_ingestor()
+    try:
+        rows, rejected, errors = await ingestor.parse(await request.body())
+        await ingestor.submit(rows, rejected)
+    except SchemaError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Backpressure as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
+        )
+    return {"accepted": len(rows), "rejected": rejected, "errors": errors, "write_error": ingestor.write_error}
+
+
+@app.websocket("/ws/ingest/production")
+async def ingest_ws(websocket: WebSocket):
+    """Stream of reading batches (same payloads as the POST endpoint)
+
+    Every message is acknowledged in order with {"seq", "accepted",
+    "rejected", "errors"} or {"seq", "error"}. While the write buffer is
+    full the next message is not read, so TCP flow control slows the sender.
+    """
+    await websocket.accept()
+    ingestor = get_ingestor()
+    seq = 0
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            body = message.get("bytes") or (message.get("text") or "").encode()
+            seq += 1
+            try:
+                rows, rejected, errors = await ingestor.parse(body)
+                # No timeout: the socket simply stops being read until there is room
+                await ingestor.submit(rows, rejected, wait=float("inf"))
+                ack = {
+                    "seq": seq,
+                    "accepted": len(rows),
+                    "rejected": rejected,
+                    "errors": errors,
+                    "write_error": ingestor.write_error,
+                }
+            except SchemaError as e:
+                ack = {"seq": seq, "error": str(e)}
+            await websocket.send_text(json.dumps(ack))
+    except WebSocketDisconnect:
+        pass
+
+
+@app.get("/api/ingest/stats")
+async def ingest_stats():
+    """Accepted/rejected/written row counts, buffer depth and flush timing"""
+    return get_ingestor().stats()
+
+
+@app.get("/api/retention/stats")
+async def retention_stats():
+    """Rows per production roll-up tier (archived and live) and compaction counters"""
+    return await asyncio.to_thread(production_retention.stats)
 
 
 # ---------------------------------------------------------------------------
@@ -507,8 +1038,12 @@ if __name__ == "__main__":
     print("Docs: http://localhost:8000/docs")
     print("Backend: Agent Development Kit + Hugging Face LLM")
     print("Purpose: Bridge ADK agents to React dashboard")
+    print("Mode: development (single worker, auto-reload)")
+    print("Production: python serve.py --workers N")
     print("=" * 70)
 
+    import uvicorn
+
     uvicorn.run(
         "adk_api_wrapper:app",
         host="0.0.0.0",
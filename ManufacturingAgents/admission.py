@@ -0,0 +1,253 @@
+"""
+Admission Control for the MCP Bridge
+Priority queues, per-method concurrency caps, per-client token buckets and load shedding
+"""
+
+# File: ManufacturingAgents/admission.py
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
+class AdmissionRejected(Exception):
+    """Request shed before execution; maps to HTTP 429 / JSON-RPC -32005"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class MethodClass:
+    """Admission settings and live counters for a group of MCP methods"""
+
+    def __init__(
+        self,
+        name: str,
+        priority: int,
+        max_concurrency: int,
+        cost: float,
+        latency_target: float,
+        initial_service_time: float,
+    ):
+        self.name = name
+        self.priority = priority  # lower runs first
+        self.max_concurrency = max_concurrency
+        self.cost = cost  # rate-limit tokens per call
+        self.latency_target = latency_target  # max acceptable queueing delay (s)
+        self.service_time = initial_service_time  # EWMA of execution time (s)
+
+        self.inflight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self.rate_limited = 0
+
+    def expected_wait(self) -> float:
+        return (self.waiting + 1) * self.service_time / self.max_concurrency
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "priority": self.priority,
+            "inflight": self.inflight,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "service_time_ms": round(self.service_time * 1000, 2),
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "rate_limited": self.rate_limited,
+        }
+
+
+def default_classes(llm_concurrency: int = 4) -> Dict[str, MethodClass]:
+    return {
+        # Cheap status reads: always first, effectively uncapped
+        "status": MethodClass("status", 0, 512, cost=1, latency_target=0.5, initial_service_time=0.005),
+        # Data reads and queued actions
+        "data": MethodClass("data", 1, 32, cost=2, latency_target=2.0, initial_service_time=0.05),
+        # LLM-backed chat: capped so it cannot starve everything else
+        "llm": MethodClass("llm", 2, llm_concurrency, cost=10, latency_target=15.0, initial_service_time=3.0),
+    }
+
+
+# MCP method -> admission class; anything else falls into "data"
+METHOD_CLASSES = {
+    "agent.status": "status",
+    "system.status": "status",
+    "action.status": "status",
+    "action.list": "status",
+    "agent.message": "llm",
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, cost: float) -> float:
+        """Consume `cost` tokens; returns 0 on success or seconds until affordable."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Decides whether, and when, an MCP call may run.
+
+    1. Per-client, per-class token bucket (cost depends on the method class).
+    2. Global and per-class concurrency caps; waiters are woken in class
+       priority order, so status reads jump ahead of queued chat.
+    3. Shedding: a call whose expected queueing delay exceeds its class
+       latency target is rejected immediately instead of piling up.
+    """
+
+    def __init__(
+        self,
+        classes: Optional[Dict[str, MethodClass]] = None,
+        method_classes: Optional[Dict[str, str]] = None,
+        default_class: str = "data",
+        max_inflight: int = 256,
+        client_rate: float = 20.0,
+        client_burst: float = 60.0,
+        max_clients: int = 10000,
+    ):
+        self.classes = classes or default_classes()
+        self.method_classes = method_classes or METHOD_CLASSES
+        self.default_class = default_class
+        self.max_inflight = max_inflight
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_clients = max_clients
+
+        self.inflight = 0
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._waiters: List[Tuple[int, int, MethodClass, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def classify(self, method: str) -> MethodClass:
+        return self.classes[self.method_classes.get(method, self.default_class)]
+
+    # ------------------------------------------------------------------
+    # Rate limiting
+    # ------------------------------------------------------------------
+
+    def _bucket(self, client_id: str) -> TokenBucket:
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            bucket = TokenBucket(self.client_rate, self.client_burst)
+            self._buckets[client_id] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client_id)
+        return bucket
+
+    # ------------------------------------------------------------------
+    # Concurrency slots
+    # ------------------------------------------------------------------
+
+    def _take(self, cls: MethodClass) -> None:
+        cls.inflight += 1
+        self.inflight += 1
+
+    def _release(self, cls: MethodClass) -> None:
+        cls.inflight -= 1
+        self.inflight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the highest-priority waiters whose class has room."""
+        blocked = []
+        while self._waiters and self.inflight < self.max_inflight:
+            entry = heapq.heappop(self._waiters)
+            cls, future = entry[2], entry[3]
+            if future.done():  # timed out or cancelled
+                continue
+            if cls.inflight >= cls.max_concurrency:
+                blocked.append(entry)
+                continue
+            self._take(cls)
+            future.set_result(None)
+        for entry in blocked:
+            heapq.heappush(self._waiters, entry)
+
+    async def _acquire(self, cls: MethodClass) -> None:
+        # Any waiter left while global capacity is free is blocked by its own
+        # class cap, so a class with no waiters of its own may go straight in
+        if (
+            self.inflight < self.max_inflight
+            and cls.inflight < cls.max_concurrency
+            and cls.waiting == 0
+        ):
+            self._take(cls)
+            return
+
+        if cls.expected_wait() > cls.latency_target:
+            cls.shed += 1
+            raise AdmissionRejected(
+                f"Server busy: '{cls.name}' queue exceeds latency target",
+                retry_after=cls.expected_wait(),
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (cls.priority, next(self._seq), cls, future))
+        cls.waiting += 1
+        try:
+            await asyncio.wait_for(future, cls.latency_target)
+        except asyncio.TimeoutError:
+            cls.shed += 1
+            raise AdmissionRejected(
+                f"Server busy: '{cls.name}' call waited longer than {cls.latency_target}s",
+                retry_after=cls.service_time,
+            )
+        except asyncio.CancelledError:
+            # Caller went away after a slot was already handed over
+            if future.done() and not future.cancelled():
+                self._release(cls)
+            raise
+        finally:
+            cls.waiting -= 1
+
+    @asynccontextmanager
+    async def admit(self, method: str, client_id: str) -> AsyncIterator[MethodClass]:
+        """Run the body only if the call is admitted; raises AdmissionRejected otherwise."""
+        cls = self.classify(method)
+
+        # Separate bucket per class, so a client's chat burst cannot lock
+        # it out of status reads
+        retry_after = self._bucket(f"{cls.name}:{client_id}").take(cls.cost)
+        if retry_after:
+            cls.rate_limited += 1
+            raise AdmissionRejected("Rate limit exceeded", retry_after=retry_after)
+
+        await self._acquire(cls)
+        cls.admitted += 1
+        start = time.monotonic()
+        try:
+            yield cls
+        finally:
+            cls.service_time = 0.8 * cls.service_time + 0.2 * (time.monotonic() - start)
+            self._release(cls)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inflight": self.inflight,
+            "max_inflight": self.max_inflight,
+            "clients_tracked": len(self._buckets),
+            "client_rate_per_second": self.client_rate,
+            "client_burst": self.client_burst,
+            "classes": {name: cls.stats() for name, cls in self.classes.items()},
+        }
@@ -0,0 +1,119 @@
+"""
+Factory Simulator Benchmark
+Wall time of scenario sweeps, in-process vs. on the process pool
+
+Run from ManufacturingAgents/:
+    python benchmarks/bench_factory_sim.py --scenarios 100 300 --replications 10 --machines 20 --orders 200
+"""
+
+# File: ManufacturingAgents/benchmarks/bench_factory_sim.py
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from supervisory_agent.tools import factory_sim  # noqa: E402
+from supervisory_agent.tools.factory_sim import apply_scenario, run_replications, sweep  # noqa: E402
+
+
+def synthetic_model(machines: int, orders: int, horizon: float, seed: int):
+    """A factory of `machines` machines over the four machine types, loaded to about 80% on one shift."""
+    rng = random.Random(seed)
+    types = ["Welder", "Drill", "CNC", "Conveyor"]
+    fleet = [
+        {
+            "machine_id": f"M{i:03d}",
+            "machine_type": types[i % len(types)],
+            "rate": rng.uniform(80, 100),
+            "windows": [],
+            "failure_rate": rng.uniform(0.0001, 0.001),
+        }
+        for i in range(machines)
+    ]
+    capacity = sum(m["rate"] for m in fleet) * horizon / 3 * 0.8
+    jobs = [
+        {
+            "order_id": f"ORD{n:05d}",
+            "quantity": capacity / orders * rng.uniform(0.5, 1.5),
+            "due": rng.uniform(0.2, 1.2) * horizon,
+            "weight": rng.choice([1.0, 2.0, 3.0]),
+        }
+        for n in range(orders)
+    ]
+    materials = [
+        {
+            "material_id": f"MAT{k:03d}",
+            "stock": rng.uniform(2000, 8000),
+            "reorder_point": 1000.0,
+            "optimal_stock": 8000.0,
+            "lead_days": float(rng.randint(2, 10)),
+            "per_unit": rng.uniform(0.01, 0.1),
+            "types": [types[k % len(types)]],
+        }
+        for k in range(8)
+    ]
+    return {
+        "start": "2024-11-01T06:00:00",
+        "horizon": horizon,
+        "machines": fleet,
+        "orders": jobs,
+        "materials": materials,
+        "shifts": 1,
+    }
+
+
+def random_scenarios(count: int, machines: int, seed: int):
+    rng = random.Random(seed)
+    scenarios = []
+    for n in range(count):
+        scenario = {"name": f"s{n}", "shifts": rng.randint(1, 3)}
+        if rng.random() < 0.5:
+            scenario["machines_down"] = {f"M{rng.randrange(machines):03d}": rng.choice([0, 24, 48])}
+        if rng.random() < 0.5:
+            scenario["lead_time_factor"] = rng.uniform(0.5, 2.0)
+        scenario["demand_factor"] = rng.uniform(0.8, 1.5)
+        scenarios.append(scenario)
+    return scenarios
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark factory simulator sweeps")
+    parser.add_argument("--scenarios", type=int, nargs="+", default=[100, 300])
+    parser.add_argument("--replications", type=int, default=10)
+    parser.add_argument("--machines", type=int, default=20)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--horizon-hours", type=float, default=168.0)
+    args = parser.parse_args()
+
+    base = synthetic_model(args.machines, args.orders, args.horizon_hours, seed=1)
+    single = time.perf_counter()
+    run_replications(apply_scenario(base, {}), [0])
+    single_ms = (time.perf_counter() - single) * 1000
+
+    results = []
+    for count in args.scenarios:
+        models = [apply_scenario(base, s) for s in random_scenarios(count, args.machines, seed=count)]
+        start = time.perf_counter()
+        summaries = asyncio.run(sweep(models, args.replications))
+        elapsed = time.perf_counter() - start
+        results.append(
+            {
+                "scenarios": count,
+                "runs": count * args.replications,
+                "workers": factory_sim.SIM_WORKERS,
+                "seconds": round(elapsed, 2),
+                "ms_per_run": round(elapsed * 1000 / (count * args.replications), 2),
+                "mean_throughput": round(sum(r["throughput"] for runs in summaries for r in runs) / (count * args.replications)),
+            }
+        )
+    print(json.dumps({"single_run_ms": round(single_ms, 2), "sweeps": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Inventory Simulator Benchmark
+Wall time of the Monte Carlo stock-out simulator across scenario and SKU counts
+
+Run from ManufacturingAgents/:
+    python benchmarks/bench_inventory_sim.py --scenarios 1000 2000 5000 --skus 1000 2000 5000
+"""
+
+# File: ManufacturingAgents/benchmarks/bench_inventory_sim.py
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from supervisory_agent.tools.inventory_sim import simulate  # noqa: E402
+
+
+def synthetic_skus(count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    demand = rng.uniform(10, 500, count)
+    stock = demand * rng.uniform(1, 30, count)  # 1-30 days of cover
+    lead = rng.integers(1, 15, count).astype(float)
+    return stock, demand, lead
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the inventory simulator")
+    parser.add_argument("--scenarios", type=int, nargs="+", default=[1000, 2000, 5000])
+    parser.add_argument("--skus", type=int, nargs="+", default=[1000, 2000, 5000])
+    parser.add_argument("--horizon-days", type=float, default=30.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = []
+    for skus in args.skus:
+        stock, demand, lead = synthetic_skus(skus, seed=skus)
+        for scenarios in args.scenarios:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                out = simulate(stock, demand, lead, args.horizon_days, scenarios)
+                timings.append((time.perf_counter() - start) * 1000)
+            results.append(
+                {
+                    "skus": skus,
+                    "scenarios": scenarios,
+                    "ms_median": round(statistics.median(timings), 1),
+                    "mean_p_stockout_horizon": round(float(out["p_stockout_horizon"].mean()), 4),
+                }
+            )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
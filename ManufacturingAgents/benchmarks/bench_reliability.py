@@ -0,0 +1,106 @@
+"""
+Fleet Reliability Benchmark
+Wall time of trend fitting, hazard/RUL estimation and window planning across fleet sizes
+
+Run from ManufacturingAgents/:
+    python benchmarks/bench_reliability.py --machines 1000 5000 10000 --readings 96
+"""
+
+# File: ManufacturingAgents/benchmarks/bench_reliability.py
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from supervisory_agent.tools.shifts import shift_of  # noqa: E402
+from supervisory_agent.tools.reliability import (  # noqa: E402
+    RISK_THRESHOLD,
+    SHIFT_LOAD,
+    fleet_reliability,
+    plan_windows,
+    sensor_trends,
+)
+
+
+def synthetic_fleet(machines: int, readings: int, seed: int):
+    """Readings every 15 minutes per machine; a tenth of the fleet is degrading."""
+    rng = np.random.default_rng(seed)
+    ids = np.repeat([f"M{i:05d}" for i in range(machines)], readings)
+    step = np.tile(np.arange(readings), machines)
+    degrading = np.repeat(rng.random(machines) < 0.1, readings)
+    drift = np.where(degrading, step * 0.02, 0.0)
+    production = pd.DataFrame(
+        {
+            "timestamp": pd.Timestamp("2024-11-01") + pd.to_timedelta(step * 15, unit="min"),
+            "machine_id": ids,
+            "temperature": rng.normal(75, 2, len(ids)) + drift * 4,
+            "vibration_level": rng.normal(2.0, 0.3, len(ids)) + drift,
+            "output_rate": rng.normal(92, 1, len(ids)),
+        }
+    )
+    ages = rng.uniform(0, 1500, machines)
+    return production, ages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the fleet reliability planner")
+    parser.add_argument("--machines", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--readings", type=int, default=96, help="readings per machine (15 min apart)")
+    parser.add_argument("--horizon-hours", type=int, default=168)
+    parser.add_argument("--window-hours", type=int, default=4)
+    parser.add_argument("--crews", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = []
+    for machines in args.machines:
+        production, ages = synthetic_fleet(machines, args.readings, seed=machines)
+        now = production["timestamp"].max()
+        load = np.array(
+            [SHIFT_LOAD[shift_of((now + pd.Timedelta(hours=h)).hour)] for h in range(args.horizon_hours + 1)]
+        )
+        timings = {"trends": [], "hazard": [], "windows": []}
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            trends = sensor_trends(production)
+            fitted = time.perf_counter()
+            result = fleet_reliability(trends, ages, args.horizon_hours)
+            estimated = time.perf_counter()
+            candidates = np.flatnonzero(
+                (result["p_fail_horizon"] >= RISK_THRESHOLD) | (result["rul_hours"] <= args.horizon_hours)
+            )
+            windows = plan_windows(
+                result["p_fail_by_hour"],
+                result["rul_hours"],
+                trends["output_rate"].to_numpy(),
+                load,
+                candidates.tolist(),
+                args.window_hours,
+                args.crews,
+            )
+            done = time.perf_counter()
+            timings["trends"].append((fitted - start) * 1000)
+            timings["hazard"].append((estimated - fitted) * 1000)
+            timings["windows"].append((done - estimated) * 1000)
+        results.append(
+            {
+                "machines": machines,
+                "rows": len(production),
+                **{f"{k}_ms_median": round(statistics.median(v), 1) for k, v in timings.items()},
+                "at_risk": int(len(candidates)),
+                "scheduled": sum(w["start"] is not None for w in windows),
+            }
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Retention Tiers Benchmark
+Compaction cost and long-range query cost of the tiered rollups versus scanning raw readings
+
+Run from ManufacturingAgents/:
+    python benchmarks/bench_retention.py --days 90 --machines 20 --interval-seconds 60
+"""
+
+# File: ManufacturingAgents/benchmarks/bench_retention.py
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from supervisory_agent.tools.data_store import DomainStore, domain_csv_path  # noqa: E402
+from supervisory_agent.tools.retention import RetentionManager  # noqa: E402
+
+
+def synthetic_production(days: int, machines: int, interval_seconds: int, seed: int) -> pd.DataFrame:
+    """One reading per machine per interval, in production_data.csv columns."""
+    rng = np.random.default_rng(seed)
+    steps = days * 86400 // interval_seconds
+    times = pd.Timestamp("2024-01-01") + pd.to_timedelta(np.repeat(np.arange(steps) * interval_seconds, machines), unit="s")
+    n = len(times)
+    hours = times.hour.to_numpy()
+    columns = pd.read_csv(domain_csv_path("production"), nrows=0).columns
+    df = pd.DataFrame(
+        {
+            "timestamp": times.strftime("%Y-%m-%d %H:%M:%S"),
+            "machine_id": np.tile([f"M{m:03d}" for m in range(1, machines + 1)], steps),
+            "machine_type": "Welder",
+            "temperature": rng.normal(80, 5, n).round(3),
+            "vibration_level": rng.normal(2.5, 0.5, n).round(3),
+            "power_consumption": rng.normal(20, 3, n).round(3),
+            "pressure": rng.normal(5, 0.5, n).round(3),
+            "material_flow_rate": rng.normal(20, 2, n).round(3),
+            "cycle_time": rng.normal(120, 10, n).round(3),
+            "output_rate": rng.normal(90, 5, n).round(2),
+            "quality_score": rng.normal(20, 5, n).round(2),
+            "downtime_minutes": rng.integers(0, 5, n),
+            "efficiency_score": rng.normal(10, 3, n).round(3),
+            "status": "operational",
+            "shift": np.where(hours < 8, "night", np.where(hours < 16, "morning", "afternoon")),
+        }
+    )
+    return df[columns]
+
+
+def brute_force(raw: pd.DataFrame, start, end, freq: str, metric: str) -> pd.DataFrame:
+    times = pd.to_datetime(raw["timestamp"])
+    selected = raw[(times >= start) & (times < end)]
+    return selected.groupby(pd.to_datetime(selected["timestamp"]).dt.floor(freq))[metric].agg(["mean", "min", "max", "count"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark tiered production retention")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--machines", type=int, default=20)
+    parser.add_argument("--interval-seconds", type=int, default=60)
+    parser.add_argument("--raw-retention-hours", type=float, default=168)
+    args = parser.parse_args()
+
+    raw = synthetic_production(args.days, args.machines, args.interval_seconds, seed=0)
+    # End mid-shift, so the appended hour below does not cross a shift boundary and compact again
+    raw = raw.iloc[: len(raw) - 4 * 3600 // args.interval_seconds * args.machines]
+    latest = pd.to_datetime(raw["timestamp"]).max()
+    queries = {
+        "last_day_15min": (latest - pd.Timedelta(days=1), "15min"),
+        "last_month_1h": (latest - pd.Timedelta(days=30), "1h"),
+        "all_1D": (pd.to_datetime(raw["timestamp"]).min(), "1D"),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "production_data.csv"
+        raw.to_csv(path, index=False)
+        store = DomainStore({"production": path})
+        retention = RetentionManager(str(Path(tmp) / "rollups.db"), store, raw_retention_hours=args.raw_retention_hours)
+
+        start = time.perf_counter()
+        retention.sync()
+        compact_seconds = time.perf_counter() - start
+        stats = retention.stats()
+
+        results = {}
+        for name, (since, bucket) in queries.items():
+            end = latest + pd.Timedelta(seconds=1)
+            start = time.perf_counter()
+            tiered = retention.query(since, end, bucket, "", ["output_rate"])
+            tier_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            expected = brute_force(raw, since, end, bucket, "output_rate")
+            scan_ms = (time.perf_counter() - start) * 1000
+            series = tiered["series"].set_index("bucket")
+            mean = series["output_rate_sum"] / series["output_rate_count"]
+            results[name] = {
+                "tier": tiered["tier"],
+                "rows_read": tiered["rows_read"],
+                "raw_rows": len(raw),
+                "tier_ms": round(tier_ms, 1),
+                "raw_scan_ms": round(scan_ms, 1),
+                "max_mean_error": float((mean - expected["mean"]).abs().max()),
+                "counts_match": bool((series["output_rate_count"] == expected["count"]).all()),
+            }
+
+        # One more hour of readings: rolled in incrementally, below the compaction slack
+        appended = synthetic_production(1, args.machines, args.interval_seconds, seed=1)
+        appended = appended.iloc[: 3600 // args.interval_seconds * args.machines].copy()
+        appended["timestamp"] = (
+            pd.to_datetime(appended["timestamp"]) + (latest - pd.Timestamp("2024-01-01") + pd.Timedelta(seconds=args.interval_seconds))
+        ).dt.strftime("%Y-%m-%d %H:%M:%S")
+        store.append("production", appended)
+        start = time.perf_counter()
+        retention.sync()
+        append_ms = (time.perf_counter() - start) * 1000
+        rebuilds = retention.rebuilds
+
+    print(
+        json.dumps(
+            {
+                "raw_rows": len(raw),
+                "compaction_seconds": round(compact_seconds, 2),
+                "tiers": stats["tiers"],
+                "raw_rows_kept": stats["raw_rows"],
+                "queries": results,
+                "incremental_sync": {"rows": len(appended), "ms": round(append_ms, 1), "rebuilds": rebuilds},
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
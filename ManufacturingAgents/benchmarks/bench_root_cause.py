@@ -0,0 +1,81 @@
+"""
+Root-Cause Engine Benchmark
+Wall time of the as-of join and the correlation/lift pass across inspection counts
+
+Run from ManufacturingAgents/:
+    python benchmarks/bench_root_cause.py --inspections 100000 1000000 3000000
+"""
+
+# File: ManufacturingAgents/benchmarks/bench_root_cause.py
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from supervisory_agent.tools.root_cause import SENSOR_COLUMNS, align, analyze  # noqa: E402
+
+
+def synthetic_tables(inspections: int, machines: int, seed: int):
+    """
+    One sensor reading per inspection, 15 minutes per machine apart; high
+    vibration raises the chance of a dimension defect.
+    """
+    rng = np.random.default_rng(seed)
+    machine = np.arange(inspections) % machines
+    step = np.arange(inspections) // machines
+    stamps = pd.Timestamp("2024-01-01") + pd.to_timedelta(step * 15, unit="min")
+    ids = pd.Series([f"M{m:05d}" for m in range(machines)]).to_numpy()[machine]
+    sensors = {column: rng.normal(50, 5, inspections) for column in SENSOR_COLUMNS}
+    production = pd.DataFrame({"timestamp": stamps, "machine_id": ids, **sensors})
+
+    dimension = rng.random(inspections) < 0.02 + 0.1 * (sensors["vibration_level"] > 57)
+    surface = ~dimension & (rng.random(inspections) < 0.05)
+    quality = pd.DataFrame(
+        {
+            "timestamp": stamps + pd.Timedelta(minutes=5),
+            "batch_id": [f"B{i}" for i in range(inspections)],
+            "machine_id": ids,
+            "defect_type": np.where(dimension, "dimension", np.where(surface, "surface_defect", "none")),
+            "rework_required": (dimension | surface).astype(int),
+        }
+    )
+    return quality, production
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the root-cause engine")
+    parser.add_argument("--inspections", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--machines", type=int, default=500)
+    args = parser.parse_args()
+
+    results = []
+    for count in args.inspections:
+        quality, production = synthetic_tables(count, args.machines, seed=count)
+        start = time.perf_counter()
+        joined, sensors = align(quality, production)
+        aligned = time.perf_counter()
+        result = analyze(joined, sensors)
+        done = time.perf_counter()
+        j = result["targets"].index("defect_type=dimension")
+        top = int(np.argmax(np.abs(result["correlation"][:, j])))
+        results.append(
+            {
+                "inspections": count,
+                "matched": result["rows"],
+                "align_ms": round((aligned - start) * 1000, 1),
+                "analyze_ms": round((done - aligned) * 1000, 1),
+                "top_sensor_for_dimension": sensors[top],
+            }
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Fast-Path Router Benchmark
+Accuracy and supervisor-hop latency saved by the local router on a held-out labelled request set
+
+Run from ManufacturingAgents/:
+    python benchmarks/bench_router.py --llm-hop-ms 1500
+
+The router never calls a model, so "latency saved" is the number of requests
+it routes directly times the supervisor turn it skips (--llm-hop-ms, measure
+yours from the ADK trace), minus the classifier's own time.
+"""
+
+# File: ManufacturingAgents/benchmarks/bench_router.py
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from supervisory_agent.tools.router import SUPERVISOR, KeywordRouter  # noqa: E402
+
+# Not used for training. "supervisory_agent" = must go through the supervisor
+LABELLED_REQUESTS = [
+    ("How much steel plate is left", "inventory_agent"),
+    ("List all materials that are running low", "inventory_agent"),
+    ("Do we need to reorder MAT003", "inventory_agent"),
+    ("What is the optimal stock for bolts", "inventory_agent"),
+    ("Show me the inventory status", "inventory_agent"),
+    ("Which supplier has the longest lead time", "inventory_agent"),
+    ("How many units of paint are in stock", "inventory_agent"),
+    ("Check stock levels for aluminum rod and welding wire", "inventory_agent"),
+    ("What is the output rate of the welder line", "production_agent"),
+    ("Show production efficiency for the morning shift", "production_agent"),
+    ("What is the cycle time on machine M004", "production_agent"),
+    ("Create a production schedule for tomorrow", "production_agent"),
+    ("Analyze production trends for the last day", "production_agent"),
+    ("Which machine has the highest power consumption", "production_agent"),
+    ("How is production going", "production_agent"),
+    ("Has shipment SH001 left yet", "logistics_agent"),
+    ("Which deliveries are scheduled for Customer C", "logistics_agent"),
+    ("What is the status of order ORD1005", "logistics_agent"),
+    ("Which carrier is cheapest", "logistics_agent"),
+    ("List all shipments that are in transit", "logistics_agent"),
+    ("What is our on-time delivery rate", "logistics_agent"),
+    ("Track the delivery for Customer D", "logistics_agent"),
+    ("Which machine is most likely to fail", "maintenance_agent"),
+    ("When was M002 last serviced", "maintenance_agent"),
+    ("Schedule maintenance for the conveyor", "maintenance_agent"),
+    ("Show predicted failure probability for all machines", "maintenance_agent"),
+    ("Is any equipment overdue for maintenance", "maintenance_agent"),
+    ("Plan preventive repairs to avoid downtime", "maintenance_agent"),
+    ("What is the defect rate this shift", "quality_control_agent"),
+    ("Which batches failed inspection", "quality_control_agent"),
+    ("Show rework required for batch B1240", "quality_control_agent"),
+    ("What are the most common defect types", "quality_control_agent"),
+    ("Quality report for product PX010", "quality_control_agent"),
+    ("How many batches passed quality checks", "quality_control_agent"),
+    ("Coordinate inventory and production for the big order", SUPERVISOR),
+    ("Machine M003 keeps producing defects, what should we do", SUPERVISOR),
+    ("Can production and logistics meet the Friday deadline", SUPERVISOR),
+    ("Give me a full factory status report", SUPERVISOR),
+    ("We got a rush order, check materials, capacity and shipping", SUPERVISOR),
+    ("Plan maintenance without hurting production targets", SUPERVISOR),
+    ("Hi there", SUPERVISOR),
+    ("What should the team prioritize this week", SUPERVISOR),
+]
+
+
+def evaluate(router: KeywordRouter, llm_hop_ms: float) -> dict:
+    routed = correct_routed = label_correct = 0
+    wrong = []
+    timings = []
+    for text, expected in LABELLED_REQUESTS:
+        decision = router.route(text)
+        timings.append(decision.elapsed_us)
+        label_correct += decision.label == expected
+        if decision.agent is None:
+            continue  # falling back is always safe; it only forgoes the saving
+        routed += 1
+        if decision.agent == expected:
+            correct_routed += 1
+        else:
+            wrong.append({"request": text, "expected": expected, **decision.as_dict()})
+
+    total = len(LABELLED_REQUESTS)
+    single_domain = sum(expected != SUPERVISOR for _, expected in LABELLED_REQUESTS)
+    classifier_ms = sum(timings) / 1000
+    return {
+        "requests": total,
+        "single_domain_requests": single_domain,
+        "routed": routed,
+        "routed_correctly": correct_routed,
+        "misrouted": wrong,
+        "routing_precision": round(correct_routed / routed, 3) if routed else 0.0,
+        "single_domain_coverage": round(correct_routed / single_domain, 3) if single_domain else 0.0,
+        # Top label vs. expected, before the confidence gate
+        "label_accuracy": round(label_correct / total, 3),
+        # Requests that end up where they should (routed correctly or left to the supervisor)
+        "end_to_end_accuracy": round((total - len(wrong)) / total, 3),
+        "classifier_us_p50": round(statistics.median(timings), 1),
+        "classifier_us_max": round(max(timings), 1),
+        "llm_hop_ms_assumed": llm_hop_ms,
+        "latency_saved_ms_total": round(correct_routed * llm_hop_ms - classifier_ms, 1),
+        "latency_saved_ms_per_request": round((correct_routed * llm_hop_ms - classifier_ms) / total, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the fast-path router")
+    parser.add_argument("--llm-hop-ms", type=float, default=1500.0, help="supervisor LLM turn skipped per routed request")
+    parser.add_argument("--min-score", type=float, default=None)
+    parser.add_argument("--min-margin", type=float, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    router = KeywordRouter()
+    if args.min_score is not None:
+        router.min_score = args.min_score
+    if args.min_margin is not None:
+        router.min_margin = args.min_margin
+    build_ms = (time.perf_counter() - start) * 1000
+
+    report = evaluate(router, args.llm_hop_ms)
+    report["build_ms"] = round(build_ms, 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+MCP Response Serialization Benchmark
+Compares the default FastAPI/pydantic path with the fast_json path on large results
+
+Run from ManufacturingAgents/:
+    python benchmarks/bench_serialization.py --rows 100000 200000
+"""
+
+# File: ManufacturingAgents/benchmarks/bench_serialization.py
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fast_json  # noqa: E402
+from fast_json import compress, dumps, frame_to_json  # noqa: E402
+
+
+def make_production_frame(rows: int) -> pd.DataFrame:
+    """Synthetic frame with the production_data.csv schema"""
+    rng = np.random.default_rng(7)
+    machines = np.array([f"M{i:03d}" for i in range(1, 201)])
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-11-01 08:00", periods=rows, freq="15s")
+            .strftime("%Y-%m-%d %H:%M:%S"),
+            "machine_id": rng.choice(machines, rows),
+            "machine_type": rng.choice(["Welder", "Conveyor", "Drill", "CNC"], rows),
+            "temperature": rng.normal(77, 5, rows),
+            "vibration_level": rng.gamma(2.0, 1.1, rows),
+            "power_consumption": rng.normal(19, 3, rows),
+            "pressure": rng.normal(4.9, 0.4, rows),
+            "material_flow_rate": rng.normal(19.5, 1.3, rows),
+            "cycle_time": rng.normal(120, 3.5, rows),
+            "output_rate": rng.normal(91.7, 0.8, rows).round(2),
+            "quality_score": rng.uniform(0, 30, rows).round(2),
+            "downtime_minutes": rng.choice([0, 0, 0, 37, 38, 45], rows),
+            "efficiency_score": rng.uniform(0, 30, rows),
+            "status": rng.choice(["operational", "maintenance"], rows, p=[0.85, 0.15]),
+            "shift": rng.choice(["morning", "afternoon", "night"], rows),
+        }
+    )
+
+
+def _timed(fn, repeat: int):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def baseline(df: pd.DataFrame, meta: dict) -> bytes:
+    """What /api/mcp did before: records dicts -> pydantic model -> jsonable_encoder -> json"""
+    from adk_api_wrapper import MCPResponse
+
+    response = MCPResponse(id=1, result={**meta, "data": df.to_dict("records")})
+    return json.dumps(
+        jsonable_encoder(response), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def fast(df: pd.DataFrame, meta: dict, orient: str) -> bytes:
+    result = {**meta, "orient": orient, "data": frame_to_json(df, orient)}
+    return dumps({"jsonrpc": "2.0", "id": 1, "result": result, "error": None})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"encoder: {'orjson' if fast_json.orjson else 'json'}, "
+          f"brotli: {'yes' if fast_json.brotli else 'no'}")
+    print(f"{'rows':>9} {'path':<16} {'time ms':>9} {'MB':>8} {'speedup':>8}")
+
+    for rows in args.rows:
+        df = make_production_frame(rows)
+        meta = {"success": True, "domain": "production", "intent": "read", "count": rows}
+
+        base_time, base_body = _timed(lambda: baseline(df, meta), args.repeat)
+        results = [("baseline", base_time, base_body)]
+        for orient in ("records", "columns"):
+            elapsed, body = _timed(lambda: fast(df, meta, orient), args.repeat)
+            results.append((f"fast/{orient}", elapsed, body))
+
+        for name, elapsed, body in results:
+            print(f"{rows:>9} {name:<16} {elapsed * 1000:>9.1f} "
+                  f"{len(body) / 1e6:>8.2f} {base_time / elapsed:>7.1f}x")
+
+        body = results[1][2]
+        for encoding in ("gzip", "br"):
+            if encoding == "br" and fast_json.brotli is None:
+                continue
+            elapsed, (packed, _) = _timed(lambda: compress(body, encoding, 0), args.repeat)
+            print(f"{rows:>9} {'+' + encoding:<16} {elapsed * 1000:>9.1f} "
+                  f"{len(packed) / 1e6:>8.2f} {len(body) / len(packed):>7.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
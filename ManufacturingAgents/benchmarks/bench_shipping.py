@@ -0,0 +1,115 @@
+"""
+Shipment Planner Benchmark
+Re-plan time for thousands of open shipments, cold and after a new order lands
+
+Run from ManufacturingAgents/:
+    python benchmarks/bench_shipping.py --shipments 5000 --customers 300
+
+Writes a synthetic logistics CSV to a temporary directory and plans it
+through its own DomainStore, so the factory data is left untouched.
+"""
+
+# File: ManufacturingAgents/benchmarks/bench_shipping.py
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from supervisory_agent.tools.data_store import DomainStore  # noqa: E402
+from supervisory_agent.tools.shipping import PlanCache, ShipmentIndex  # noqa: E402
+
+CARRIERS = {"Carrier 1": (80.0, 0.38, "high"), "Carrier 2": (200.0, 0.14, "medium"), "Carrier 3": (0.0, 0.6, "low")}
+
+
+def synthetic_shipments(count: int, customers: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    carrier = rng.choice(list(CARRIERS), count)
+    quantity = rng.integers(50, 1500, count)
+    fixed = np.array([CARRIERS[c][0] for c in carrier])
+    rate = np.array([CARRIERS[c][1] for c in carrier])
+    return pd.DataFrame(
+        {
+            "shipment_id": [f"SH{n:06d}" for n in range(count)],
+            "order_id": [f"ORD{n:06d}" for n in range(count)],
+            "customer": [f"Customer {c}" for c in rng.integers(0, customers, count)],
+            "product": rng.choice(["Product X", "Product Y", "Product Z"], count),
+            "quantity": quantity,
+            "scheduled_date": (np.datetime64("2024-11-01") + rng.integers(0, 60, count)).astype(str),
+            "status": rng.choice(["scheduled", "preparing", "in_transit", "delivered"], count, p=[0.5, 0.3, 0.1, 0.1]),
+            "priority": [CARRIERS[c][2] for c in carrier],
+            "delivery_date": "",
+            "carrier": carrier,
+            "tracking_number": "",
+            "estimated_cost": np.round(fixed + rate * quantity * rng.uniform(0.9, 1.1, count), 2),
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the shipment consolidation planner")
+    parser.add_argument("--shipments", type=int, default=5000)
+    parser.add_argument("--customers", type=int, default=300)
+    parser.add_argument("--max-load-units", type=float, default=2000.0)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "logistics_data.csv"
+        synthetic_shipments(args.shipments, args.customers, args.seed).to_csv(path, index=False)
+        store = DomainStore({"logistics": path})
+        index = ShipmentIndex(store)
+        plans = PlanCache(index)
+
+        start = time.perf_counter()
+        cold = plans.get(args.max_load_units, 3)
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        plans.get(args.max_load_units, 3)
+        cached_ms = (time.perf_counter() - start) * 1000
+
+        def add_order(df):
+            row = df.iloc[[0]].assign(shipment_id="SH-NEW", order_id="ORD-NEW", status="scheduled")
+            return pd.concat([df, row], ignore_index=True), None
+
+        start = time.perf_counter()
+        store.modify("logistics", add_order)
+        replanned = plans.get(args.max_load_units, 3)
+        replan_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        _, _, hits = index.lookup(["scheduled"], ["Carrier 2"], "2024-11-10", "2024-11-20")
+        lookup_us = (time.perf_counter() - start) * 1e6
+
+    print(
+        json.dumps(
+            {
+                "shipments": args.shipments,
+                "open_shipments": cold["open_shipments"],
+                "loads": len(cold["loads"]),
+                "consolidated_loads": cold["consolidated_loads"],
+                "current_cost": cold["current_cost"],
+                "planned_cost": cold["planned_cost"],
+                "savings": cold["savings"],
+                "plan_ms_cold": round(cold_ms, 1),
+                "plan_ms_cached": round(cached_ms, 3),
+                "new_order_write_and_replan_ms": round(replan_ms, 1),
+                "replanned_open_shipments": replanned["open_shipments"],
+                "indexed_lookup_us": round(lookup_us, 1),
+                "indexed_lookup_hits": int(len(hits)),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
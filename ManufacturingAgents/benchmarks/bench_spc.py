@@ -0,0 +1,88 @@
+"""
+SPC Engine Benchmark
+Per-inspection update cost of the incremental control charts across stream sizes
+
+Run from ManufacturingAgents/:
+    python benchmarks/bench_spc.py --inspections 100000 1000000 --machines 500
+"""
+
+# File: ManufacturingAgents/benchmarks/bench_spc.py
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+
+from supervisory_agent.tools.spc import SPCEngine  # noqa: E402
+
+
+class _NoStore:
+    """Stands in for DomainStore: the benchmark feeds rows through observe()"""
+
+    def subscribe(self, callback) -> None:
+        pass
+
+
+def synthetic_inspections(count: int, machines: int, products: int, seed: int):
+    """defect_rate around 10 with a +2 shift on a tenth of the machines in the last quarter."""
+    rng = np.random.default_rng(seed)
+    machine = rng.integers(0, machines, count)
+    product = rng.integers(0, products, count)
+    rate = rng.normal(10, 2, count)
+    shifted = (machine % 10 == 0) & (np.arange(count) >= count * 3 // 4)
+    rate[shifted] += 2
+    failed = rng.random(count) < 0.05
+    return [
+        {
+            "timestamp": str(i),
+            "batch_id": f"B{i}",
+            "machine_id": f"M{m:04d}",
+            "product_id": f"PX{p:04d}",
+            "defect_rate": float(r),
+            "inspection_status": "failed" if f else "passed",
+        }
+        for i, (m, p, r, f) in enumerate(zip(machine, product, rate, failed))
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the SPC engine")
+    parser.add_argument("--inspections", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--machines", type=int, default=500)
+    parser.add_argument("--products", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = []
+    for count in args.inspections:
+        records = synthetic_inspections(count, args.machines, args.products, seed=count)
+        engine = SPCEngine(_NoStore())
+        violations = 0
+        start = time.perf_counter()
+        for record in records:
+            violations += len(engine.observe(record))
+        elapsed = time.perf_counter() - start
+        shifted = [
+            state
+            for key, state in engine._states["machine"].items()
+            if int(key[1:]) % 10 == 0
+        ]
+        results.append(
+            {
+                "inspections": count,
+                "seconds": round(elapsed, 2),
+                "us_per_inspection": round(elapsed / count * 1e6, 2),
+                "violations": violations,
+                "shifted_machines_flagged": sum(1 for s in shifted if any(v["chart"] == "cusum" for v in s.violations)),
+                "shifted_machines": len(shifted),
+            }
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
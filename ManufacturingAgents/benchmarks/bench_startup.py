@@ -0,0 +1,94 @@
+"""
+Startup / Import-Time Benchmark
+Measures cold import cost of the bridge and agent modules in fresh interpreters
+
+Run from ManufacturingAgents/:
+    python benchmarks/bench_startup.py --runs 5
+"""
+
+# File: ManufacturingAgents/benchmarks/bench_startup.py
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "status_hub",
+    "fast_json",
+    "supervisory_agent.tools.data_store",
+    "supervisory_agent.tools.tools",
+    "supervisory_agent.agent",
+    "adk_api_wrapper",
+]
+
+# Work deferred to first use, measured separately from the import
+FIRST_USE = {
+    "supervisory_agent.agent": "mod.root_agent",
+    "supervisory_agent.tools.tools": "mod.mcp_call('production', 'read', {})",
+}
+
+HEAVY = ["pandas", "numpy", "google.adk", "httpx", "uvicorn", "dotenv"]
+
+PROBE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+mod = importlib.import_module({module!r})
+imported = time.perf_counter()
+heavy = [name for name in {heavy!r} if name in sys.modules]
+{first_use}
+done = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "first_use_ms": (done - imported) * 1000,
+    "heavy": heavy,
+}}))
+"""
+
+
+def measure(module: str, runs: int) -> dict:
+    code = PROBE.format(
+        module=module, first_use=FIRST_USE.get(module, "pass"), heavy=HEAVY
+    )
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1]}
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    return {
+        "import_ms": statistics.median(s["import_ms"] for s in samples),
+        "first_use_ms": statistics.median(s["first_use_ms"] for s in samples),
+        "heavy": samples[-1]["heavy"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+
+    print(f"{'module':<38} {'import ms':>10} {'first use ms':>13}  heavy deps loaded at import")
+    for module in args.modules:
+        result = measure(module, args.runs)
+        if "error" in result:
+            print(f"{module:<38} {'error':>10}  {result['error']}")
+            continue
+        first_use = f"{result['first_use_ms']:.1f}" if module in FIRST_USE else "-"
+        print(f"{module:<38} {result['import_ms']:>10.1f} {first_use:>13}  "
+              f"{', '.join(result['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
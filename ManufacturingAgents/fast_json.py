@@ -0,0 +1,145 @@
+"""
+Fast JSON Serialization
+Encodes MCP responses without the pydantic/jsonable_encoder path and
+compresses large bodies with brotli or gzip
+"""
+
+# File: ManufacturingAgents/fast_json.py
+
+import gzip
+import json
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+FRAME_ORIENTS = ("records", "columns")
+
+
+class RawJSON:
+    """Pre-encoded JSON fragment embedded verbatim by `dumps`"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+def _fallback_default(obj: Any) -> Any:
+    if hasattr(obj, "item"):  # NumPy scalars
+        return obj.item()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode to JSON bytes, splicing in any RawJSON fragments."""
+    fragments: Dict[str, bytes] = {}
+    prefix = uuid.uuid4().hex
+
+    def default(value: Any) -> Any:
+        if isinstance(value, RawJSON):
+            token = f"__raw_{prefix}_{len(fragments)}__"
+            fragments[token] = value.data
+            return token
+        return _fallback_default(value)
+
+    if orjson is not None:
+        encoded = orjson.dumps(
+            obj,
+            default=default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    else:
+        encoded = json.dumps(obj, default=default, separators=(",", ":")).encode()
+
+    for token, fragment in fragments.items():
+        encoded = encoded.replace(b'"' + token.encode() + b'"', fragment, 1)
+    return encoded
+
+
+def frame_to_json(df, orient: str = "records") -> RawJSON:
+    """Serialize a DataFrame straight to JSON without per-row dicts.
+
+    `records` gives a list of row objects (same shape as `to_dict('records')`),
+    `columns` gives {column: [values, ...]}, which is smaller for wide results.
+    """
+    if orient == "records":
+        encoded = df.to_json(orient="records", date_format="iso", double_precision=15)
+        return RawJSON(encoded.encode())
+    if orient == "columns":
+        parts = [
+            json.dumps(str(column)) + ":"
+            + df[column].to_json(orient="values", date_format="iso", double_precision=15)
+            for column in df.columns
+        ]
+        return RawJSON(("{" + ",".join(parts) + "}").encode())
+    raise ValueError(f"Unknown orient '{orient}', expected one of {FRAME_ORIENTS}")
+
+
+def _quality(params: List[str]) -> float:
+    """q-value of one Accept-Encoding entry; 1 if absent, 0 if malformed."""
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value.strip())
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def _pick_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = set()
+    for token in accept_encoding.split(","):
+        coding, *params = token.split(";")
+        coding = coding.strip().lower()
+        # "br;q=0", "gzip; q=0.0": explicitly refused
+        if coding and _quality(params) > 0:
+            accepted.add(coding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, accept_encoding: str, min_size: int) -> Tuple[bytes, Optional[str]]:
+    """Compress `body` with the best encoding the client accepts, above `min_size`."""
+    if len(body) < min_size:
+        return body, None
+    encoding = _pick_encoding(accept_encoding or "")
+    if encoding == "br":
+        return brotli.compress(body, quality=4), encoding
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=3), encoding
+    return body, None
+
+
+def json_response(
+    content: Any, request: Request, min_size: int, status_code: int = 200
+) -> Response:
+    """JSON response encoded with `dumps` and negotiated compression."""
+    body, encoding = compress(
+        dumps(content), request.headers.get("accept-encoding", ""), min_size
+    )
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,443 @@
+"""
+Sensor Ingestion
+Validates production readings in bulk, micro-batches them by size and age and
+appends them to the domain store, with backpressure when the writer falls behind
+"""
+
+# File: ManufacturingAgents/ingestion.py
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib decoder
+    orjson = None
+
+from supervisory_agent.tools.shifts import shift_names
+
+# production_data.csv columns: (name, kind, required). Optional columns get
+# defaults: machine_type from the machine's last reading, status
+# "operational", shift from the hour (the shared calendar in tools/shifts.py).
+PRODUCTION_SCHEMA: Tuple[Tuple[str, str, bool], ...] = (
+    ("timestamp", "timestamp", True),
+    ("machine_id", "str", True),
+    ("machine_type", "str", False),
+    ("temperature", "float", True),
+    ("vibration_level", "float", True),
+    ("power_consumption", "float", True),
+    ("pressure", "float", True),
+    ("material_flow_rate", "float", True),
+    ("cycle_time", "float", True),
+    ("output_rate", "float", True),
+    ("quality_score", "float", True),
+    ("downtime_minutes", "int", True),
+    ("efficiency_score", "float", False),
+    ("status", "str", False),
+    ("shift", "str", False),
+)
+STATUSES = ("operational", "maintenance")
+RETRY_MAX_SECONDS = 5.0  # backoff cap between attempts to write a failed batch
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+MAX_ERRORS = 5  # rejected-row messages returned per request
+
+
+class SchemaError(ValueError):
+    """Payload cannot be read as readings at all (maps to HTTP 422)"""
+
+
+class Backpressure(Exception):
+    """Writer is behind and the buffer stayed full (maps to HTTP 429)"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Ingestion buffer full")
+        self.retry_after = retry_after
+
+
+def decode(body: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def to_frame(payload: Any):
+    """
+    Readings as a DataFrame from any accepted shape:
+    {"columns": {name: [values]}} (fastest), {"readings": [records]},
+    a list of records, or a single record.
+    """
+    import pandas as pd
+
+    if isinstance(payload, dict) and "columns" in payload:
+        columns = payload["columns"]
+        if (
+            not isinstance(columns, dict)
+            or not columns
+            or not all(isinstance(v, list) for v in columns.values())
+            or len({len(v) for v in columns.values()}) != 1
+        ):
+            raise SchemaError("'columns' must map column names to value lists of equal length")
+        return pd.DataFrame(columns)
+    if isinstance(payload, dict) and "readings" in payload:
+        payload = payload["readings"]
+    elif isinstance(payload, dict):
+        payload = [payload]
+    if not isinstance(payload, list) or not all(isinstance(r, dict) for r in payload):
+        raise SchemaError("Expected {'columns': {...}}, {'readings': [...]}, a list of readings or one reading")
+    return pd.DataFrame.from_records(payload)
+
+
+def csv_lines(rows) -> Optional[str]:
+    """
+    CSV text of `rows` (no header), formatting numeric columns with orjson,
+    several times faster than DataFrame.to_csv. None if orjson is missing
+    or a text value would need quoting; the store then uses to_csv.
+    """
+    if orjson is None or rows.empty:
+        return None
+    columns = []
+    for name in rows.columns:
+        values = rows[name]
+        if values.dtype.kind in "fiu":
+            # Shortest round-trip floats, as to_csv writes them; NaN -> empty
+            encoded = orjson.dumps(values.to_numpy().tolist()).decode()[1:-1].replace("null", "")
+            columns.append(encoded.split(","))
+        else:
+            text = values.fillna("").astype(str).tolist()
+            joined = "\x00".join(text)
+            if any(c in joined for c in ',"\n\r'):
+                return None
+            columns.append(text)
+    return "\n".join(map(",".join, zip(*columns))) + "\n"
+
+
+def validate(frame, machine_types: Dict[str, str]):
+    """
+    Vectorized check against PRODUCTION_SCHEMA. Returns the valid rows in
+    CSV form (canonical timestamps, defaults filled), the number rejected
+    and the first MAX_ERRORS reasons.
+    """
+    import numpy as np
+    import pandas as pd
+
+    names = [name for name, _, _ in PRODUCTION_SCHEMA]
+    unknown = [c for c in frame.columns if c not in names]
+    if unknown:
+        raise SchemaError(f"Unknown column(s): {unknown}")
+    missing = [name for name, _, required in PRODUCTION_SCHEMA if required and name not in frame.columns]
+    if missing:
+        raise SchemaError(f"Missing required column(s): {missing}")
+
+    n = len(frame)
+    bad = np.zeros(n, dtype=bool)
+    reasons: List[str] = []
+
+    def reject(mask, reason: str) -> None:
+        mask = np.asarray(mask) & ~bad
+        if mask.any():
+            if len(reasons) < MAX_ERRORS:
+                reasons.append(f"row {int(np.argmax(mask))}: {reason} ({int(mask.sum())} rows)")
+            bad[mask] = True
+
+    out = {}
+    for name, kind, required in PRODUCTION_SCHEMA:
+        if name not in frame.columns:
+            continue
+        column = frame[name]
+        if kind == "timestamp":
+            # Naive times are kept as sent; offsets are converted to UTC
+            parsed = pd.to_datetime(column, errors="coerce", format="ISO8601", utc=True).dt.tz_localize(None)
+            reject(parsed.isna().to_numpy(), f"invalid {name}")
+            out[name] = parsed
+        elif kind in ("float", "int"):
+            values = pd.to_numeric(column, errors="coerce").to_numpy(dtype=np.float64)
+            invalid = ~np.isfinite(values)
+            if required:
+                reject(invalid, f"{name} must be a finite number")
+            if kind == "int":
+                reject(np.isfinite(values) & (values != np.round(values)), f"{name} must be an integer")
+            out[name] = values
+        else:
+            values = column.astype(object)
+            empty = values.isna().to_numpy() | (values.astype(str).str.len() == 0).to_numpy()
+            if required:
+                reject(empty, f"{name} is required")
+            out[name] = values.where(~empty, None)
+
+    if "status" in out:
+        status = out["status"].fillna("operational")
+        reject(~status.isin(STATUSES).to_numpy(), f"status must be one of {list(STATUSES)}")
+        out["status"] = status
+
+    keep = ~bad
+    rows = pd.DataFrame({name: (v[keep] if isinstance(v, np.ndarray) else v[keep].to_numpy()) for name, v in out.items()})
+    if rows.empty:
+        return rows, int(bad.sum()), reasons
+
+    stamps = pd.DatetimeIndex(rows["timestamp"])
+    rows["timestamp"] = stamps.strftime(TIMESTAMP_FORMAT)
+    if "downtime_minutes" in rows:
+        rows["downtime_minutes"] = rows["downtime_minutes"].astype(np.int64)
+    known = rows["machine_id"].astype(str).map(machine_types)
+    rows["machine_type"] = rows["machine_type"].fillna(known) if "machine_type" in rows else known
+    if "status" not in rows:
+        rows["status"] = "operational"
+    if "shift" not in rows:
+        rows["shift"] = shift_names(stamps.hour.to_numpy())
+    else:
+        rows["shift"] = rows["shift"].fillna(pd.Series(shift_names(stamps.hour.to_numpy()), index=rows.index))
+    return rows, int(bad.sum()), reasons
+
+
+def parse_readings(body: bytes, machine_types: Dict[str, str]):
+    """Bytes of one request or message -> (valid rows, rejected count, reasons)."""
+    try:
+        payload = decode(body)
+    except ValueError as e:
+        raise SchemaError(f"Invalid JSON: {e}")
+    return validate(to_frame(payload), machine_types)
+
+
+class Ingestor:
+    """
+    Buffer of validated readings in front of DomainStore.append.
+
+    `submit` adds a batch to the buffer; one writer task flushes it when
+    `batch_rows` rows are waiting or the oldest has waited `flush_seconds`,
+    appending everything buffered in a single write (in a thread). Buffered
+    plus in-flight rows are capped at `max_pending_rows`: submitters wait
+    for room, and give up with Backpressure after `submit_timeout` seconds.
+
+    Rows are acknowledged once buffered. A batch whose write fails goes back
+    to the front of the buffer and is retried with backoff; meanwhile the
+    buffer fills, submitters get Backpressure, and the error is reported in
+    `stats()` and `write_error`. Only rows still failing at `stop()` are lost
+    (counted in `lost_rows`).
+
+    Store subscribers (status registry, caches, SPC, retention) are not
+    called from the write itself: a separate notifier task calls them at
+    most once per `notify_seconds`, covering every flush since the last
+    call, so the writer never waits on listeners that scan the table.
+    """
+
+    def __init__(
+        self,
+        store,
+        domain: str = "production",
+        batch_rows: int = 50_000,
+        flush_seconds: float = 0.25,
+        max_pending_rows: int = 500_000,
+        submit_timeout: float = 5.0,
+        notify_seconds: float = 1.0,
+    ):
+        self.store = store
+        self.domain = domain
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        self.max_pending_rows = max_pending_rows
+        self.submit_timeout = submit_timeout
+        self.notify_seconds = notify_seconds
+
+        self._buffer: List[Any] = []
+        self._buffered_rows = 0
+        self._inflight_rows = 0
+        self._oldest: Optional[float] = None
+        self._retry_at = 0.0
+        self._retry_delay = 0.0
+        self._machine_types: Optional[Dict[str, str]] = None
+        self._changed: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+        self._notifier: Optional[asyncio.Task] = None
+        self._unnotified = False
+        self._stopping = False
+
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.flushes = 0
+        self.backpressure_waits = 0
+        self.backpressure_rejections = 0
+        self.last_flush_ms = 0.0
+        self.write_errors = 0
+        self.write_error: Optional[str] = None  # last failure, until a write succeeds
+        self.lost_rows = 0
+        self.notifications = 0
+        self.last_notify_ms = 0.0
+
+    @property
+    def pending_rows(self) -> int:
+        return self._buffered_rows + self._inflight_rows
+
+    def machine_types(self) -> Dict[str, str]:
+        """machine_id -> machine_type of its last reading, for rows that omit it."""
+        if self._machine_types is None:
+            df = self.store.frame(self.domain)
+            self._machine_types = dict(
+                zip(df["machine_id"].astype(str), df["machine_type"].astype(str))
+            )
+        return self._machine_types
+
+    def start(self) -> None:
+        """Start the writer on the running loop (idempotent)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._changed = asyncio.Condition()
+        self._stopping = False
+        self._task = asyncio.create_task(self._writer())
+
+    async def stop(self) -> None:
+        """Let the writer flush what is buffered, then stop it."""
+        if self._task is None:
+            return
+        async with self._changed:
+            self._stopping = True
+            self._changed.notify_all()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._notifier is not None:
+            await asyncio.gather(self._notifier, return_exceptions=True)
+            self._notifier = None
+
+    async def parse(self, body: bytes):
+        """Decode and validate off the event loop."""
+        return await asyncio.to_thread(parse_readings, body, self.machine_types())
+
+    async def submit(self, rows, rejected: int = 0, wait: Optional[float] = None) -> None:
+        """
+        Queue validated rows for the writer. Waits while the buffer is full;
+        raises Backpressure once `wait` (default submit_timeout) has passed.
+        """
+        self.start()
+        self.rejected += rejected
+        count = len(rows)
+        if not count:
+            return
+        # wait=inf: block until there is room (WebSocket streams)
+        timeout = self.submit_timeout if wait is None else (None if wait == float("inf") else wait)
+        async with self._changed:
+            if not self._has_room(count):
+                self.backpressure_waits += 1
+                try:
+                    await asyncio.wait_for(self._changed.wait_for(lambda: self._has_room(count)), timeout)
+                except asyncio.TimeoutError:
+                    self.backpressure_rejections += 1
+                    raise Backpressure(retry_after=max(self.flush_seconds, self.last_flush_ms / 1000, self._retry_delay))
+            self._buffer.append(rows)
+            self._buffered_rows += count
+            self._oldest = self._oldest or time.monotonic()
+            self.accepted += count
+            latest = rows[["machine_id", "machine_type"]].dropna().drop_duplicates("machine_id", keep="last")
+            self.machine_types().update(zip(latest["machine_id"].astype(str), latest["machine_type"].astype(str)))
+            self._changed.notify_all()
+
+    def _has_room(self, count: int) -> bool:
+        # An empty buffer always takes one batch, however large
+        return self.pending_rows == 0 or self.pending_rows + count <= self.max_pending_rows
+
+    def _due(self) -> bool:
+        if not self._buffer or time.monotonic() < self._retry_at:
+            return False
+        return self._buffered_rows >= self.batch_rows or time.monotonic() - self._oldest >= self.flush_seconds
+
+    async def _writer(self) -> None:
+        while True:
+            async with self._changed:
+                if self._stopping and not self._buffer:
+                    return
+                while not self._due() and not self._stopping:
+                    delay = None if not self._buffer else max(
+                        0.0, self._oldest + self.flush_seconds - time.monotonic(), self._retry_at - time.monotonic()
+                    )
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+            if self._buffer:
+                await self._flush()
+
+    async def _flush(self) -> None:
+        import pandas as pd
+
+        batch, self._buffer = self._buffer, []
+        rows = self._buffered_rows
+        self._inflight_rows += rows
+        self._buffered_rows = 0
+        self._oldest = None
+        started = time.perf_counter()
+        frame = batch[0] if len(batch) == 1 else pd.concat(batch, ignore_index=True)
+        try:
+            await asyncio.to_thread(self._write, frame)
+            self.written += rows
+            self.flushes += 1
+            self.write_error = None
+            self._retry_delay = 0.0
+            self._schedule_notify()
+        except Exception as e:
+            self.write_errors += 1
+            self.write_error = f"{type(e).__name__}: {e}"
+            if self._stopping:
+                self.lost_rows += rows
+                print(f"Ingestion write failed at shutdown, {rows} rows lost: {e}")
+            else:
+                # The store cut the partial write back off: retry the whole batch
+                self._buffer.insert(0, frame)
+                self._buffered_rows += rows
+                self._oldest = time.monotonic() - self.flush_seconds  # due as soon as _retry_at passes
+                self._retry_delay = min(RETRY_MAX_SECONDS, max(self.flush_seconds, 2 * self._retry_delay))
+                self._retry_at = time.monotonic() + self._retry_delay
+                print(f"Ingestion write failed ({rows} rows), retrying in {self._retry_delay:.2f}s: {e}")
+        finally:
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+            self._inflight_rows -= rows
+            if self._changed is not None:
+                async with self._changed:
+                    self._changed.notify_all()
+
+    def _write(self, frame) -> None:
+        frame = frame.reindex(columns=[name for name, _, _ in PRODUCTION_SCHEMA])
+        self.store.append(self.domain, frame, text=csv_lines(frame), notify=False)
+
+    def _schedule_notify(self) -> None:
+        self._unnotified = True
+        if self._notifier is None or self._notifier.done():
+            self._notifier = asyncio.create_task(self._notify_loop())
+
+    async def _notify_loop(self) -> None:
+        # One store notification for all flushes since the previous one;
+        # stops once a notification found nothing new to cover
+        while self._unnotified:
+            self._unnotified = False
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self.store.notify, self.domain)
+                self.notifications += 1
+            except Exception as e:
+                print(f"Ingestion notify failed: {e}")
+            self.last_notify_ms = (time.perf_counter() - started) * 1000
+            if self._unnotified and not self._stopping:
+                await asyncio.sleep(self.notify_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "domain": self.domain,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "buffered_rows": self._buffered_rows,
+            "inflight_rows": self._inflight_rows,
+            "max_pending_rows": self.max_pending_rows,
+            "batch_rows": self.batch_rows,
+            "flush_seconds": self.flush_seconds,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "backpressure_waits": self.backpressure_waits,
+            "backpressure_rejections": self.backpressure_rejections,
+            "write_errors": self.write_errors,
+            "write_error": self.write_error,
+            "lost_rows": self.lost_rows,
+            "notifications": self.notifications,
+            "last_notify_ms": round(self.last_notify_ms, 2),
+            "writer_running": self._task is not None and not self._task.done(),
+        }
@@ -0,0 +1,146 @@
+"""
+Local Hugging Face Inference Stand-in
+Mimics the HF router and legacy text-generation endpoints for offline load testing
+
+Run from ManufacturingAgents/:
+    python loadtest/hf_standin.py --port 9000 --latency-ms 800 --jitter-ms 200 \\
+        --concurrency 8 --router-error-rate 0.05
+
+Point the bridge at it:
+    HF_API_TOKEN=dummy \\
+    HF_ROUTER_BASE_URL=http://localhost:9000/hf-inference \\
+    HF_LEGACY_BASE_URL=http://localhost:9000 \\
+    python adk_api_wrapper.py
+"""
+
+# File: ManufacturingAgents/loadtest/hf_standin.py
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Response shapes accepted by adk_api_wrapper._extract_generated_text
+RESPONSE_FORMATS = ("list", "dict", "mixed")
+
+
+class StandinSettings:
+    def __init__(
+        self,
+        latency_ms: float = 500.0,
+        jitter_ms: float = 100.0,
+        ms_per_token: float = 0.0,
+        concurrency: int = 0,
+        router_error_rate: float = 0.0,
+        legacy_error_rate: float = 0.0,
+        response_format: str = "list",
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.ms_per_token = ms_per_token  # extra latency per generated token
+        self.concurrency = concurrency  # 0 = unlimited; else requests queue like a busy GPU
+        self.router_error_rate = router_error_rate
+        self.legacy_error_rate = legacy_error_rate
+        self.response_format = response_format
+        self.rng = random.Random(seed)
+
+
+def create_app(settings: StandinSettings) -> FastAPI:
+    app = FastAPI(title="HF Inference Stand-in")
+    slots = asyncio.Semaphore(settings.concurrency) if settings.concurrency else None
+    counters: Dict[str, int] = {"requests": 0, "errors": 0, "inflight": 0}
+
+    def _generate(prompt: str, max_new_tokens: int) -> str:
+        words = prompt.split()[-20:] or ["status"]
+        return " ".join(settings.rng.choice(words) for _ in range(max_new_tokens // 4 or 1))
+
+    def _body(text: str) -> Any:
+        fmt = settings.response_format
+        if fmt == "mixed":
+            fmt = settings.rng.choice(("list", "dict"))
+        return [{"generated_text": text}] if fmt == "list" else {"generated_text": text}
+
+    async def _serve(request: Request, error_rate: float) -> JSONResponse:
+        counters["requests"] += 1
+        if not request.headers.get("authorization", "").startswith("Bearer "):
+            return JSONResponse({"error": "Authorization header is required"}, status_code=401)
+
+        payload = await request.json()
+        parameters = payload.get("parameters") or {}
+        max_new_tokens = int(parameters.get("max_new_tokens", 200))
+
+        async def _work() -> JSONResponse:
+            counters["inflight"] += 1
+            try:
+                delay = settings.latency_ms + settings.rng.uniform(
+                    -settings.jitter_ms, settings.jitter_ms
+                )
+                delay += settings.ms_per_token * max_new_tokens
+                await asyncio.sleep(max(0.0, delay) / 1000)
+
+                if settings.rng.random() < error_rate:
+                    counters["errors"] += 1
+                    return JSONResponse(
+                        {"error": "Model is currently loading", "estimated_time": 20.0},
+                        status_code=503,
+                    )
+                text = _generate(str(payload.get("inputs", "")), max_new_tokens)
+                return JSONResponse(_body(text))
+            finally:
+                counters["inflight"] -= 1
+
+        if slots is None:
+            return await _work()
+        async with slots:
+            return await _work()
+
+    @app.post("/hf-inference/models/{model_id:path}")
+    async def router_endpoint(model_id: str, request: Request):
+        return await _serve(request, settings.router_error_rate)
+
+    @app.post("/models/{model_id:path}")
+    async def legacy_endpoint(model_id: str, request: Request):
+        return await _serve(request, settings.legacy_error_rate)
+
+    @app.get("/stats")
+    async def stats():
+        return {**counters, "time": time.time()}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the HF inference API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--ms-per-token", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=0, help="0 = unlimited")
+    parser.add_argument("--router-error-rate", type=float, default=0.0)
+    parser.add_argument("--legacy-error-rate", type=float, default=0.0)
+    parser.add_argument("--format", choices=RESPONSE_FORMATS, default="list")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    settings = StandinSettings(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        ms_per_token=args.ms_per_token,
+        concurrency=args.concurrency,
+        router_error_rate=args.router_error_rate,
+        legacy_error_rate=args.legacy_error_rate,
+        response_format=args.format,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Load Generator for the ADK-React Bridge
+Open-loop traffic against /api/mcp, /api/agents and /ws/agent/{id} with latency percentiles
+
+Run from ManufacturingAgents/ against a running bridge (see loadtest/hf_standin.py):
+    python loadtest/load_generator.py --url http://localhost:8000 --duration 30 \\
+        --status-rate 200 --system-rate 20 --message-rate 2 --agents-rate 50 --ws-clients 100
+
+Requests are scheduled at fixed target rates regardless of how fast the server
+answers (open loop), so queueing inside the bridge shows up as latency instead
+of silently lowering the offered load.
+"""
+
+# File: ManufacturingAgents/loadtest/load_generator.py
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+AGENT_IDS = ["production", "inventory", "logistics", "maintenance", "quality", "supervisory"]
+
+
+class LatencyStats:
+    """Latencies and outcomes for one traffic stream"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.outcomes: Counter = Counter()
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    def record(self, latency: float, outcome: Any) -> None:
+        self.latencies.append(latency)
+        self.outcomes[str(outcome)] += 1
+
+    @staticmethod
+    def _percentile(ordered: List[float], q: float) -> float:
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        elapsed = (self.finished or time.monotonic()) - self.started
+        ok = sum(n for outcome, n in self.outcomes.items() if outcome.startswith("2") or outcome == "ok")
+        return {
+            "stream": self.name,
+            "requests": len(ordered),
+            "ok": ok,
+            "outcomes": dict(self.outcomes),
+            "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed > 0 else 0.0,
+            "p50_ms": round(self._percentile(ordered, 50) * 1000, 2),
+            "p90_ms": round(self._percentile(ordered, 90) * 1000, 2),
+            "p99_ms": round(self._percentile(ordered, 99) * 1000, 2),
+            "max_ms": round((ordered[-1] if ordered else 0.0) * 1000, 2),
+        }
+
+
+# ---------------------------------------------------------------------------
+# HTTP streams
+# ---------------------------------------------------------------------------
+
+
+def _mcp_status_call(rng: random.Random) -> Dict[str, Any]:
+    return {"method": "agent.status", "params": {"agent_id": rng.choice(AGENT_IDS)}}
+
+
+def _mcp_system_call(rng: random.Random) -> Dict[str, Any]:
+    return {"method": "system.status", "params": {}}
+
+
+def _mcp_message_call(rng: random.Random) -> Dict[str, Any]:
+    agent_id = rng.choice(AGENT_IDS)
+    return {
+        "method": "agent.message",
+        "params": {"agent_id": agent_id, "message": f"Summarize current {agent_id} status"},
+    }
+
+
+async def _timed(stats: LatencyStats, send: Callable[[], Any]) -> None:
+    start = time.monotonic()
+    try:
+        response = await send()
+        outcome = response.status_code
+    except httpx.TimeoutException:
+        outcome = "timeout"
+    except httpx.HTTPError as exc:
+        outcome = type(exc).__name__
+    stats.record(time.monotonic() - start, outcome)
+
+
+async def run_stream(
+    stats: LatencyStats,
+    rate: float,
+    duration: float,
+    send: Callable[[], Any],
+    poisson: bool,
+    rng: random.Random,
+) -> None:
+    """Fire `send` at `rate` per second for `duration` seconds without waiting for replies."""
+    if rate <= 0:
+        return
+    tasks = set()
+    deadline = time.monotonic() + duration
+    next_at = time.monotonic()
+    while next_at < deadline:
+        delay = next_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(_timed(stats, send))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        next_at += rng.expovariate(rate) if poisson else 1.0 / rate
+    if tasks:
+        await asyncio.gather(*tasks)
+    stats.finished = time.monotonic()
+
+
+# ---------------------------------------------------------------------------
+# WebSocket clients
+# ---------------------------------------------------------------------------
+
+
+async def run_ws_client(
+    ws_url: str,
+    agent_id: str,
+    duration: float,
+    refresh_interval: float,
+    connect_stats: LatencyStats,
+    refresh_stats: LatencyStats,
+    messages: Counter,
+) -> None:
+    """
+    Hold one dashboard connection open. Every `refresh_interval` seconds the
+    client asks for a refresh and times the round trip to the next snapshot;
+    pushed deltas in between are only counted.
+    """
+    import websockets  # optional; only needed for --ws-clients
+
+    start = time.monotonic()
+    try:
+        async with websockets.connect(f"{ws_url}/ws/agent/{agent_id}") as ws:
+            json.loads(await ws.recv())  # initial snapshot
+            connect_stats.record(time.monotonic() - start, "ok")
+
+            deadline = start + duration
+            while time.monotonic() < deadline:
+                if refresh_interval > 0:
+                    sent = time.monotonic()
+                    await ws.send("refresh")
+                else:
+                    sent = None
+                wait_until = time.monotonic() + (refresh_interval or (deadline - time.monotonic()))
+                while True:
+                    remaining = min(wait_until, deadline) - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        message = json.loads(await asyncio.wait_for(ws.recv(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                    messages[message.get("type", "unknown")] += 1
+                    if sent is not None and message.get("type") == "snapshot":
+                        refresh_stats.record(time.monotonic() - sent, "ok")
+                        sent = None
+                if sent is not None:
+                    refresh_stats.record(time.monotonic() - sent, "timeout")
+    except Exception as exc:  # connection refused, closed by server, ...
+        connect_stats.record(time.monotonic() - start, type(exc).__name__)
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    client_ids = itertools.cycle([f"loadgen-{i}" for i in range(args.clients)])
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    timeout = httpx.Timeout(args.timeout)
+
+    streams: List[LatencyStats] = []
+    jobs = []
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+
+        def mcp_sender(make_call: Callable[[random.Random], Dict[str, Any]]):
+            def send():
+                body = dict(make_call(rng), id=1)
+                return client.post("/api/mcp", json=body, headers={"X-Client-Id": next(client_ids)})
+            return send
+
+        def agents_sender():
+            return client.get("/api/agents", headers={"X-Client-Id": next(client_ids)})
+
+        for name, rate, send in (
+            ("mcp agent.status", args.status_rate, mcp_sender(_mcp_status_call)),
+            ("mcp system.status", args.system_rate, mcp_sender(_mcp_system_call)),
+            ("mcp agent.message", args.message_rate, mcp_sender(_mcp_message_call)),
+            ("GET /api/agents", args.agents_rate, agents_sender),
+        ):
+            if rate > 0:
+                stats = LatencyStats(name)
+                streams.append(stats)
+                jobs.append(run_stream(stats, rate, args.duration, send, args.poisson, rng))
+
+        ws_messages: Counter = Counter()
+        if args.ws_clients:
+            ws_url = args.url.replace("http://", "ws://", 1).replace("https://", "wss://", 1)
+            connect_stats = LatencyStats("ws connect")
+            refresh_stats = LatencyStats("ws refresh")
+            streams += [connect_stats, refresh_stats]
+            for i in range(args.ws_clients):
+                jobs.append(
+                    run_ws_client(
+                        ws_url,
+                        AGENT_IDS[i % len(AGENT_IDS)],
+                        args.duration,
+                        args.ws_refresh_interval,
+                        connect_stats,
+                        refresh_stats,
+                        ws_messages,
+                    )
+                )
+
+        await asyncio.gather(*jobs)
+
+        server_stats = {}
+        for path in ("/api/admission/stats", "/api/ws/stats"):
+            try:
+                server_stats[path] = (await client.get(path)).json()
+            except httpx.HTTPError:
+                pass
+
+    for stats in streams:
+        stats.finished = stats.finished or time.monotonic()
+    return {
+        "target": args.url,
+        "duration_seconds": args.duration,
+        "streams": [stats.summary() for stats in streams],
+        "ws_messages": dict(ws_messages),
+        "server": server_stats,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    header = f"{'stream':<20}{'reqs':>8}{'ok':>8}{'rps':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(f"\nLoad test against {report['target']} for {report['duration_seconds']}s")
+    print(header)
+    print("-" * len(header))
+    for s in report["streams"]:
+        print(
+            f"{s['stream']:<20}{s['requests']:>8}{s['ok']:>8}{s['throughput_rps']:>9}"
+            f"{s['p50_ms']:>10}{s['p90_ms']:>10}{s['p99_ms']:>10}{s['max_ms']:>10}"
+        )
+    print("\nOutcomes:")
+    for s in report["streams"]:
+        print(f"  {s['stream']:<20}{s['outcomes']}")
+    if report["ws_messages"]:
+        print("WebSocket messages received:", report["ws_messages"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Open-loop load generator for the ADK-React bridge")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--status-rate", type=float, default=50.0, help="agent.status calls/s")
+    parser.add_argument("--system-rate", type=float, default=5.0, help="system.status calls/s")
+    parser.add_argument("--message-rate", type=float, default=0.0, help="agent.message (LLM) calls/s")
+    parser.add_argument("--agents-rate", type=float, default=10.0, help="GET /api/agents calls/s")
+    parser.add_argument("--ws-clients", type=int, default=0, help="concurrent WebSocket dashboards")
+    parser.add_argument("--ws-refresh-interval", type=float, default=5.0, help="0 = listen only")
+    parser.add_argument("--clients", type=int, default=50, help="distinct X-Client-Id values")
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", metavar="PATH", help="also write the full report here")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Production Launcher for the ADK-React Bridge
+Preloads domain data in a master process, then forks workers that share it copy-on-write
+
+Usage (from ManufacturingAgents/):
+    python serve.py --workers 4 --port 8000
+
+Signals to the master:
+    SIGHUP   reload domain data in the master, then replace the workers one at
+             a time with fresh forks that share the reloaded data
+    SIGTERM  graceful shutdown of all workers
+"""
+
+# File: ManufacturingAgents/serve.py
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Set
+
+import uvicorn
+
+# Crash-looping workers are restarted at most this often
+RESTART_BACKOFF_SECONDS = 1.0
+# How often the master loop checks for exited workers and signal flags
+POLL_SECONDS = 0.2
+
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Master:
+    """
+    Pre-fork supervisor: preload once, fork N uvicorn workers, keep them alive.
+
+    Signal handlers only set flags; the main loop acts on them. A reload
+    re-reads the data in the master and then rolls the workers: one old
+    worker at a time is replaced by a new fork and asked to shut down
+    gracefully, so capacity never drops and every worker shares the
+    master's reloaded pages instead of re-reading the CSVs itself.
+    """
+
+    def __init__(self, app, store, sock: socket.socket, workers: int, log_level: str):
+        self.app = app
+        self.store = store
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.children: Dict[int, float] = {}
+        self.outdated: List[int] = []  # workers forked before the last reload
+        self.retiring: Set[int] = set()  # told to stop, not to be restarted
+        self.stopping = False
+        self.stop_sent = False
+        self.reload_requested = False
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return
+
+        # --- worker process ---
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, signal.SIG_DFL)
+
+        config = uvicorn.Config(self.app, log_level=self.log_level, lifespan="on")
+        server = uvicorn.Server(config)
+        server.run(sockets=[self.sock])
+        os._exit(0)
+
+    def request_reload(self, *_) -> None:
+        self.reload_requested = True
+
+    def request_stop(self, *_) -> None:
+        self.stopping = True
+
+    @staticmethod
+    def _terminate(pid: int) -> None:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def reload_data(self) -> None:
+        print(f"[master {os.getpid()}] reloading domain data")
+        self.store.reload()
+        gc.freeze()
+        self.outdated = [pid for pid in self.children if pid not in self.retiring]
+
+    def roll(self) -> None:
+        """Replace the next outdated worker once the previous one has exited."""
+        if self.retiring or not self.outdated:
+            return
+        old = self.outdated.pop(0)
+        if old not in self.children:
+            return
+        self.spawn()
+        self.retiring.add(old)
+        self._terminate(old)
+        print(f"[master] replacing worker {old} ({len(self.outdated)} left to reload)")
+
+    def run(self) -> None:
+        signal.signal(signal.SIGHUP, self.request_reload)
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        # Objects allocated so far are never collected, so the GC does not
+        # write to (and unshare) the preloaded pages in the workers
+        gc.freeze()
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"[master {os.getpid()}] started {self.workers} workers: {list(self.children)}")
+
+        while self.children:
+            if self.stopping and not self.stop_sent:
+                self.stop_sent = True
+                for pid in self.children:
+                    self._terminate(pid)
+            elif self.reload_requested and not self.stopping:
+                self.reload_requested = False
+                self.reload_data()
+            if not self.stopping:
+                self.roll()
+
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(POLL_SECONDS)
+                continue
+
+            started = self.children.pop(pid, time.monotonic())
+            if pid in self.outdated:
+                self.outdated.remove(pid)
+            if pid in self.retiring:
+                self.retiring.discard(pid)
+                continue
+            if self.stopping:
+                continue
+            print(f"[master] worker {pid} exited with status {status}; restarting")
+            if time.monotonic() - started < RESTART_BACKOFF_SECONDS:
+                time.sleep(RESTART_BACKOFF_SECONDS)
+            self.spawn()
+
+        print("[master] all workers stopped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Production server for the ADK-React bridge")
+    parser.add_argument("--host", default=os.getenv("BRIDGE_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("BRIDGE_PORT", "8000")))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("BRIDGE_WORKERS", os.cpu_count() or 1))
+    )
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    # Per-process pools (the factory simulator's) size themselves by this
+    os.environ["BRIDGE_WORKERS"] = str(max(1, args.workers))
+
+    # Import the app and its data once, in the master
+    from adk_api_wrapper import app
+    from supervisory_agent.tools.data_store import store
+
+    store.preload()
+    print(f"[master] preloaded domain data: {store.stats()['domains']}")
+
+    if not hasattr(os, "fork") or args.workers <= 1:
+        uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level)
+        return
+
+    sock = _bind(args.host, args.port, args.backlog)
+    print(f"[master] listening on http://{args.host}:{args.port}")
+    Master(app, store, sock, args.workers, args.log_level).run()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
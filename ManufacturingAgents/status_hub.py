@@ -0,0 +1,266 @@
+"""
+Agent Status Broadcast Hub
+Computes each agent's status once per tick and pushes deltas to WebSocket subscribers
+"""
+
+# File: ManufacturingAgents/status_hub.py
+
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Keys that change on every read and carry no information on their own
+VOLATILE_KEYS = ("timestamp",)
+
+_MISSING = object()
+
+
+def diff_status(
+    previous: Dict[str, Any], current: Dict[str, Any]
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Top-level delta between two status snapshots (changed keys, removed keys)."""
+    changed = {
+        key: value
+        for key, value in current.items()
+        if key not in VOLATILE_KEYS and previous.get(key, _MISSING) != value
+    }
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+
+def content_etag(content: Any) -> str:
+    """Weak ETag over the content, ignoring volatile top-level keys.
+
+    Weak because two bodies that differ only in a volatile key (the
+    timestamp) share a tag: they are equivalent, not byte-identical.
+    """
+    if isinstance(content, dict):
+        content = {k: v for k, v in content.items() if k not in VOLATILE_KEYS}
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return 'W/"' + hashlib.sha1(canonical.encode()).hexdigest()[:20] + '"'
+
+
+def combine_etags(etags: List[str]) -> str:
+    """Single (weak) ETag for a list of per-item ETags."""
+    digest = hashlib.sha1("".join(etags).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+class Subscription:
+    """Bounded outbox for a single WebSocket connection"""
+
+    def __init__(self, agent_id: str, max_queue: int):
+        self.agent_id = agent_id
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def offer(self, message: str) -> bool:
+        """Queue a message without blocking; False if the consumer is behind."""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def reset(self, message: str) -> None:
+        """Discard the backlog of a slow consumer and resync it with `message`."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class StatusHub:
+    """Versioned agent status snapshots with fan-out to WebSocket subscribers.
+
+    Each watched agent's status is computed once per tick (or when
+    `refresh` is called after a change), diffed against the last snapshot
+    and only the delta is pushed. Messages are encoded once and shared by
+    every subscriber of that agent.
+
+    A snapshot is only replaced when its content changes, so it carries a
+    version counter and a weak ETag that HTTP pollers can revalidate
+    against, and long-poll requests can wait on `wait_for_change`.
+    """
+
+    def __init__(
+        self,
+        fetch_status: Callable[[str], Dict[str, Any]],
+        interval: float = 2.0,
+        max_queue: int = 32,
+    ):
+        self.fetch_status = fetch_status
+        self.interval = interval
+        self.max_queue = max_queue
+
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._versions: Dict[str, int] = {}
+        self._etags: Dict[str, str] = {}
+        self._refreshed_at: Dict[str, float] = {}
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._watchers: Dict[str, int] = {}
+        self._change_event = asyncio.Event()
+        self._ticker: Optional[asyncio.Task] = None
+        self.ticks = 0
+        self.deltas_sent = 0
+        self.resyncs = 0
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, agent_id: str) -> Subscription:
+        """Register a subscriber and queue a full snapshot for it."""
+        if agent_id not in self._snapshots:
+            self.refresh(agent_id)
+
+        subscription = Subscription(agent_id, self.max_queue)
+        subscription.offer(self.snapshot_message(agent_id))
+        self._subscribers.setdefault(agent_id, set()).add(subscription)
+        self._ensure_ticker()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.agent_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.agent_id]
+
+    def snapshot_message(self, agent_id: str) -> str:
+        return json.dumps(
+            {
+                "type": "snapshot",
+                "agent_id": agent_id,
+                "status": self._snapshots.get(agent_id, {}),
+            }
+        )
+
+    # ------------------------------------------------------------------
+    # Change detection
+    # ------------------------------------------------------------------
+
+    def refresh(self, agent_id: str) -> bool:
+        """Recompute one agent's status and broadcast the delta, if any."""
+        current = self.fetch_status(agent_id)
+        self._refreshed_at[agent_id] = time.monotonic()
+        previous = self._snapshots.get(agent_id)
+        if previous is None:
+            self._store(agent_id, current)
+            return True
+
+        changed, removed = diff_status(previous, current)
+        if not changed and not removed:
+            return False
+        self._store(agent_id, current)
+
+        subscribers = self._subscribers.get(agent_id)
+        if subscribers:
+            message = json.dumps(
+                {
+                    "type": "delta",
+                    "agent_id": agent_id,
+                    "timestamp": current.get("timestamp", datetime.now().isoformat()),
+                    "changes": changed,
+                    "removed": removed,
+                }
+            )
+            self._broadcast(agent_id, subscribers, message)
+        return True
+
+    def _store(self, agent_id: str, status: Dict[str, Any]) -> None:
+        self._snapshots[agent_id] = status
+        self._versions[agent_id] = self._versions.get(agent_id, 0) + 1
+        self._etags[agent_id] = content_etag(status)
+
+        # Wake long-poll waiters; they re-check versions themselves
+        event, self._change_event = self._change_event, asyncio.Event()
+        event.set()
+
+    # ------------------------------------------------------------------
+    # Versioned reads
+    # ------------------------------------------------------------------
+
+    def get(self, agent_id: str) -> Tuple[Dict[str, Any], str]:
+        """Current snapshot and ETag, recomputed at most once per tick."""
+        refreshed_at = self._refreshed_at.get(agent_id)
+        if refreshed_at is None or time.monotonic() - refreshed_at >= self.interval:
+            self.refresh(agent_id)
+        return self._snapshots[agent_id], self._etags[agent_id]
+
+    def version(self, agent_id: str) -> int:
+        return self._versions.get(agent_id, 0)
+
+    async def wait_for_change(self, agent_ids: List[str], timeout: float) -> bool:
+        """Block until any of `agent_ids` changes version or `timeout` passes."""
+        start = {agent_id: self.version(agent_id) for agent_id in agent_ids}
+        for agent_id in agent_ids:
+            self._watchers[agent_id] = self._watchers.get(agent_id, 0) + 1
+        self._ensure_ticker()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                if any(self.version(a) != v for a, v in start.items()):
+                    return True
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+                try:
+                    await asyncio.wait_for(self._change_event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return False
+        finally:
+            for agent_id in agent_ids:
+                self._watchers[agent_id] -= 1
+                if not self._watchers[agent_id]:
+                    del self._watchers[agent_id]
+
+    def _broadcast(
+        self, agent_id: str, subscribers: Set[Subscription], message: str
+    ) -> None:
+        snapshot = None
+        for subscription in subscribers:
+            if subscription.offer(message):
+                continue
+            # Slow consumer: collapse its backlog into one fresh snapshot
+            if snapshot is None:
+                snapshot = self.snapshot_message(agent_id)
+            subscription.reset(snapshot)
+            self.resyncs += 1
+        self.deltas_sent += len(subscribers)
+
+    def _ensure_ticker(self) -> None:
+        if self._ticker is None or self._ticker.done():
+            self._ticker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Tick loop; runs while any agent has subscribers or long-poll waiters."""
+        while self._subscribers or self._watchers:
+            await asyncio.sleep(self.interval)
+            for agent_id in set(self._subscribers) | set(self._watchers):
+                try:
+                    self.refresh(agent_id)
+                except Exception as e:
+                    print(f"Status hub refresh failed for {agent_id}: {e}")
+            self.ticks += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "agents": {
+                agent_id: len(subscribers)
+                for agent_id, subscribers in self._subscribers.items()
+            },
+            "connections": sum(len(s) for s in self._subscribers.values()),
+            "long_poll_waiters": sum(self._watchers.values()),
+            "versions": dict(self._versions),
+            "ticks": self.ticks,
+            "deltas_sent": self.deltas_sent,
+            "resyncs": self.resyncs,
+            "interval_seconds": self.interval,
+        }
@@ -0,0 +1,339 @@
+"""
+Agent Status Registry
+Per-agent KPIs derived from domain data, recomputed only when that domain changes
+
+The registry subscribes to the DomainStore: a write through mcp_call, an
+action job or ingestion, or a reload of a changed CSV, marks the one
+affected agent (plus the supervisory roll-up) for recomputation on a
+background thread, coalescing bursts of writes. Reads are dict lookups.
+"""
+
+# File: ManufacturingAgents/status_registry.py
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Domain-backed agents; "supervisory" is rolled up from these
+AGENT_DOMAINS = {
+    "production": "production",
+    "inventory": "inventory",
+    "logistics": "logistics",
+    "maintenance": "maintenance",
+    "quality": "quality",
+}
+
+# Rows considered "recent" for time-series domains
+RECENT_ROWS = 50
+MAX_ALERTS = 10
+
+STATUS_RANK = {"operational": 0, "warning": 1, "critical": 2}
+
+
+def _mean(df, column: str) -> Optional[float]:
+    if column not in df.columns or df.empty:
+        return None
+    value = df[column].mean()
+    return None if value != value else round(float(value), 2)  # NaN -> None
+
+
+def _recent(df):
+    # Rows are normally appended in time order; sort only when they are not
+    if "timestamp" in df.columns and not df["timestamp"].is_monotonic_increasing:
+        df = df.sort_values("timestamp")
+    return df.tail(RECENT_ROWS)
+
+
+def _overall(alerts: List[Dict[str, str]]) -> str:
+    levels = {alert["level"] for alert in alerts}
+    if "critical" in levels:
+        return "critical"
+    if "warning" in levels:
+        return "warning"
+    return "operational"
+
+
+# ---------------------------------------------------------------------------
+# KPI derivations: DataFrame -> (efficiency, alerts, metrics)
+# ---------------------------------------------------------------------------
+
+
+def production_kpis(df):
+    recent = _recent(df)
+    latest = recent.drop_duplicates("machine_id", keep="last") if "machine_id" in recent else recent
+    alerts = []
+    if "status" in latest.columns:
+        for row in latest[latest["status"] != "operational"].itertuples(index=False):
+            alerts.append({"level": "warning", "message": f"Machine {row.machine_id} is {row.status}"})
+    metrics = {
+        "production_rate": _mean(recent, "output_rate"),
+        "avg_quality_score": _mean(recent, "quality_score"),
+        "total_downtime_minutes": float(recent["downtime_minutes"].sum()) if "downtime_minutes" in recent else None,
+        "active_lines": int((latest["status"] == "operational").sum()) if "status" in latest else len(latest),
+        "total_lines": len(latest),
+        "readings": len(df),
+    }
+    return _mean(recent, "efficiency_score"), alerts, metrics
+
+
+def inventory_kpis(df):
+    alerts = []
+    below = df[df["current_stock"] <= df["reorder_point"]]
+    for row in below.itertuples(index=False):
+        alerts.append(
+            {"level": "critical", "message": f"{row.material_name} at {row.current_stock} (reorder point {row.reorder_point})"}
+        )
+    flagged = df[(df["reorder_needed"] == 1) & (df["current_stock"] > df["reorder_point"])]
+    for row in flagged.itertuples(index=False):
+        alerts.append({"level": "warning", "message": f"{row.material_name} flagged for reorder"})
+
+    fill = (df["current_stock"] / df["optimal_stock"]).clip(upper=1.0)
+    metrics = {
+        "total_items": len(df),
+        "total_stock": int(df["current_stock"].sum()),
+        "low_stock_items": int((df["status"] == "low").sum()) if "status" in df else len(below),
+        "reorder_pending": int((df["reorder_needed"] == 1).sum()),
+        "stock_value": round(float((df["current_stock"] * df["unit_cost"]).sum()), 2),
+    }
+    return round(float(fill.mean()) * 100, 1) if len(df) else None, alerts, metrics
+
+
+def logistics_kpis(df):
+    active = df[df["status"].isin(["scheduled", "preparing", "in_transit"])]
+    delivered = df[df["delivery_date"].notna() & (df["status"].isin(["delivered", "in_transit"]))]
+    on_time = delivered[delivered["delivery_date"].astype(str) <= delivered["scheduled_date"].astype(str)]
+    on_time_rate = round(len(on_time) / len(delivered) * 100, 1) if len(delivered) else 100.0
+
+    alerts = [
+        {"level": "warning", "message": f"High-priority shipment {row.shipment_id} still preparing"}
+        for row in df[(df["priority"] == "high") & (df["status"] == "preparing")].itertuples(index=False)
+    ]
+    metrics = {
+        "active_shipments": len(active),
+        "delivered": int((df["status"] == "delivered").sum()),
+        "on_time_rate": on_time_rate,
+        "high_priority_open": int((active["priority"] == "high").sum()),
+    }
+    return on_time_rate, alerts, metrics
+
+
+def maintenance_kpis(df):
+    alerts = []
+    for row in df.itertuples(index=False):
+        risk = float(row.predicted_failure_prob)
+        if risk >= 0.5:
+            alerts.append({"level": "critical", "message": f"Machine {row.machine_id} failure risk {risk:.0%}"})
+        elif row.status != "operational":
+            alerts.append(
+                {"level": "warning", "message": f"Machine {row.machine_id} {row.status.replace('_', ' ')} (failure risk {risk:.0%})"}
+            )
+    operational = int((df["status"] == "operational").sum())
+    metrics = {
+        "machines_operational": operational,
+        "machines_maintenance": len(df) - operational,
+        "avg_failure_probability": _mean(df, "predicted_failure_prob"),
+        "total_downtime_hours": round(float(df["total_downtime_hours"].sum()), 2),
+    }
+    return round(operational / len(df) * 100, 1) if len(df) else None, alerts, metrics
+
+
+def quality_kpis(df):
+    recent = _recent(df)
+    failed = recent[recent["inspection_status"] == "failed"]
+    pass_rate = round((1 - len(failed) / len(recent)) * 100, 1) if len(recent) else None
+    alerts = [
+        {"level": "warning", "message": f"Batch {row.batch_id} failed inspection on {row.machine_id} ({row.defect_type})"}
+        for row in failed.itertuples(index=False)
+    ]
+    metrics = {
+        "defect_rate": _mean(recent, "defect_rate"),
+        "pass_rate": pass_rate,
+        "inspections": len(df),
+        "rework_required": int(recent["rework_required"].sum()),
+    }
+    return pass_rate, alerts, metrics
+
+
+KPI_FUNCTIONS: Dict[str, Callable] = {
+    "production": production_kpis,
+    "inventory": inventory_kpis,
+    "logistics": logistics_kpis,
+    "maintenance": maintenance_kpis,
+    "quality": quality_kpis,
+}
+
+
+class StatusRegistry:
+    """
+    Latest status per agent, kept current by DomainStore change events.
+
+    Change events only mark agents dirty; a worker thread recomputes them
+    `debounce` seconds after the first event of a burst, so writers never
+    wait for a KPI pass over the whole table (debounce=0 recomputes inline).
+    `listeners` are called with each agent id whose status was recomputed,
+    from that worker thread. `extras` adds (alerts, metrics) from other
+    sources to an agent's status, e.g. SPC violations to quality. CSVs
+    edited outside the process are noticed by a cheap mtime check, at most
+    once per `check_interval`.
+    """
+
+    def __init__(
+        self,
+        store,
+        agent_domains: Optional[Dict[str, str]] = None,
+        check_interval: float = 1.0,
+        debounce: float = 0.25,
+        extras: Optional[Dict[str, Callable[[], Tuple[List[Dict[str, str]], Dict[str, Any]]]]] = None,
+    ):
+        self.store = store
+        self.check_interval = check_interval
+        self.debounce = debounce
+        self.agent_domains = agent_domains or AGENT_DOMAINS
+        self.extras = extras or {}
+        self.domain_agents = {domain: agent for agent, domain in self.agent_domains.items()}
+        self._statuses: Dict[str, Dict[str, Any]] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str], None]] = []
+        self._dirty: Set[str] = set()
+        self._wake = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self.recomputes = 0
+        self.coalesced = 0
+        self.compute_ms = 0.0
+        store.subscribe(self.on_domain_changed)
+
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        self._listeners.append(callback)
+
+    def get(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        """Current status, or None for an agent the registry does not cover."""
+        domain = self.agent_domains.get(agent_id)
+        if domain is not None:
+            now = time.monotonic()
+            if now - self._checked_at.get(domain, 0.0) >= self.check_interval:
+                self._checked_at[domain] = now
+                self.store.frame(domain)  # reloads, and so recomputes, if the file changed
+
+        status = self._statuses.get(agent_id)
+        if status is not None:
+            return status
+        if agent_id == "supervisory":
+            for agent in self.agent_domains:
+                self.get(agent)
+            return self._statuses.get("supervisory") or self._recompute_supervisory()
+        if domain is not None:
+            # Frame was already loaded before the registry subscribed
+            return self._recompute(agent_id)
+        return None
+
+    def on_domain_changed(self, domain: str) -> None:
+        agent_id = self.domain_agents.get(domain)
+        if agent_id is None:
+            return
+        if self.debounce <= 0:
+            self._refresh({agent_id})
+            return
+        with self._lock:
+            if agent_id in self._dirty:
+                self.coalesced += 1
+            self._dirty.add(agent_id)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="status-registry", daemon=True)
+                self._worker.start()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.debounce)  # let the rest of a burst of writes land
+            self.flush()
+
+    def flush(self) -> None:
+        """Recompute every agent marked dirty now, in the calling thread."""
+        with self._lock:
+            self._wake.clear()
+            agents, self._dirty = self._dirty, set()
+        if agents:
+            self._refresh(agents)
+
+    def _refresh(self, agents: Set[str]) -> None:
+        for agent_id in sorted(agents):
+            try:
+                self._recompute(agent_id)
+            except Exception as e:
+                print(f"StatusRegistry recompute failed for {agent_id}: {e}")
+        self._recompute_supervisory()
+        for callback in list(self._listeners):
+            for changed in (*sorted(agents), "supervisory"):
+                try:
+                    callback(changed)
+                except Exception as e:
+                    print(f"StatusRegistry listener failed for {changed}: {e}")
+
+    def _recompute(self, agent_id: str) -> Dict[str, Any]:
+        domain = self.agent_domains[agent_id]
+        start = time.perf_counter()
+        efficiency, alerts, metrics = KPI_FUNCTIONS[domain](self.store.frame(domain))
+        extra = self.extras.get(agent_id)
+        if extra is not None:
+            extra_alerts, extra_metrics = extra()
+            alerts, metrics = extra_alerts + alerts, {**metrics, **extra_metrics}
+        status = {
+            "agent_id": agent_id,
+            "timestamp": datetime.now().isoformat(),
+            "source": "domain_data",
+            "status": _overall(alerts),
+            "efficiency": efficiency,
+            "alerts": alerts[:MAX_ALERTS],
+            "alert_count": len(alerts),
+            "metrics": metrics,
+        }
+        with self._lock:
+            self._statuses[agent_id] = status
+            self.recomputes += 1
+            self.compute_ms += (time.perf_counter() - start) * 1000
+        return status
+
+    def _recompute_supervisory(self) -> Dict[str, Any]:
+        with self._lock:
+            agents = {a: self._statuses[a] for a in self.agent_domains if a in self._statuses}
+        efficiencies = [s["efficiency"] for s in agents.values() if s["efficiency"] is not None]
+        worst = max((STATUS_RANK[s["status"]] for s in agents.values()), default=0)
+        alerts = [
+            {
+                "level": "warning" if s["status"] == "critical" else "info",
+                "message": f"{agent_id} agent reports {s['alert_count']} alert(s)",
+            }
+            for agent_id, s in agents.items()
+            if s["alert_count"]
+        ]
+        status = {
+            "agent_id": "supervisory",
+            "timestamp": datetime.now().isoformat(),
+            "source": "domain_data",
+            "status": ("operational", "warning", "critical")[worst],
+            "efficiency": round(sum(efficiencies) / len(efficiencies), 1) if efficiencies else None,
+            "alerts": alerts,
+            "alert_count": len(alerts),
+            "metrics": {
+                "active_agents": len(agents),
+                "system_health": ("good", "degraded", "critical")[worst],
+                "agents_by_status": {
+                    level: sum(s["status"] == level for s in agents.values()) for level in STATUS_RANK
+                },
+            },
+        }
+        with self._lock:
+            self._statuses["supervisory"] = status
+        return status
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "agents": sorted(self._statuses),
+            "recomputes": self.recomputes,
+            "coalesced_changes": self.coalesced,
+            "pending": sorted(self._dirty),
+            "avg_compute_ms": round(self.compute_ms / self.recomputes, 3) if self.recomputes else 0.0,
+        }
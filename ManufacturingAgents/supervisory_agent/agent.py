@@ -1,85 +1,183 @@
 # File: supervisory_agent/agent.py
+#
+# google.adk and the five sub-agent modules are imported on first access to
+# `root_agent` (or any sub-agent / tool name below), not when this module is
+# imported. ADK's loader reads `root_agent` as an attribute, which triggers
+# the build through the module-level __getattr__.
 
-from google.adk.agents import LlmAgent as Agent
-from google.adk.tools.agent_tool import AgentTool
-
-# Import all sub-agents
-from .sub_agents.inventory_agent.agent import inventory_agent
-from .sub_agents.production_agent.agent import production_agent
-from .sub_agents.logistics_agent.agent import logistics_agent
-from .sub_agents.maintenance_agent.agent import maintenance_agent
-from .sub_agents.quality_control_agent.agent import quality_control_agent
-
-# Import tools
-from .tools.tools import (
-    get_current_time,
-    query_timescaledb,
-    publish_kafka,
-    mcp_call,
-)
+import importlib
+from typing import Any, Dict
+
+# Lazily resolved names -> (module, attribute)
+_SUB_AGENTS = {
+    "inventory_agent": (".sub_agents.inventory_agent.agent", "inventory_agent"),
+    "production_agent": (".sub_agents.production_agent.agent", "production_agent"),
+    "logistics_agent": (".sub_agents.logistics_agent.agent", "logistics_agent"),
+    "maintenance_agent": (".sub_agents.maintenance_agent.agent", "maintenance_agent"),
+    "quality_control_agent": (".sub_agents.quality_control_agent.agent", "quality_control_agent"),
+}
+
+_cache: Dict[str, Any] = {}
+
+
+def _sub_agent(name: str):
+    if name not in _cache:
+        module_name, attribute = _SUB_AGENTS[name]
+        module = importlib.import_module(module_name, __package__)
+        _cache[name] = getattr(module, attribute)
+    return _cache[name]
+
+
+def _build_root_agent():
+    from google.adk.agents import LlmAgent as Agent
+    from google.adk.tools.agent_tool import AgentTool
 
-# Wrap agents as tools
-inventory_tool = AgentTool(inventory_agent)
-production_tool = AgentTool(production_agent)
-logistics_tool = AgentTool(logistics_agent)
-maintenance_tool = AgentTool(maintenance_agent)
-quality_control_tool = AgentTool(quality_control_agent)
-
-root_agent = Agent(
-    name="supervisory_agent",
-    model="gemini-2.0-flash",
-    description="Main coordinator for smart factory operations with multi-agent orchestration.",
-    instruction=(
-        "You are the supervisory agent for a smart factory multi-agent system.\n\n"
-        
-        "**Your Role:**\n"
-        "- Coordinate between specialized agents (inventory, production, logistics, maintenance, quality)\n"
-        "- Handle complex requests requiring multiple agents\n"
-        "- Provide high-level oversight and decision-making\n"
-        "- Ensure efficient communication between agents\n\n"
-        
-        "**Available Sub-Agents:**\n"
-        "1. **inventory_agent** - Stock levels, reorder management, material availability\n"
-        "2. **production_agent** - Production planning, scheduling, machine optimization\n"
-        "3. **logistics_agent** - Shipping, delivery, order tracking\n"
-        "4. **maintenance_agent** - Equipment health, predictive maintenance, repairs\n"
-        "5. **quality_control_agent** - Quality monitoring, defect tracking, compliance\n\n"
-        
-        "**Delegation Rules:**\n"
-        "- For SINGLE-DOMAIN requests → transfer to appropriate agent\n"
-        "- For MULTI-DOMAIN requests → coordinate multiple agents yourself\n"
-        "- For SIMPLE questions → answer directly if you have context\n"
-        "- For COMPLEX coordination → use agent tools to gather info, then synthesize\n\n"
-        
-        "**Examples:**\n"
-        "- 'Check inventory' → transfer to inventory_agent\n"
-        "- 'Schedule production' → transfer to production_agent\n"
-        "- 'We have a major order: coordinate inventory, production, and logistics' → YOU handle coordination\n"
-        "- 'Machine M003 has quality issues' → coordinate quality_control_agent and maintenance_agent\n\n"
-        
-        "**Important:**\n"
-        "- All agents have MCP access to real factory data\n"
-        "- Agents can make autonomous, data-driven decisions\n"
-        "- Avoid micromanaging - trust agents' expertise\n"
-        "- Focus on high-level coordination and conflict resolution\n"
-        "- Provide clear context when delegating tasks"
-    ),
-    sub_agents=[
-        inventory_agent,
-        production_agent,
-        logistics_agent,
-        maintenance_agent,
-        quality_control_agent,
-    ],
-    tools=[
-        inventory_tool,
-        production_tool,
-        logistics_tool,
-        maintenance_tool,
-        quality_control_tool,
+    # Import tools
+    from .tools.tools import (
         get_current_time,
         query_timescaledb,
         publish_kafka,
         mcp_call,
-    ],
-)
\ No newline at end of file
+    )
+    from .tools.accounting import install as install_accounting, ledger
+    from .tools.coordination import build_coordinate_agents
+    from .tools.digest import get_kpi_digest
+    from .tools.factory_sim import simulate_factory
+    from .tools.router import fast_route
+    from .tools.tool_cache import report_cache_savings
+
+    # Import all sub-agents
+    inventory_agent = _sub_agent("inventory_agent")
+    production_agent = _sub_agent("production_agent")
+    logistics_agent = _sub_agent("logistics_agent")
+    maintenance_agent = _sub_agent("maintenance_agent")
+    quality_control_agent = _sub_agent("quality_control_agent")
+
+    # Wrap agents as tools
+    inventory_tool = AgentTool(inventory_agent)
+    production_tool = AgentTool(production_agent)
+    logistics_tool = AgentTool(logistics_agent)
+    maintenance_tool = AgentTool(maintenance_agent)
+    quality_control_tool = AgentTool(quality_control_agent)
+
+    # Concurrent fan-out over the same agents, results in this order
+    coordinate_agents = build_coordinate_agents(
+        [
+            inventory_agent,
+            production_agent,
+            logistics_agent,
+            maintenance_agent,
+            quality_control_agent,
+        ]
+    )
+
+    _cache.update(
+        inventory_tool=inventory_tool,
+        production_tool=production_tool,
+        logistics_tool=logistics_tool,
+        maintenance_tool=maintenance_tool,
+        quality_control_tool=quality_control_tool,
+    )
+
+    root = Agent(
+        name="supervisory_agent",
+        model="gemini-2.0-flash",
+        description="Main coordinator for smart factory operations with multi-agent orchestration.",
+        instruction=(
+            "You are the supervisory agent for a smart factory multi-agent system.\n\n"
+
+            "**Your Role:**\n"
+            "- Coordinate between specialized agents (inventory, production, logistics, maintenance, quality)\n"
+            "- Handle complex requests requiring multiple agents\n"
+            "- Provide high-level oversight and decision-making\n"
+            "- Ensure efficient communication between agents\n\n"
+
+            "**Available Sub-Agents:**\n"
+            "1. **inventory_agent** - Stock levels, reorder management, material availability\n"
+            "2. **production_agent** - Production planning, scheduling, machine optimization\n"
+            "3. **logistics_agent** - Shipping, delivery, order tracking\n"
+            "4. **maintenance_agent** - Equipment health, predictive maintenance, repairs\n"
+            "5. **quality_control_agent** - Quality monitoring, defect tracking, compliance\n\n"
+
+            "**Delegation Rules:**\n"
+            "- For SINGLE-DOMAIN requests → transfer to appropriate agent\n"
+            "- For MULTI-DOMAIN requests → coordinate multiple agents yourself\n"
+            "- For SIMPLE questions → answer directly if you have context\n"
+            "- For COMPLEX coordination → use agent tools to gather info, then synthesize\n"
+            "- When you need answers from SEVERAL agents → call coordinate_agents ONCE with one\n"
+            "  self-contained question per agent; they run in parallel. Only call agent tools\n"
+            "  one by one when a question depends on another agent's answer\n\n"
+
+            "**Examples:**\n"
+            "- 'Check inventory' → transfer to inventory_agent\n"
+            "- 'Schedule production' → transfer to production_agent\n"
+            "- 'We have a major order: coordinate inventory, production, and logistics' → YOU handle coordination\n"
+            "  with coordinate_agents(agent_requests={'inventory_agent': ..., 'production_agent': ...,\n"
+            "  'logistics_agent': ...}, timeout_seconds=0)\n"
+            "- 'Machine M003 has quality issues' → coordinate quality_control_agent and maintenance_agent\n\n"
+
+            "**Important:**\n"
+            "- All agents have MCP access to real factory data\n"
+            "- get_kpi_digest(domain='all') gives a compact KPI overview of every domain\n"
+            "- simulate_factory(scenarios=[...], horizon_hours=0, replications=0) answers cross-domain\n"
+            "  'what if' questions (shifts, machines down, rush orders, supplier delays) by simulation\n"
+            "- Agents can make autonomous, data-driven decisions\n"
+            "- Avoid micromanaging - trust agents' expertise\n"
+            "- Focus on high-level coordination and conflict resolution\n"
+            "- Provide clear context when delegating tasks"
+        ),
+        # Confident single-domain requests skip the routing LLM turn
+        before_model_callback=fast_route,
+        after_agent_callback=[report_cache_savings, ledger.report],
+        sub_agents=[
+            inventory_agent,
+            production_agent,
+            logistics_agent,
+            maintenance_agent,
+            quality_control_agent,
+        ],
+        tools=[
+            inventory_tool,
+            production_tool,
+            logistics_tool,
+            maintenance_tool,
+            quality_control_tool,
+            coordinate_agents,
+            get_current_time,
+            query_timescaledb,
+            publish_kafka,
+            mcp_call,
+            get_kpi_digest,
+            simulate_factory,
+        ],
+    )
+
+    # Token/latency accounting and per-session budgets for every agent
+    install_accounting(
+        [root, inventory_agent, production_agent, logistics_agent, maintenance_agent, quality_control_agent],
+        ledger,
+    )
+    return root
+
+
+_TOOL_NAMES = (
+    "inventory_tool",
+    "production_tool",
+    "logistics_tool",
+    "maintenance_tool",
+    "quality_control_tool",
+)
+
+
+def __getattr__(name: str):
+    if name == "root_agent" or name in _TOOL_NAMES:
+        if "root_agent" not in _cache:
+            _cache["root_agent"] = _build_root_agent()
+        return _cache[name]
+    if name in _SUB_AGENTS:
+        return _sub_agent(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + ["root_agent", *_TOOL_NAMES, *_SUB_AGENTS])
@@ -1,6 +1,8 @@
 # File: supervisory_agent/sub_agents/inventory_agent/agent.py
 
 from google.adk.agents import LlmAgent as Agent
+from ...tools.digest import get_kpi_digest
+from ...tools.inventory_sim import simulate_inventory
 from ...tools.tools import mcp_call
 
 inventory_agent = Agent(
@@ -18,6 +20,10 @@ inventory_agent = Agent(
         "- Coordinate with production and logistics agents\n\n"
         
         "**Available MCP Commands:**\n"
+        "0. get_kpi_digest(domain='inventory')\n"
+        "   → Compact precomputed KPIs: stock vs reorder point coverage, days of cover, lowest-coverage materials\n"
+        "   Call this FIRST; use mcp_call below only for details it does not cover\n\n"
+        
         "1. mcp_call(domain='inventory', intent='read', data={})\n"
         "   → Get all current inventory data\n\n"
         
@@ -31,6 +37,14 @@ inventory_agent = Agent(
         "4. mcp_call(domain='inventory', intent='update', data={'id': 0, 'updates': {'current_stock': 4500}})\n"
         "   → Update stock levels after consumption or delivery\n\n"
         
+        "5. mcp_call(domain='inventory', intent='aggregate', data={'group_by': 'supplier', 'metrics': {'current_stock': 'sum', 'lead_time_days': 'max'}})\n"
+        "   → Totals per supplier or status computed server-side\n"
+        "   Functions: sum, mean, min, max, count, median, std, nunique, p50/p95/p99\n\n"
+        
+        "6. simulate_inventory(production_plan={}, horizon_days=0, scenarios=0, service_level=0)\n"
+        "   → Monte Carlo stock-out probabilities, reorder points and order quantities for all materials\n"
+        "   production_plan={'Welder': 3000} projects a planned daily output per machine type; 0 = defaults (30 days, 2000 scenarios, 95%)\n\n"
+        
         "**Your Responsibilities:**\n"
         "1. **Stock monitoring** - Track current_stock vs reorder_point vs optimal_stock\n"
         "2. **Reorder management** - Alert when materials fall below reorder points\n"
@@ -46,8 +60,8 @@ inventory_agent = Agent(
         "1. Fetch current inventory data using mcp_call\n"
         "2. Check materials against reorder points\n"
         "3. Analyze consumption trends\n"
-        "4. Calculate required order quantities (optimal_stock - current_stock)\n"
-        "5. Consider lead times and supplier availability\n"
+        "4. Run simulate_inventory for stock-out risk and order quantities (pass the production plan if known)\n"
+        "5. Use its actions (order_now / order_soon) and quantities; consider supplier availability\n"
         "6. Provide specific reorder recommendations with quantities and urgency\n\n"
         
         "**Alert Thresholds:**\n"
@@ -59,13 +73,15 @@ inventory_agent = Agent(
         "**Important Rules:**\n"
         "- ALWAYS fetch real data before making recommendations\n"
         "- Include specific material IDs, quantities, and supplier names\n"
-        "- Calculate reorder quantities based on optimal_stock targets\n"
+        "- Base reorder quantities on simulate_inventory rather than hand calculations\n"
         "- Consider lead_time_days when planning orders\n"
         "- Coordinate with production_agent for upcoming material requirements\n"
         "- Do NOT transfer to supervisory_agent unless issue requires cross-domain coordination"
     ),
     tools=[
+        get_kpi_digest,
         mcp_call,
+        simulate_inventory,
     ],
 )
 
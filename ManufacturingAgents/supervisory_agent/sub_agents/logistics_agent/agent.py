@@ -1,6 +1,8 @@
 # File: supervisory_agent/sub_agents/logistics_agent/agent.py
 
 from google.adk.agents import LlmAgent as Agent
+from ...tools.digest import get_kpi_digest
+from ...tools.shipping import find_shipments, plan_shipments
 from ...tools.tools import mcp_call
 
 logistics_agent = Agent(
@@ -18,6 +20,10 @@ logistics_agent = Agent(
         "- Monitor delivery performance and costs\n\n"
         
         "**Available MCP Commands:**\n"
+        "0. get_kpi_digest(domain='logistics')\n"
+        "   → Compact precomputed KPIs: shipment status counts, open shipments by priority, next shipments due\n"
+        "   Call this FIRST; use mcp_call below only for details it does not cover\n\n"
+        
         "1. mcp_call(domain='logistics', intent='read', data={})\n"
         "   → Get all shipment and order data\n\n"
         
@@ -31,6 +37,17 @@ logistics_agent = Agent(
         "4. mcp_call(domain='production', intent='analyze', data={'type': 'trends'})\n"
         "   → Check production capacity for upcoming shipments\n\n"
         
+        "5. mcp_call(domain='logistics', intent='aggregate', data={'group_by': ['carrier', 'status'], 'metrics': {'estimated_cost': ['sum', 'mean'], 'quantity': 'sum'}})\n"
+        "   → Costs and volumes per carrier/status without reading every shipment\n"
+        "   Functions: sum, mean, min, max, count, median, std, nunique, p50/p95/p99\n\n"
+        
+        "6. plan_shipments(max_load_units=0, consolidation_days=0)\n"
+        "   → Consolidated loads per customer with the cheapest allowed carrier, cost vs. current plan\n"
+        "   0 = defaults (2000 units per load, ship up to 3 days early); re-run after any order change\n\n"
+        
+        "7. find_shipments(status=['scheduled'], carrier=[], date_from='2024-11-18', date_to='2024-11-25')\n"
+        "   → Indexed lookup by status, carrier and date range ([] / '' = any)\n\n"
+        
         "**Your Responsibilities:**\n"
         "1. **Shipment tracking** - Monitor status (scheduled, in_transit, delivered)\n"
         "2. **Delivery scheduling** - Optimize delivery dates and routes\n"
@@ -46,8 +63,8 @@ logistics_agent = Agent(
         "1. Fetch shipment data using mcp_call\n"
         "2. Check production status for scheduled shipments\n"
         "3. Verify inventory availability for orders\n"
-        "4. Optimize delivery schedule based on priority and deadlines\n"
-        "5. Select appropriate carriers considering cost and timeline\n"
+        "4. Run plan_shipments to consolidate loads and assign carriers under priority and date limits\n"
+        "5. Use its loads, carriers and costs rather than comparing shipments one by one\n"
         "6. Provide specific shipping plan with tracking and timelines\n\n"
         
         "**Priority Handling:**\n"
@@ -71,6 +88,9 @@ logistics_agent = Agent(
         "- Proactively identify potential delays and suggest alternatives"
     ),
     tools=[
+        get_kpi_digest,
         mcp_call,
+        plan_shipments,
+        find_shipments,
     ],
 )
\ No newline at end of file
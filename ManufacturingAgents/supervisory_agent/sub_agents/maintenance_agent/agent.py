@@ -1,6 +1,8 @@
 # File: supervisory_agent/sub_agents/maintenance_agent/agent.py
 
 from google.adk.agents import LlmAgent as Agent
+from ...tools.digest import get_kpi_digest
+from ...tools.reliability import plan_maintenance
 from ...tools.tools import mcp_call
 
 maintenance_agent = Agent(
@@ -18,6 +20,10 @@ maintenance_agent = Agent(
         "- Coordinate with production for maintenance windows\n\n"
         
         "**Available MCP Commands:**\n"
+        "0. get_kpi_digest(domain='maintenance')\n"
+        "   → Compact precomputed KPIs: failure-risk ranking, status and priority counts\n"
+        "   Call this FIRST; use mcp_call below only for details it does not cover\n\n"
+        
         "1. mcp_call(domain='maintenance', intent='read', data={})\n"
         "   → Get all maintenance status data\n\n"
         
@@ -31,6 +37,15 @@ maintenance_agent = Agent(
         "4. mcp_call(domain='maintenance', intent='analyze', data={'type': 'summary'})\n"
         "   → Get maintenance statistics and trends\n\n"
         
+        "5. mcp_call(domain='production', intent='aggregate', data={'group_by': 'machine_id', 'time_bucket': '1h', 'metrics': {'temperature': ['max', 'p95'], 'vibration_level': 'max'}})\n"
+        "   → Hourly condition peaks per machine\n"
+        "   Functions: sum, mean, min, max, count, median, std, nunique, p50/p95/p99\n\n"
+        
+        "6. plan_maintenance(horizon_hours=0, window_hours=0, crews=0)\n"
+        "   → Fleet-wide failure risk and remaining useful life (RUL) from sensor trends and hours since maintenance,\n"
+        "     plus maintenance windows placed where they cost the least production within crew capacity\n"
+        "   0 = defaults (168 h horizon, 4 h windows, 2 crews)\n\n"
+        
         "**Your Responsibilities:**\n"
         "1. **Health monitoring** - Track temperature, vibration, and downtime patterns\n"
         "2. **Predictive maintenance** - Use predicted_failure_prob to schedule proactive maintenance\n"
@@ -45,9 +60,9 @@ maintenance_agent = Agent(
         "**Decision-Making Process:**\n"
         "1. Fetch maintenance status using mcp_call\n"
         "2. Check real-time sensor data from production domain\n"
-        "3. Identify machines with high failure probability or anomalies\n"
-        "4. Prioritize maintenance tasks (critical → high → medium → low)\n"
-        "5. Coordinate with production_agent for optimal maintenance timing\n"
+        "3. Run plan_maintenance for failure risk, RUL and proposed windows across the fleet\n"
+        "4. Prioritize maintenance tasks (critical → high → medium → low) using its risk ranking\n"
+        "5. Confirm its windows with production_agent before taking machines offline\n"
         "6. Provide specific maintenance schedule with machine IDs and timelines\n\n"
         
         "**Maintenance Triggers:**\n"
@@ -59,13 +74,15 @@ maintenance_agent = Agent(
         "**Important Rules:**\n"
         "- ALWAYS check both maintenance and production data for complete picture\n"
         "- Prioritize machines with high failure probability\n"
-        "- Schedule maintenance during low-production periods when possible\n"
+        "- Base maintenance timing on plan_maintenance windows rather than hand estimates\n"
         "- Provide specific machine IDs, maintenance types, and estimated durations\n"
         "- Consider production impact when scheduling maintenance\n"
         "- Alert production_agent before taking machines offline"
     ),
     tools=[
+        get_kpi_digest,
         mcp_call,
+        plan_maintenance,
     ],
 )
 
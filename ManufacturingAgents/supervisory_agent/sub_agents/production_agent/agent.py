@@ -1,5 +1,9 @@
 # supervisory_agent/sub_agents/production_agent/agent.py
 from google.adk.agents import LlmAgent as Agent
+from ...tools.digest import get_kpi_digest
+from ...tools.factory_sim import simulate_factory
+from ...tools.retention import get_production_history
+from ...tools.scheduling import schedule_production
 from ...tools.tools import mcp_call
 
 
@@ -18,6 +22,10 @@ production_agent = Agent(
         "- Coordinate with inventory and maintenance agents\n\n"
         
         "**Available MCP Commands:**\n"
+        "0. get_kpi_digest(domain='production')\n"
+        "   → Compact precomputed KPIs: per-machine efficiency, downtime and output, worst machines first\n"
+        "   Call this FIRST; use mcp_call below only for details it does not cover\n\n"
+        
         "1. mcp_call(domain='production', intent='read', data={}) \n"
         "   → Get all current production data\n\n"
         
@@ -31,6 +39,22 @@ production_agent = Agent(
         "4. mcp_call(domain='production', intent='analyze', data={'type': 'trends'})\n"
         "   → Analyze recent production trends (output, quality, downtime)\n\n"
         
+        "5. mcp_call(domain='production', intent='aggregate', data={'group_by': ['machine_id', 'shift'], 'metrics': {'output_rate': ['mean', 'p95'], 'downtime_minutes': 'sum'}})\n"
+        "   → Per machine/shift KPIs; add 'time_bucket': '1D' for daily figures\n"
+        "   Functions: sum, mean, min, max, count, median, std, nunique, p50/p95/p99\n\n"
+        
+        "6. schedule_production(jobs=[{'job_id': 'J1', 'quantity': 1000, 'due': '2024-11-08', 'priority': 'high', 'machine_type': 'Welder'}], horizon_hours=0, time_limit_seconds=0, start_time='')\n"
+        "   → Deterministic solver: machine assignments and timelines respecting capacity, maintenance windows and material stock\n"
+        "   jobs=[] schedules all open orders; 0 / '' use the defaults (one week, 2 s, latest production reading)\n\n"
+        
+        "7. simulate_factory(scenarios=[{'name': 'add shift', 'shifts': 2}, {'name': 'M003 down', 'machines_down': ['M003']}], horizon_hours=0, replications=0)\n"
+        "   → What-if simulation against the baseline: throughput, late orders and stock-out distributions per scenario\n"
+        "   Fields: shifts, machines_down, extra_orders, expedite, demand_factor, rate_factor, lead_time_factor, failure_factor\n\n"
+        
+        "8. get_production_history(start='2024-11-01', end='', bucket='1D', machine_id='', metrics=['output_rate', 'temperature'])\n"
+        "   → Mean/min/max/count per bucket over any range, from raw readings or 1-minute, hourly and per-shift roll-ups\n"
+        "   Raw readings are only kept for recent days; use this for trends over longer periods\n\n"
+        
         "**Your Responsibilities:**\n"
         "1. **Always fetch data first** - Use mcp_call to get current production status before making recommendations\n"
         "2. **Machine scheduling** - Assign jobs based on machine capacity, type, and current status\n"
@@ -43,7 +67,7 @@ production_agent = Agent(
         "   - Inform logistics_agent about production completion estimates\n\n"
         
         "**Decision-Making Process:**\n"
-        "1. Fetch current production data using mcp_call\n"
+        "1. Fetch current production data using mcp_call (get_production_history for longer-term trends)\n"
         "2. Analyze machine availability and capacity\n"
         "3. Consider constraints (materials, maintenance schedules, quality requirements)\n"
         "4. Provide specific, actionable recommendations with reasoning\n"
@@ -54,9 +78,9 @@ production_agent = Agent(
         "Your steps:\n"
         "1. Call mcp_call(domain='production', intent='read') to see machine status\n"
         "2. Call mcp_call(domain='production', intent='analyze', data={'type': 'trends'}) for capacity\n"
-        "3. Identify which machines can produce Product X\n"
-        "4. Calculate production capacity per machine\n"
-        "5. Create schedule with specific machine assignments and timelines\n"
+        "3. Call schedule_production with the job (quantity, due date, priority, machine_type if known)\n"
+        "4. Use its assignments and timelines as the schedule - do not compute schedules yourself\n"
+        "5. Explain late or unscheduled jobs (capacity, maintenance windows, material shortages)\n"
         "6. Check with inventory_agent if materials are available\n"
         "7. Provide detailed production plan\n\n"
         
@@ -64,12 +88,18 @@ production_agent = Agent(
         "- ALWAYS use mcp_call to get real data before answering\n"
         "- Provide specific machine IDs (M001, M002, etc.) in recommendations\n"
         "- Include estimated timelines and capacity calculations\n"
+        "- Use get_production_history for trends beyond the last few days; mcp_call only sees retained raw readings\n"
+        "- Answer 'what if' questions (extra shift, machine down, rush order) with simulate_factory, not estimates\n"
         "- Alert about potential issues (maintenance needs, capacity constraints)\n"
         "- Do NOT transfer back to supervisory_agent unless request is completely unrelated to production\n"
         "- Be proactive - suggest optimizations and improvements"
     ),
     tools=[
+        get_kpi_digest,
         mcp_call,
+        schedule_production,
+        simulate_factory,
+        get_production_history,
     ],
 )
 
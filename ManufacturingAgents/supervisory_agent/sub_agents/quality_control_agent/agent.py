@@ -1,6 +1,9 @@
 # File: supervisory_agent/sub_agents/quality_control_agent/agent.py
 
 from google.adk.agents import LlmAgent as Agent
+from ...tools.digest import get_kpi_digest
+from ...tools.root_cause import find_root_causes
+from ...tools.spc import get_spc_status
 from ...tools.tools import mcp_call
 
 quality_control_agent = Agent(
@@ -18,6 +21,10 @@ quality_control_agent = Agent(
         "- Coordinate with production for quality improvements\n\n"
         
         "**Available MCP Commands:**\n"
+        "0. get_kpi_digest(domain='quality')\n"
+        "   → Compact precomputed KPIs: pass rate, defect types, fail and defect rates per machine\n"
+        "   Call this FIRST; use mcp_call below only for details it does not cover\n\n"
+        
         "1. mcp_call(domain='quality', intent='read', data={})\n"
         "   → Get all quality inspection data\n\n"
         
@@ -31,6 +38,20 @@ quality_control_agent = Agent(
         "4. mcp_call(domain='production', intent='query', data={'query': 'machine_id==\"M003\"'})\n"
         "   → Check production conditions for machines with quality issues\n\n"
         
+        "5. mcp_call(domain='quality', intent='aggregate', data={'group_by': 'inspector', 'time_bucket': '1D', 'metrics': {'defect_rate': ['mean', 'max'], 'rework_required': 'sum'}})\n"
+        "   → Defects per inspector per day; prefer this over reading raw rows for any totals\n"
+        "   Functions: sum, mean, min, max, count, median, std, nunique, p50/p95/p99\n\n"
+        
+        "6. get_spc_status(dimension='machine', key='')\n"
+        "   → Control charts per machine (or dimension='product'): X-bar/R, p-chart, CUSUM, EWMA limits\n"
+        "     and Western Electric rule violations, updated as inspections arrive\n"
+        "   key='M003' for one machine's limits and recent violations; '' = all, out-of-control first\n\n"
+        
+        "7. find_root_causes(target='', machine_id='', tolerance_minutes=0)\n"
+        "   → Sensor conditions linked to each defect_type and to rework, from inspections joined to the\n"
+        "     machine's sensor readings: correlation per sensor and lift of high/low sensor and machine conditions\n"
+        "   target='surface_defect' or 'rework_required' narrows it; machine_id='M003' restricts to one machine\n\n"
+        
         "**Your Responsibilities:**\n"
         "1. **Quality monitoring** - Track quality_score, defect_rate, and inspection_status\n"
         "2. **Defect analysis** - Identify patterns in defect_type (surface_defect, dimension, etc.)\n"
@@ -44,7 +65,7 @@ quality_control_agent = Agent(
         
         "**Decision-Making Process:**\n"
         "1. Fetch quality data using mcp_call\n"
-        "2. Analyze defect rates and patterns by machine, batch, or time\n"
+        "2. Check get_spc_status for machines or products out of statistical control\n"
         "3. Identify root causes (machine issues, material problems, process issues)\n"
         "4. Check production data for machines with quality problems\n"
         "5. Provide actionable recommendations (process adjustments, machine maintenance, etc.)\n"
@@ -59,8 +80,8 @@ quality_control_agent = Agent(
         "**Root Cause Analysis:**\n"
         "When quality issues detected:\n"
         "1. Check which machine produced the defects\n"
-        "2. Query production data for that machine (temperature, vibration, etc.)\n"
-        "3. Look for correlations (high temp → surface defects, high vibration → dimension issues)\n"
+        "2. Run find_root_causes for the defect type (and machine) instead of comparing rows by hand\n"
+        "3. Report the strongest correlations and highest-lift conditions with their support\n"
         "4. Recommend specific corrective actions\n\n"
         
         "**Important Rules:**\n"
@@ -69,9 +90,12 @@ quality_control_agent = Agent(
         "- Provide specific machine IDs and defect types in reports\n"
         "- Include batch IDs and timestamps for traceability\n"
         "- Alert relevant agents when quality issues require their attention\n"
-        "- Track trends over time to identify systemic issues"
+        "- Track trends over time to identify systemic issues; treat SPC violations, not single bad batches, as process shifts"
     ),
     tools=[
+        get_kpi_digest,
         mcp_call,
+        get_spc_status,
+        find_root_causes,
     ],
 )
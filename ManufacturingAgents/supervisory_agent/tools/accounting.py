@@ -0,0 +1,304 @@
+# supervisory_agent/tools/accounting.py
+# Token, payload and latency accounting for every agent, tool and session,
+# recorded through ADK model/tool callbacks. Totals live in memory; deltas
+# are appended to a local SQLite file at most every USAGE_FLUSH_SECONDS.
+# Per-session budgets stop runaway delegation chains: once a session is over
+# budget, further model calls get a canned reply and delegations are refused.
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .tool_cache import scope_id
+
+# Tools that hand work to other agents
+DELEGATION_TOOLS = {"transfer_to_agent", "coordinate_agents"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    flushed_at        REAL NOT NULL,
+    session_id        TEXT NOT NULL,
+    kind              TEXT NOT NULL,
+    name              TEXT NOT NULL,
+    calls             INTEGER NOT NULL,
+    prompt_tokens     INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    payload_bytes     INTEGER NOT NULL,
+    elapsed_ms        REAL NOT NULL,
+    errors            INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS usage_session ON usage (session_id);
+"""
+
+_FIELDS = ("calls", "prompt_tokens", "completion_tokens", "payload_bytes", "elapsed_ms", "errors")
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+class Budget:
+    """Per-session limits; 0 disables a limit"""
+
+    def __init__(self, max_tokens: int = 0, max_llm_calls: int = 0, max_delegations: int = 0):
+        self.max_tokens = max_tokens
+        self.max_llm_calls = max_llm_calls
+        self.max_delegations = max_delegations
+
+    @classmethod
+    def from_env(cls) -> "Budget":
+        return cls(
+            max_tokens=_env_int("AGENT_BUDGET_TOKENS", 200_000),
+            max_llm_calls=_env_int("AGENT_BUDGET_LLM_CALLS", 60),
+            max_delegations=_env_int("AGENT_BUDGET_DELEGATIONS", 20),
+        )
+
+
+def _payload_size(value: Any) -> int:
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+class UsageLedger:
+    """
+    Counters per (session, kind, name), kind being "agent" (LLM calls made
+    by that agent) or "tool". Sessions are the root ADK session: sub-agents
+    run by AgentTool inherit it through session state, like the mcp cache.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        budget: Optional[Budget] = None,
+        flush_seconds: float = 30.0,
+        max_sessions: int = 1000,
+    ):
+        self.path = path
+        self.budget = budget or Budget()
+        self.flush_seconds = flush_seconds
+        self.max_sessions = max_sessions
+
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Dict[Tuple[str, str], Dict[str, float]]]" = OrderedDict()
+        self._pending: Dict[Tuple[str, str, str], Dict[str, float]] = {}
+        self._started: Dict[Any, float] = {}
+        self._last_flush = time.monotonic()
+        self.budget_stops = 0
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(self, session: str, kind: str, name: str, **amounts: float) -> None:
+        with self._lock:
+            totals = self._sessions.get(session)
+            if totals is None:
+                totals = self._sessions[session] = {}
+                if len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session)
+            for bucket in (
+                totals.setdefault((kind, name), dict.fromkeys(_FIELDS, 0)),
+                self._pending.setdefault((session, kind, name), dict.fromkeys(_FIELDS, 0)),
+            ):
+                bucket["calls"] += 1
+                for field, amount in amounts.items():
+                    bucket[field] += amount
+        if time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def session_totals(self, session: str) -> Dict[str, Any]:
+        with self._lock:
+            totals = self._sessions.get(session, {})
+            agents = {name: dict(v) for (kind, name), v in totals.items() if kind == "agent"}
+            tools = {name: dict(v) for (kind, name), v in totals.items() if kind == "tool"}
+        llm = {f: sum(v[f] for v in agents.values()) for f in _FIELDS}
+        return {
+            "session_id": session,
+            "llm_calls": int(llm["calls"]),
+            "tokens": int(llm["prompt_tokens"] + llm["completion_tokens"]),
+            "prompt_tokens": int(llm["prompt_tokens"]),
+            "completion_tokens": int(llm["completion_tokens"]),
+            "llm_ms": round(llm["elapsed_ms"], 1),
+            "tool_calls": int(sum(v["calls"] for v in tools.values())),
+            "tool_ms": round(sum(v["elapsed_ms"] for v in tools.values()), 1),
+            "tool_payload_bytes": int(sum(v["payload_bytes"] for v in tools.values())),
+            "delegations": int(
+                sum(v["calls"] for name, v in tools.items() if name in DELEGATION_TOOLS or name.endswith("_agent"))
+            ),
+            "agents": agents,
+            "tools": tools,
+        }
+
+    def over_budget(self, session: str) -> Optional[str]:
+        budget = self.budget
+        totals = self.session_totals(session)
+        if budget.max_tokens and totals["tokens"] >= budget.max_tokens:
+            return f"token budget of {budget.max_tokens} reached ({totals['tokens']} used)"
+        if budget.max_llm_calls and totals["llm_calls"] >= budget.max_llm_calls:
+            return f"LLM call budget of {budget.max_llm_calls} reached"
+        return None
+
+    def delegation_over_budget(self, session: str) -> Optional[str]:
+        limit = self.budget.max_delegations
+        if limit and self.session_totals(session)["delegations"] >= limit:
+            return f"delegation budget of {limit} reached"
+        return None
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def flush(self) -> int:
+        """Append counters accumulated since the last flush; returns rows written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending or not self.path:
+            return 0
+        now = time.time()
+        rows = [
+            (now, session, kind, name, *(bucket[f] for f in _FIELDS))
+            for (session, kind, name), bucket in pending.items()
+        ]
+        try:
+            with sqlite3.connect(self.path, timeout=10) as db:
+                db.executescript(_SCHEMA)
+                db.executemany(f"INSERT INTO usage VALUES ({', '.join('?' * 10)})", rows)
+        except sqlite3.Error as e:
+            print(f"Usage flush to {self.path} failed: {e}")
+            return 0
+        return len(rows)
+
+    # ------------------------------------------------------------------
+    # ADK callbacks
+    # ------------------------------------------------------------------
+
+    def before_model(self, callback_context, llm_request):
+        session = scope_id(callback_context)
+        reason = self.over_budget(session)
+        if reason:
+            self.budget_stops += 1
+            return _canned_reply(f"Session budget exhausted: {reason}. Stopping here.")
+        self._started[("model", callback_context.invocation_id, callback_context.agent_name)] = time.perf_counter()
+        return None
+
+    def after_model(self, callback_context, llm_response):
+        if llm_response.partial:
+            return None
+        started = self._started.pop(("model", callback_context.invocation_id, callback_context.agent_name), None)
+        usage = llm_response.usage_metadata
+        prompt = (usage.prompt_token_count if usage else None) or 0
+        completion = (usage.candidates_token_count if usage else None) or 0
+        self.record(
+            scope_id(callback_context),
+            "agent",
+            callback_context.agent_name,
+            prompt_tokens=prompt,
+            completion_tokens=completion,
+            elapsed_ms=(time.perf_counter() - started) * 1000 if started else 0.0,
+            errors=1 if llm_response.error_code else 0,
+        )
+        return None
+
+    def before_tool(self, tool, args, tool_context):
+        if tool.name in DELEGATION_TOOLS or _is_agent_tool(tool):
+            reason = self.delegation_over_budget(scope_id(tool_context))
+            if reason:
+                self.budget_stops += 1
+                return {"success": False, "error": f"Session budget exhausted: {reason}. Answer with what you have."}
+        self._started[("tool", tool_context.function_call_id)] = time.perf_counter()
+        return None
+
+    def after_tool(self, tool, args, tool_context, tool_response):
+        started = self._started.pop(("tool", tool_context.function_call_id), None)
+        failed = isinstance(tool_response, dict) and tool_response.get("success") is False
+        self.record(
+            scope_id(tool_context),
+            "tool",
+            tool.name,
+            payload_bytes=_payload_size(args) + _payload_size(tool_response),
+            elapsed_ms=(time.perf_counter() - started) * 1000 if started else 0.0,
+            errors=1 if failed else 0,
+        )
+        return None
+
+    def report(self, callback_context) -> None:
+        """after_agent_callback: one-line usage summary for the session."""
+        totals = self.session_totals(scope_id(callback_context))
+        print(
+            f"[usage] session {totals['session_id']}: {totals['llm_calls']} LLM calls, "
+            f"{totals['prompt_tokens']}+{totals['completion_tokens']} tokens in {totals['llm_ms']} ms; "
+            f"{totals['tool_calls']} tool calls ({totals['delegations']} delegations), "
+            f"{totals['tool_payload_bytes']} payload bytes in {totals['tool_ms']} ms"
+        )
+        return None
+
+
+def summarize(path: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+    """Flushed usage per agent and per tool, optionally for one session."""
+    if not os.path.exists(path):
+        return {"agents": [], "tools": [], "sessions": 0}
+    where, params = ("WHERE session_id = ?", (session_id,)) if session_id else ("", ())
+    with sqlite3.connect(path, timeout=10) as db:
+        db.row_factory = sqlite3.Row
+        rows = db.execute(
+            f"""
+            SELECT kind, name, SUM(calls) AS calls, SUM(prompt_tokens) AS prompt_tokens,
+                   SUM(completion_tokens) AS completion_tokens, SUM(payload_bytes) AS payload_bytes,
+                   ROUND(SUM(elapsed_ms), 1) AS elapsed_ms,
+                   ROUND(SUM(elapsed_ms) / SUM(calls), 1) AS avg_ms, SUM(errors) AS errors
+            FROM usage {where} GROUP BY kind, name ORDER BY kind, SUM(prompt_tokens) + SUM(elapsed_ms) DESC
+            """,
+            params,
+        ).fetchall()
+        sessions = db.execute(f"SELECT COUNT(DISTINCT session_id) FROM usage {where}", params).fetchone()[0]
+    return {
+        "agents": [dict(r) for r in rows if r["kind"] == "agent"],
+        "tools": [dict(r) for r in rows if r["kind"] == "tool"],
+        "sessions": sessions,
+    }
+
+
+def _is_agent_tool(tool) -> bool:
+    from google.adk.tools.agent_tool import AgentTool
+
+    return isinstance(tool, AgentTool)
+
+
+def _canned_reply(text: str):
+    from google.adk.models import LlmResponse
+    from google.genai import types
+
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+def _as_list(callback) -> List:
+    if callback is None:
+        return []
+    return list(callback) if isinstance(callback, list) else [callback]
+
+
+def install(agents, ledger: "UsageLedger") -> None:
+    """Add the ledger's callbacks to each agent, after any it already has."""
+    for agent in agents:
+        agent.before_model_callback = _as_list(agent.before_model_callback) + [ledger.before_model]
+        agent.after_model_callback = _as_list(agent.after_model_callback) + [ledger.after_model]
+        agent.before_tool_callback = _as_list(agent.before_tool_callback) + [ledger.before_tool]
+        agent.after_tool_callback = _as_list(agent.after_tool_callback) + [ledger.after_tool]
+
+
+ledger = UsageLedger(
+    path=os.getenv("USAGE_DB_PATH", str(Path(__file__).parent.parent / "data" / "usage.db")),
+    budget=Budget.from_env(),
+    flush_seconds=float(os.getenv("USAGE_FLUSH_SECONDS", "30")),
+)
+atexit.register(ledger.flush)
@@ -0,0 +1,188 @@
+# supervisory_agent/tools/actions.py
+# Operational actions that change domain data. Each one reads and writes
+# through the shared DomainStore, so cached frames and the CSVs stay in step.
+# Invalid input raises ValueError (not worth retrying); anything else is
+# treated as transient by the action queue.
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .data_store import DOMAIN_FILES, store
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _ids(params: dict, key: str) -> Optional[List[str]]:
+    value = params.get(key)
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list) or not value:
+        raise ValueError(f"'{key}' must be an ID or a non-empty list of IDs")
+    return [str(v) for v in value]
+
+
+def _require_known(df, column: str, wanted: List[str]) -> None:
+    missing = sorted(set(wanted) - set(df[column].astype(str)))
+    if missing:
+        raise ValueError(f"Unknown {column}: {', '.join(missing)}")
+
+
+def reorder_materials(params: dict) -> dict:
+    """
+    Place replenishment orders for inventory materials.
+
+    Args:
+        params: material_ids (ID or list; default: every material flagged
+            reorder_needed) and optional quantity (default: top up to optimal_stock)
+
+    Returns:
+        Ordered quantities and estimated cost per material
+    """
+    material_ids = _ids(params, "material_ids")
+    quantity = params.get("quantity")
+
+    def apply(df):
+        if material_ids is None:
+            mask = df["reorder_needed"] == 1
+        else:
+            _require_known(df, "material_id", material_ids)
+            mask = df["material_id"].astype(str).isin(material_ids)
+
+        selected = df[mask]
+        if quantity is not None:
+            quantities = selected["material_id"].map(lambda _: float(quantity))
+        else:
+            quantities = (selected["optimal_stock"] - selected["current_stock"]).clip(lower=0)
+
+        df.loc[mask, "status"] = "reorder_placed"
+        df.loc[mask, "reorder_needed"] = 0
+        df.loc[mask, "last_updated"] = _now()
+
+        orders = [
+            {
+                "material_id": row.material_id,
+                "quantity": float(qty),
+                "supplier": row.supplier,
+                "estimated_cost": round(float(qty) * float(row.unit_cost), 2),
+                "lead_time_days": int(row.lead_time_days),
+            }
+            for row, qty in zip(selected.itertuples(index=False), quantities)
+        ]
+        return df, orders
+
+    orders = store.modify("inventory", apply)
+    return {
+        "orders": orders,
+        "count": len(orders),
+        "total_estimated_cost": round(sum(o["estimated_cost"] for o in orders), 2),
+    }
+
+
+def reschedule_shipments(params: dict) -> dict:
+    """
+    Move one or more shipments to a new date.
+
+    Args:
+        params: shipment_ids (ID or list) and scheduled_date (YYYY-MM-DD)
+
+    Returns:
+        Previous and new dates per shipment
+    """
+    shipment_ids = _ids(params, "shipment_ids")
+    scheduled_date = params.get("scheduled_date")
+    if not shipment_ids or not scheduled_date:
+        raise ValueError("'shipment_ids' and 'scheduled_date' are required")
+    datetime.strptime(scheduled_date, "%Y-%m-%d")  # ValueError on a bad date
+
+    def apply(df):
+        _require_known(df, "shipment_id", shipment_ids)
+        mask = df["shipment_id"].astype(str).isin(shipment_ids)
+        changes = [
+            {"shipment_id": sid, "from": prev, "to": scheduled_date}
+            for sid, prev in zip(df.loc[mask, "shipment_id"], df.loc[mask, "scheduled_date"])
+        ]
+        df.loc[mask, "scheduled_date"] = scheduled_date
+        df.loc[mask, "status"] = "scheduled"
+        return df, changes
+
+    changes = store.modify("logistics", apply)
+    return {"rescheduled": changes, "count": len(changes)}
+
+
+def schedule_maintenance(params: dict) -> dict:
+    """
+    Book maintenance for one or more machines.
+
+    Args:
+        params: machine_ids (ID or list), date (YYYY-MM-DD) and optional
+            maintenance_type (default "preventive")
+
+    Returns:
+        Scheduled machines and date
+    """
+    machine_ids = _ids(params, "machine_ids")
+    date = params.get("date")
+    maintenance_type = params.get("maintenance_type", "preventive")
+    if not machine_ids or not date:
+        raise ValueError("'machine_ids' and 'date' are required")
+    datetime.strptime(date, "%Y-%m-%d")
+
+    def apply(df):
+        _require_known(df, "machine_id", machine_ids)
+        mask = df["machine_id"].astype(str).isin(machine_ids)
+        df.loc[mask, "next_maintenance_due"] = date
+        df.loc[mask, "maintenance_type"] = maintenance_type
+        df.loc[mask, "status"] = "maintenance_scheduled"
+        return df, sorted(df.loc[mask, "machine_id"].astype(str))
+
+    scheduled = store.modify("maintenance", apply)
+    return {"machines": scheduled, "date": date, "maintenance_type": maintenance_type}
+
+
+def update_record(params: dict) -> dict:
+    """
+    Generic single-record update, equivalent to mcp_call(domain, "update", ...).
+
+    Args:
+        params: domain, id (row index) and updates (column -> value)
+    """
+    domain = params.get("domain")
+    record_id = params.get("id")
+    updates = params.get("updates") or {}
+    if domain not in DOMAIN_FILES:
+        raise ValueError(f"Unknown domain: {domain}")
+    if record_id is None or not updates:
+        raise ValueError("'id' and 'updates' are required")
+
+    def apply(df):
+        unknown = sorted(set(updates) - set(df.columns))
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        if record_id not in df.index:
+            raise ValueError(f"No record {record_id} in {domain}")
+        for key, value in updates.items():
+            df.loc[record_id, key] = value
+        return df, None
+
+    store.modify(domain, apply)
+    return {"domain": domain, "id": record_id, "updated": sorted(updates)}
+
+
+# Action name -> (domain it changes, handler). `None` = depends on params.
+ACTIONS: Dict[str, Any] = {
+    "reorder_materials": ("inventory", reorder_materials),
+    "reschedule_shipments": ("logistics", reschedule_shipments),
+    "schedule_maintenance": ("maintenance", schedule_maintenance),
+    "update_record": (None, update_record),
+}
+
+
+def run_action(action: str, params: dict) -> dict:
+    """Execute a registered action synchronously (called from a worker thread)."""
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown action: {action}")
+    handler: Callable[[dict], dict] = ACTIONS[action][1]
+    return handler(params)
@@ -0,0 +1,110 @@
+# supervisory_agent/tools/coordination.py
+# Concurrent fan-out to sub-agents. ADK executes the function calls of one
+# model turn one after another, so asking three AgentTools in a row costs the
+# sum of three conversations; coordinate_agents runs them side by side.
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from google.adk.agents import BaseAgent
+    from google.adk.tools.tool_context import ToolContext
+
+# Per-branch timeout bounds (seconds)
+DEFAULT_BRANCH_TIMEOUT = 60.0
+MAX_BRANCH_TIMEOUT = 300.0
+
+# Short names the model may use instead of full agent names
+AGENT_ALIASES = {
+    "inventory": "inventory_agent",
+    "production": "production_agent",
+    "logistics": "logistics_agent",
+    "maintenance": "maintenance_agent",
+    "quality": "quality_control_agent",
+    "quality_control": "quality_control_agent",
+}
+
+
+async def _run_branch(agent: "BaseAgent", request: str, tool_context: "ToolContext", timeout: float) -> Dict[str, Any]:
+    from google.adk.tools.agent_tool import AgentTool
+
+    start = time.perf_counter()
+    branch: Dict[str, Any] = {"agent": agent.name, "request": request}
+    try:
+        response = await asyncio.wait_for(
+            AgentTool(agent).run_async(args={"request": request}, tool_context=tool_context),
+            timeout,
+        )
+        branch.update(status="ok", response=response)
+    except asyncio.TimeoutError:
+        branch.update(status="timeout", error=f"No answer within {timeout:.0f}s")
+    except Exception as e:
+        branch.update(status="error", error=f"{type(e).__name__}: {e}")
+    branch["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return branch
+
+
+def build_coordinate_agents(agents: List["BaseAgent"]):
+    """
+    Build the `coordinate_agents` tool over `agents`. Their order here is
+    the order results are reported in, whatever order branches finish in.
+    """
+    by_name = {agent.name: agent for agent in agents}
+    order = {agent.name: index for index, agent in enumerate(agents)}
+
+    async def coordinate_agents(
+        agent_requests: Dict[str, str],
+        tool_context: "ToolContext",
+        timeout_seconds: float,
+    ) -> dict:
+        """
+        Ask several specialist agents independent questions at the same time.
+
+        Use this for multi-domain requests instead of calling the agent tools
+        one after another: total time is that of the slowest agent.
+
+        Args:
+            agent_requests: Agent name -> self-contained question for it, e.g.
+                {"inventory_agent": "Which materials need reordering?",
+                 "production_agent": "What is the current output rate?"}
+            timeout_seconds: Time limit for each agent (0 = 60s); slower agents
+                are reported as "timeout" and the others are still returned
+
+        Returns:
+            One result per agent in a fixed agent order, each with status
+            ok / timeout / error and the agent's response
+        """
+        timeout = min(max(float(timeout_seconds or DEFAULT_BRANCH_TIMEOUT), 1.0), MAX_BRANCH_TIMEOUT)
+
+        branches, unknown = {}, []
+        for name, request in (agent_requests or {}).items():
+            name = AGENT_ALIASES.get(name, name)
+            if name in by_name:
+                branches[name] = str(request)
+            else:
+                unknown.append(name)
+        if not branches:
+            return {
+                "success": False,
+                "error": "No known agents in agent_requests",
+                "unknown_agents": unknown,
+                "available_agents": list(by_name),
+            }
+
+        start = time.perf_counter()
+        names = sorted(branches, key=order.__getitem__)
+        results = await asyncio.gather(
+            *(_run_branch(by_name[name], branches[name], tool_context, timeout) for name in names)
+        )
+        failed = [r["agent"] for r in results if r["status"] != "ok"]
+        return {
+            "success": not failed,
+            "results": results,
+            "completed": len(results) - len(failed),
+            "failed_agents": failed,
+            "unknown_agents": unknown,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+            "sequential_ms": round(sum(r["elapsed_ms"] for r in results), 1),
+        }
+
+    return coordinate_agents
@@ -0,0 +1,345 @@
+# supervisory_agent/tools/data_store.py
+import io
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # no flock (Windows): one process per data directory
+    fcntl = None
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+FINGERPRINT_BYTES = 64
+
+# Domain-to-CSV mapping
+DOMAIN_FILES = {
+    "inventory": "data/inventory_data.csv",
+    "production": "data/production_data.csv",
+    "logistics": "data/logistics_data.csv",
+    "maintenance": "data/maintenance_data.csv",
+    "quality": "data/quality_data.csv",
+}
+
+
+def domain_csv_path(domain: str) -> Path:
+    return Path(__file__).parent.parent / DOMAIN_FILES[domain]
+
+
+class DomainStore:
+    """
+    Process-wide cache of one DataFrame per domain CSV.
+
+    Frames are loaded once and re-read only when the file is replaced or
+    rewritten on disk or a reload is requested, so a master process can
+    preload them before forking workers and the workers share the pages
+    copy-on-write. Rows another process appends are followed by file
+    offset: only the new bytes are parsed, and they count as an append.
+
+    Frames returned by `frame()` are shared: treat them as read-only and copy
+    before mutating.
+
+    `append()` adds rows to the end of the CSV without rewriting it; the
+    appended chunks are joined onto the cached frame on the next `frame()`
+    call, so a stream of small appends costs one concatenation per read.
+
+    Appends and read-modify-write cycles hold an exclusive flock on a lock
+    file next to the CSV, so pre-forked workers sharing the data directory
+    never interleave appends and `modify` always changes the current file:
+    it re-reads the CSV inside the lock and replaces it before releasing.
+
+    `rewrites(domain)` counts the changes that replaced the frame (loads and
+    writes) rather than appending to it; a consumer that follows a table
+    incrementally can resume from its row count while the counter is
+    unchanged and must start over when it moves.
+
+    Callbacks registered with `subscribe()` are called with the domain name
+    whenever its frame is (re)loaded or written, in the thread that made the
+    change and outside the store's locks.
+    """
+
+    def __init__(self, files: Dict[str, Path]):
+        self.files = files
+        self._frames: Dict[str, "pd.DataFrame"] = {}
+        # (inode, size, mtime_ns) of the file as last seen, and the bytes of
+        # it already in the frame (always ending at a line break)
+        self._signatures: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        self._offsets: Dict[str, int] = {}
+        # The bytes just before the offset: a file rewritten in place (same
+        # inode) no longer has them there and is reloaded instead of followed
+        self._fingerprints: Dict[str, bytes] = {}
+        self._loaded_at: Dict[str, str] = {}
+        self._rewrites: Dict[str, int] = {domain: 0 for domain in files}
+        self._lock = threading.Lock()
+        # Serialize read-modify-write cycles per domain (see `modify`)
+        self._write_locks = {domain: threading.Lock() for domain in files}
+        self._listeners: List[Callable[[str], None]] = []
+        # Rows appended since the cached frame was last materialized
+        self._tails: Dict[str, List["pd.DataFrame"]] = {}
+        self.loads = 0
+        self.appended_rows = 0
+        self.followed_rows = 0
+
+    def frame(self, domain: str) -> "pd.DataFrame":
+        if domain not in self.files:
+            raise ValueError(f"Unknown domain: {domain}")
+        if self._tails.get(domain):
+            self._join_tail(domain)
+        df = self._frames.get(domain)
+        if df is not None and self._signatures.get(domain) == self._signature(domain):
+            return df
+
+        with self._lock:
+            changed = self._refresh(domain)
+        if self._tails.get(domain):
+            self._join_tail(domain)
+        if changed:
+            self._notify(domain)
+        return self._frames[domain]
+
+    def _signature(self, domain: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.files[domain])
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _refresh(self, domain: str) -> bool:
+        """Bring the cached frame up to the file (under `_lock`); True if it changed."""
+        signature = self._signature(domain)
+        if domain in self._frames:
+            if self._signatures.get(domain) == signature:
+                return False
+            followed = self._follow(domain, signature)
+            if followed is not None:
+                return followed
+        self._load(domain)
+        return True
+
+    def _follow(self, domain: str, signature) -> Optional[bool]:
+        """
+        Read rows another process appended since the last read. None when
+        the file was replaced or rewritten instead, so it must be reloaded.
+        """
+        import pandas as pd
+
+        previous, offset = self._signatures.get(domain), self._offsets[domain]
+        if signature is None or previous is None or signature[0] != previous[0] or signature[1] <= offset:
+            return None
+        fingerprint = self._fingerprints[domain]
+        with open(self.files[domain], "rb") as f:
+            f.seek(offset - len(fingerprint))
+            if f.read(len(fingerprint)) != fingerprint:
+                return None
+            chunk = f.read(signature[1] - offset)
+        # A writer without the lock may be mid-line: take complete lines only
+        complete = chunk.rfind(b"\n") + 1
+        if not complete:
+            return False
+        columns = list(self._frames[domain].columns)
+        rows = pd.read_csv(io.BytesIO(chunk[:complete]), header=None, names=columns)
+        self._tails.setdefault(domain, []).append(rows)
+        self._advance(domain, chunk[:complete], offset + complete)
+        # Re-check next time if a partial line is still pending
+        self._signatures[domain] = signature if complete == len(chunk) else None
+        self.followed_rows += len(rows)
+        return True
+
+    def _advance(self, domain: str, data: bytes, offset: int) -> None:
+        self._offsets[domain] = offset
+        self._fingerprints[domain] = (self._fingerprints.get(domain, b"") + data)[-FINGERPRINT_BYTES:]
+        self._loaded_at[domain] = datetime.now().isoformat()
+
+    def _join_tail(self, domain: str) -> None:
+        import pandas as pd
+
+        with self._lock:
+            tail = self._tails.pop(domain, None)
+            if tail:
+                self._frames[domain] = pd.concat([self._frames[domain], *tail], ignore_index=True)
+
+    def _load(self, domain: str) -> None:
+        import pandas as pd  # deferred until the first data access
+
+        with open(self.files[domain], "rb") as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+        self._tails.pop(domain, None)
+        self._frames[domain] = pd.read_csv(io.BytesIO(data))
+        self._rewrites[domain] += 1
+        self._signatures[domain] = (st.st_ino, len(data), st.st_mtime_ns) if len(data) == st.st_size else None
+        self._fingerprints[domain] = b""
+        self._advance(domain, data, len(data))
+        self.loads += 1
+
+    def preload(self, domains: Optional[Iterable[str]] = None) -> None:
+        """Load every domain now (e.g. in a master process before fork)."""
+        for domain in domains or self.files:
+            self.frame(domain)
+
+    def reload(self, domain: Optional[str] = None) -> None:
+        """Re-read one or all domains from disk."""
+        names = [domain] if domain else list(self.files)
+        with self._lock:
+            for name in names:
+                self._load(name)
+        for name in names:
+            self._notify(name)
+
+    @contextmanager
+    def _file_lock(self, domain: str):
+        """Exclusive lock on the domain CSV, across every process that uses it."""
+        if fcntl is None:
+            yield
+            return
+        path = Path(self.files[domain])
+        with open(path.with_name(f".{path.name}.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def write(self, domain: str, df: "pd.DataFrame") -> None:
+        """Persist a modified frame and make it the cached copy."""
+        with self._write_locks[domain], self._file_lock(domain):
+            self._replace(domain, df)
+        self._notify(domain)
+
+    def _replace(self, domain: str, df: "pd.DataFrame") -> None:
+        with self._lock:
+            # Write aside and rename: the CSV is either the old or the new table
+            path = Path(self.files[domain])
+            staging = path.with_name(f".{path.name}.tmp")
+            data = df.to_csv(index=False).encode()
+            with open(staging, "wb") as f:
+                f.write(data)
+            os.replace(staging, path)
+            self._tails.pop(domain, None)
+            self._frames[domain] = df
+            self._rewrites[domain] += 1
+            self._signatures[domain] = self._signature(domain)
+            self._fingerprints[domain] = b""
+            self._advance(domain, data, len(data))
+
+    def append(
+        self, domain: str, rows: "pd.DataFrame", text: Optional[str] = None, notify: bool = True
+    ) -> int:
+        """
+        Append rows to the domain CSV without rewriting it and to the cached
+        frame. Columns are matched by name to the existing header; returns
+        the number of rows written. `text` is the rows already rendered as
+        CSV lines, which requires the columns in header order. With
+        `notify=False` subscribers are not called; the caller is expected to
+        call `notify(domain)` later, e.g. once for a burst of appends.
+
+        The rows go to the file in one write under the cross-process lock,
+        and a failed write is cut back off, so the file never holds part of
+        a batch.
+        """
+        if domain not in self.files:
+            raise ValueError(f"Unknown domain: {domain}")
+        if rows.empty:
+            return 0
+        with self._write_locks[domain]:
+            # The cached frame's header; frame() would also join the pending tail
+            cached = self._frames.get(domain)
+            columns = (cached if cached is not None else self.frame(domain)).columns
+            missing = [c for c in rows.columns if c not in columns]
+            if missing:
+                raise ValueError(f"Unknown column(s) for {domain}: {missing}")
+            if text is not None and list(rows.columns) != list(columns):
+                raise ValueError(f"Pre-rendered rows for {domain} must follow the CSV header order")
+            rows = rows.reindex(columns=columns)
+            data = (text if text is not None else rows.to_csv(header=False, index=False)).encode()
+            with self._file_lock(domain), self._lock:
+                # Rows other processes appended come first, in file order
+                followed = self._refresh(domain)
+                fd = os.open(self.files[domain], os.O_WRONLY | os.O_APPEND)
+                try:
+                    start = os.fstat(fd).st_size
+                    try:
+                        view = memoryview(data)
+                        while view:
+                            view = view[os.write(fd, view) :]
+                    except BaseException:
+                        os.ftruncate(fd, start)
+                        raise
+                finally:
+                    os.close(fd)
+                if start == self._offsets[domain]:
+                    self._tails.setdefault(domain, []).append(rows)
+                    self._advance(domain, data, start + len(data))
+                    self._signatures[domain] = self._signature(domain)
+                # else: an unterminated line precedes the rows; the next frame() reads them back
+                self.appended_rows += len(rows)
+        if notify or followed:
+            self._notify(domain)
+        return len(rows)
+
+    def modify(
+        self, domain: str, change: Callable[["pd.DataFrame"], Tuple["pd.DataFrame", Any]]
+    ) -> Any:
+        """
+        Apply `change` to a private copy of the domain frame and persist it.
+
+        `change(df)` returns `(new_df, result)`, or `(None, result)` to leave
+        the table as it is; `result` is passed back to the caller. Writers to
+        the same domain run one at a time, in this and every other process,
+        and `df` is the file as it is under the lock, so no update (and no
+        row appended elsewhere) is lost to a read-modify-write race.
+        """
+        if domain not in self.files:
+            raise ValueError(f"Unknown domain: {domain}")
+        with self._write_locks[domain], self._file_lock(domain):
+            df, result = change(self.frame(domain).copy())
+            if df is not None:
+                self._replace(domain, df)
+        if df is not None:
+            self._notify(domain)
+        return result
+
+    def rewrites(self, domain: str) -> int:
+        """Number of times the domain frame was replaced rather than appended to."""
+        return self._rewrites[domain]
+
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        """Call `callback(domain)` after every change to a domain's frame."""
+        self._listeners.append(callback)
+
+    def notify(self, domain: str) -> None:
+        """Call the subscribers for a change made with `append(notify=False)`."""
+        if domain not in self.files:
+            raise ValueError(f"Unknown domain: {domain}")
+        self._notify(domain)
+
+    def _notify(self, domain: str) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(domain)
+            except Exception as e:
+                print(f"DomainStore listener failed for {domain}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "domains": {
+                domain: {
+                    "rows": len(df) + sum(len(t) for t in self._tails.get(domain, [])),
+                    "loaded_at": self._loaded_at.get(domain),
+                }
+                for domain, df in self._frames.items()
+            },
+            "loads": self.loads,
+            "appended_rows": self.appended_rows,
+            "followed_rows": self.followed_rows,
+            "listeners": len(self._listeners),
+        }
+
+
+# Shared by every tool and the bridge in this process
+store = DomainStore({domain: domain_csv_path(domain) for domain in DOMAIN_FILES})
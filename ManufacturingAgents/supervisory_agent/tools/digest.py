@@ -0,0 +1,406 @@
+# supervisory_agent/tools/digest.py
+# Compact KPI snapshot per domain, so agents can start from a few hundred
+# bytes of precomputed figures instead of reading every row. Each digest is
+# rebuilt only after its own domain changes (DomainStore event), on the next
+# request, and lists at most MAX_ITEMS entries however large the data grows.
+# Production and quality only grow by appends: their digests are rendered
+# from per-machine sums and counts that appended rows are folded into, so a
+# new batch costs a groupby over that batch rather than the whole table.
+# The other domains are small, rewritten in place, and rebuilt in full.
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Tuple
+
+from .data_store import DOMAIN_FILES, store
+
+MAX_ITEMS = 10
+
+
+def _r(value, digits: int = 2):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else round(value, digits)  # NaN -> None
+
+
+def _plain(value):
+    if hasattr(value, "item"):  # NumPy scalar -> Python
+        value = value.item()
+    return _r(value) if isinstance(value, float) else value
+
+
+def _top(df, by: str, ascending: bool, columns: Dict[str, str]) -> Dict[str, Any]:
+    """First MAX_ITEMS rows by `by`, renamed per `columns`, plus how many were left out."""
+    ranked = df.sort_values(by, ascending=ascending).head(MAX_ITEMS)
+    items = [
+        {name: _plain(value) for name, value in zip(columns, row)}
+        for row in ranked[list(columns.values())].itertuples(index=False)
+    ]
+    return {"items": items, "omitted": max(0, len(df) - MAX_ITEMS)}
+
+
+def _counts(series) -> Dict[str, int]:
+    counts = series.value_counts().head(MAX_ITEMS)
+    return {str(k): int(v) for k, v in counts.items()}
+
+
+def merge_partials(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold the partial of appended rows into the partial of the rows before them.
+
+    "totals" are added, "groups" frames (sums and counts per key) are added
+    key-wise, and "latest" frames keep the row with the newest timestamp per
+    key, the appended one on ties.
+    """
+    import pandas as pd
+
+    return {
+        "totals": {k: old["totals"][k] + new["totals"][k] for k in old["totals"]},
+        "groups": {
+            name: pd.concat([frame, new["groups"][name]]).groupby(level=0).sum()
+            for name, frame in old["groups"].items()
+        },
+        "latest": {
+            name: pd.concat([frame, new["latest"][name]])
+            .sort_values("timestamp", kind="stable")
+            .pipe(lambda both: both[~both.index.duplicated(keep="last")])
+            .sort_index()
+            for name, frame in old["latest"].items()
+        },
+    }
+
+
+def _mean(sums, counts):
+    return sums / counts.where(counts > 0)
+
+
+def production_partial(df) -> Dict[str, Any]:
+    counted = df.assign(
+        efficiency_n=df["efficiency_score"].notna(), output_n=df["output_rate"].notna(), readings=1
+    )
+    groups = {
+        "machines": counted.groupby("machine_id").agg(
+            efficiency_sum=("efficiency_score", "sum"),
+            efficiency_n=("efficiency_n", "sum"),
+            downtime_minutes=("downtime_minutes", "sum"),
+            output_sum=("output_rate", "sum"),
+            output_n=("output_n", "sum"),
+            readings=("readings", "sum"),
+        )
+    }
+    if "shift" in df.columns:
+        groups["shifts"] = counted.groupby("shift").agg(
+            efficiency_sum=("efficiency_score", "sum"), efficiency_n=("efficiency_n", "sum")
+        )
+    # Status is the machine's last reported one in timestamp order
+    latest = (
+        df.dropna(subset=["status"])
+        .sort_values("timestamp", kind="stable")
+        .drop_duplicates("machine_id", keep="last")
+        .set_index("machine_id")[["timestamp", "status"]]
+        .sort_index()
+    )
+    return {
+        "totals": {
+            "efficiency_sum": float(df["efficiency_score"].sum()),
+            "efficiency_n": int(df["efficiency_score"].count()),
+            "output_sum": float(df["output_rate"].sum()),
+            "output_n": int(df["output_rate"].count()),
+            "downtime_minutes": float(df["downtime_minutes"].sum()),
+        },
+        "groups": groups,
+        "latest": {"status": latest},
+    }
+
+
+def production_render(partial: Dict[str, Any]) -> Dict[str, Any]:
+    import pandas as pd
+
+    totals, machines = partial["totals"], partial["groups"]["machines"]
+    per_machine = pd.DataFrame(
+        {
+            "machine_id": machines.index,
+            "efficiency": _mean(machines["efficiency_sum"], machines["efficiency_n"]).to_numpy(),
+            "downtime_minutes": machines["downtime_minutes"].to_numpy(),
+            "output_rate": _mean(machines["output_sum"], machines["output_n"]).to_numpy(),
+            "readings": machines["readings"].to_numpy(),
+            "status": partial["latest"]["status"]["status"].reindex(machines.index).to_numpy(),
+        }
+    )
+    shifts = partial["groups"].get("shifts")
+    return {
+        "machines": int(len(per_machine)),
+        "avg_efficiency": _r(totals["efficiency_sum"] / totals["efficiency_n"]) if totals["efficiency_n"] else None,
+        "avg_output_rate": _r(totals["output_sum"] / totals["output_n"]) if totals["output_n"] else None,
+        "total_downtime_minutes": _r(totals["downtime_minutes"]),
+        "status_counts": _counts(per_machine["status"]),
+        "shift_efficiency": {
+            str(k): _r(v) for k, v in _mean(shifts["efficiency_sum"], shifts["efficiency_n"]).head(MAX_ITEMS).items()
+        } if shifts is not None else {},
+        "lowest_efficiency_machines": _top(
+            per_machine,
+            "efficiency",
+            True,
+            {
+                "machine_id": "machine_id",
+                "efficiency": "efficiency",
+                "downtime_minutes": "downtime_minutes",
+                "output_rate": "output_rate",
+                "status": "status",
+            },
+        ),
+    }
+
+
+def production_digest(df) -> Dict[str, Any]:
+    return production_render(production_partial(df))
+
+
+def inventory_digest(df) -> Dict[str, Any]:
+    df = df.assign(
+        coverage=df["current_stock"] / df["reorder_point"],
+        days_of_cover=df["current_stock"] / df["consumed_last_24h"].where(df["consumed_last_24h"] > 0),
+        shortfall=(df["optimal_stock"] - df["current_stock"]).clip(lower=0),
+    )
+    return {
+        "materials": int(len(df)),
+        "below_reorder_point": int((df["coverage"] <= 1).sum()),
+        "flagged_for_reorder": int((df["reorder_needed"] == 1).sum()),
+        "stock_value": _r((df["current_stock"] * df["unit_cost"]).sum()),
+        "reorder_cost_to_optimal": _r((df["shortfall"] * df["unit_cost"]).sum()),
+        "lowest_coverage_materials": _top(
+            df,
+            "coverage",
+            True,
+            {
+                "material_id": "material_id",
+                "name": "material_name",
+                "stock": "current_stock",
+                "reorder_point": "reorder_point",
+                "coverage_x_reorder_point": "coverage",
+                "days_of_cover": "days_of_cover",
+                "lead_time_days": "lead_time_days",
+            },
+        ),
+    }
+
+
+def logistics_digest(df) -> Dict[str, Any]:
+    open_shipments = df[df["status"] != "delivered"]
+    return {
+        "shipments": int(len(df)),
+        "status_counts": _counts(df["status"]),
+        "open_by_priority": _counts(open_shipments["priority"]),
+        "open_quantity": int(open_shipments["quantity"].sum()),
+        "open_estimated_cost": _r(open_shipments["estimated_cost"].sum()),
+        "carrier_counts": _counts(df["carrier"]),
+        "next_open_shipments": _top(
+            open_shipments,
+            "scheduled_date",
+            True,
+            {
+                "shipment_id": "shipment_id",
+                "customer": "customer",
+                "scheduled_date": "scheduled_date",
+                "status": "status",
+                "priority": "priority",
+                "quantity": "quantity",
+            },
+        ),
+    }
+
+
+def maintenance_digest(df) -> Dict[str, Any]:
+    return {
+        "machines": int(len(df)),
+        "status_counts": _counts(df["status"]),
+        "priority_counts": _counts(df["priority"]),
+        "avg_failure_probability": _r(df["predicted_failure_prob"].mean(), 3),
+        "total_downtime_hours": _r(df["total_downtime_hours"].sum()),
+        "failure_risk_ranking": _top(
+            df,
+            "predicted_failure_prob",
+            False,
+            {
+                "machine_id": "machine_id",
+                "failure_probability": "predicted_failure_prob",
+                "hours_since_maintenance": "hours_since_maintenance",
+                "next_maintenance_due": "next_maintenance_due",
+                "status": "status",
+                "priority": "priority",
+            },
+        ),
+    }
+
+
+def quality_partial(df) -> Dict[str, Any]:
+    failed = df["inspection_status"] == "failed"
+    per_machine = df.assign(
+        failed=failed, inspections=1, defect_rate_n=df["defect_rate"].notna()
+    ).groupby("machine_id").agg(
+        inspections=("inspections", "sum"),
+        failed=("failed", "sum"),
+        defect_rate_sum=("defect_rate", "sum"),
+        defect_rate_n=("defect_rate_n", "sum"),
+        rework=("rework_required", "sum"),
+    )
+    defects = df.loc[df["defect_type"] != "none", "defect_type"]
+    return {
+        "totals": {
+            "inspections": int(len(df)),
+            "failed": int(failed.sum()),
+            "defect_rate_sum": float(df["defect_rate"].sum()),
+            "defect_rate_n": int(df["defect_rate"].count()),
+            "rework_required": int(df["rework_required"].sum()),
+        },
+        "groups": {"machines": per_machine, "defect_types": defects.value_counts().to_frame("count")},
+        "latest": {},
+    }
+
+
+def quality_render(partial: Dict[str, Any]) -> Dict[str, Any]:
+    import pandas as pd
+
+    totals, machines = partial["totals"], partial["groups"]["machines"]
+    per_machine = pd.DataFrame(
+        {
+            "machine_id": machines.index,
+            "inspections": machines["inspections"].to_numpy(),
+            "failed": machines["failed"].to_numpy(),
+            "defect_rate": _mean(machines["defect_rate_sum"], machines["defect_rate_n"]).to_numpy(),
+            "rework": machines["rework"].to_numpy(),
+        }
+    )
+    per_machine["fail_rate"] = per_machine["failed"] / per_machine["inspections"] * 100
+    defect_types = partial["groups"]["defect_types"]["count"].sort_values(ascending=False, kind="stable")
+    rows = totals["inspections"]
+    return {
+        "inspections": rows,
+        "pass_rate": _r((1 - totals["failed"] / rows) * 100, 1) if rows else None,
+        "avg_defect_rate": _r(totals["defect_rate_sum"] / totals["defect_rate_n"]) if totals["defect_rate_n"] else None,
+        "rework_required": totals["rework_required"],
+        "defect_type_counts": {str(k): int(v) for k, v in defect_types.head(MAX_ITEMS).items()},
+        "machines_by_fail_rate": _top(
+            per_machine,
+            "fail_rate",
+            False,
+            {
+                "machine_id": "machine_id",
+                "inspections": "inspections",
+                "failed": "failed",
+                "fail_rate": "fail_rate",
+                "avg_defect_rate": "defect_rate",
+                "rework": "rework",
+            },
+        ),
+    }
+
+
+def quality_digest(df) -> Dict[str, Any]:
+    return quality_render(quality_partial(df))
+
+
+DIGESTS: Dict[str, Callable] = {
+    "production": production_digest,
+    "inventory": inventory_digest,
+    "logistics": logistics_digest,
+    "maintenance": maintenance_digest,
+    "quality": quality_digest,
+}
+
+# Append-only domains: (partial of some rows, digest from a partial)
+FOLDS: Dict[str, Tuple[Callable, Callable]] = {
+    "production": (production_partial, production_render),
+    "quality": (quality_partial, quality_render),
+}
+
+
+class DigestCache:
+    """One digest per domain, marked stale by DomainStore change events"""
+
+    def __init__(self, store):
+        self.store = store
+        self._digests: Dict[str, Dict[str, Any]] = {}
+        self._stale = set(DIGESTS)
+        self._lock = threading.Lock()
+        # FOLDS domains: partial and the (store.rewrites, rows) it covers
+        self._partials: Dict[str, Dict[str, Any]] = {}
+        self._covered: Dict[str, Tuple[int, int]] = {}
+        self.builds = 0
+        self.folds = 0
+        store.subscribe(self.mark_stale)
+
+    def mark_stale(self, domain: str) -> None:
+        self._stale.add(domain)
+
+    def get(self, domain: str) -> Dict[str, Any]:
+        self.store.frame(domain)  # mtime check; a changed file marks the digest stale
+        with self._lock:
+            if domain in self._stale or domain not in self._digests:
+                # Clear first, then read: a change landing meanwhile marks it stale again
+                self._stale.discard(domain)
+                rewrites = self.store.rewrites(domain)
+                df = self.store.frame(domain)
+                start = time.perf_counter()
+                if domain in FOLDS:
+                    digest = self._fold(domain, df, rewrites)
+                else:
+                    digest = DIGESTS[domain](df)
+                self._digests[domain] = {
+                    "domain": domain,
+                    "rows": int(len(df)),
+                    "computed_at": datetime.now().isoformat(),
+                    "build_ms": round((time.perf_counter() - start) * 1000, 2),
+                    **digest,
+                }
+                self.builds += 1
+            return self._digests[domain]
+
+    def _fold(self, domain: str, df, rewrites: int) -> Dict[str, Any]:
+        partial_of, render = FOLDS[domain]
+        covered = self._covered.get(domain)
+        # Only rows appended since the last build can be folded in; any
+        # rewrite or reload may have changed the rows already counted
+        if covered is not None and covered[0] == rewrites and covered[1] <= len(df):
+            partial = self._partials[domain]
+            if len(df) > covered[1]:
+                partial = merge_partials(partial, partial_of(df.iloc[covered[1]:]))
+            self.folds += 1
+        else:
+            partial = partial_of(df)
+        self._partials[domain] = partial
+        self._covered[domain] = (rewrites, len(df))
+        return render(partial)
+
+
+digests = DigestCache(store)
+
+
+def get_kpi_digest(domain: str) -> dict:
+    """
+    Precomputed KPI summary of a domain, small and fixed in size.
+
+    Call this FIRST for an overview instead of reading all rows with
+    mcp_call(intent='read'); fall back to mcp_call only for details the
+    digest does not contain.
+
+    Args:
+        domain: production, inventory, logistics, maintenance, quality, or "all"
+
+    Returns:
+        Totals and counts plus at most 10 ranked items per list:
+        production - per-machine efficiency/downtime (worst first)
+        inventory - stock vs reorder point coverage (lowest first)
+        logistics - shipment status counts and next open shipments
+        maintenance - failure-risk ranking
+        quality - defect and fail rates per machine
+    """
+    try:
+        if domain == "all":
+            return {"success": True, "digests": {name: digests.get(name) for name in DIGESTS}}
+        if domain not in DOMAIN_FILES:
+            return {"success": False, "error": f"Unknown domain: {domain}", "available": [*DIGESTS, "all"]}
+        return {"success": True, **digests.get(domain)}
+    except Exception as e:
+        return {"success": False, "domain": domain, "error": str(e)}
@@ -0,0 +1,541 @@
+# supervisory_agent/tools/factory_sim.py
+# Discrete-event factory simulator for "what if" questions (add a shift, take
+# a machine down, rush an order). The model is seeded from the current data:
+# machines with their output rates and maintenance windows (as used by the
+# scheduler), open orders from logistics, material stock with reorder points
+# and lead times from inventory, and failure rates from maintenance.
+# Machines work open orders in due-date order, in lots of about LOT_HOURS of
+# output; cycle times, breakdowns, repairs and supplier lead times are random.
+# A lot needs its machine type's materials in stock, and a material that hits
+# its reorder point is reordered up to optimal_stock.
+# Each scenario is replicated with different seeds and scenarios run in
+# parallel on a process pool; results are distributions per scenario. The
+# tool is async: it awaits the pool instead of holding a thread meanwhile.
+import asyncio
+import atexit
+import heapq
+import math
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .data_store import store
+from .inventory_sim import MATERIAL_REQUIREMENTS, _type_daily_units
+from .scheduling import _merge, load_machines, open_order_jobs, parse_jobs, place
+from .shifts import SHIFTS
+
+DEFAULT_HORIZON_HOURS = 168
+DEFAULT_REPLICATIONS = 10
+MAX_SCENARIOS = 500
+MAX_REPLICATIONS = 200
+LOT_HOURS = 1.0  # output per lot, in hours at the machine's rate
+CYCLE_TIME_CV = 0.1  # lot-to-lot variation of processing time
+LEAD_TIME_CV = 0.2
+MEAN_REPAIR_HOURS = 8.0
+# predicted_failure_prob is read as P(failure within this many hours)
+FAILURE_PROB_HOURS = 720.0
+DEFAULT_FAILURE_PROB = 0.1
+# Operated shifts from the shared calendar, in the order they are staffed
+# (morning first); "shifts": n runs the first n. Hours count from the start
+# of the morning's day, so the night shift (00-08) runs 24-32
+_DAY_START = {name: start for name, start, _ in SHIFTS}["morning"]
+SHIFT_HOURS = tuple(
+    (name, start + 24 * (start < _DAY_START), end + 24 * (start < _DAY_START))
+    for name, start, end in sorted(SHIFTS, key=lambda shift: (shift[1] < _DAY_START, shift[1]))
+)
+# Below this many runs the sweep stays in-process; a pool is not worth starting
+PARALLEL_MIN_RUNS = 40
+# Pool size per process: every serve.py worker (BRIDGE_WORKERS) starts its
+# own pool, so by default they split the CPUs between them
+SIM_WORKERS = int(os.getenv("SIM_WORKERS", "0")) or max(
+    1, (os.cpu_count() or 1) // max(1, int(os.getenv("BRIDGE_WORKERS", "1")))
+)
+MAX_ITEMS = 20
+
+SCENARIO_KEYS = {
+    "name",
+    "shifts",
+    "machines_down",
+    "extra_orders",
+    "expedite",
+    "demand_factor",
+    "rate_factor",
+    "lead_time_factor",
+    "failure_factor",
+}
+
+
+# ---------------------------------------------------------------------------
+# Model: plain data, so it pickles cheaply to the worker processes
+# ---------------------------------------------------------------------------
+
+
+def build_model(horizon: float) -> Dict[str, Any]:
+    """Snapshot of machines, open orders and materials from the domain data."""
+    production = store.frame("production")
+    maintenance = store.frame("maintenance")
+    inventory = store.frame("inventory")
+    start = datetime.fromisoformat(str(production["timestamp"].max()))
+
+    failure_prob = dict(
+        zip(maintenance["machine_id"].astype(str), maintenance["predicted_failure_prob"].astype(float))
+    )
+    machines = []
+    for m in load_machines(start, horizon):
+        machine_type = max(m.rates, key=m.rates.get)
+        p = min(max(failure_prob.get(m.machine_id, DEFAULT_FAILURE_PROB), 0.0), 0.99)
+        machines.append(
+            {
+                "machine_id": m.machine_id,
+                "machine_type": machine_type,
+                "rate": m.rates[machine_type],
+                "windows": list(m.windows),
+                "failure_rate": -math.log(1 - p) / FAILURE_PROB_HOURS,
+            }
+        )
+
+    # Material use per unit of a machine type's output, from the last 24 h
+    recent = _type_daily_units()
+    materials = []
+    for row in inventory.itertuples(index=False):
+        types = [t for t, used in MATERIAL_REQUIREMENTS.items() if row.material_id in used]
+        units = sum(recent.get(t, 0.0) for t in types)
+        materials.append(
+            {
+                "material_id": str(row.material_id),
+                "stock": float(row.current_stock),
+                "reorder_point": float(row.reorder_point),
+                "optimal_stock": float(row.optimal_stock),
+                "lead_days": float(row.lead_time_days),
+                "per_unit": float(row.consumed_last_24h) / units if units > 0 else 0.0,
+                "types": types,
+            }
+        )
+
+    observed_shifts = production["shift"].nunique() if "shift" in production.columns else len(SHIFT_HOURS)
+    return {
+        "start": start.isoformat(),
+        "horizon": horizon,
+        "machines": machines,
+        "orders": [
+            {"order_id": job.job_id, "quantity": job.quantity, "due": job.due, "weight": job.weight}
+            for job in parse_jobs(open_order_jobs(), start, horizon)
+        ],
+        "materials": materials,
+        "shifts": max(1, min(len(SHIFT_HOURS), int(observed_shifts))),
+    }
+
+
+def _off_shift_windows(start: datetime, horizon: float, shifts: int) -> List[Tuple[float, float]]:
+    """Hours (from start) outside the first `shifts` shifts of each day."""
+    if shifts >= len(SHIFT_HOURS):
+        return []
+    first = SHIFT_HOURS[0][1]
+    last = SHIFT_HOURS[shifts - 1][2]
+    offset = start.hour + start.minute / 60  # hour of day at t = 0
+    windows = []
+    day = -24.0
+    while day < horizon + 24:
+        # Off from the end of the last operated shift to the next day's first shift
+        windows.append((day + last - offset, day + 24 + first - offset))
+        day += 24
+    return _merge([(max(0.0, s), e) for s, e in windows if e > 0])
+
+
+def apply_scenario(model: Dict[str, Any], scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Model with one scenario's changes applied (the input is not modified)."""
+    unknown = set(scenario) - SCENARIO_KEYS
+    if unknown:
+        raise ValueError(f"Unknown scenario field(s) {sorted(unknown)}; use {sorted(SCENARIO_KEYS)}")
+    start = datetime.fromisoformat(model["start"])
+    horizon = model["horizon"]
+    shifts = int(scenario.get("shifts") or model["shifts"])
+    if not 1 <= shifts <= len(SHIFT_HOURS):
+        raise ValueError(f"shifts must be between 1 and {len(SHIFT_HOURS)}")
+
+    down = scenario.get("machines_down") or {}
+    if isinstance(down, list):
+        down = {machine_id: 0 for machine_id in down}
+    known = {m["machine_id"] for m in model["machines"]}
+    if set(down) - known:
+        raise ValueError(f"Unknown machine(s) in machines_down: {sorted(set(down) - known)}")
+
+    rate_factor = float(scenario.get("rate_factor") or 1.0)
+    failure_factor = float(scenario.get("failure_factor") or 1.0)
+    off_shift = _off_shift_windows(start, horizon, shifts)
+    machines = []
+    for m in model["machines"]:
+        windows = m["windows"] + off_shift
+        if m["machine_id"] in down:
+            windows.append((0.0, float(down[m["machine_id"]] or horizon + 1)))
+        machines.append(
+            {
+                **m,
+                "rate": m["rate"] * rate_factor,
+                "windows": _merge(windows),
+                "failure_rate": m["failure_rate"] * failure_factor,
+            }
+        )
+
+    demand_factor = float(scenario.get("demand_factor") or 1.0)
+    orders = [{**o, "quantity": o["quantity"] * demand_factor} for o in model["orders"]]
+    extra = scenario.get("extra_orders") or []
+    for n, job in enumerate(parse_jobs(extra, start, horizon)):
+        order_id = extra[n].get("order_id") or f"EXTRA{n + 1}"
+        orders.append({"order_id": str(order_id), "quantity": job.quantity, "due": job.due, "weight": job.weight})
+    expedite = {str(o) for o in scenario.get("expedite") or []}
+    missing = expedite - {o["order_id"] for o in orders}
+    if missing:
+        raise ValueError(f"Unknown order(s) in expedite: {sorted(missing)}")
+    for o in orders:
+        o["expedite"] = o["order_id"] in expedite
+
+    lead_factor = float(scenario.get("lead_time_factor") or 1.0)
+    materials = [{**mat, "lead_days": mat["lead_days"] * lead_factor} for mat in model["materials"]]
+    return {**model, "machines": machines, "orders": orders, "materials": materials, "shifts": shifts}
+
+
+# ---------------------------------------------------------------------------
+# Simulation
+# ---------------------------------------------------------------------------
+
+
+def simulate_once(model: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    """One replication; returns throughput, lateness and stock-out figures."""
+    rng = random.Random(seed)
+    horizon = model["horizon"]
+    machines = model["machines"]
+    materials = model["materials"]
+    orders = sorted(model["orders"], key=lambda o: (not o["expedite"], o["due"], -o["weight"]))
+
+    remaining = [o["quantity"] for o in orders]  # units not yet started
+    open_lots = [0] * len(orders)
+    finished_at: List[Optional[float]] = [None] * len(orders)
+    head = 0  # first order with units left to start
+
+    stock = [mat["stock"] for mat in materials]
+    on_order = [False] * len(materials)
+    stocked_out = [False] * len(materials)
+    # Materials each machine consumes: (material index, quantity per unit)
+    needs = [
+        [(k, mat["per_unit"]) for k, mat in enumerate(materials) if m["machine_type"] in mat["types"] and mat["per_unit"] > 0]
+        for m in machines
+    ]
+
+    events: List[Tuple[float, int, str, int, int]] = []
+    seq = 0
+
+    def push(at: float, kind: str, index: int, token: int = 0) -> None:
+        nonlocal seq
+        seq += 1
+        heapq.heappush(events, (at, seq, kind, index, token))
+
+    def reorder(k: int, now: float) -> None:
+        mat = materials[k]
+        if on_order[k] or stock[k] > mat["reorder_point"]:
+            return
+        on_order[k] = True
+        shape = 1 / LEAD_TIME_CV**2
+        lead = mat["lead_days"] * 24 * rng.gammavariate(shape, 1 / shape)
+        push(now + lead, "arrival", k, int(max(0.0, mat["optimal_stock"] - stock[k])))
+
+    busy = [False] * len(machines)
+    down_until = [0.0] * len(machines)
+    lot_token = [0] * len(machines)
+    lot_end = [0.0] * len(machines)
+    lot_of: List[Optional[Tuple[int, float, float]]] = [None] * len(machines)  # (order, units, start)
+    starved_since: Dict[int, float] = {}
+    busy_hours = 0.0
+    starved_hours = 0.0
+    produced = 0.0
+
+    for k in range(len(materials)):
+        reorder(k, 0.0)
+    for i, m in enumerate(machines):
+        push(0.0, "ready", i)
+        if m["failure_rate"] > 0:
+            push(rng.expovariate(m["failure_rate"]), "fail", i)
+
+    def start_lot(i: int, now: float) -> None:
+        nonlocal head, starved_hours
+        while head < len(orders) and remaining[head] <= 1e-9:
+            head += 1
+        if head >= len(orders):
+            return
+        m = machines[i]
+        units = min(remaining[head], m["rate"] * LOT_HOURS)
+        duration = units / m["rate"] * rng.lognormvariate(0.0, CYCLE_TIME_CV)
+        begin = place(max(now, down_until[i]), duration, m["windows"])
+        if begin >= horizon:
+            return
+        if begin > now:
+            push(begin, "ready", i)
+            return
+        short = [k for k, per_unit in needs[i] if stock[k] < units * per_unit]
+        if short:
+            for k in short:
+                stocked_out[k] = True
+                reorder(k, now)
+            starved_since.setdefault(i, now)
+            return
+        if i in starved_since:
+            starved_hours += now - starved_since.pop(i)
+        for k, per_unit in needs[i]:
+            stock[k] -= units * per_unit
+            reorder(k, now)
+        remaining[head] -= units
+        open_lots[head] += 1
+        busy[i] = True
+        lot_of[i] = (head, units, now)
+        lot_end[i] = now + duration
+        lot_token[i] += 1
+        push(lot_end[i], "done", i, lot_token[i])
+
+    while events:
+        now, _, kind, i, token = heapq.heappop(events)
+        if now > horizon:
+            break
+        if kind == "ready":
+            if not busy[i]:
+                start_lot(i, now)
+        elif kind == "done":
+            if token != lot_token[i] or not busy[i]:
+                continue  # superseded by a breakdown that delayed the lot
+            order, units, began = lot_of[i]
+            busy[i] = False
+            lot_of[i] = None
+            produced += units
+            busy_hours += now - began
+            open_lots[order] -= 1
+            if open_lots[order] == 0 and remaining[order] <= 1e-9:
+                finished_at[order] = now
+            start_lot(i, now)
+        elif kind == "fail":
+            repair = rng.expovariate(1 / MEAN_REPAIR_HOURS)
+            down_until[i] = max(down_until[i], now) + repair
+            if busy[i]:
+                lot_end[i] += repair
+                lot_token[i] += 1
+                push(lot_end[i], "done", i, lot_token[i])
+            else:
+                push(down_until[i], "ready", i)
+            push(down_until[i] + rng.expovariate(machines[i]["failure_rate"]), "fail", i)
+        elif kind == "arrival":
+            stock[i] += token
+            on_order[i] = False
+            reorder(i, now)
+            for waiting in list(starved_since):
+                if not busy[waiting]:
+                    start_lot(waiting, now)
+
+    for i, since in starved_since.items():
+        starved_hours += max(0.0, horizon - since)
+    for i in range(len(machines)):
+        if busy[i]:
+            busy_hours += horizon - lot_of[i][2]
+
+    late = 0
+    lateness = 0.0
+    weighted = 0.0
+    for n, o in enumerate(orders):
+        end = finished_at[n]
+        if end is None:
+            over = max(0.0, horizon - o["due"])  # censored: still open at the horizon
+            late += o["due"] < horizon
+        else:
+            over = max(0.0, end - o["due"])
+            late += over > 1e-9
+        lateness += over
+        weighted += o["weight"] * over
+    return {
+        "throughput": produced,
+        "orders_completed": sum(end is not None for end in finished_at),
+        "late_orders": late,
+        "lateness_hours": lateness,
+        "weighted_lateness_hours": weighted,
+        "stockout_machine_hours": starved_hours,
+        "utilization": busy_hours / (len(machines) * horizon) if machines else 0.0,
+        "stocked_out": [materials[k]["material_id"] for k, out in enumerate(stocked_out) if out],
+    }
+
+
+def run_replications(model: Dict[str, Any], seeds: List[int]) -> List[Dict[str, Any]]:
+    """Replications of one scenario model."""
+    return [simulate_once(model, seed) for seed in seeds]
+
+
+def run_scenarios(models: List[Dict[str, Any]], seeds: List[int]) -> List[List[Dict[str, Any]]]:
+    """Worker entry point: replications of each of a chunk of scenario models."""
+    return [run_replications(model, seeds) for model in models]
+
+
+# ---------------------------------------------------------------------------
+# Sweeps: one task per scenario on a process pool
+# ---------------------------------------------------------------------------
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process pool shared by every sweep, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn: the caller runs threads (bridge, ADK) that must not be forked mid-lock
+            _pool = ProcessPoolExecutor(max_workers=SIM_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(_shutdown_pool)
+
+
+async def sweep(models: List[Dict[str, Any]], replications: int, seed: int = 42) -> List[List[Dict[str, Any]]]:
+    """
+    Replications of every scenario model, in parallel when the sweep is big
+    enough. Scenario n uses the same seeds as every other scenario (common
+    random numbers), so differences between scenarios are not sampling noise.
+    Small sweeps run on a thread; cancelling the caller cancels queued chunks.
+    """
+    from concurrent.futures.process import BrokenProcessPool
+
+    seeds = [seed + r for r in range(replications)]
+    if len(models) * replications < PARALLEL_MIN_RUNS or SIM_WORKERS <= 1:
+        return await asyncio.to_thread(run_scenarios, models, seeds)
+    try:
+        pool = get_pool()
+        size = max(1, len(models) // (SIM_WORKERS * 4))  # a few tasks per worker keeps IPC small
+        futures = [
+            asyncio.wrap_future(pool.submit(run_scenarios, models[i : i + size], seeds))
+            for i in range(0, len(models), size)
+        ]
+        return [runs for chunk in await asyncio.gather(*futures) for runs in chunk]
+    except BrokenProcessPool:
+        _shutdown_pool()
+        return await asyncio.to_thread(run_scenarios, models, seeds)
+
+
+def _distribution(values: List[float], digits: int = 1) -> Dict[str, float]:
+    ordered = sorted(values)
+
+    def pct(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], digits)
+
+    return {
+        "mean": round(sum(ordered) / len(ordered), digits),
+        "p10": pct(0.1),
+        "p50": pct(0.5),
+        "p90": pct(0.9),
+    }
+
+
+def summarize_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Distributions over the replications of one scenario."""
+    stockouts: Dict[str, int] = {}
+    for run in runs:
+        for material_id in run["stocked_out"]:
+            stockouts[material_id] = stockouts.get(material_id, 0) + 1
+    return {
+        "throughput_units": _distribution([r["throughput"] for r in runs], 0),
+        "orders_completed": _distribution([r["orders_completed"] for r in runs]),
+        "late_orders": _distribution([r["late_orders"] for r in runs]),
+        "lateness_hours": _distribution([r["lateness_hours"] for r in runs]),
+        "weighted_lateness_hours": _distribution([r["weighted_lateness_hours"] for r in runs]),
+        "stockout_machine_hours": _distribution([r["stockout_machine_hours"] for r in runs]),
+        "utilization": _distribution([r["utilization"] for r in runs], 3),
+        "stockout_probability": {
+            k: round(v / len(runs), 3) for k, v in sorted(stockouts.items(), key=lambda kv: -kv[1])
+        },
+    }
+
+
+async def simulate_factory(scenarios: List[dict], horizon_hours: int, replications: int) -> dict:
+    """
+    Simulate the factory under "what if" scenarios and compare them with
+    the current plan. Use this instead of estimating the effect of a change.
+
+    Every scenario is run several times with random cycle times, breakdowns
+    and supplier lead times; a "baseline" scenario (no changes) is always
+    included. Scenarios run in parallel.
+
+    Args:
+        scenarios: list of changes, each a dict with any of
+            "name", "shifts" (1-3 shifts per day), "machines_down"
+            ({"M003": hours, 0 = whole horizon} or ["M003"]), "extra_orders"
+            ([{"quantity", "due" (ISO or hours), "priority", "order_id"}]),
+            "expedite" (order_ids to work first), "demand_factor",
+            "rate_factor", "lead_time_factor", "failure_factor".
+            [] = baseline only
+        horizon_hours: simulated period from the latest production reading; 0 = 168
+        replications: runs per scenario; 0 = 10
+
+    Returns:
+        Per scenario (at most 20): mean/p10/p50/p90 of throughput, completed
+        and late orders, lateness, stock-out machine-hours and utilization,
+        the probability that each material runs out, and the change in mean
+        throughput and late orders against the baseline
+    """
+    try:
+        horizon = float(horizon_hours or DEFAULT_HORIZON_HOURS)
+        runs = int(replications or DEFAULT_REPLICATIONS)
+        if horizon <= 0 or not 0 < runs <= MAX_REPLICATIONS:
+            raise ValueError(f"horizon_hours must be positive and replications between 1 and {MAX_REPLICATIONS}")
+        if len(scenarios or []) > MAX_SCENARIOS:
+            raise ValueError(f"At most {MAX_SCENARIOS} scenarios per sweep")
+        if not all(isinstance(s, dict) for s in scenarios or []):
+            raise ValueError("Each scenario must be a dict of changes")
+
+        started = time.perf_counter()
+        model = await asyncio.to_thread(build_model, horizon)
+        if not model["machines"]:
+            raise ValueError("No operational machines in production data")
+        named = [{"name": "baseline"}] + [
+            {"name": s.get("name") or f"scenario {n + 1}", **s} for n, s in enumerate(scenarios or [])
+        ]
+        models = [apply_scenario(model, s) for s in named]
+        results = await sweep(models, runs)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    summaries = [summarize_runs(r) for r in results]
+    base = summaries[0]
+    report = []
+    for scenario, summary in zip(named, summaries):
+        report.append(
+            {
+                "scenario": scenario["name"],
+                "changes": {k: v for k, v in scenario.items() if k != "name"},
+                **summary,
+                "vs_baseline": {
+                    "throughput_units": round(summary["throughput_units"]["mean"] - base["throughput_units"]["mean"], 0),
+                    "late_orders": round(summary["late_orders"]["mean"] - base["late_orders"]["mean"], 1),
+                },
+            }
+        )
+    return {
+        "success": True,
+        "start": model["start"],
+        "horizon_hours": horizon,
+        "replications": runs,
+        "machines": len(model["machines"]),
+        "open_orders": len(model["orders"]),
+        "observed_shifts": model["shifts"],
+        "scenarios": report[:MAX_ITEMS],
+        "scenarios_omitted": max(0, len(report) - MAX_ITEMS),
+        "elapsed_ms": round(elapsed_ms, 1),
+    }
@@ -0,0 +1,233 @@
+# supervisory_agent/tools/inventory_sim.py
+# Monte Carlo stock-depletion simulator for the inventory agent. Daily
+# consumption per material is gamma distributed around its expected rate
+# (consumed_last_24h, rescaled by a production plan through the machine
+# types that use the material), lead times are gamma around lead_time_days.
+# A sum of i.i.d. gamma days is itself gamma, so demand over the horizon, the
+# lead time and lead time + review period are single draws per scenario
+# instead of day-by-day paths. All materials and scenarios are sampled as
+# NumPy batches (lead-time demand in column blocks to bound memory).
+import math
+import time
+from typing import Any, Dict, Optional
+
+from .data_store import store
+
+# Which materials each machine type consumes (as in data/manufacturing_data.py)
+MATERIAL_REQUIREMENTS = {
+    "Welder": ["MAT001", "MAT003"],
+    "Drill": ["MAT002", "MAT004"],
+    "CNC": ["MAT002", "MAT004"],
+    "Conveyor": ["MAT005"],
+}
+
+DEFAULT_HORIZON_DAYS = 30
+DEFAULT_SCENARIOS = 2000
+MAX_SCENARIOS = 20_000  # per call; run time grows with scenarios x materials
+DEFAULT_SERVICE_LEVEL = 0.95
+REVIEW_DAYS = 7  # orders are reviewed weekly: cover lead time + one review period
+DEMAND_CV = 0.3  # day-to-day variation of consumption
+LEAD_TIME_CV = 0.2
+MAX_ITEMS = 20
+# Samples per block (scenarios x materials); keeps peak memory around 100 MB
+BLOCK_SAMPLES = 4_000_000
+
+
+def simulate(
+    stock,
+    daily_demand,
+    lead_days,
+    horizon_days: float = DEFAULT_HORIZON_DAYS,
+    scenarios: int = DEFAULT_SCENARIOS,
+    service_level: float = DEFAULT_SERVICE_LEVEL,
+    review_days: float = REVIEW_DAYS,
+    demand_cv: float = DEMAND_CV,
+    lead_cv: float = LEAD_TIME_CV,
+    seed: Optional[int] = 42,
+) -> Dict[str, Any]:
+    """
+    Stock-out risk and reorder levels for every material at once.
+
+    Arrays are per material. Returns arrays of:
+        p_stockout_horizon - P(demand over the horizon exceeds stock), no new orders
+        p_stockout_lead_time - P(stock runs out before an order placed today arrives)
+        expected_shortage - mean units short over the horizon
+        reorder_point - service-level quantile of lead-time demand
+        order_up_to - service-level quantile of demand over lead time + review period
+
+    Demand over a fixed number of days has the same gamma shape for every
+    material, only the scale differs, so those draws are shared (common
+    random numbers): each material's own distribution is exact and the
+    horizon figures reduce to a sort and a search. Lead-time demand depends
+    on each material's lead time and is sampled per scenario and material.
+    """
+    import numpy as np
+
+    stock = np.asarray(stock, dtype=np.float64)
+    mean = np.asarray(daily_demand, dtype=np.float64)
+    lead = np.asarray(lead_days, dtype=np.float64)
+    n = len(stock)
+    rng = np.random.default_rng(seed)
+
+    shape = 1.0 / demand_cv**2  # gamma shape per day; scale = mean * cv^2
+    lead_shape = 1.0 / lead_cv**2
+    scale = mean * demand_cv**2
+
+    # Horizon: P(scale * G > stock) and E[max(scale * G - stock, 0)] from sorted G
+    horizon_draws = np.sort(rng.standard_gamma(shape * horizon_days, size=scenarios))
+    tail_sums = np.concatenate([np.cumsum(horizon_draws[::-1])[::-1], [0.0]])
+    has_demand = scale > 0
+    threshold = np.divide(stock, scale, out=np.full(n, np.inf), where=has_demand)
+    above = np.searchsorted(horizon_draws, threshold, side="right")
+    beyond = scenarios - above
+    p_horizon = beyond / scenarios
+    shortage = scale * (tail_sums[above] - beyond * np.where(has_demand, threshold, 0.0)) / scenarios
+
+    out = {
+        "p_stockout_horizon": p_horizon,
+        "p_stockout_lead_time": np.empty(n),
+        "expected_shortage": np.where(has_demand, shortage, 0.0),
+        "reorder_point": np.empty(n),
+        "order_up_to": np.empty(n),
+    }
+
+    q = min(scenarios - 1, int(np.ceil(service_level * scenarios)) - 1)
+    review_draws = rng.standard_gamma(shape * review_days, size=(scenarios, 1)).astype(np.float32)
+    lead_factor = (rng.standard_gamma(lead_shape, size=(scenarios, 1)) / lead_shape).astype(np.float32)
+    block = max(1, BLOCK_SAMPLES // scenarios)
+    for lo in range(0, n, block):
+        hi = min(n, lo + block)
+        lead_time = lead_factor * lead[lo:hi].astype(np.float32)
+        unit = rng.standard_gamma(np.float32(shape) * lead_time, dtype=np.float32)  # lead-time demand / scale
+        s = (stock[lo:hi] / np.where(has_demand[lo:hi], scale[lo:hi], 1.0)).astype(np.float32)
+
+        out["p_stockout_lead_time"][lo:hi] = np.where(has_demand[lo:hi], (unit > s).mean(axis=0), 0.0)
+        out["reorder_point"][lo:hi] = np.partition(unit, q, axis=0)[q] * scale[lo:hi]
+        unit += review_draws
+        out["order_up_to"][lo:hi] = np.partition(unit, q, axis=0)[q] * scale[lo:hi]
+
+    return out
+
+
+def _type_daily_units() -> Dict[str, float]:
+    """Recent daily output per machine type: mean operational output_rate per machine x 24 h."""
+    production = store.frame("production")
+    running = production[production["status"] == "operational"]
+    per_machine = running.groupby(["machine_type", "machine_id"])["output_rate"].mean()
+    return {str(t): float(v) * 24 for t, v in per_machine.groupby(level=0).sum().items()}
+
+
+def planned_demand(inventory, production_plan: Dict[str, float]):
+    """
+    Expected daily consumption per material: consumed_last_24h, scaled by
+    planned vs. recent daily units of the machine types that use it.
+    """
+    demand = inventory["consumed_last_24h"].astype(float).to_numpy().copy()
+    if not production_plan:
+        return demand
+
+    unknown = set(production_plan) - set(MATERIAL_REQUIREMENTS)
+    if unknown:
+        raise ValueError(f"Unknown machine type(s) in production_plan: {sorted(unknown)}")
+    recent = _type_daily_units()
+    for i, material_id in enumerate(inventory["material_id"].astype(str)):
+        types = [t for t, materials in MATERIAL_REQUIREMENTS.items() if material_id in materials]
+        baseline = sum(recent.get(t, 0.0) for t in types)
+        if baseline > 0:
+            planned = sum(float(production_plan.get(t, recent.get(t, 0.0))) for t in types)
+            demand[i] *= planned / baseline
+    return demand
+
+
+def simulate_inventory(
+    production_plan: Dict[str, float], horizon_days: int, scenarios: int, service_level: float
+) -> dict:
+    """
+    Monte Carlo projection of stock for every material: stock-out
+    probabilities and recommended reorder quantities.
+
+    Use this for reorder decisions instead of comparing current_stock with
+    reorder_point by hand; it accounts for variable consumption and lead times.
+
+    Args:
+        production_plan: planned units per day by machine type, e.g.
+            {"Welder": 3000, "Drill": 1500}; {} = recent production rates
+        horizon_days: projection horizon; 0 = 30 days
+        scenarios: number of simulated scenarios, at most 20000; 0 = 2000
+        service_level: target probability of no stock-out, e.g. 0.95; 0 = 0.95
+
+    Returns:
+        Per material (most urgent first, at most 20): daily demand, days of
+        cover, stock-out probability over the horizon and before a new order
+        could arrive, recommended reorder point, days until it is reached,
+        an action ("order_now", "order_soon" = within a week, "ok") and the
+        quantity to order
+    """
+    try:
+        horizon = float(horizon_days or DEFAULT_HORIZON_DAYS)
+        runs = int(scenarios or DEFAULT_SCENARIOS)
+        level = float(service_level or DEFAULT_SERVICE_LEVEL)
+        if not 0 < level < 1:
+            raise ValueError("service_level must be between 0 and 1")
+        if horizon <= 0 or runs <= 0:
+            raise ValueError("horizon_days and scenarios must be positive")
+        if runs > MAX_SCENARIOS:
+            raise ValueError(f"At most {MAX_SCENARIOS} scenarios per simulation")
+
+        inventory = store.frame("inventory")
+        demand = planned_demand(inventory, production_plan or {})
+        stock = inventory["current_stock"].astype(float).to_numpy()
+        start = time.perf_counter()
+        result = simulate(stock, demand, inventory["lead_time_days"].astype(float).to_numpy(), horizon, runs, level)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    materials = []
+    for i, row in enumerate(inventory.itertuples(index=False)):
+        p_lead = float(result["p_stockout_lead_time"][i])
+        reorder_point = float(result["reorder_point"][i])
+        order_up_to = float(result["order_up_to"][i])
+        # Expected days until stock falls to the reorder point
+        reorder_in = float((stock[i] - reorder_point) / demand[i]) if demand[i] > 0 else None
+        if stock[i] <= reorder_point or p_lead > 1 - level:
+            action, quantity = "order_now", max(0.0, math.ceil(order_up_to - stock[i]))
+        elif reorder_in is not None and reorder_in <= REVIEW_DAYS:
+            action, quantity = "order_soon", max(0.0, math.ceil(order_up_to - reorder_point))
+        else:
+            action, quantity = "ok", 0.0
+        materials.append(
+            {
+                "material_id": row.material_id,
+                "name": row.material_name,
+                "stock": float(stock[i]),
+                "daily_demand": round(float(demand[i]), 2),
+                "days_of_cover": round(float(stock[i] / demand[i]), 1) if demand[i] > 0 else None,
+                "p_stockout_horizon": round(float(result["p_stockout_horizon"][i]), 4),
+                "p_stockout_before_replenishment": round(p_lead, 4),
+                "expected_shortage": round(float(result["expected_shortage"][i]), 1),
+                "reorder_point": round(reorder_point, 1),
+                "reorder_in_days": round(max(0.0, reorder_in), 1) if reorder_in is not None else None,
+                "action": action,
+                "order_quantity": float(quantity),
+                "order_cost": round(quantity * float(row.unit_cost), 2),
+            }
+        )
+    urgency = {"order_now": 0, "order_soon": 1, "ok": 2}
+    materials.sort(
+        key=lambda m: (urgency[m["action"]], m["reorder_in_days"] if m["reorder_in_days"] is not None else float("inf"))
+    )
+
+    return {
+        "success": True,
+        "horizon_days": horizon,
+        "scenarios": runs,
+        "service_level": level,
+        "materials_total": len(materials),
+        "order_now": sum(m["action"] == "order_now" for m in materials),
+        "order_soon": sum(m["action"] == "order_soon" for m in materials),
+        "total_order_cost": round(sum(m["order_cost"] for m in materials), 2),
+        "materials": materials[:MAX_ITEMS],
+        "materials_omitted": max(0, len(materials) - MAX_ITEMS),
+        "elapsed_ms": round(elapsed_ms, 1),
+    }
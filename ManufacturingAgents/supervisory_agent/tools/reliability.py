@@ -0,0 +1,317 @@
+# supervisory_agent/tools/reliability.py
+# Fleet reliability for the maintenance agent: failure hazard and remaining
+# useful life per machine from the sensor history, then maintenance windows
+# placed where they cost the least production.
+#
+# Hazard is Weibull in hours since maintenance (wear-out), scaled by stress:
+#   h(t) = (k / eta) * (t / eta)^(k - 1) * exp(a * temp_excess + b * vib_excess)
+# Temperature and vibration follow each machine's fitted linear trend, so the
+# hazard is integrated over an hourly grid for every machine at once.
+# RUL is the median residual life, capped by when the vibration trend crosses
+# VIBRATION_LIMIT. NumPy/pandas are imported inside the functions.
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from .data_store import store
+from .shifts import shift_of
+
+WEIBULL_SHAPE = 2.0
+WEIBULL_SCALE_HOURS = 2500.0  # characteristic life at nominal stress
+NOMINAL_TEMPERATURE = 75.0
+NOMINAL_VIBRATION = 2.5
+TEMPERATURE_COEF = 0.08  # per degree above nominal
+VIBRATION_COEF = 0.5  # per mm/s above nominal
+VIBRATION_LIMIT = 7.0
+MAX_RUL_HOURS = 2000  # grid length; longer lives are reported as >= this
+TREND_HOLD_HOURS = 72  # trends are extrapolated this far, then held flat
+BLOCK_MACHINES = 1024  # machines per block of the hourly grid (~16 MB per array)
+
+DEFAULT_HORIZON_HOURS = 168
+DEFAULT_WINDOW_HOURS = 4
+DEFAULT_CREWS = 2
+RISK_THRESHOLD = 0.1  # P(failure within the horizon) that calls for a window
+UNPLANNED_DOWNTIME_HOURS = 24.0  # production lost by a breakdown
+# Share of full output planned per shift; maintenance gravitates to the night
+SHIFT_LOAD = {"morning": 1.0, "afternoon": 1.0, "night": 0.5}
+MAX_ITEMS = 20
+
+
+def sensor_trends(production):
+    """
+    Per machine, in one groupby pass: fitted temperature/vibration at the
+    last reading, their slope per hour, and mean output rate.
+    """
+    import numpy as np
+    import pandas as pd
+
+    stamps = pd.to_datetime(production["timestamp"])
+    # Hours from the first reading; small values keep the sums of squares well conditioned
+    t = (stamps - stamps.min()) / pd.Timedelta(hours=1)
+    frame = pd.DataFrame(
+        {
+            "machine_id": production["machine_id"].to_numpy(),
+            "t": t.to_numpy(),
+            "temperature": production["temperature"].to_numpy(dtype=float),
+            "vibration": production["vibration_level"].to_numpy(dtype=float),
+            "output_rate": production["output_rate"].to_numpy(dtype=float),
+        }
+    )
+    frame["tt"] = frame["t"] ** 2
+    frame["t_temp"] = frame["t"] * frame["temperature"]
+    frame["t_vib"] = frame["t"] * frame["vibration"]
+    sums = frame.groupby("machine_id").agg(
+        n=("t", "size"),
+        t=("t", "sum"),
+        tt=("tt", "sum"),
+        temp=("temperature", "sum"),
+        vib=("vibration", "sum"),
+        t_temp=("t_temp", "sum"),
+        t_vib=("t_vib", "sum"),
+        t_last=("t", "max"),
+        output_rate=("output_rate", "mean"),
+    )
+    n = sums["n"].to_numpy(dtype=float)
+    denominator = n * sums["tt"] - sums["t"] ** 2
+    ok = denominator.to_numpy() > 1e-9
+
+    def level_and_slope(total, cross):
+        slope = np.where(ok, (n * sums[cross] - sums["t"] * sums[total]) / np.where(ok, denominator, 1.0), 0.0)
+        mean = sums[total] / n
+        level = mean + slope * (sums["t_last"] - sums["t"] / n)
+        return level.to_numpy(), slope
+
+    temperature, temp_slope = level_and_slope("temp", "t_temp")
+    vibration, vib_slope = level_and_slope("vib", "t_vib")
+    return pd.DataFrame(
+        {
+            "machine_id": sums.index.astype(str),
+            "readings": sums["n"].to_numpy(),
+            "temperature": temperature,
+            "temp_slope_per_h": temp_slope,
+            "vibration": vibration,
+            "vib_slope_per_h": vib_slope,
+            "output_rate": sums["output_rate"].to_numpy(),
+        }
+    )
+
+
+def fleet_reliability(trends, age_hours, horizon_hours: float = DEFAULT_HORIZON_HOURS):
+    """
+    Vectorized over machines (rows of `trends`, ages aligned), in blocks of
+    BLOCK_MACHINES x hourly grid: hazard now, P(failure within the horizon),
+    P(failure) by hour up to the horizon (machines x hours) and RUL in hours.
+    """
+    import numpy as np
+
+    n = len(trends)
+    horizon = int(min(horizon_hours, MAX_RUL_HOURS))
+    age_all = np.asarray(age_hours, dtype=float)
+    temp_now = trends["temperature"].to_numpy(dtype=float)
+    temp_slope = trends["temp_slope_per_h"].to_numpy(dtype=float)
+    vib_now = trends["vibration"].to_numpy(dtype=float)
+    vib_slope = trends["vib_slope_per_h"].to_numpy(dtype=float)
+
+    grid = np.arange(MAX_RUL_HOURS + 1, dtype=float)[None, :]  # hours from now
+    projected = np.minimum(grid, TREND_HOLD_HOURS)
+    hazard_now = np.empty(n)
+    p_fail_by_hour = np.empty((n, horizon + 1))
+    rul = np.empty(n)
+    for lo in range(0, n, BLOCK_MACHINES):
+        hi = min(n, lo + BLOCK_MACHINES)
+        age = age_all[lo:hi, None]
+        temp = temp_now[lo:hi, None] + temp_slope[lo:hi, None] * projected
+        vib = vib_now[lo:hi, None] + vib_slope[lo:hi, None] * projected
+        log_stress = TEMPERATURE_COEF * np.clip(temp - NOMINAL_TEMPERATURE, 0, 40) + VIBRATION_COEF * np.clip(
+            vib - NOMINAL_VIBRATION, 0, 10
+        )
+        hazard = (WEIBULL_SHAPE / WEIBULL_SCALE_HOURS) * ((age + grid) / WEIBULL_SCALE_HOURS) ** (
+            WEIBULL_SHAPE - 1
+        ) * np.exp(log_stress)
+        # Cumulative hazard, trapezoid rule with one-hour steps
+        cumulative = np.zeros_like(hazard)
+        np.cumsum((hazard[:, 1:] + hazard[:, :-1]) / 2, axis=1, out=cumulative[:, 1:])
+
+        hazard_now[lo:hi] = hazard[:, 0]
+        p_fail_by_hour[lo:hi] = 1 - np.exp(-cumulative[:, : horizon + 1])
+        # Median residual life: first hour where P(fail) >= 0.5, i.e. H >= ln 2
+        reached = cumulative >= np.log(2)
+        rul[lo:hi] = np.where(reached[:, -1], reached.argmax(axis=1), MAX_RUL_HOURS)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        to_limit = np.where(vib_slope > 0, (VIBRATION_LIMIT - vib_now) / vib_slope, np.inf)
+    to_limit = np.where(to_limit <= TREND_HOLD_HOURS, to_limit, np.inf)
+    to_limit = np.where(vib_now >= VIBRATION_LIMIT, 0.0, to_limit)
+
+    return {
+        "hazard_per_1000h": hazard_now * 1000,
+        "p_fail_horizon": p_fail_by_hour[:, horizon],
+        "p_fail_by_hour": p_fail_by_hour,
+        "rul_hours": np.minimum(rul, to_limit),
+        "vibration_limit_in_hours": to_limit,
+    }
+
+
+def plan_windows(
+    p_fail_by_hour,
+    rul_hours,
+    output_rates,
+    load_by_hour,
+    candidates,
+    window_hours: int,
+    crews: int,
+) -> List[Dict[str, Any]]:
+    """
+    Most urgent first, give each candidate machine the start hour that
+    minimizes planned output lost in the window plus the expected breakdown
+    loss of waiting until then, with at most `crews` windows at once and the
+    window finished before the machine's RUL when possible.
+    """
+    import numpy as np
+
+    horizon = len(load_by_hour) - 1
+    starts = np.arange(horizon - window_hours + 1)
+    if not len(starts):
+        return []
+    # Planned output lost by a window starting at each hour (per unit output rate)
+    window_load = np.convolve(load_by_hour[:horizon], np.ones(window_hours), mode="valid")[: len(starts)]
+    occupancy = np.zeros(horizon, dtype=int)
+
+    windows = []
+    for i in sorted(candidates, key=lambda i: rul_hours[i]):
+        rate = output_rates[i]
+        cost = rate * window_load + rate * UNPLANNED_DOWNTIME_HOURS * p_fail_by_hour[i, starts]
+        busy = np.lib.stride_tricks.sliding_window_view(occupancy, window_hours)[: len(starts)].max(axis=1) >= crews
+        # Running past the RUL is charged up to a full breakdown, graded so
+        # that a window which cannot end in time still starts as early as possible
+        overrun = np.clip((starts + window_hours - rul_hours[i]) / window_hours, 0.0, 1.0)
+        late = overrun > 0
+        cost = np.where(busy, np.inf, cost + rate * UNPLANNED_DOWNTIME_HOURS * overrun)
+        if not np.isfinite(cost).any():
+            windows.append({"index": i, "start": None, "reason": "no crew available in the horizon"})
+            continue
+        s = int(np.argmin(cost))
+        occupancy[s : s + window_hours] += 1
+        windows.append(
+            {
+                "index": i,
+                "start": s,
+                "planned_loss_units": round(float(rate * window_load[s]), 1),
+                "risk_before_window": round(float(p_fail_by_hour[i, s]), 4),
+                "after_rul": bool(late[s]),
+            }
+        )
+    return windows
+
+
+def plan_maintenance(horizon_hours: int, window_hours: int, crews: int) -> dict:
+    """
+    Fleet-wide failure risk and remaining useful life from sensor history,
+    plus maintenance windows that cost the least production.
+
+    Risk is computed from each machine's temperature and vibration trend and
+    hours since maintenance, not the static predicted_failure_prob column.
+    Machines get a window when P(failure within the horizon) >= 0.1, their
+    RUL ends within the horizon, or their status is needs_attention.
+
+    Args:
+        horizon_hours: planning horizon; 0 = 168 (one week)
+        window_hours: length of one maintenance window; 0 = 4
+        crews: maintenance crews, i.e. windows that may overlap; 0 = 2
+
+    Returns:
+        Machines ranked by risk (at most 20) with hazard, failure probability
+        within the horizon, RUL hours and sensor trends, and the planned
+        windows (start/end, production lost, risk accepted by waiting)
+    """
+    import numpy as np
+
+    try:
+        horizon = int(horizon_hours or DEFAULT_HORIZON_HOURS)
+        duration = int(window_hours or DEFAULT_WINDOW_HOURS)
+        crew_count = int(crews or DEFAULT_CREWS)
+        if not 0 < duration <= horizon <= MAX_RUL_HOURS:
+            raise ValueError(f"Need 0 < window_hours <= horizon_hours <= {MAX_RUL_HOURS}")
+
+        started = time.perf_counter()
+        production = store.frame("production")
+        maintenance = store.frame("maintenance")
+        trends = sensor_trends(production)
+        ages = trends["machine_id"].map(
+            dict(zip(maintenance["machine_id"].astype(str), maintenance["hours_since_maintenance"].astype(float)))
+        )
+        static = trends["machine_id"].map(
+            dict(zip(maintenance["machine_id"].astype(str), maintenance["predicted_failure_prob"].astype(float)))
+        )
+        result = fleet_reliability(trends, ages.fillna(0).to_numpy(), horizon)
+
+        now = datetime.fromisoformat(str(production["timestamp"].max()))
+        load = np.array([SHIFT_LOAD[shift_of((now + timedelta(hours=h)).hour)] for h in range(horizon + 1)])
+        flagged = trends["machine_id"].isin(
+            maintenance.loc[maintenance["status"] == "needs_attention", "machine_id"].astype(str)
+        ).to_numpy()
+        candidates = np.flatnonzero(
+            (result["p_fail_horizon"] >= RISK_THRESHOLD) | (result["rul_hours"] <= horizon) | flagged
+        )
+        windows = plan_windows(
+            result["p_fail_by_hour"],
+            result["rul_hours"],
+            trends["output_rate"].to_numpy(),
+            load,
+            candidates.tolist(),
+            duration,
+            crew_count,
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    def at(hours: float) -> str:
+        return (now + timedelta(hours=hours)).isoformat(timespec="minutes")
+
+    def finite(value: float) -> Optional[float]:
+        return round(float(value), 1) if np.isfinite(value) else None
+
+    ranking = []
+    for i in np.argsort(-result["p_fail_horizon"])[:MAX_ITEMS]:
+        ranking.append(
+            {
+                "machine_id": trends["machine_id"].iat[i],
+                "p_fail_horizon": round(float(result["p_fail_horizon"][i]), 4),
+                "hazard_per_1000h": round(float(result["hazard_per_1000h"][i]), 4),
+                "rul_hours": finite(result["rul_hours"][i]),
+                "rul_capped": bool(result["rul_hours"][i] >= MAX_RUL_HOURS),
+                "hours_since_maintenance": finite(ages.iat[i]) if ages.notna().iat[i] else None,
+                "temperature": round(float(trends["temperature"].iat[i]), 2),
+                "temp_trend_per_day": round(float(trends["temp_slope_per_h"].iat[i] * 24), 3),
+                "vibration": round(float(trends["vibration"].iat[i]), 3),
+                "vib_trend_per_day": round(float(trends["vib_slope_per_h"].iat[i] * 24), 3),
+                "vibration_limit_in_hours": finite(result["vibration_limit_in_hours"][i]),
+                "static_failure_prob": None if np.isnan(static.iat[i]) else float(static.iat[i]),
+            }
+        )
+
+    planned = [
+        {
+            "machine_id": trends["machine_id"].iat[w["index"]],
+            **(
+                {"start": at(w["start"]), "end": at(w["start"] + duration)}
+                if w["start"] is not None
+                else {"start": None, "end": None}
+            ),
+            **{k: v for k, v in w.items() if k not in ("index", "start")},
+        }
+        for w in windows
+    ]
+    planned.sort(key=lambda w: (w["start"] is None, w["start"] or ""))
+    return {
+        "success": True,
+        "as_of": at(0),
+        "horizon_hours": horizon,
+        "machines": int(len(trends)),
+        "at_risk": int(len(candidates)),
+        "risk_ranking": ranking,
+        "windows": planned[:MAX_ITEMS],
+        "windows_omitted": max(0, len(planned) - MAX_ITEMS),
+        "elapsed_ms": round(elapsed_ms, 1),
+    }
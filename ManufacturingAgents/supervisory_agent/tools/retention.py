@@ -0,0 +1,456 @@
+# supervisory_agent/tools/retention.py
+# Tiered retention for the production time series. Raw readings are kept for
+# RAW_RETENTION_HOURS behind the latest reading; older rows are rolled into
+# 1-minute, 1-hour and per-shift aggregates (sum, min, max and count per
+# machine and sensor, so means and coarser buckets can be derived exactly)
+# and removed from production_data.csv. Each tier has its own retention; the
+# shift tier is kept forever.
+# Every tier is the merge of two parts: the archive (rollups of compacted
+# rows, in SQLite next to the CSVs, merged by upsert and committed only once
+# the compacted CSV has replaced the old one) and the live part
+# (rollups of the rows still in production_data.csv, in memory, updated
+# incrementally when rows are appended and rebuilt after any other change).
+# A raw row is in exactly one of them.
+# Queries use the coarsest tier whose bucket divides the requested bucket and
+# that still covers the requested start, reading only the buckets in range,
+# so long ranges touch a few thousand shift rows instead of every reading.
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .data_store import store
+from .shifts import SHIFT_FREQ, SHIFT_NAMES
+
+METRICS = (
+    "temperature",
+    "vibration_level",
+    "power_consumption",
+    "pressure",
+    "material_flow_rate",
+    "cycle_time",
+    "output_rate",
+    "quality_score",
+    "downtime_minutes",
+    "efficiency_score",
+)
+DEFAULT_METRICS = ("output_rate", "quality_score", "efficiency_score", "temperature", "vibration_level", "downtime_minutes")
+STATS = ("sum", "min", "max", "count")
+MERGE = {"sum": "sum", "min": "min", "max": "max", "count": "sum"}  # how partial stats combine
+# Finest to coarsest; shift buckets follow the calendar in shifts.py
+TIERS = (("1min", "1min"), ("1h", "1h"), ("shift", SHIFT_FREQ))
+RAW_RETENTION_HOURS = float(os.getenv("PRODUCTION_RAW_RETENTION_HOURS", "168"))
+TIER_RETENTION_HOURS = {
+    "1min": float(os.getenv("PRODUCTION_1MIN_RETENTION_HOURS", "720")),
+    "1h": float(os.getenv("PRODUCTION_1H_RETENTION_HOURS", "8760")),
+    "shift": 0.0,  # forever
+}
+# Compact (rewriting the CSV) only once at least this much raw data is past its window
+COMPACT_SLACK_HOURS = 8
+AUTO_BUCKETS = ("1min", "15min", "1h", "8h", "1D", "7D")
+MAX_POINTS = 200  # auto bucket: coarse enough for at most this many buckets
+MAX_ITEMS = 200
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"  # archive buckets, sortable as text in SQLite
+
+
+def rollup(raw, freq: str, metrics: List[str], times=None):
+    """Raw readings -> sum/min/max/count per (bucket, machine_id) and metric."""
+    import pandas as pd
+
+    if times is None:
+        times = pd.to_datetime(raw["timestamp"], format="mixed")
+    keys = [
+        pd.Series(times.to_numpy(), index=raw.index).dt.floor(freq).rename("bucket"),
+        raw["machine_id"].astype(str).rename("machine_id"),
+    ]
+    result = raw[metrics].groupby(keys, sort=True).agg(list(STATS))
+    result.columns = [f"{metric}_{stat}" for metric, stat in result.columns]
+    return result.reset_index()
+
+
+def combine(frames, freq: Optional[str] = None, by_machine: bool = True):
+    """
+    Merge rollups (optionally re-bucketed to a coarser `freq`, optionally
+    across machines): sums and counts add, minima and maxima combine.
+    """
+    import pandas as pd
+
+    frames = [f for f in frames if not f.empty] or frames[:1]
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    if freq is not None:
+        df = df.assign(bucket=df["bucket"].dt.floor(freq))
+    keys = ["bucket", "machine_id"] if by_machine else ["bucket"]
+    how = {c: MERGE[c.rsplit("_", 1)[1]] for c in df.columns if c not in ("bucket", "machine_id")}
+    return df.groupby(keys, sort=True).agg(how).reset_index()
+
+
+def _schema(tier: str, metrics: List[str]) -> str:
+    columns = ",\n".join(f"    {m}_{s} REAL" for m in metrics for s in STATS)
+    return (
+        f"CREATE TABLE IF NOT EXISTS rollup_{tier} (\n"
+        "    bucket     TEXT NOT NULL,\n"
+        "    machine_id TEXT NOT NULL,\n"
+        f"{columns},\n"
+        "    PRIMARY KEY (bucket, machine_id)\n"
+        ");\n"
+    )
+
+
+def _upsert(tier: str, metrics: List[str]) -> str:
+    columns = [f"{m}_{s}" for m in metrics for s in STATS]
+    merge = {
+        "sum": "{c} = {c} + excluded.{c}",
+        "count": "{c} = {c} + excluded.{c}",
+        # min()/max() of two values are NULL if either is; keep the other one
+        "min": "{c} = COALESCE(MIN({c}, excluded.{c}), {c}, excluded.{c})",
+        "max": "{c} = COALESCE(MAX({c}, excluded.{c}), {c}, excluded.{c})",
+    }
+    updates = ", ".join(merge[c.rsplit("_", 1)[1]].format(c=c) for c in columns)
+    return (
+        f"INSERT INTO rollup_{tier} (bucket, machine_id, {', '.join(columns)}) "
+        f"VALUES ({', '.join('?' * (len(columns) + 2))}) "
+        f"ON CONFLICT (bucket, machine_id) DO UPDATE SET {updates}"
+    )
+
+
+class RetentionManager:
+    """Tiered rollups of production data, kept in step with the production table"""
+
+    def __init__(self, path: str, store, raw_retention_hours: float = RAW_RETENTION_HOURS):
+        self.path = path
+        self.store = store
+        self.raw_retention_hours = raw_retention_hours
+        self._lock = threading.Lock()
+        self._metrics: Optional[List[str]] = None
+        self._live: Dict[str, Any] = {}
+        self._times = None  # parsed timestamps of the production rows
+        self._rows = 0  # production rows already rolled into the live part
+        self._rewrites: Optional[int] = None  # store.rewrites("production") they were read under
+        self._stale = True
+        self.rebuilds = 0
+        self.compactions = 0
+        self.compacted_rows = 0
+        self.last_compaction: Optional[str] = None
+        store.subscribe(self._on_change)
+
+    def _on_change(self, domain: str) -> None:
+        if domain == "production":
+            self._stale = True
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _rollups(self, raw, times) -> Dict[str, Any]:
+        # Each tier from the next finer one: raw is grouped only once
+        result, finer = {}, None
+        for tier, freq in TIERS:
+            finer = rollup(raw, freq, self._metrics, times) if finer is None else combine([finer], freq)
+            result[tier] = finer
+        return result
+
+    def sync(self) -> int:
+        """
+        Roll production rows added since the last sync into the live tiers
+        (rebuilding them after any other change) and compact raw data past
+        its retention. Returns the number of rows rolled up.
+        """
+        self.store.frame("production")  # mtime check; an edited CSV marks the tiers stale
+        with self._lock:
+            applied = self._sync()
+            if self._compaction_due():
+                self._compact()
+                applied += self._sync()
+            return applied
+
+    def _sync(self) -> int:
+        import pandas as pd
+
+        if not self._stale:
+            return 0
+        # Clear first, then read: a change landing meanwhile marks the tiers stale again
+        self._stale = False
+        rewrites = self.store.rewrites("production")
+        df = self.store.frame("production")
+        if self._metrics is None:
+            self._metrics = [m for m in METRICS if m in df.columns]
+            with self._connect() as db:
+                db.executescript("".join(_schema(tier, self._metrics) for tier, _ in TIERS))
+        # Only pure appends since the last sync can be rolled in incrementally
+        appended = bool(self._live) and rewrites == self._rewrites and self._rows <= len(df)
+        start = self._rows if appended else 0
+        new = df.iloc[start:]
+        times = pd.to_datetime(new["timestamp"], format="mixed")
+        if not appended:
+            self._times = times
+            self._live = self._rollups(new, times)
+            self.rebuilds += 1
+        elif len(new):
+            self._times = pd.concat([self._times, times])
+            for tier, update in self._rollups(new, times).items():
+                live = self._live[tier]
+                # Only buckets at or after the first new one can change
+                first = update["bucket"].min()
+                self._live[tier] = pd.concat(
+                    [live[live["bucket"] < first], combine([live[live["bucket"] >= first], update])],
+                    ignore_index=True,
+                )
+        self._rows = len(df)
+        self._rewrites = rewrites
+        return len(new)
+
+    def _compaction_due(self) -> bool:
+        import pandas as pd
+
+        if not len(self._times):
+            return False
+        cutoff = (self._times.max() - pd.Timedelta(hours=self.raw_retention_hours)).floor(SHIFT_FREQ)
+        return cutoff - self._times.min() >= pd.Timedelta(hours=COMPACT_SLACK_HOURS)
+
+    def _archive(self, db: sqlite3.Connection, compacted, latest) -> None:
+        """Upsert rollups of `compacted` into the archive, in `db`'s open transaction."""
+        import pandas as pd
+
+        times = pd.to_datetime(compacted["timestamp"], format="mixed")
+        for tier, update in self._rollups(compacted, times).items():
+            rows = update.assign(bucket=update["bucket"].dt.strftime(TIME_FORMAT))
+            db.executemany(_upsert(tier, self._metrics), rows.itertuples(index=False, name=None))
+            retention = TIER_RETENTION_HOURS[tier]
+            if retention:
+                horizon = (latest - pd.Timedelta(hours=retention)).floor(SHIFT_FREQ)
+                db.execute(f"DELETE FROM rollup_{tier} WHERE bucket < ?", (horizon.strftime(TIME_FORMAT),))
+
+    def _compact(self) -> None:
+        import pandas as pd
+
+        def split(df):
+            # `df` is the CSV as it is under the store's cross-process lock:
+            # another worker may have compacted it since this one last synced
+            times = pd.to_datetime(df["timestamp"], format="mixed")
+            latest = times.max()
+            # Cut on a shift boundary so every bucket is either all archive or all live
+            old = times < (latest - pd.Timedelta(hours=self.raw_retention_hours)).floor(SHIFT_FREQ)
+            if not old.any():
+                return None, 0
+            self._archive(db, df[old], latest)
+            return df[~old].reset_index(drop=True), int(old.sum())
+
+        # Every worker runs this loop; the store lock makes read, archive and
+        # replace one step, so a file is compacted (and archived) only once.
+        # The sums are additive, so they must land exactly once: commit them
+        # only after the rewritten CSV is in place, roll back if it is not
+        db = self._connect()
+        try:
+            compacted = self.store.modify("production", split)
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        if compacted:
+            self.compactions += 1
+            self.compacted_rows += compacted
+            self.last_compaction = datetime.now().isoformat()
+
+    def compact(self) -> int:
+        """Compact now if raw data is past its retention; returns rows moved to the archive."""
+        before = self.compacted_rows
+        self.sync()
+        return self.compacted_rows - before
+
+    def _archived(self, tier: str, start, end, machine_id: str, columns: List[str]):
+        import pandas as pd
+
+        sql = f"SELECT bucket, machine_id, {', '.join(columns)} FROM rollup_{tier} WHERE bucket >= ? AND bucket < ?"
+        params = [start.strftime(TIME_FORMAT), end.strftime(TIME_FORMAT)]
+        if machine_id:
+            sql += " AND machine_id = ?"
+            params.append(machine_id)
+        with self._connect() as db:
+            rows = db.execute(sql, params).fetchall()
+        df = pd.DataFrame.from_records(rows, columns=["bucket", "machine_id", *columns])
+        return df.assign(bucket=pd.to_datetime(df["bucket"], format=TIME_FORMAT))
+
+    def _earliest(self) -> Dict[str, Any]:
+        """Oldest bucket per source, archive or live; NaT when empty."""
+        import pandas as pd
+
+        with self._connect() as db:
+            archived = {tier: db.execute(f"SELECT MIN(bucket) FROM rollup_{tier}").fetchone()[0] for tier, _ in TIERS}
+        earliest = {"raw": self._times.min() if len(self._times) else pd.NaT}
+        for tier, _ in TIERS:
+            candidates = [pd.Timestamp(archived[tier])] if archived[tier] else []
+            if not self._live[tier].empty:
+                candidates.append(self._live[tier]["bucket"].iat[0])
+            earliest[tier] = min(candidates) if candidates else pd.NaT
+        return earliest
+
+    def query(self, start: Optional[datetime], end: Optional[datetime], bucket: str, machine_id: str, metrics: List[str]) -> Dict[str, Any]:
+        """
+        Bucketed sum/min/max/count of `metrics` over [start, end), from the
+        coarsest tier that serves the bucket and covers the range.
+        """
+        import pandas as pd
+
+        self.sync()
+        with self._lock:
+            raw = self.store.frame("production").iloc[: self._rows]  # rows appended since are not in _times
+            unknown = [m for m in metrics if m not in self._metrics]
+            if unknown:
+                raise ValueError(f"Unknown metric(s): {unknown}; available: {self._metrics}")
+            earliest = self._earliest()
+            raw_times = self._times
+            live = self._live
+
+        known = [t for t in earliest.values() if not pd.isna(t)]
+        if not known:
+            raise ValueError("No production data")
+        start = pd.Timestamp(start) if start else min(known)
+        end = pd.Timestamp(end) if end else raw_times.max() + pd.Timedelta(seconds=1)
+        if end <= start:
+            raise ValueError("end must be after start")
+
+        if not bucket:
+            span = end - start
+            bucket = next((b for b in AUTO_BUCKETS if span / pd.Timedelta(b) <= MAX_POINTS), AUTO_BUCKETS[-1])
+        try:
+            width = pd.Timedelta(SHIFT_FREQ if bucket == "shift" else bucket)
+        except ValueError:
+            raise ValueError(f"Unknown bucket '{bucket}'; use a fixed width like 15min, 1h, shift, 1D")
+        if width <= pd.Timedelta(0):
+            raise ValueError("bucket must be positive")
+
+        # Coarsest tier whose bucket divides the requested one and whose data reaches back to start
+        floor = max(start, min(known))
+        sources = [("raw", pd.Timedelta(0))] + [(tier, pd.Timedelta(freq)) for tier, freq in TIERS]
+        covering = [s for s in sources if not pd.isna(earliest[s[0]]) and earliest[s[0]] <= floor]
+        fitting = [s for s in covering if s[1] == pd.Timedelta(0) or width % s[1] == pd.Timedelta(0)]
+        tier, tier_width = fitting[-1] if fitting else (covering or sources[-1:])[0]
+        if tier_width and width % tier_width:
+            # Finer tiers no longer reach back this far: round up to this tier's buckets
+            width = tier_width * (width // tier_width + 1)
+        freq = f"{int(width.total_seconds())}s"
+
+        columns = [f"{m}_{s}" for m in metrics for s in STATS]
+        if tier == "raw":
+            in_range = (raw_times >= start).to_numpy() & (raw_times < end).to_numpy()
+            if machine_id:
+                in_range &= (raw["machine_id"].astype(str) == machine_id).to_numpy()
+            data = rollup(raw[in_range], freq, metrics, raw_times[in_range])
+            read = int(in_range.sum())
+        else:
+            first = start.floor(tier_width)
+            recent = live[tier]
+            recent = recent[(recent["bucket"] >= first) & (recent["bucket"] < end)]
+            if machine_id:
+                recent = recent[recent["machine_id"] == machine_id]
+            archived = self._archived(tier, first, end, machine_id, columns)
+            data = pd.concat([archived, recent[["bucket", "machine_id", *columns]]], ignore_index=True)
+            read = len(data)
+        series = combine([data], freq, by_machine=False)
+        return {"tier": tier, "bucket": width, "rows_read": read, "series": series, "start": start, "end": end}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            archived = {}
+            if self._metrics is not None:
+                with self._connect() as db:
+                    archived = {tier: db.execute(f"SELECT COUNT(*) FROM rollup_{tier}").fetchone()[0] for tier, _ in TIERS}
+            return {
+                "raw_retention_hours": self.raw_retention_hours,
+                "tiers": {
+                    tier: {
+                        "archive_rows": archived.get(tier, 0),
+                        "live_rows": len(self._live.get(tier, ())),
+                        "retention_hours": TIER_RETENTION_HOURS[tier] or None,
+                    }
+                    for tier, _ in TIERS
+                },
+                "raw_rows": self._rows,
+                "rebuilds": self.rebuilds,
+                "compactions": self.compactions,
+                "compacted_rows": self.compacted_rows,
+                "last_compaction": self.last_compaction,
+            }
+
+
+production_retention = RetentionManager(
+    os.getenv("PRODUCTION_ROLLUP_DB_PATH", str(Path(__file__).parent.parent / "data" / "production_rollups.db")),
+    store,
+)
+
+
+def get_production_history(start: str, end: str, bucket: str, machine_id: str, metrics: List[str]) -> dict:
+    """
+    Production sensor history over any time range, bucketed, from tiered
+    rollups: recent raw readings, then 1-minute, 1-hour and per-shift
+    aggregates. Use this for trends over days, weeks or months instead of
+    reading raw rows; older raw readings are no longer kept.
+
+    Args:
+        start: ISO start, e.g. "2024-11-01"; "" = earliest data
+        end: ISO end (exclusive); "" = latest reading
+        bucket: "15min", "1h", "shift", "1D", "7D", ...; "" = about 200 buckets
+            over the range. Coarsened automatically when only coarser tiers
+            reach back to `start`
+        machine_id: e.g. "M003"; "" = all machines combined
+        metrics: sensor columns, e.g. ["output_rate", "temperature"]; [] = output,
+            quality, efficiency, temperature, vibration and downtime
+
+    Returns:
+        The tier used, effective bucket, rollup rows read, and per bucket the
+        mean/min/max/count of each metric (latest 200 buckets)
+    """
+    try:
+        metrics = list(metrics or DEFAULT_METRICS)
+        started = time.perf_counter()
+        result = production_retention.query(
+            datetime.fromisoformat(start) if start else None,
+            datetime.fromisoformat(end) if end else None,
+            bucket,
+            machine_id,
+            metrics,
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    import pandas as pd
+    from pandas.tseries.frequencies import to_offset
+
+    series = result["series"]
+    width = result["bucket"]
+    by_shift = width == pd.Timedelta(SHIFT_FREQ)
+    label = to_offset(width).freqstr
+    points = []
+    for row in series.tail(MAX_ITEMS).itertuples(index=False):
+        row = row._asdict()
+        point = {"bucket": row["bucket"].isoformat()}
+        if by_shift:
+            point["shift"] = SHIFT_NAMES[row["bucket"].hour]
+        for metric in metrics:
+            count = int(row[f"{metric}_count"])
+            point[metric] = {
+                "mean": round(row[f"{metric}_sum"] / count, 4) if count else None,
+                "min": None if count == 0 else round(float(row[f"{metric}_min"]), 4),
+                "max": None if count == 0 else round(float(row[f"{metric}_max"]), 4),
+                "count": count,
+            }
+        points.append(point)
+    return {
+        "success": True,
+        "tier": result["tier"],
+        "bucket": label if label[0].isdigit() else f"1{label}",
+        "machine_id": machine_id or None,
+        "start": result["start"].isoformat(),
+        "end": result["end"].isoformat(),
+        "rows_read": result["rows_read"],
+        "buckets": len(series),
+        "points": points,
+        "omitted": max(0, len(series) - MAX_ITEMS),
+        "elapsed_ms": round(elapsed_ms, 1),
+    }
@@ -0,0 +1,318 @@
+# supervisory_agent/tools/root_cause.py
+# Defect root-cause analytics for the quality control agent. Each inspection
+# is joined to the latest sensor reading of the same machine at or before it
+# (as-of join within a tolerance), then every sensor condition is scored
+# against every defect_type and rework_required in a few matrix products:
+# Pearson (point-biserial) correlation per sensor, and lift of "sensor in its
+# top/bottom quartile" and "produced on machine X" conditions. Appended
+# inspections are joined on their own, and appended readings re-join only
+# the inspections they could now be the latest reading for; the whole table
+# is re-joined only after either domain is rewritten. Analyses are cached
+# per version of the joined table.
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from .data_store import store
+
+SENSOR_COLUMNS = (
+    "temperature",
+    "vibration_level",
+    "power_consumption",
+    "pressure",
+    "material_flow_rate",
+    "cycle_time",
+)
+DEFAULT_TOLERANCE_MINUTES = 60
+HIGH_QUANTILE = 0.75
+LOW_QUANTILE = 0.25
+MIN_SUPPORT = 3  # inspections a condition must cover to be ranked by lift
+MAX_ITEMS = 10
+
+
+def align(quality, production, tolerance_minutes: float = DEFAULT_TOLERANCE_MINUTES, rows=None):
+    """
+    Inspections with the sensor columns of the machine's latest reading at or
+    before the inspection time, within the tolerance (unmatched rows dropped).
+    `_row` holds each inspection's position in the quality table (`rows`,
+    by default 0..n-1).
+    """
+    import numpy as np
+    import pandas as pd
+
+    sensors = [c for c in SENSOR_COLUMNS if c in production.columns]
+    left = quality.assign(
+        _row=np.arange(len(quality)) if rows is None else rows, _at=pd.to_datetime(quality["timestamp"])
+    ).sort_values("_at", kind="stable")
+    right = production[["timestamp", "machine_id", *sensors]].assign(
+        _at=pd.to_datetime(production["timestamp"])
+    ).sort_values("_at", kind="stable")
+    left["machine_id"] = left["machine_id"].astype(str)
+    right["machine_id"] = right["machine_id"].astype(str)
+    joined = pd.merge_asof(
+        left,
+        right.drop(columns="timestamp").rename(columns={"_at": "_reading_at"}),
+        left_on="_at",
+        right_on="_reading_at",
+        by="machine_id",
+        direction="backward",
+        tolerance=pd.Timedelta(minutes=tolerance_minutes),
+        allow_exact_matches=True,
+    )
+    return joined.dropna(subset=sensors).drop(columns=["_at", "_reading_at"]).reset_index(drop=True), sensors
+
+
+def targets(joined) -> Tuple[List[str], Any]:
+    """Binary outcome columns: one per defect_type (except none) plus rework_required."""
+    import numpy as np
+
+    codes, values = joined["defect_type"].factorize(sort=True)
+    wanted = [(code, str(name)) for code, name in enumerate(values) if str(name) != "none"]
+    columns = [codes == code for code, _ in wanted]
+    names = [f"defect_type={name}" for _, name in wanted]
+    if "rework_required" in joined.columns:
+        columns.append(joined["rework_required"].to_numpy() == 1)
+        names.append("rework_required")
+    return names, np.column_stack(columns).astype(np.float64) if columns else np.empty((len(joined), 0))
+
+
+def analyze(joined, sensors: List[str]) -> Dict[str, Any]:
+    """
+    Correlation of every sensor with every target and lift of every
+    condition, as matrices (features x targets / conditions x targets).
+    """
+    import numpy as np
+
+    names, y = targets(joined)
+    # Column-major so per-sensor reductions and quantiles run over contiguous memory
+    x = np.asfortranarray(joined[sensors].to_numpy(dtype=np.float64))
+    n = len(x)
+
+    # Pearson correlation: standardized columns, one matrix product
+    xc = x - x.mean(axis=0)
+    yc = y - y.mean(axis=0)
+    x_norm = np.sqrt((xc**2).sum(axis=0))
+    y_norm = np.sqrt((yc**2).sum(axis=0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = (xc.T @ yc) / np.outer(x_norm, y_norm)
+    corr = np.nan_to_num(corr)
+
+    # Conditions: sensor above its upper / below its lower quartile, machine
+    high, low = np.quantile(x, [HIGH_QUANTILE, LOW_QUANTILE], axis=0) if n else (np.zeros(len(sensors)),) * 2
+    machine_codes, machines = joined["machine_id"].factorize(sort=True)
+    conditions = (
+        [f"{s} > {h:.4g} (top quartile)" for s, h in zip(sensors, high)]
+        + [f"{s} < {l:.4g} (bottom quartile)" for s, l in zip(sensors, low)]
+        + [f"machine_id={m}" for m in machines]
+    )
+    support = np.concatenate(
+        [
+            (x > high).sum(axis=0),
+            (x < low).sum(axis=0),
+            np.bincount(machine_codes, minlength=len(machines)),
+        ]
+    ).astype(np.float64)
+    # Target counts per condition: indicator matrices times Y, machines via bincount
+    hits = np.vstack(
+        [
+            (x > high).T.astype(np.float64) @ y,
+            (x < low).T.astype(np.float64) @ y,
+            np.stack([np.bincount(machine_codes, weights=y[:, j], minlength=len(machines)) for j in range(y.shape[1])], axis=1)
+            if y.shape[1]
+            else np.empty((len(machines), 0)),
+        ]
+    )
+    base = y.mean(axis=0) if n else np.zeros(y.shape[1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = hits / support[:, None]
+        lift = rate / base[None, :]
+    return {
+        "targets": names,
+        "base_rate": base,
+        "positives": y.sum(axis=0),
+        "sensors": sensors,
+        "correlation": corr,
+        "conditions": conditions,
+        "support": support,
+        "rate": np.nan_to_num(rate),
+        "lift": np.nan_to_num(lift),
+        "rows": n,
+    }
+
+
+class RootCauseCache:
+    """Joined inspections per tolerance, kept in step with production and quality"""
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._results: Dict[float, Dict[str, Any]] = {}
+        self.builds = 0
+        self.updates = 0
+
+    def get(self, tolerance_minutes: float):
+        self.store.frame("quality")  # mtime checks; edited CSVs are reloaded first
+        self.store.frame("production")
+        with self._lock:
+            # Counters before frames: a rewrite landing in between pairs the old
+            # counter with the new rows, and the next call rebuilds
+            rewrites = (self.store.rewrites("quality"), self.store.rewrites("production"))
+            quality = self.store.frame("quality")
+            production = self.store.frame("production")
+            sizes = (len(quality), len(production))
+            cached = self._results.get(tolerance_minutes)
+            if cached is not None and cached["rewrites"] == rewrites and cached["sizes"] == sizes:
+                return cached
+            if cached is not None and cached["rewrites"] == rewrites and cached["sizes"] <= sizes:
+                cached = self._update(cached, quality, production, tolerance_minutes)
+                self.updates += 1
+            else:
+                cached = self._build(quality, production, tolerance_minutes)
+                self.builds += 1
+            cached.update(rewrites=rewrites, sizes=sizes, inspections=len(quality))
+            self._results[tolerance_minutes] = cached
+            return cached
+
+    def _build(self, quality, production, tolerance_minutes: float) -> Dict[str, Any]:
+        import pandas as pd
+
+        joined, sensors = align(quality, production, tolerance_minutes)
+        return {
+            "joined": joined,
+            "sensors": sensors,
+            "analyses": {},
+            "quality_at": pd.to_datetime(quality["timestamp"]).to_numpy(),
+            "quality_machines": quality["machine_id"].astype(str).to_numpy(),
+            "production_at": pd.to_datetime(production["timestamp"]).to_numpy(),
+        }
+
+    def _update(self, cached: Dict[str, Any], quality, production, tolerance_minutes: float) -> Dict[str, Any]:
+        """Join appended inspections, and re-join those appended readings may now match."""
+        import numpy as np
+        import pandas as pd
+
+        old_inspections, old_readings = cached["sizes"]
+        new_quality = quality.iloc[old_inspections:]
+        new_production = production.iloc[old_readings:]
+        quality_at = np.concatenate([cached["quality_at"], pd.to_datetime(new_quality["timestamp"]).to_numpy()])
+        quality_machines = np.concatenate([cached["quality_machines"], new_quality["machine_id"].astype(str).to_numpy()])
+        production_at = np.concatenate([cached["production_at"], pd.to_datetime(new_production["timestamp"]).to_numpy()])
+        tolerance = np.timedelta64(int(tolerance_minutes * 60_000_000), "us")
+
+        rows = np.arange(old_inspections, len(quality))
+        if len(new_production):
+            # A new reading of machine m can only become the match of an
+            # inspection of m taken at or after it, and within the tolerance
+            readings = pd.DataFrame(
+                {"machine_id": new_production["machine_id"].astype(str).to_numpy(), "at": production_at[old_readings:]}
+            ).groupby("machine_id")["at"].agg(["min", "max"])
+            machines = pd.Series(quality_machines[:old_inspections])
+            earliest = machines.map(readings["min"]).to_numpy()
+            latest = machines.map(readings["max"]).to_numpy()
+            at = quality_at[:old_inspections]
+            rows = np.concatenate([np.flatnonzero((at >= earliest) & (at <= latest + tolerance)), rows])
+
+        joined = cached["joined"]
+        if len(rows):
+            # Only readings inside the window of the re-joined inspections can match
+            window = (production_at >= quality_at[rows].min() - tolerance) & (production_at <= quality_at[rows].max())
+            rejoined, _ = align(quality.iloc[rows], production[window], tolerance_minutes, rows=rows)
+            joined = pd.concat([joined[~joined["_row"].isin(rows)], rejoined], ignore_index=True)
+        return {
+            **cached,
+            "joined": joined,
+            "analyses": {} if len(rows) else cached["analyses"],
+            "quality_at": quality_at,
+            "quality_machines": quality_machines,
+            "production_at": production_at,
+        }
+
+    def analysis(self, tolerance_minutes: float, machine_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """(join entry, analysis) for all machines ("") or one, computed once per data version."""
+        cached = self.get(tolerance_minutes)
+        result = cached["analyses"].get(machine_id)
+        if result is None:
+            joined = cached["joined"]
+            if machine_id:
+                joined = joined[joined["machine_id"] == machine_id]
+                if joined.empty:
+                    raise ValueError(f"No matched inspections for machine {machine_id}")
+            result = cached["analyses"][machine_id] = analyze(joined, cached["sensors"])
+        return cached, result
+
+
+root_causes = RootCauseCache(store)
+
+
+def find_root_causes(target: str, machine_id: str, tolerance_minutes: int) -> dict:
+    """
+    Rank the sensor conditions associated with each defect type and with
+    rework, over all inspections joined to the machine's sensor readings.
+
+    Use this for root-cause questions instead of comparing quality and
+    production rows by hand. Associations are statistical evidence, not proof.
+
+    Args:
+        target: a defect_type (e.g. "surface_defect") or "rework_required"; "" = all
+        machine_id: restrict to one machine, e.g. "M003"; "" = all machines
+        tolerance_minutes: how old the matched sensor reading may be; 0 = 60
+
+    Returns:
+        Per target: base rate and count, sensors ranked by |correlation|
+        (with direction), and conditions (sensor top/bottom quartile, machine)
+        that raise the rate, ranked by lift with their support and rate
+        (at most 10 each)
+    """
+    try:
+        tolerance = float(tolerance_minutes or DEFAULT_TOLERANCE_MINUTES)
+        if tolerance <= 0:
+            raise ValueError("tolerance_minutes must be positive")
+        start = time.perf_counter()
+        cached, result = root_causes.analysis(tolerance, machine_id)
+        if target:
+            wanted = target if target == "rework_required" else f"defect_type={target}"
+            if wanted not in result["targets"]:
+                raise ValueError(f"Unknown or unseen target: {target}; available: {result['targets']}")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    import numpy as np
+
+    report = []
+    for j, name in enumerate(result["targets"]):
+        if target and name != wanted:
+            continue
+        corr = result["correlation"][:, j]
+        by_corr = np.argsort(-np.abs(corr))[:MAX_ITEMS]
+        eligible = np.flatnonzero(result["support"] >= MIN_SUPPORT)
+        by_lift = eligible[np.argsort(-result["lift"][eligible, j], kind="stable")][:MAX_ITEMS]
+        report.append(
+            {
+                "target": name,
+                "cases": int(result["positives"][j]),
+                "base_rate": round(float(result["base_rate"][j]), 4),
+                "sensor_correlation": [
+                    {"sensor": result["sensors"][i], "correlation": round(float(corr[i]), 3)} for i in by_corr
+                ],
+                "conditions_by_lift": [
+                    {
+                        "condition": result["conditions"][i],
+                        "lift": round(float(result["lift"][i, j]), 2),
+                        "rate": round(float(result["rate"][i, j]), 4),
+                        "support": int(result["support"][i]),
+                    }
+                    for i in by_lift
+                    if result["lift"][i, j] > 1
+                ],
+            }
+        )
+    return {
+        "success": True,
+        "inspections": cached["inspections"],
+        "matched": result["rows"],
+        "tolerance_minutes": tolerance,
+        "machine_id": machine_id or None,
+        "targets": report,
+        "elapsed_ms": round(elapsed_ms, 1),
+    }
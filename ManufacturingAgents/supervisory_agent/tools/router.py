@@ -0,0 +1,275 @@
+# supervisory_agent/tools/router.py
+# Local fast-path router in front of the supervisory LLM. A TF-IDF
+# nearest-centroid classifier, trained on the delegation examples below,
+# sends confident single-domain requests straight to the sub-agent
+# (no Gemini turn spent on "transfer to inventory_agent"); anything
+# multi-domain, ambiguous or unfamiliar still goes to the supervisor.
+import math
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+SUPERVISOR = "supervisory_agent"
+
+# Delegation examples: the supervisor's instruction examples, the
+# sub-agents' capability lists and typical dashboard questions
+TRAINING_EXAMPLES: Dict[str, List[str]] = {
+    "inventory_agent": [
+        "Check inventory",
+        "What are the current stock levels",
+        "Which materials need reordering",
+        "Find materials below reorder point",
+        "Is steel plate stock sufficient",
+        "How much aluminum rod do we have in stock",
+        "Show low stock materials",
+        "Calculate reorder quantities for welding wire",
+        "Which supplier provides cutting fluid and what is the lead time",
+        "Material availability and stock optimization",
+        "Prevent stockouts and excess inventory",
+        "Monitor material consumption in the last 24 hours",
+        "Update stock level for bolts after delivery",
+        "What is the holding cost of our inventory",
+        "Reorder paint from the supplier",
+    ],
+    "production_agent": [
+        "Schedule production",
+        "What is the current production output rate",
+        "Show machine efficiency scores",
+        "Plan the production schedule for the next shift",
+        "How is the morning shift performing",
+        "Production planning and scheduling",
+        "Monitor machine performance temperature and vibration",
+        "Optimize cycle time on the welder line",
+        "What is the power consumption of machine M001",
+        "Analyze production trends",
+        "Which line has the lowest throughput",
+        "How many units did we produce today",
+        "Increase output on the drill line",
+        "Show material flow rate and pressure readings",
+    ],
+    "logistics_agent": [
+        "Track shipments",
+        "Where is order ORD1002",
+        "When will shipment SH003 be delivered",
+        "Show scheduled deliveries for next week",
+        "Which carrier is handling the high priority orders",
+        "Optimize delivery schedules and carrier selection",
+        "Order fulfillment and tracking",
+        "What are the shipping costs this month",
+        "List shipments in transit",
+        "Delivery performance and on time rate",
+        "Reschedule the delivery for customer B",
+        "Get the tracking number for customer A",
+        "Which orders are still preparing for dispatch",
+    ],
+    "maintenance_agent": [
+        "Which machines need maintenance",
+        "Predict equipment failures",
+        "Schedule preventive maintenance for M001",
+        "What is the failure probability of the welder",
+        "Equipment health and repairs",
+        "When is the next maintenance due",
+        "Minimize unplanned downtime",
+        "Hours since last maintenance for each machine",
+        "Machine M003 is vibrating, does it need repair",
+        "Show maintenance priority list",
+        "Book a repair window for the conveyor",
+        "Predictive maintenance risk ranking",
+    ],
+    "quality_control_agent": [
+        "What is the defect rate",
+        "Show failed inspections",
+        "Quality monitoring and defect tracking",
+        "Which batches require rework",
+        "Quality compliance report",
+        "What types of defects are we seeing",
+        "Inspection status for batch B1234",
+        "Which inspector failed the most batches",
+        "Quality score trend for product PX003",
+        "Root cause of surface defects",
+        "How many inspections passed today",
+        "Track rework and scrap",
+    ],
+    SUPERVISOR: [
+        "We have a major order: coordinate inventory, production, and logistics",
+        "Machine M003 has quality issues",
+        "Coordinate maintenance and production for the downtime window",
+        "Give me an overview of the whole factory",
+        "How is the plant doing overall",
+        "Can we fulfil a rush order of 2000 units next week",
+        "Do we have enough material and capacity for the new order and can we ship it on time",
+        "Summarize all agents status",
+        "Resolve the conflict between maintenance schedule and production plan",
+        "What should I focus on today",
+        "Plan for the new customer contract across all departments",
+        "Hello",
+        "What can you do",
+    ],
+}
+
+# Identifier patterns are strong domain hints; map them to shared tokens
+_ID_PATTERNS = [
+    (re.compile(r"\bmat\d+\b"), " idmaterial "),
+    (re.compile(r"\b(?:sh|ord|trk)\d+\b"), " idshipment "),
+    (re.compile(r"\bb\d{3,}\b"), " idbatch "),
+    (re.compile(r"\bpx\d+\b"), " idproduct "),
+    (re.compile(r"\bm\d{3}\b"), " idmachine "),
+]
+_TOKEN = re.compile(r"[a-z]+")
+_STOPWORDS = frozenset(
+    "a an the is are was were be to of for in on at and or do does did we our i me my you "
+    "your it its this that what which who how when where can could should would with from by "
+    "any all some there have has had give show tell please".split()
+)
+
+# Route only when the best domain is clearly ahead
+MIN_SCORE = float(os.getenv("ROUTER_MIN_SCORE", "0.2"))
+MIN_MARGIN = float(os.getenv("ROUTER_MIN_MARGIN", "0.08"))
+
+
+def _stem(word: str) -> str:
+    for suffix in ("ing", "ies", "es", "ed", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    text = text.lower()
+    for pattern, token in _ID_PATTERNS:
+        text = pattern.sub(token, text)
+    words = [_stem(w) for w in _TOKEN.findall(text) if w not in _STOPWORDS]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class RoutingDecision:
+    def __init__(self, agent: Optional[str], label: str, score: float, margin: float, elapsed_us: float):
+        self.agent = agent  # None = let the supervisor decide
+        self.label = label
+        self.score = score
+        self.margin = margin
+        self.elapsed_us = elapsed_us
+
+    def as_dict(self) -> dict:
+        return {
+            "agent": self.agent,
+            "label": self.label,
+            "score": round(self.score, 3),
+            "margin": round(self.margin, 3),
+            "elapsed_us": round(self.elapsed_us, 1),
+        }
+
+
+class KeywordRouter:
+    """TF-IDF nearest-centroid classifier over the labelled examples"""
+
+    def __init__(
+        self,
+        examples: Optional[Dict[str, List[str]]] = None,
+        min_score: float = MIN_SCORE,
+        min_margin: float = MIN_MARGIN,
+    ):
+        examples = examples or TRAINING_EXAMPLES
+        self.min_score = min_score
+        self.min_margin = min_margin
+
+        docs = [(label, tokenize(text)) for label, texts in examples.items() for text in texts]
+        df = Counter(term for _, tokens in docs for term in set(tokens))
+        self.idf = {term: math.log((1 + len(docs)) / (1 + n)) + 1 for term, n in df.items()}
+
+        self.centroids: Dict[str, Dict[str, float]] = {}
+        for label in examples:
+            centroid: Counter = Counter()
+            for doc_label, tokens in docs:
+                if doc_label == label:
+                    centroid.update(self._vector(tokens))
+            self.centroids[label] = self._normalize(centroid)
+
+        self.routed = 0
+        self.fallbacks = 0
+
+    def _vector(self, tokens: List[str]) -> Dict[str, float]:
+        counts = Counter(tokens)
+        vector = {t: (1 + math.log(n)) * self.idf[t] for t, n in counts.items() if t in self.idf}
+        return self._normalize(vector)
+
+    @staticmethod
+    def _normalize(vector: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        return {t: v / norm for t, v in vector.items()} if norm else {}
+
+    def scores(self, text: str) -> List[Tuple[str, float]]:
+        vector = self._vector(tokenize(text))
+        ranked = [
+            (label, sum(w * centroid.get(t, 0.0) for t, w in vector.items()))
+            for label, centroid in self.centroids.items()
+        ]
+        return sorted(ranked, key=lambda item: -item[1])
+
+    def route(self, text: str) -> RoutingDecision:
+        start = time.perf_counter()
+        ranked = self.scores(text)
+        (label, score), (_, runner_up) = ranked[0], ranked[1]
+        margin = score - runner_up
+        confident = label != SUPERVISOR and score >= self.min_score and margin >= self.min_margin
+        if confident:
+            self.routed += 1
+        else:
+            self.fallbacks += 1
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        return RoutingDecision(label if confident else None, label, score, margin, elapsed_us)
+
+    def stats(self) -> dict:
+        total = self.routed + self.fallbacks
+        return {
+            "routed": self.routed,
+            "fallbacks": self.fallbacks,
+            "routed_share": round(self.routed / total, 3) if total else 0.0,
+        }
+
+
+router = KeywordRouter()
+
+
+def fast_route(callback_context, llm_request):
+    """
+    before_model_callback for the supervisory agent.
+
+    On the first model call of a turn, a confident single-domain request is
+    answered with a transfer_to_agent function call instead of a Gemini
+    round-trip; ADK then hands the turn to that sub-agent as usual.
+    Set FAST_ROUTER=0 to disable.
+    """
+    if os.getenv("FAST_ROUTER", "1") == "0":
+        return None
+
+    events = callback_context._invocation_context.session.events
+    if not events or events[-1].author != "user":
+        return None  # mid-turn (tool results, transfers back): supervisor decides
+    parts = (events[-1].content.parts if events[-1].content else None) or []
+    text = " ".join(part.text for part in parts if part.text)
+    if not text.strip():
+        return None
+
+    decision = router.route(text)
+    if decision.agent is None:
+        return None
+
+    from google.adk.models import LlmResponse
+    from google.genai import types
+
+    print(f"[router] '{text[:60]}' -> {decision.agent} ({decision.as_dict()})")
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[
+                types.Part(
+                    function_call=types.FunctionCall(
+                        name="transfer_to_agent", args={"agent_name": decision.agent}
+                    )
+                )
+            ],
+        )
+    )
@@ -0,0 +1,419 @@
+# supervisory_agent/tools/scheduling.py
+# Deterministic job-to-machine scheduler for the production agent, so plans
+# come from a solver instead of the LLM doing arithmetic over machine rows.
+# Capacity per machine and operation type comes from production_data.csv,
+# maintenance windows from the machine status and maintenance_data.csv, and
+# material limits from inventory stock. Jobs are dispatched earliest-finish
+# in due-date order (priority breaks ties), then a relocation local search reduces weighted
+# tardiness until no move helps or the time limit is reached.
+# NumPy/pandas are imported inside the functions that need them.
+import bisect
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from .data_store import store
+
+PRIORITY_WEIGHTS = {"high": 3.0, "medium": 2.0, "low": 1.0}
+MAINTENANCE_WINDOW_HOURS = 4.0
+DEFAULT_HORIZON_HOURS = 168.0
+DEFAULT_TIME_LIMIT_SECONDS = 2.0
+# Relocation candidates per tardy job: the least loaded compatible machines
+CANDIDATE_MACHINES = 16
+MAX_ITEMS = 50
+
+
+class Machine:
+    def __init__(self, machine_id: str, rates: Dict[str, float], windows: List[Tuple[float, float]]):
+        self.machine_id = machine_id
+        self.rates = rates  # units/hour per machine_type the machine can run
+        self.windows = sorted(windows)  # (start, end) hours from the schedule start
+        self.best_rate = max(rates.values())
+
+
+class Job:
+    def __init__(
+        self,
+        job_id: str,
+        quantity: float,
+        due: float,
+        weight: float = 1.0,
+        machine_type: Optional[str] = None,
+        materials: Optional[Dict[str, float]] = None,
+    ):
+        self.job_id = job_id
+        self.quantity = quantity
+        self.due = due  # hours from the schedule start
+        self.weight = weight
+        self.machine_type = machine_type  # None = any machine, at its best rate
+        self.materials = materials or {}  # material_id -> quantity per unit
+
+    def key(self) -> Tuple[float, float, float]:
+        """Dispatch and per-machine sequence order: due date, then priority, longest first."""
+        return (self.due, -self.weight, -self.quantity)
+
+
+def place(ready: float, duration: float, windows: List[Tuple[float, float]]) -> float:
+    """Earliest start >= ready where [start, start + duration) misses every window."""
+    start = ready
+    for window_start, window_end in windows:
+        if start + duration <= window_start:
+            break
+        if start < window_end:
+            start = window_end
+    return start
+
+
+class Scheduler:
+    """Earliest-finish dispatch plus relocation local search over a fixed horizon"""
+
+    def __init__(self, machines: List[Machine], horizon: float, stock: Optional[Dict[str, float]] = None):
+        import numpy as np
+
+        self.machines = machines
+        self.horizon = horizon
+        self.stock = dict(stock or {})
+
+        # machine_type -> (machine indices, rates); None = every machine at its best rate
+        self._groups: Dict[Optional[str], Tuple[Any, Any]] = {
+            None: (np.arange(len(machines)), np.array([m.best_rate for m in machines], dtype=float))
+        }
+        for machine_type in sorted({t for m in machines for t in m.rates}):
+            idx = [i for i, m in enumerate(machines) if machine_type in m.rates]
+            self._groups[machine_type] = (
+                np.array(idx),
+                np.array([machines[i].rates[machine_type] for i in idx], dtype=float),
+            )
+
+    def _rate(self, job: Job, machine: int) -> float:
+        m = self.machines[machine]
+        return m.best_rate if job.machine_type is None else m.rates[job.machine_type]
+
+    def _timeline(self, machine: int, sequence: List[int], jobs: List[Job]):
+        """Start/end of each job run back to back in `sequence`, and the weighted tardiness."""
+        windows = self.machines[machine].windows
+        t = cost = 0.0
+        spans = []
+        for j in sequence:
+            job = jobs[j]
+            duration = job.quantity / self._rate(job, machine)
+            start = place(t, duration, windows)
+            t = start + duration
+            spans.append((start, t))
+            cost += job.weight * max(0.0, t - job.due)
+        return spans, cost, t
+
+    def solve(self, jobs: List[Job], time_limit: float = DEFAULT_TIME_LIMIT_SECONDS) -> Dict[str, Any]:
+        import numpy as np
+
+        started = time.perf_counter()
+        deadline = started + time_limit
+        machines = self.machines
+        free = np.zeros(len(machines))
+        sequences: List[List[int]] = [[] for _ in machines]
+        start_at: Dict[int, float] = {}
+        end_at: Dict[int, float] = {}
+        machine_of: Dict[int, int] = {}
+        unscheduled: List[Tuple[int, str]] = []
+        stock = dict(self.stock)
+
+        # 1. Dispatch: each job to the machine where it finishes first
+        for j in sorted(range(len(jobs)), key=lambda j: jobs[j].key()):
+            job = jobs[j]
+            group = self._groups.get(job.machine_type)
+            if group is None:
+                unscheduled.append((j, f"no available machine of type {job.machine_type}"))
+                continue
+            short = [
+                f"{material} short by {round(need * job.quantity - stock.get(material, 0.0), 2)}"
+                for material, need in job.materials.items()
+                if need * job.quantity > stock.get(material, 0.0)
+            ]
+            if short:
+                unscheduled.append((j, "; ".join(short)))
+                continue
+
+            idx, rates = group
+            durations = job.quantity / rates
+            finish = free[idx] + durations  # lower bound; windows can only push it later
+            exact = np.zeros(len(idx), dtype=bool)
+            while True:
+                k = int(np.argmin(finish))
+                if exact[k]:
+                    break
+                m = machines[idx[k]]
+                finish[k] = place(free[idx[k]], durations[k], m.windows) + durations[k]
+                exact[k] = True
+            machine = int(idx[k])
+            if finish[k] > self.horizon:
+                unscheduled.append((j, "no capacity within the horizon"))
+                continue
+
+            for material, need in job.materials.items():
+                stock[material] = stock.get(material, 0.0) - need * job.quantity
+            machine_of[j] = machine
+            sequences[machine].append(j)
+            start_at[j], end_at[j] = finish[k] - durations[k], float(finish[k])
+            free[machine] = finish[k]
+        dispatch_ms = (time.perf_counter() - started) * 1000
+
+        # 2. Local search: move tardy jobs to machines where the total weighted tardiness drops
+        costs = [self._timeline(i, seq, jobs)[1] for i, seq in enumerate(sequences)]
+        moves = 0
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            tardy = sorted(
+                (j for j in end_at if end_at[j] > jobs[j].due),
+                key=lambda j: -jobs[j].weight * (end_at[j] - jobs[j].due),
+            )
+            for j in tardy:
+                if time.perf_counter() >= deadline:
+                    break
+                job, a = jobs[j], machine_of[j]
+                seq_a = [x for x in sequences[a] if x != j]
+                spans_a, cost_a, _ = self._timeline(a, seq_a, jobs)
+
+                idx, _ = self._groups[job.machine_type]
+                loads = free[idx]
+                nearest = idx[np.argsort(loads)[: CANDIDATE_MACHINES + 1]]
+                best = None
+                for b in (int(b) for b in nearest if b != a):
+                    keys = [jobs[x].key() for x in sequences[b]]
+                    seq_b = list(sequences[b])
+                    seq_b.insert(bisect.bisect(keys, job.key()), j)
+                    spans_b, cost_b, end_b = self._timeline(b, seq_b, jobs)
+                    if end_b > self.horizon:
+                        continue
+                    delta = cost_a + cost_b - costs[a] - costs[b]
+                    if delta < -1e-9 and (best is None or delta < best[0]):
+                        best = (delta, b, seq_b, spans_b, cost_b, end_b)
+                if best is None:
+                    continue
+
+                _, b, seq_b, spans_b, cost_b, end_b = best
+                for i, seq, spans, cost in ((a, seq_a, spans_a, cost_a), (b, seq_b, spans_b, cost_b)):
+                    sequences[i], costs[i] = seq, cost
+                    free[i] = spans[-1][1] if spans else 0.0
+                    for x, (s, e) in zip(seq, spans):
+                        start_at[x], end_at[x] = s, e
+                        machine_of[x] = i
+                moves += 1
+                improved = True
+
+        return {
+            "assignments": sorted(
+                ((j, machine_of[j], start_at[j], end_at[j]) for j in end_at), key=lambda a: (a[2], a[1])
+            ),
+            "unscheduled": unscheduled,
+            "busy_hours": {i: sum(e - s for s, e in self._timeline(i, seq, jobs)[0]) for i, seq in enumerate(sequences) if seq},
+            "weighted_tardiness": round(sum(costs), 3),
+            "solver": {
+                "dispatch_ms": round(dispatch_ms, 2),
+                "improve_ms": round((time.perf_counter() - started) * 1000 - dispatch_ms, 2),
+                "moves": moves,
+                "time_limit_s": time_limit,
+            },
+        }
+
+
+# ---------------------------------------------------------------------------
+# Factory data -> solver inputs
+# ---------------------------------------------------------------------------
+
+
+def _hours(moment: datetime, start: datetime) -> float:
+    return (moment - start).total_seconds() / 3600
+
+
+def _merge(windows: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    merged: List[Tuple[float, float]] = []
+    for s, e in sorted(windows):
+        if merged and s <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+        else:
+            merged.append((s, e))
+    return merged
+
+
+def load_machines(start: datetime, horizon: float, window_hours: float = MAINTENANCE_WINDOW_HOURS) -> List[Machine]:
+    """
+    One Machine per machine_id with an output rate (units/hour) for each
+    machine_type it has run while operational. Maintenance windows: now for
+    machines currently in maintenance or flagged needs_attention, and at
+    next_maintenance_due (or now, if overdue) when that falls in the horizon.
+    """
+    import pandas as pd
+
+    production = store.frame("production")
+    maintenance = store.frame("maintenance")
+
+    ordered = production.sort_values("timestamp")
+    latest_status = ordered.groupby("machine_id")["status"].last()
+    running = ordered[ordered["status"] == "operational"]
+    rate = running["output_rate"].where(running["output_rate"] > 0, 3600 / running["cycle_time"])
+    rates = rate.groupby([running["machine_id"], running["machine_type"]]).mean()
+
+    windows: Dict[str, List[Tuple[float, float]]] = {}
+    for machine_id, status in latest_status.items():
+        if status == "maintenance":
+            windows.setdefault(machine_id, []).append((0.0, window_hours))
+    for row in maintenance.itertuples(index=False):
+        due = pd.to_datetime(row.next_maintenance_due, errors="coerce")
+        if row.status == "needs_attention":
+            at = 0.0
+        elif pd.notna(due) and _hours(due.to_pydatetime(), start) < horizon:
+            at = max(0.0, _hours(due.to_pydatetime(), start))
+        else:
+            continue
+        windows.setdefault(row.machine_id, []).append((at, at + window_hours))
+
+    per_machine: Dict[str, Dict[str, float]] = {}
+    for (machine_id, machine_type), value in rates.items():
+        if value > 0:
+            per_machine.setdefault(machine_id, {})[machine_type] = float(value)
+    return [
+        Machine(machine_id, machine_rates, _merge(windows.get(machine_id, [])))
+        for machine_id, machine_rates in sorted(per_machine.items())
+    ]
+
+
+def parse_datetime(value: Any) -> datetime:
+    """ISO date/time as naive UTC, like the timestamps ingestion stores."""
+    parsed = datetime.fromisoformat(str(value))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _parse_time(value: Any, start: datetime) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _hours(parse_datetime(value), start)
+
+
+def parse_jobs(raw: List[dict], start: datetime, horizon: float) -> List[Job]:
+    jobs = []
+    for n, item in enumerate(raw):
+        quantity = float(item.get("quantity", 0))
+        if quantity <= 0:
+            raise ValueError(f"Job {n}: quantity must be positive")
+        priority = item.get("priority", "medium")
+        weight = float(priority) if isinstance(priority, (int, float)) else PRIORITY_WEIGHTS.get(str(priority), 1.0)
+        due = item.get("due")
+        jobs.append(
+            Job(
+                job_id=str(item.get("job_id") or f"J{n + 1:04d}"),
+                quantity=quantity,
+                due=horizon if due in (None, "") else _parse_time(due, start),
+                weight=weight,
+                machine_type=item.get("machine_type") or None,
+                materials={str(k): float(v) for k, v in (item.get("materials") or {}).items()},
+            )
+        )
+    return jobs
+
+
+def open_order_jobs() -> List[dict]:
+    """Jobs for every shipment not yet in transit or delivered."""
+    shipments = store.frame("logistics")
+    pending = shipments[shipments["status"].isin(["scheduled", "preparing"])]
+    return [
+        {"job_id": row.order_id, "quantity": row.quantity, "due": str(row.scheduled_date), "priority": row.priority}
+        for row in pending.itertuples(index=False)
+    ]
+
+
+def schedule_production(
+    jobs: List[dict], horizon_hours: float, time_limit_seconds: float, start_time: str
+) -> dict:
+    """
+    Assign production jobs to machines with a deterministic solver.
+
+    Use this instead of working out schedules by hand. It respects machine
+    capacity (output rate per machine and machine type), maintenance windows
+    and material stock, and minimizes priority-weighted lateness.
+
+    Args:
+        jobs: list of {"job_id", "quantity", "due" (ISO date/time or hours
+            from start), "priority" (high/medium/low), "machine_type"
+            (optional, e.g. "Welder"), "materials" (optional,
+            {material_id: quantity per unit})}. Empty list = schedule all
+            open orders from logistics.
+        horizon_hours: planning horizon; 0 = one week
+        time_limit_seconds: solver time limit; 0 = 2 seconds
+        start_time: ISO start of the schedule; "" = latest production reading
+
+    Returns:
+        Summary (makespan, late jobs, utilization per machine), the first 50
+        assignments by start time and any jobs that could not be scheduled
+    """
+    try:
+        horizon = float(horizon_hours or DEFAULT_HORIZON_HOURS)
+        time_limit = float(time_limit_seconds or DEFAULT_TIME_LIMIT_SECONDS)
+        if start_time:
+            start = parse_datetime(start_time)
+        else:
+            start = datetime.fromisoformat(str(store.frame("production")["timestamp"].max()))
+
+        job_list = parse_jobs(jobs or open_order_jobs(), start, horizon)
+        machines = load_machines(start, horizon)
+        if not machines:
+            return {"success": False, "error": "No operational machines in production data"}
+        stock = dict(zip(store.frame("inventory")["material_id"], store.frame("inventory")["current_stock"].astype(float)))
+
+        result = Scheduler(machines, horizon, stock).solve(job_list, time_limit)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    def at(hours: float) -> str:
+        return (start + timedelta(hours=hours)).isoformat(timespec="minutes")
+
+    assignments = result["assignments"]
+    late = [(j, end - job_list[j].due) for j, _, _, end in assignments if end > job_list[j].due + 1e-9]
+    makespan = max((end for *_, end in assignments), default=0.0)
+    utilization = sorted(
+        (
+            {
+                "machine_id": machines[i].machine_id,
+                "busy_hours": round(busy, 2),
+                "utilization": round(busy / makespan, 3) if makespan else 0.0,
+            }
+            for i, busy in result["busy_hours"].items()
+        ),
+        key=lambda u: -u["busy_hours"],
+    )
+    return {
+        "success": True,
+        "start": at(0.0),
+        "horizon_hours": horizon,
+        "machines": len(machines),
+        "maintenance_windows": {
+            m.machine_id: [[at(s), at(e)] for s, e in m.windows] for m in machines if m.windows
+        },
+        "jobs": len(job_list),
+        "scheduled": len(assignments),
+        "makespan_end": at(makespan),
+        "late_jobs": len(late),
+        "on_time_rate": round(1 - len(late) / len(assignments), 3) if assignments else None,
+        "weighted_tardiness_hours": result["weighted_tardiness"],
+        "utilization": utilization[:MAX_ITEMS],
+        "assignments": [
+            {
+                "job_id": job_list[j].job_id,
+                "machine_id": machines[i].machine_id,
+                "machine_type": job_list[j].machine_type,
+                "quantity": job_list[j].quantity,
+                "start": at(s),
+                "end": at(e),
+                "late_hours": round(max(0.0, e - job_list[j].due), 2),
+            }
+            for j, i, s, e in assignments[:MAX_ITEMS]
+        ],
+        "assignments_omitted": max(0, len(assignments) - MAX_ITEMS),
+        "unscheduled": [
+            {"job_id": job_list[j].job_id, "reason": reason} for j, reason in result["unscheduled"][:MAX_ITEMS]
+        ],
+        "unscheduled_total": len(result["unscheduled"]),
+        "solver": result["solver"],
+    }
@@ -0,0 +1,25 @@
+# supervisory_agent/tools/shifts.py
+# The plant's shift calendar, shared by everything that labels, buckets or
+# plans by shift: three 8-hour shifts starting at midnight, as
+# generate_csv_data.py labels production_data.csv (night 00-08, morning
+# 08-16, afternoon 16-24).
+from typing import Dict, Tuple
+
+# (name, first hour, end hour) in hours of the day
+SHIFTS: Tuple[Tuple[str, int, int], ...] = (("night", 0, 8), ("morning", 8, 16), ("afternoon", 16, 24))
+SHIFT_LENGTH_HOURS = 8
+SHIFT_FREQ = f"{SHIFT_LENGTH_HOURS}h"  # pandas frequency of shift-aligned buckets
+SHIFT_NAMES: Dict[int, str] = {start: name for name, start, _ in SHIFTS}
+
+
+def shift_of(hour: int) -> str:
+    """Name of the shift an hour of the day (0-23) falls in."""
+    return SHIFTS[int(hour) // SHIFT_LENGTH_HOURS][0]
+
+
+def shift_names(hours):
+    """Vectorized shift_of over an array of hours of the day."""
+    import numpy as np
+
+    names = np.array([name for name, _, _ in SHIFTS])
+    return names[np.asarray(hours, dtype=np.int64) // SHIFT_LENGTH_HOURS]
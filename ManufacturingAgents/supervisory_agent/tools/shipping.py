@@ -0,0 +1,371 @@
+# supervisory_agent/tools/shipping.py
+# Shipment consolidation and carrier assignment for the logistics agent.
+# Open shipments to the same customer whose date windows overlap are packed
+# into loads (up to a unit capacity), and each load goes to the cheapest
+# carrier allowed for its most urgent shipment. Carrier costs are a fixed
+# charge plus a per-unit rate fitted to estimated_cost history; a carrier
+# may take a priority class it (or a higher one) has been used for before.
+# ShipmentIndex keeps status/carrier/date lookups over logistics_data.csv and
+# is rebuilt only after the logistics domain changes, as is the cached plan.
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .data_store import store
+
+OPEN_STATUSES = ("scheduled", "preparing")
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+# Days a shipment may leave before / after its scheduled date
+MAX_ADVANCE_DAYS = 3
+MAX_DELAY_DAYS = {"high": 0, "medium": 1, "low": 3}
+DEFAULT_LOAD_UNITS = 2000.0
+MAX_ITEMS = 50
+
+
+class ShipmentIndex:
+    """Status, carrier and date lookups over the logistics frame"""
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._stale = True
+        self.version = 0
+        self.builds = 0
+        store.subscribe(self._on_change)
+
+    def _on_change(self, domain: str) -> None:
+        if domain == "logistics":
+            self._stale = True
+
+    def _build(self) -> None:
+        import numpy as np
+        import pandas as pd
+
+        # Clear first, then read: a change landing meanwhile marks the index stale again
+        self._stale = False
+        df = self.store.frame("logistics").reset_index(drop=True)
+        days = pd.to_datetime(df["scheduled_date"], errors="coerce").to_numpy("datetime64[D]")
+        order = np.argsort(days, kind="stable")
+        self._frame = df
+        self._days = days
+        self._date_order = order
+        self._sorted_days = days[order]
+        self._by_status = {str(k): v for k, v in df.groupby("status").indices.items()}
+        self._by_carrier = {str(k): v for k, v in df.groupby("carrier").indices.items()}
+        self.version += 1
+        self.builds += 1
+
+    def snapshot(self):
+        """(frame, scheduled days, version), rebuilt first if logistics changed."""
+        self.store.frame("logistics")  # mtime check; an edited CSV marks the index stale
+        with self._lock:
+            if self._stale:
+                self._build()
+            return self._frame, self._days, self.version
+
+    def lookup(
+        self,
+        status: Optional[List[str]] = None,
+        carrier: Optional[List[str]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ):
+        """(frame, scheduled days, row positions) from one build.
+
+        Rows match every given filter and are in scheduled-date order; they
+        index into the returned frame, not whatever a later snapshot holds.
+        """
+        import numpy as np
+
+        self.store.frame("logistics")
+        with self._lock:
+            if self._stale:
+                self._build()
+            lo = np.searchsorted(self._sorted_days, np.datetime64(date_from, "D")) if date_from else 0
+            hi = (
+                np.searchsorted(self._sorted_days, np.datetime64(date_to, "D"), side="right")
+                if date_to
+                else len(self._sorted_days)
+            )
+            rows = self._date_order[lo:hi]
+            for values, index in ((status, self._by_status), (carrier, self._by_carrier)):
+                if values:
+                    wanted = [index[v] for v in values if v in index]
+                    rows = rows[np.isin(rows, np.concatenate(wanted))] if wanted else rows[:0]
+            return self._frame, self._days, rows
+
+
+shipment_index = ShipmentIndex(store)
+
+
+# ---------------------------------------------------------------------------
+# Carrier cost model
+# ---------------------------------------------------------------------------
+
+
+class Carrier:
+    def __init__(self, name: str, fixed: float, per_unit: float, best_priority: int):
+        self.name = name
+        self.fixed = fixed
+        self.per_unit = per_unit
+        self.best_priority = best_priority  # most urgent class (rank) it may carry
+
+    def cost(self, units: float) -> float:
+        return self.fixed + self.per_unit * units
+
+
+def fit_carriers(df) -> List[Carrier]:
+    """cost = fixed + per_unit * quantity per carrier (least squares, both >= 0)."""
+    import numpy as np
+
+    carriers = []
+    for name, group in df.dropna(subset=["carrier", "estimated_cost"]).groupby("carrier"):
+        qty = group["quantity"].to_numpy(dtype=float)
+        cost = group["estimated_cost"].to_numpy(dtype=float)
+        if len(np.unique(qty)) >= 2:
+            per_unit, fixed = np.polyfit(qty, cost, 1)
+        else:
+            per_unit, fixed = cost.sum() / qty.sum(), 0.0
+        if per_unit < 0 or fixed < 0:  # degenerate fit: fall back to a pure unit rate
+            per_unit, fixed = cost.sum() / qty.sum(), 0.0
+        ranks = group["priority"].map(PRIORITY_RANK).dropna()
+        carriers.append(
+            Carrier(str(name), float(fixed), float(per_unit), int(ranks.min()) if len(ranks) else 2)
+        )
+    return carriers
+
+
+# ---------------------------------------------------------------------------
+# Consolidation
+# ---------------------------------------------------------------------------
+
+
+def consolidate(
+    customers,
+    quantities,
+    earliest,
+    latest,
+    ranks,
+    max_units: float,
+) -> List[List[int]]:
+    """
+    Group shipments into loads: same customer, a common ship day inside every
+    member's [earliest, latest] window, and at most `max_units` per load.
+    Greedy by window end, which gives the fewest loads per customer when
+    capacity does not bind.
+    """
+    import numpy as np
+
+    loads: List[List[int]] = []
+    order = np.lexsort((ranks, latest, customers))
+    current: List[int] = []
+    customer = None
+    window_start = window_end = units = 0
+    for i in order:
+        i = int(i)
+        fits = (
+            current
+            and customers[i] == customer
+            and earliest[i] <= window_end
+            and units + quantities[i] <= max_units
+        )
+        if fits:
+            current.append(i)
+            window_start = max(window_start, earliest[i])
+            units += quantities[i]
+        else:
+            if current:
+                loads.append(current)
+            current = [i]
+            customer = customers[i]
+            window_start, window_end, units = earliest[i], latest[i], quantities[i]
+    if current:
+        loads.append(current)
+    return loads
+
+
+def plan(
+    index: ShipmentIndex, max_units: float = DEFAULT_LOAD_UNITS, advance_days: int = MAX_ADVANCE_DAYS
+) -> Dict[str, Any]:
+    import numpy as np
+
+    started = time.perf_counter()
+    df, days, rows = index.lookup(status=list(OPEN_STATUSES))
+    carriers = fit_carriers(df)
+    if not carriers:
+        raise ValueError("No carrier cost history in logistics data")
+
+    rows = rows[~np.isnat(days[rows])]
+    open_df = df.iloc[rows]
+    quantities = open_df["quantity"].to_numpy(dtype=float)
+    too_big = quantities > max_units
+    ranks = open_df["priority"].map(PRIORITY_RANK).fillna(2).to_numpy(dtype=int)
+    scheduled = days[rows].astype(np.int64)
+    delay = open_df["priority"].map(MAX_DELAY_DAYS).fillna(0).to_numpy(dtype=np.int64)
+    customers = open_df["customer"].astype(str).to_numpy()
+
+    # Oversize shipments travel alone; the rest are packed into loads
+    small = np.flatnonzero(~too_big)
+    packed = consolidate(
+        customers[small],
+        quantities[small],
+        scheduled[small] - advance_days,
+        scheduled[small] + delay[small],
+        ranks[small],
+        max_units,
+    )
+    loads = [[int(small[j]) for j in load] for load in packed] + [[int(i)] for i in np.flatnonzero(too_big)]
+
+    fixed = np.array([c.fixed for c in carriers])
+    per_unit = np.array([c.per_unit for c in carriers])
+    best = np.array([c.best_priority for c in carriers])
+
+    def cheapest(units, rank):
+        """Cheapest allowed carrier and its cost for each (units, priority rank) pair."""
+        costs = fixed + per_unit * units[:, None]
+        allowed = best <= rank[:, None]
+        allowed[~allowed.any(axis=1)] = True  # nobody has carried this class yet: allow all
+        costs = np.where(allowed, costs, np.inf)
+        k = np.argmin(costs, axis=1)
+        return k, costs[np.arange(len(k)), k]
+
+    # Per-load totals with one vectorized pass: members laid out load by load
+    members = np.concatenate([np.asarray(load, dtype=np.int64) for load in loads]) if loads else np.zeros(0, np.int64)
+    sizes = np.array([len(load) for load in loads], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]) if loads else sizes
+    load_units = np.add.reduceat(quantities[members], starts) if loads else np.zeros(0)
+    load_rank = np.minimum.reduceat(ranks[members], starts) if loads else sizes
+    carrier_k, load_cost = cheapest(load_units, load_rank)
+    _, alone_cost = cheapest(quantities[members], ranks[members])
+    standalone = np.add.reduceat(alone_cost, starts) if loads else np.zeros(0)
+
+    current_carrier = open_df["carrier"].astype(str).to_numpy()
+    current_cost = open_df["estimated_cost"].fillna(0).to_numpy(dtype=float)
+    shipment_ids = open_df["shipment_id"].astype(str).to_numpy()
+    names = np.array([c.name for c in carriers])
+    priority_names = {r: p for p, r in PRIORITY_RANK.items()}
+    planned = []
+    for n, load in enumerate(loads):
+        carrier = names[carrier_k[n]]
+        ship_day = max(int((scheduled[load] - advance_days).max()), int(scheduled[load].min()))
+        planned.append(
+            {
+                "customer": customers[load[0]],
+                "ship_date": str(np.datetime64(ship_day, "D")),
+                "carrier": str(carrier),
+                "priority": priority_names[int(load_rank[n])],
+                "shipments": shipment_ids[load].tolist(),
+                "quantity": float(load_units[n]),
+                "cost": round(float(load_cost[n]), 2),
+                "standalone_cost": round(float(standalone[n]), 2),
+                "current_cost": round(float(current_cost[load].sum()), 2),
+                "carrier_changes": int((current_carrier[load] != carrier).sum()),
+                "oversize": bool(too_big[load[0]]),
+            }
+        )
+    planned.sort(key=lambda load: (load["ship_date"], PRIORITY_RANK[load["priority"]]))
+
+    total = sum(load["cost"] for load in planned)
+    current = float(current_cost.sum())
+    return {
+        "open_shipments": int(len(rows)),
+        "loads": planned,
+        "consolidated_loads": sum(len(load["shipments"]) > 1 for load in planned),
+        "planned_cost": round(total, 2),
+        "current_cost": round(current, 2),
+        "savings": round(current - total, 2),
+        "carriers": [
+            {
+                "carrier": c.name,
+                "fixed": round(c.fixed, 2),
+                "per_unit": round(c.per_unit, 4),
+                "max_priority": priority_names[c.best_priority],
+            }
+            for c in carriers
+        ],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+class PlanCache:
+    """Last plan per parameter set, reused until the logistics data changes"""
+
+    def __init__(self, index: ShipmentIndex):
+        self.index = index
+        self._plans: Dict[Tuple[int, float, int], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, max_units: float, advance_days: int) -> Dict[str, Any]:
+        _, _, version = self.index.snapshot()
+        key = (version, max_units, advance_days)
+        with self._lock:
+            cached = self._plans.get(key)
+        if cached is not None:
+            return cached
+        result = plan(self.index, max_units, advance_days)
+        with self._lock:
+            self._plans = {k: v for k, v in self._plans.items() if k[0] == version}
+            self._plans[key] = result
+        return result
+
+
+shipping_plans = PlanCache(shipment_index)
+
+
+def plan_shipments(max_load_units: float, consolidation_days: int) -> dict:
+    """
+    Consolidate open shipments into loads and pick the cheapest allowed
+    carrier for each. Re-run it whenever orders change; it is fast.
+
+    Shipments to the same customer are combined when they can leave on a
+    common day: up to `consolidation_days` early, and late only by priority
+    (high 0, medium 1, low 3 days). A carrier may take high-priority loads
+    only if it has carried high-priority shipments before.
+
+    Args:
+        max_load_units: capacity of one load in units; 0 = 2000
+        consolidation_days: how many days early a shipment may leave to join a load; 0 = 3
+
+    Returns:
+        Loads (first 50 by ship date) with carrier, shipments, cost, cost if
+        shipped separately and current estimated cost, plus total savings
+        and the fitted carrier cost model
+    """
+    try:
+        result = shipping_plans.get(float(max_load_units or DEFAULT_LOAD_UNITS), int(consolidation_days or MAX_ADVANCE_DAYS))
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    loads = result["loads"]
+    return {
+        "success": True,
+        **{k: v for k, v in result.items() if k != "loads"},
+        "load_count": len(loads),
+        "loads": loads[:MAX_ITEMS],
+        "loads_omitted": max(0, len(loads) - MAX_ITEMS),
+    }
+
+
+def find_shipments(status: List[str], carrier: List[str], date_from: str, date_to: str) -> dict:
+    """
+    Indexed shipment lookup by status, carrier and scheduled date range.
+
+    Args:
+        status: e.g. ["scheduled", "preparing"]; [] = any
+        carrier: e.g. ["Carrier 1"]; [] = any
+        date_from: first scheduled date (YYYY-MM-DD); "" = open
+        date_to: last scheduled date (YYYY-MM-DD); "" = open
+
+    Returns:
+        Matching shipments in scheduled-date order (at most 50) and the total count
+    """
+    try:
+        df, _, rows = shipment_index.lookup(status or None, carrier or None, date_from or None, date_to or None)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    matches = df.iloc[rows[:MAX_ITEMS]]
+    return {
+        "success": True,
+        "count": int(len(rows)),
+        "shipments": matches.astype(object).where(matches.notna(), None).to_dict("records"),
+        "omitted": max(0, int(len(rows)) - MAX_ITEMS),
+    }
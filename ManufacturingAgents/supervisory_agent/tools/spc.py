@@ -0,0 +1,451 @@
+# supervisory_agent/tools/spc.py
+# Statistical process control over quality inspections for the quality
+# control agent. Every machine_id and product_id keeps running chart state
+# (X-bar/R and p-chart over subgroups of consecutive inspections, CUSUM and
+# EWMA over individual defect_rate values) that is updated in O(1) per
+# inspection, with Western Electric rules checked on each new X-bar point.
+# Limits are estimated from the first BASELINE_SUBGROUPS subgroups (or
+# BASELINE_POINTS inspections for CUSUM/EWMA) and frozen after that; until
+# then they are provisional running estimates.
+# The engine follows quality_data.csv: rows appended since the last sync are
+# fed in incrementally, any other change replays the whole table. The shared
+# engine syncs on a background thread shortly after each quality change and
+# reports violations found in new rows to its listeners.
+import copy
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .data_store import store
+
+SUBGROUP_SIZE = 5
+BASELINE_SUBGROUPS = 20
+BASELINE_POINTS = SUBGROUP_SIZE * BASELINE_SUBGROUPS
+# Shewhart constants for subgroups of 2..10
+A2 = {2: 1.880, 3: 1.023, 4: 0.729, 5: 0.577, 6: 0.483, 7: 0.419, 8: 0.373, 9: 0.337, 10: 0.308}
+D3 = {2: 0.0, 3: 0.0, 4: 0.0, 5: 0.0, 6: 0.0, 7: 0.076, 8: 0.136, 9: 0.184, 10: 0.223}
+D4 = {2: 3.267, 3: 2.574, 4: 2.282, 5: 2.114, 6: 2.004, 7: 1.924, 8: 1.864, 9: 1.816, 10: 1.777}
+CUSUM_K = 0.5  # allowance, in standard deviations
+CUSUM_H = 5.0  # decision interval, in standard deviations
+EWMA_LAMBDA = 0.2
+EWMA_L = 3.0
+RECENT_VIOLATIONS = 20  # kept per chart state, and engine-wide for alerts
+SYNC_DEBOUNCE_SECONDS = 0.25
+MAX_ITEMS = 20
+MAX_ALERTS = 5
+DIMENSIONS = {"machine": "machine_id", "product": "product_id"}
+
+
+class Running:
+    """Count, mean and variance (Welford) that can be frozen as a baseline"""
+
+    __slots__ = ("n", "mean", "m2", "frozen")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.frozen = False
+
+    def add(self, value: float, freeze_at: int) -> None:
+        if self.frozen:
+            return
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        self.frozen = self.n >= freeze_at
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+
+class WesternElectric:
+    """
+    The four Western Electric zone rules on a stream of standardized points,
+    O(1) per point (last five z-scores plus the current same-side run).
+    """
+
+    __slots__ = ("recent", "run_side", "run_length")
+
+    def __init__(self):
+        self.recent: Deque[float] = deque(maxlen=5)
+        self.run_side = 0
+        self.run_length = 0
+
+    def check(self, z: float) -> List[str]:
+        self.recent.append(z)
+        side = (z > 0) - (z < 0)
+        if side and side == self.run_side:
+            self.run_length += 1
+        else:
+            self.run_side, self.run_length = side, 1 if side else 0
+
+        rules = []
+        if abs(z) > 3:
+            rules.append("WE1: point beyond 3 sigma")
+        last = list(self.recent)
+        for sign in (1, -1):
+            if abs(z) > 2 and z * sign > 0 and sum(1 for v in last[-3:] if v * sign > 2) >= 2:
+                rules.append("WE2: 2 of 3 points beyond 2 sigma on one side")
+            if abs(z) > 1 and z * sign > 0 and sum(1 for v in last if v * sign > 1) >= 4:
+                rules.append("WE3: 4 of 5 points beyond 1 sigma on one side")
+        if self.run_length == 8:
+            rules.append("WE4: 8 consecutive points on one side of the center line")
+        return rules
+
+
+class ChartState:
+    """SPC state of one machine or product"""
+
+    def __init__(self, subgroup_size: int = SUBGROUP_SIZE):
+        self.subgroup_size = subgroup_size
+        self.inspections = 0
+        self.last_timestamp: Optional[str] = None
+        # Current, incomplete subgroup
+        self._sum = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+        self._failed = 0
+        self._count = 0
+        # X-bar/R and p-chart baselines (per completed subgroup)
+        self.xbar = Running()
+        self.ranges = Running()
+        self.p = Running()
+        self.xbar_rules = WesternElectric()
+        self.subgroups = 0
+        self.last_xbar: Optional[float] = None
+        self.last_range: Optional[float] = None
+        self.last_p: Optional[float] = None
+        # Individuals: CUSUM and EWMA
+        self.values = Running()
+        self.cusum_high = 0.0
+        self.cusum_low = 0.0
+        self.ewma: Optional[float] = None
+        self.ewma_points = 0
+        self.violations: Deque[Dict[str, Any]] = deque(maxlen=RECENT_VIOLATIONS)
+        self.violation_count = 0
+
+    def _flag(self, chart: str, rule: str, value: float, timestamp: str, batch_id: str) -> Dict[str, Any]:
+        violation = {"chart": chart, "rule": rule, "value": round(value, 3), "timestamp": timestamp, "batch_id": batch_id}
+        self.violations.append(violation)
+        self.violation_count += 1
+        return violation
+
+    def xbar_limits(self) -> Tuple[float, float, float]:
+        center = self.xbar.mean
+        spread = A2[self.subgroup_size] * self.ranges.mean
+        return center - spread, center, center + spread
+
+    def p_limits(self) -> Tuple[float, float, float]:
+        p = self.p.mean
+        spread = 3 * math.sqrt(max(p * (1 - p), 0.0) / self.subgroup_size)
+        return max(0.0, p - spread), p, min(1.0, p + spread)
+
+    def update(self, value: float, failed: bool, timestamp: str, batch_id: str) -> List[Dict[str, Any]]:
+        """Add one inspection; returns the violations it triggered."""
+        self.inspections += 1
+        self.last_timestamp = timestamp
+        found = []
+
+        # Individuals: standardize against the baseline (provisional until frozen)
+        self.values.add(value, BASELINE_POINTS)
+        sigma = self.values.std
+        if sigma > 0 and self.values.n >= 2:
+            z = (value - self.values.mean) / sigma
+            self.cusum_high = max(0.0, self.cusum_high + z - CUSUM_K)
+            self.cusum_low = max(0.0, self.cusum_low - z - CUSUM_K)
+            # Signal, then restart the side that crossed so a shift is reported once per run
+            if self.cusum_high > CUSUM_H:
+                found.append(self._flag("cusum", "sustained upward shift", value, timestamp, batch_id))
+                self.cusum_high = 0.0
+            if self.cusum_low > CUSUM_H:
+                found.append(self._flag("cusum", "sustained downward shift", value, timestamp, batch_id))
+                self.cusum_low = 0.0
+        self.ewma = value if self.ewma is None else EWMA_LAMBDA * value + (1 - EWMA_LAMBDA) * self.ewma
+        self.ewma_points += 1
+        low, high = self.ewma_limits()
+        if sigma > 0 and not low <= self.ewma <= high:
+            found.append(self._flag("ewma", "EWMA beyond control limits", self.ewma, timestamp, batch_id))
+
+        # Subgroup charts
+        self._sum += value
+        self._min = min(self._min, value)
+        self._max = max(self._max, value)
+        self._failed += bool(failed)
+        self._count += 1
+        if self._count == self.subgroup_size:
+            found.extend(self._close_subgroup(timestamp, batch_id))
+        return found
+
+    def _close_subgroup(self, timestamp: str, batch_id: str) -> List[Dict[str, Any]]:
+        xbar = self._sum / self._count
+        spread = self._max - self._min
+        p = self._failed / self._count
+        self._sum, self._min, self._max, self._failed, self._count = 0.0, math.inf, -math.inf, 0, 0
+        self.subgroups += 1
+        self.last_xbar, self.last_range, self.last_p = xbar, spread, p
+        self.xbar.add(xbar, BASELINE_SUBGROUPS)
+        self.ranges.add(spread, BASELINE_SUBGROUPS)
+        self.p.add(p, BASELINE_SUBGROUPS)
+
+        found = []
+        if self.subgroups < 2:
+            return found
+        low, center, high = self.xbar_limits()
+        sigma = (high - center) / 3
+        if sigma > 0:
+            for rule in self.xbar_rules.check((xbar - center) / sigma):
+                found.append(self._flag("xbar", rule, xbar, timestamp, batch_id))
+        range_center = self.ranges.mean
+        if spread > D4[self.subgroup_size] * range_center or spread < D3[self.subgroup_size] * range_center:
+            found.append(self._flag("range", "range beyond control limits", spread, timestamp, batch_id))
+        p_low, _, p_high = self.p_limits()
+        if not p_low <= p <= p_high:
+            found.append(self._flag("p", "failed fraction beyond control limits", p, timestamp, batch_id))
+        return found
+
+    def ewma_limits(self) -> Tuple[float, float]:
+        sigma = self.values.std
+        width = EWMA_L * sigma * math.sqrt(
+            EWMA_LAMBDA / (2 - EWMA_LAMBDA) * (1 - (1 - EWMA_LAMBDA) ** (2 * self.ewma_points))
+        )
+        return self.values.mean - width, self.values.mean + width
+
+    def summary(self) -> Dict[str, Any]:
+        def r(value: Optional[float], digits: int = 3) -> Optional[float]:
+            return None if value is None else round(value, digits)
+
+        charts: Dict[str, Any] = {}
+        if self.subgroups:
+            low, center, high = self.xbar_limits()
+            p_low, p_center, p_high = self.p_limits()
+            charts["xbar"] = {"lcl": r(low), "center": r(center), "ucl": r(high), "last": r(self.last_xbar)}
+            charts["range"] = {
+                "lcl": r(D3[self.subgroup_size] * self.ranges.mean),
+                "center": r(self.ranges.mean),
+                "ucl": r(D4[self.subgroup_size] * self.ranges.mean),
+                "last": r(self.last_range),
+            }
+            charts["p"] = {"lcl": r(p_low), "center": r(p_center), "ucl": r(p_high), "last": r(self.last_p)}
+        if self.values.n:
+            low, high = self.ewma_limits()
+            charts["ewma"] = {"lcl": r(low), "center": r(self.values.mean), "ucl": r(high), "last": r(self.ewma)}
+            charts["cusum"] = {"upper": r(self.cusum_high), "lower": r(self.cusum_low), "h": CUSUM_H}
+        return {
+            "inspections": self.inspections,
+            "subgroups": self.subgroups,
+            "subgroup_size": self.subgroup_size,
+            "limits": "frozen" if self.xbar.frozen else "provisional",
+            "last_inspection": self.last_timestamp,
+            "charts": charts,
+            "violations": self.violation_count,
+            "recent_violations": list(self.violations),
+        }
+
+
+class SPCEngine:
+    """
+    Chart state per machine_id and product_id, kept in step with the quality table.
+
+    With `debounce` set, a quality change wakes a worker thread that syncs
+    `debounce` seconds later, so a burst of appends is applied in one pass
+    and the charts advance without being queried. Otherwise the engine only
+    syncs when asked. `listeners` are called with the violations found in
+    appended rows (not on replays), from the thread that synced.
+    """
+
+    def __init__(self, store, subgroup_size: int = SUBGROUP_SIZE, debounce: Optional[float] = None):
+        if subgroup_size not in A2:
+            raise ValueError(f"subgroup_size must be between 2 and 10, got {subgroup_size}")
+        self.store = store
+        self.subgroup_size = subgroup_size
+        self.debounce = debounce
+        self._lock = threading.Lock()
+        self._states: Dict[str, Dict[str, ChartState]] = {name: {} for name in DIMENSIONS}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_VIOLATIONS)
+        self._rows = 0  # quality rows already applied
+        self._rewrites: Optional[int] = None  # store.rewrites("quality") they were read under
+        self._stale = True
+        self._listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+        self._wake = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self.replays = 0
+        self.background_syncs = 0
+        store.subscribe(self._on_change)
+
+    def add_listener(self, callback: Callable[[List[Dict[str, Any]]], None]) -> None:
+        self._listeners.append(callback)
+
+    def _on_change(self, domain: str) -> None:
+        if domain != "quality":
+            return
+        self._stale = True
+        if self.debounce is None:
+            return
+        # Not self._lock: that is held for a whole replay, and writers call this
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="spc-sync", daemon=True)
+                self._worker.start()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            time.sleep(self.debounce)  # let the rest of a burst of appends land
+            self._wake.clear()
+            try:
+                self.sync()
+                self.background_syncs += 1
+            except Exception as e:
+                print(f"SPCEngine sync failed: {e}")
+
+    def _reset(self) -> None:
+        self._states = {name: {} for name in DIMENSIONS}
+        self._recent.clear()
+        self._rows = 0
+        self.replays += 1
+
+    def observe(self, record: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Apply one inspection row (quality_data.csv columns); returns new violations."""
+        with self._lock:
+            return self._observe(record)
+
+    def _observe(self, record: Dict[str, Any]) -> List[Dict[str, Any]]:
+        value = float(record["defect_rate"])
+        failed = record.get("inspection_status") == "failed"
+        timestamp, batch_id = str(record["timestamp"]), str(record["batch_id"])
+        found = []
+        for name, column in DIMENSIONS.items():
+            key = str(record[column])
+            state = self._states[name].get(key)
+            if state is None:
+                state = self._states[name][key] = ChartState(self.subgroup_size)
+            for violation in state.update(value, failed, timestamp, batch_id):
+                found.append({name: key, **violation})
+        self._recent.extend(found)
+        self._rows += 1
+        return found
+
+    def sync(self) -> int:
+        """Apply quality rows added since the last sync; returns how many were applied."""
+        self.store.frame("quality")  # mtime check; an edited CSV marks the engine stale
+        with self._lock:
+            if not self._stale:
+                return 0
+            # Clear first, then read: a change landing meanwhile marks it stale again
+            self._stale = False
+            # Any write or reload since the last sync may have changed applied
+            # rows in place; only pure appends can be applied incrementally
+            rewrites = self.store.rewrites("quality")
+            df = self.store.frame("quality")
+            replay = rewrites != self._rewrites or self._rows > len(df)
+            if replay:
+                self._reset()
+                self._rewrites = rewrites
+            start = self._rows
+            columns = ["timestamp", "batch_id", "defect_rate", "inspection_status", *DIMENSIONS.values()]
+            found = []
+            for row in df[columns].iloc[start:].itertuples(index=False):
+                found.extend(self._observe(row._asdict()))
+        if found and not replay:
+            for callback in list(self._listeners):
+                try:
+                    callback(found)
+                except Exception as e:
+                    print(f"SPCEngine listener failed: {e}")
+        return len(df) - start
+
+    def states(self, dimension: str) -> Dict[str, ChartState]:
+        """Copy of the chart states per key; the worker keeps updating the originals."""
+        self.sync()
+        with self._lock:
+            return copy.deepcopy(self._states[dimension])
+
+    def overview(self) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """(alerts for the latest violations, out-of-control counts) for the quality agent status."""
+        self.sync()
+        with self._lock:
+            recent = list(self._recent)[-MAX_ALERTS:]
+            out_of_control = {
+                name: sum(1 for state in states.values() if state.violation_count)
+                for name, states in self._states.items()
+            }
+        alerts = []
+        for violation in reversed(recent):
+            name = next(n for n in DIMENSIONS if n in violation)
+            alerts.append(
+                {
+                    "level": "warning",
+                    "message": f"SPC {violation['chart']}: {violation['rule']} on {name} {violation[name]}"
+                    f" (batch {violation['batch_id']})",
+                }
+            )
+        return alerts, {f"spc_{name}s_out_of_control": count for name, count in out_of_control.items()}
+
+
+spc = SPCEngine(store, debounce=SYNC_DEBOUNCE_SECONDS)
+
+
+def get_spc_status(dimension: str, key: str) -> dict:
+    """
+    Control chart status of quality inspections per machine or product:
+    X-bar/R and p-chart limits, CUSUM and EWMA, and Western Electric rule
+    violations. Use this to decide whether a process is out of control
+    instead of querying defect_rate thresholds.
+
+    Charts are updated incrementally as inspections arrive. Subgroups are 5
+    consecutive inspections; limits are provisional until 20 subgroups exist.
+
+    Args:
+        dimension: "machine" or "product"; "" = machine
+        key: a machine_id or product_id, e.g. "M003"; "" = every key, those
+            with violations first
+
+    Returns:
+        For one key: limits, last values and recent violations of each chart.
+        For all keys: per key the inspection and violation counts, latest
+        violation and X-bar/p-chart figures (at most 20 keys)
+    """
+    dimension = dimension or "machine"
+    if dimension not in DIMENSIONS:
+        return {"success": False, "error": f"Unknown dimension: {dimension}", "available": list(DIMENSIONS)}
+    try:
+        states = spc.states(dimension)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+
+    if key:
+        state = states.get(key)
+        if state is None:
+            return {"success": False, "error": f"No inspections for {DIMENSIONS[dimension]} {key}"}
+        return {"success": True, DIMENSIONS[dimension]: key, **state.summary()}
+
+    ranked = sorted(states.items(), key=lambda item: (-item[1].violation_count, item[0]))
+    items = []
+    for name, state in ranked[:MAX_ITEMS]:
+        summary = state.summary()
+        items.append(
+            {
+                DIMENSIONS[dimension]: name,
+                "inspections": state.inspections,
+                "violations": state.violation_count,
+                "latest_violation": summary["recent_violations"][-1] if state.violations else None,
+                "xbar": summary["charts"].get("xbar"),
+                "p": summary["charts"].get("p"),
+                "limits": summary["limits"],
+            }
+        )
+    return {
+        "success": True,
+        "dimension": dimension,
+        "keys": len(states),
+        "out_of_control": sum(1 for state in states.values() if state.violation_count),
+        "items": items,
+        "omitted": max(0, len(states) - MAX_ITEMS),
+    }
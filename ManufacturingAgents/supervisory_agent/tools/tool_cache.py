@@ -0,0 +1,165 @@
+# supervisory_agent/tools/tool_cache.py
+# Session-scoped memo of read-only mcp_call results. A coordinated request
+# fans out to several sub-agents that each fetch overlapping data; within one
+# scope identical calls are served from here. Any change to a domain (update,
+# action, ingestion, reload) drops that domain's entries in every scope.
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .data_store import store
+
+# Intents that never modify data
+CACHEABLE_INTENTS = ("read", "query", "aggregate", "analyze", "predict")
+
+# State key carrying the scope id; AgentTool copies the parent's state into
+# the child session, so sub-agents inherit the supervisory agent's scope
+SCOPE_STATE_KEY = "mcp_cache_scope"
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items() if v not in (None, {}, [], "")}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def cache_key(domain: str, intent: str, data: Optional[dict]) -> Tuple[str, str, str]:
+    """Equivalent calls map to the same key (case, whitespace, key order, empty params)."""
+    return (
+        str(domain).strip().lower(),
+        str(intent).strip().lower(),
+        json.dumps(_normalize(data or {}), sort_keys=True, default=str),
+    )
+
+
+def scope_id(tool_context) -> str:
+    """The session's cache scope, created on first use and inherited by sub-agents."""
+    scope = tool_context.state.get(SCOPE_STATE_KEY)
+    if not scope:
+        scope = tool_context._invocation_context.session.id
+        tool_context.state[SCOPE_STATE_KEY] = scope
+    return scope
+
+
+class _Scope:
+    def __init__(self):
+        self.entries: "OrderedDict[Tuple[str, str, str], Tuple[dict, float, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+        self.invalidated = 0
+
+
+class ToolResultCache:
+    """
+    Per-scope LRU of mcp_call results keyed by the normalized call.
+
+    Entries hold (result, cost_ms, stored_at). Hits add the original cost to
+    `saved_ms`; entries older than `ttl` seconds are recomputed. Each domain
+    has a generation bumped on invalidation; a result whose domain moved on
+    while it was being computed is returned but not stored.
+    """
+
+    def __init__(self, store, max_scopes: int = 256, max_entries: int = 256, ttl: float = 300.0):
+        self.max_scopes = max_scopes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._scopes: "OrderedDict[str, _Scope]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.store = store
+        store.subscribe(self.invalidate_domain)
+
+    def _scope(self, scope: str) -> _Scope:
+        entry = self._scopes.get(scope)
+        if entry is None:
+            entry = self._scopes[scope] = _Scope()
+            if len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+        else:
+            self._scopes.move_to_end(scope)
+        return entry
+
+    def call(
+        self,
+        scope: str,
+        domain: str,
+        intent: str,
+        data: Optional[dict],
+        compute: Callable[[str, str, dict], dict],
+    ) -> dict:
+        key = cache_key(domain, intent, data)
+        if key[0] in self.store.files:
+            # Cheap mtime check first: an edited CSV reloads and invalidates
+            self.store.frame(key[0])
+
+        with self._lock:
+            state = self._scope(scope)
+            cached = state.entries.get(key)
+            if cached is not None and time.monotonic() - cached[2] < self.ttl:
+                state.entries.move_to_end(key)
+                state.hits += 1
+                state.saved_ms += cached[1]
+                return {**cached[0], "cache": {"hit": True, "saved_ms": round(cached[1], 2)}}
+            generation = self._generations.get(key[0], 0)
+
+        start = time.perf_counter()
+        result = compute(domain, intent, data)
+        cost_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            state = self._scope(scope)
+            state.misses += 1
+            if result.get("success") and self._generations.get(key[0], 0) == generation:
+                state.entries[key] = (result, cost_ms, time.monotonic())
+                if len(state.entries) > self.max_entries:
+                    state.entries.popitem(last=False)
+        return result
+
+    def invalidate_domain(self, domain: str) -> None:
+        with self._lock:
+            self._generations[domain] = self._generations.get(domain, 0) + 1
+            for state in self._scopes.values():
+                stale = [key for key in state.entries if key[0] == domain]
+                for key in stale:
+                    del state.entries[key]
+                state.invalidated += len(stale)
+
+    def stats(self, scope: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            scopes = [self._scopes[scope]] if scope in self._scopes else [] if scope else list(self._scopes.values())
+            hits = sum(s.hits for s in scopes)
+            misses = sum(s.misses for s in scopes)
+            return {
+                "scopes": len(scopes),
+                "calls": hits + misses,
+                "hits": hits,
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+                "saved_ms": round(sum(s.saved_ms for s in scopes), 2),
+                "entries": sum(len(s.entries) for s in scopes),
+                "invalidated": sum(s.invalidated for s in scopes),
+            }
+
+
+mcp_cache = ToolResultCache(store)
+
+
+def report_cache_savings(callback_context) -> None:
+    """after_agent_callback: log what the cache saved for this session."""
+    scope = callback_context.state.get(SCOPE_STATE_KEY)
+    if not scope:
+        return None
+    stats = mcp_cache.stats(scope)
+    if stats["calls"]:
+        print(
+            f"[mcp cache] {callback_context.agent_name} session {scope}: "
+            f"{stats['hits']}/{stats['calls']} calls served from cache, "
+            f"{stats['saved_ms']} ms of data work saved"
+        )
+    return None
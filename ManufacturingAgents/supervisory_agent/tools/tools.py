@@ -1,86 +1,202 @@
 # supervisory_agent/tools/tools.py
-import pandas as pd
-import numpy as np
-from pathlib import Path
+# pandas/NumPy are imported inside the tools that need them, so importing
+# this module (and every agent that lists these tools) stays cheap.
 from datetime import datetime
 import json
+import re
 
-def mcp_call(domain: str, intent: str, data: dict) -> dict:
+from .data_store import DOMAIN_FILES, store
+from .tool_cache import CACHEABLE_INTENTS, mcp_cache, scope_id
+
+# Intents whose result is a table of rows
+FRAME_INTENTS = ("read", "query", "aggregate")
+
+# Aggregations for intent='aggregate', plus percentiles written as p50, p95, p99.9
+AGG_FUNCTIONS = ("sum", "mean", "min", "max", "count", "median", "std", "nunique")
+_PERCENTILE = re.compile(r"^p(\d{1,2}(?:\.\d+)?)$")
+
+
+def _aggregate(df, data: dict):
+    """
+    Group-by / time-bucket aggregation, vectorized in pandas.
+
+    data:
+        group_by: column or list of columns
+        time_bucket: pandas frequency for `time_column` ("15min", "1h", "1D", "W")
+        time_column: defaults to "timestamp"
+        metrics: {column: function or [functions]}; every group also gets "rows"
+        query: optional pandas query applied first
+        sort_by, ascending, limit (default 100)
+    """
+    import pandas as pd
+
+    query_str = data.get("query", "")
+    if query_str:
+        df = df.query(query_str)
+
+    group_by = data.get("group_by") or []
+    if isinstance(group_by, str):
+        group_by = [group_by]
+    missing = [c for c in group_by if c not in df.columns]
+    if missing:
+        raise ValueError(f"Unknown group_by column(s): {missing}")
+
+    keys = list(group_by)
+    bucket = data.get("time_bucket")
+    if bucket:
+        time_col = data.get("time_column", "timestamp")
+        if time_col not in df.columns:
+            raise ValueError(f"Unknown time_column: {time_col}")
+        times = pd.to_datetime(df[time_col])
+        try:
+            buckets = times.dt.floor(bucket)
+        except ValueError:  # calendar frequencies (W, M, Q) have no fixed width
+            buckets = times.dt.to_period(bucket).dt.start_time
+        df = df.assign(**{time_col: buckets})
+        keys.insert(0, time_col)
+    if not keys:
+        df = df.assign(group="all")
+        keys = ["group"]
+
+    grouped = df.groupby(keys, sort=True, dropna=False)
+    columns = {"rows": grouped.size()}
+    for column, functions in (data.get("metrics") or {}).items():
+        if column not in df.columns:
+            raise ValueError(f"Unknown metric column: {column}")
+        for fn in [functions] if isinstance(functions, str) else functions:
+            percentile = _PERCENTILE.match(fn)
+            if fn not in AGG_FUNCTIONS and not percentile:
+                raise ValueError(f"Unknown aggregation '{fn}'. Use {', '.join(AGG_FUNCTIONS)} or pNN")
+            if fn not in ("count", "nunique") and not pd.api.types.is_numeric_dtype(df[column]):
+                raise ValueError(f"'{fn}' needs a numeric column, '{column}' is not")
+            if percentile:
+                columns[f"{column}_{fn}"] = grouped[column].quantile(float(percentile.group(1)) / 100)
+            else:
+                columns[f"{column}_{fn}"] = grouped[column].agg(fn)
+
+    result = pd.DataFrame(columns).reset_index()
+    if bucket:
+        result[keys[0]] = result[keys[0]].astype(str)
+    result = result.round(4)
+
+    sort_by = data.get("sort_by")
+    if sort_by:
+        if sort_by not in result.columns:
+            raise ValueError(f"Unknown sort_by column: {sort_by}")
+        result = result.sort_values(sort_by, ascending=data.get("ascending", True))
+    return result
+
+
+def mcp_frame(domain: str, intent: str, data: dict):
+    """
+    Row-returning intents (read, query, aggregate) as (metadata, DataFrame).
+    Lets callers serialize the frame directly instead of building per-row dicts.
+    """
+    if domain not in DOMAIN_FILES:
+        raise ValueError(f"Unknown domain: {domain}")
+    if intent not in FRAME_INTENTS:
+        raise ValueError(f"Intent '{intent}' does not return rows")
+
+    df = store.frame(domain)
+
+    # Intent: READ - Basic data retrieval
+    if intent == "read":
+        filters = data.get("filter", {})
+        result_df = df
+
+        # Apply filters
+        for key, value in filters.items():
+            if key in df.columns:
+                result_df = result_df[result_df[key] == value]
+
+        meta = {
+            "success": True,
+            "domain": domain,
+            "intent": intent,
+            "count": len(result_df),
+            "columns": list(result_df.columns),
+        }
+
+    # Intent: AGGREGATE - Grouped metrics, only the summary table leaves the data layer
+    elif intent == "aggregate":
+        limit = data.get("limit", 100)
+        grouped_df = _aggregate(df, data)
+        result_df = grouped_df.head(limit)
+
+        meta = {
+            "success": True,
+            "domain": domain,
+            "intent": intent,
+            "groups": len(grouped_df),
+            "count": len(result_df),
+            "truncated": len(grouped_df) > len(result_df),
+            "columns": list(result_df.columns),
+        }
+
+    # Intent: QUERY - Advanced filtering with pandas query
+    else:
+        query_str = data.get("query", "")
+        limit = data.get("limit", 100)
+
+        if query_str:
+            result_df = df.query(query_str).head(limit)
+        else:
+            result_df = df.head(limit)
+
+        meta = {
+            "success": True,
+            "domain": domain,
+            "intent": intent,
+            "query": query_str,
+            "count": len(result_df),
+        }
+
+    meta["timestamp"] = datetime.now().isoformat()
+    return meta, result_df
+
+
+def mcp_call(domain: str, intent: str, data: dict, tool_context=None) -> dict:
     """
     MCP-based context sharing for multi-agent coordination.
     Implements Model Context Protocol for seamless data access across agents.
     
     Args:
         domain: Agent domain (inventory, production, logistics, maintenance, quality)
-        intent: Operation type (read, query, predict, update, analyze)
-        data: Operation parameters
+        intent: Operation type (read, query, aggregate, predict, update, analyze)
+        data: Operation parameters. For aggregate:
+            {'group_by': ['machine_id', 'shift'], 'time_bucket': '1D',
+             'metrics': {'output_rate': ['mean', 'p95'], 'downtime_minutes': 'sum'},
+             'query': '...', 'sort_by': 'output_rate_mean', 'limit': 100}
+            Functions: sum, mean, min, max, count, median, std, nunique, p50/p90/p95/p99
         
     Returns:
         Context data with metadata for agent decision-making
     """
-    
-    # Domain-to-CSV mapping
-    domain_files = {
-        "inventory": "data/inventory_data.csv",
-        "production": "data/production_data.csv",
-        "logistics": "data/logistics_data.csv",
-        "maintenance": "data/maintenance_data.csv",
-        "quality": "data/quality_data.csv",
-    }
-    
-    if domain not in domain_files:
+    # Inside an agent session, repeated reads are shared across all agents
+    if tool_context is not None and intent in CACHEABLE_INTENTS:
+        return mcp_cache.call(scope_id(tool_context), domain, intent, data, _mcp_call)
+    return _mcp_call(domain, intent, data)
+
+
+def _mcp_call(domain: str, intent: str, data: dict) -> dict:
+    if domain not in DOMAIN_FILES:
         return {"error": f"Unknown domain: {domain}", "success": False}
     
-    csv_path = Path(__file__).parent.parent / domain_files[domain]
-    
     try:
-        df = pd.read_csv(csv_path)
-        
-        # Intent: READ - Basic data retrieval
-        if intent == "read":
-            filters = data.get("filter", {})
-            result_df = df
-            
-            # Apply filters
-            for key, value in filters.items():
-                if key in df.columns:
-                    result_df = result_df[result_df[key] == value]
-            
-            return {
-                "success": True,
-                "domain": domain,
-                "intent": intent,
-                "data": result_df.to_dict('records'),
-                "count": len(result_df),
-                "columns": list(result_df.columns),
-                "timestamp": datetime.now().isoformat()
-            }
-        
-        # Intent: QUERY - Advanced filtering with pandas query
-        elif intent == "query":
-            query_str = data.get("query", "")
-            limit = data.get("limit", 100)
-            
-            if query_str:
-                result_df = df.query(query_str).head(limit)
-            else:
-                result_df = df.head(limit)
-            
-            return {
-                "success": True,
-                "domain": domain,
-                "intent": intent,
-                "query": query_str,
-                "data": result_df.to_dict('records'),
-                "count": len(result_df),
-                "timestamp": datetime.now().isoformat()
-            }
+        # Intents: READ / QUERY / AGGREGATE - Tables
+        if intent in FRAME_INTENTS:
+            meta, result_df = mcp_frame(domain, intent, data)
+            return {**meta, "data": result_df.to_dict('records')}
+
+        df = store.frame(domain)
         
         # Intent: ANALYZE - Statistical analysis
-        elif intent == "analyze":
+        if intent == "analyze":
             analysis_type = data.get("type", "summary")
             
             if analysis_type == "summary":
+                import numpy as np
+
                 numeric_cols = df.select_dtypes(include=[np.number]).columns
                 summary = df[numeric_cols].describe().to_dict()
                 
@@ -96,7 +212,9 @@ def mcp_call(domain: str, intent: str, data: dict) -> dict:
             elif analysis_type == "trends":
                 # For production domain - analyze trends
                 if domain == "production" and "timestamp" in df.columns:
-                    df['timestamp'] = pd.to_datetime(df['timestamp'])
+                    import pandas as pd
+
+                    df = df.assign(timestamp=pd.to_datetime(df['timestamp']))
                     recent = df.sort_values('timestamp').tail(50)
                     
                     trends = {
@@ -131,11 +249,13 @@ def mcp_call(domain: str, intent: str, data: dict) -> dict:
             
             # Update logic (be careful with CSV writes in production)
             # This is a simplified example
-            for key, value in updates.items():
-                if key in df.columns:
-                    df.loc[df.index == record_id, key] = value
-            
-            df.to_csv(csv_path, index=False)
+            def apply_updates(df):
+                for key, value in updates.items():
+                    if key in df.columns:
+                        df.loc[df.index == record_id, key] = value
+                return df, None
+
+            store.modify(domain, apply_updates)
             
             return {
                 "success": True,
@@ -149,7 +269,7 @@ def mcp_call(domain: str, intent: str, data: dict) -> dict:
             return {
                 "error": f"Unknown intent: {intent}",
                 "success": False,
-                "available_intents": ["read", "query", "analyze", "predict", "update"]
+                "available_intents": ["read", "query", "aggregate", "analyze", "predict", "update"]
             }
     
     except Exception as e:
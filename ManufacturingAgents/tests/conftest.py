@@ -0,0 +1,43 @@
+# ManufacturingAgents/tests/conftest.py
+# Run from ManufacturingAgents/:  python -m pytest -q tests
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# The module-level singletons open their databases at import time: keep
+# them out of supervisory_agent/data
+_SCRATCH = tempfile.mkdtemp(prefix="manufacturing-tests-")
+os.environ.setdefault("PRODUCTION_ROLLUP_DB_PATH", str(Path(_SCRATCH) / "production_rollups.db"))
+os.environ.setdefault("USAGE_DB_PATH", str(Path(_SCRATCH) / "usage.db"))
+os.environ.setdefault("ACTION_DB_PATH", str(Path(_SCRATCH) / "actions.db"))
+
+from supervisory_agent.tools.data_store import DomainStore, domain_csv_path  # noqa: E402
+
+
+@pytest.fixture
+def domain_store(tmp_path):
+    """DomainStore over private copies of the given domains' CSVs (or given frames)."""
+
+    def make(**frames):
+        files = {}
+        for domain, df in frames.items():
+            path = tmp_path / f"{domain}_data.csv"
+            if df is None:
+                shutil.copy(domain_csv_path(domain), path)
+            else:
+                df.to_csv(path, index=False)
+            files[domain] = path
+        return DomainStore(files)
+
+    return make
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_SCRATCH, ignore_errors=True)
@@ -0,0 +1,213 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from action_queue import MAX_ATTEMPTS_LIMIT, ActionQueue, IdempotencyConflict
+
+
+def make_queue(tmp_path, run, **kwargs):
+    options = {"workers": 1, "retry_base": 0.01, "retry_max": 0.05, "poll_interval": 0.02}
+    options.update(kwargs)
+    return ActionQueue(str(tmp_path / "actions.db"), run, **options)
+
+
+async def wait_for_status(queue, job_id, statuses=("succeeded", "failed"), timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = await queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+
+def test_transient_errors_are_retried_until_success(tmp_path):
+    calls = []
+
+    def run(action, params):
+        calls.append(action)
+        if len(calls) < 3:
+            raise RuntimeError("database busy")
+        return {"applied": params["n"]}
+
+    async def scenario():
+        queue = make_queue(tmp_path, run, max_attempts=3)
+        job, _ = await queue.submit("inventory", "reorder_materials", {"n": 1})
+        try:
+            return await wait_for_status(queue, job["job_id"])
+        finally:
+            await queue.stop()
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 3
+    assert job["result"] == {"applied": 1}
+
+
+def test_job_fails_after_max_attempts(tmp_path):
+    def run(action, params):
+        raise RuntimeError("still down")
+
+    async def scenario():
+        queue = make_queue(tmp_path, run, max_attempts=2)
+        job, _ = await queue.submit("inventory", "reorder_materials", {})
+        try:
+            return await wait_for_status(queue, job["job_id"]), queue.processed
+        finally:
+            await queue.stop()
+
+    job, processed = asyncio.run(scenario())
+    assert job["status"] == "failed"
+    assert job["attempts"] == 2
+    assert "still down" in job["error"]
+    assert processed["retried"] == 1
+
+
+def test_worker_survives_database_errors(tmp_path):
+    async def scenario():
+        queue = make_queue(tmp_path, lambda action, params: {"ok": True})
+        claim, failures = queue._claim, []
+
+        def flaky_claim():
+            if len(failures) < 2:
+                failures.append(1)
+                raise sqlite3.OperationalError("database is locked")
+            return claim()
+
+        queue._claim = flaky_claim
+        job, _ = await queue.submit("inventory", "reorder_materials", {})
+        try:
+            return await wait_for_status(queue, job["job_id"]), queue.processed
+        finally:
+            await queue.stop()
+
+    job, processed = asyncio.run(scenario())
+    assert job["status"] == "succeeded"
+    assert processed["db_errors"] == 2
+
+
+def test_value_error_fails_without_retry(tmp_path):
+    def run(action, params):
+        raise ValueError("No record 99 in inventory")
+
+    async def scenario():
+        queue = make_queue(tmp_path, run, max_attempts=5)
+        job, _ = await queue.submit("inventory", "update_record", {})
+        try:
+            return await wait_for_status(queue, job["job_id"])
+        finally:
+            await queue.stop()
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "failed"
+    assert job["attempts"] == 1
+
+
+def expire_lease(queue, job_id, attempts):
+    # As if the worker that claimed it died mid-run
+    queue._execute(
+        "UPDATE jobs SET status = 'running', attempts = ?, lease_until = ? WHERE id = ?",
+        (attempts, time.time() - 1, job_id),
+    )
+
+
+def test_expired_lease_is_reclaimed_while_attempts_remain(tmp_path):
+    async def scenario():
+        queue = make_queue(tmp_path, lambda action, params: {"ok": True}, workers=0, max_attempts=3)
+        job, _ = await queue.submit("inventory", "reorder_materials", {})
+        expire_lease(queue, job["job_id"], attempts=1)
+        queue.workers = 1
+        queue.start()
+        try:
+            return await wait_for_status(queue, job["job_id"])
+        finally:
+            await queue.stop()
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 2
+
+
+def test_expired_lease_on_last_attempt_fails_the_job(tmp_path):
+    calls = []
+    finished = []
+
+    async def on_done(job):
+        finished.append(job["job_id"])
+
+    async def scenario():
+        queue = make_queue(tmp_path, lambda action, params: calls.append(action), workers=0, max_attempts=2, on_done=on_done)
+        job, _ = await queue.submit("inventory", "reorder_materials", {})
+        expire_lease(queue, job["job_id"], attempts=2)
+        queue.workers = 1
+        queue.start()
+        try:
+            return await wait_for_status(queue, job["job_id"])
+        finally:
+            await queue.stop()
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "failed"
+    assert job["attempts"] == 2
+    assert "Lease expired" in job["error"]
+    assert calls == []
+    assert finished == [job["job_id"]]
+
+
+def test_heartbeat_keeps_a_long_job_leased(tmp_path):
+    running = []
+    lock = threading.Lock()
+
+    def run(action, params):
+        with lock:
+            running.append(action)
+        time.sleep(0.6)
+        return {}
+
+    async def scenario():
+        # Two workers: without renewal the second would reclaim the job
+        queue = make_queue(tmp_path, run, workers=2, lease_seconds=0.2)
+        job, _ = await queue.submit("inventory", "reorder_materials", {})
+        try:
+            return await wait_for_status(queue, job["job_id"])
+        finally:
+            await queue.stop()
+
+    job = asyncio.run(scenario())
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 1
+    assert running == ["reorder_materials"]
+
+
+def test_idempotency_key_deduplicates_and_detects_conflicts(tmp_path):
+    async def scenario():
+        queue = make_queue(tmp_path, lambda action, params: {}, workers=0)
+        first, duplicate = await queue.submit("inventory", "reorder_materials", {"n": 1}, idempotency_key="k1")
+        assert not duplicate
+        again, duplicate = await queue.submit("inventory", "reorder_materials", {"n": 1}, idempotency_key="k1")
+        assert duplicate
+        assert again["job_id"] == first["job_id"]
+        with pytest.raises(IdempotencyConflict):
+            await queue.submit("inventory", "reorder_materials", {"n": 2}, idempotency_key="k1")
+
+    asyncio.run(scenario())
+
+
+def test_max_attempts_is_validated_and_clamped(tmp_path):
+    async def scenario():
+        queue = make_queue(tmp_path, lambda action, params: {}, workers=0)
+        for bad in ("3", 2.5, True):
+            with pytest.raises(ValueError):
+                await queue.submit("inventory", "reorder_materials", {}, max_attempts=bad)
+        high, _ = await queue.submit("inventory", "reorder_materials", {"n": 1}, max_attempts=1000)
+        low, _ = await queue.submit("inventory", "reorder_materials", {"n": 2}, max_attempts=-4)
+        default, _ = await queue.submit("inventory", "reorder_materials", {"n": 3})
+        return high, low, default
+
+    high, low, default = asyncio.run(scenario())
+    assert high["max_attempts"] == MAX_ATTEMPTS_LIMIT
+    assert low["max_attempts"] == 1
+    assert default["max_attempts"] == 3
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected, MethodClass
+
+
+def controller(**kwargs) -> AdmissionController:
+    classes = {
+        "status": MethodClass("status", 0, 8, cost=1, latency_target=1.0, initial_service_time=0.01),
+        "data": MethodClass("data", 1, 1, cost=1, latency_target=1.0, initial_service_time=0.1),
+        "llm": MethodClass("llm", 2, 1, cost=1, latency_target=0.3, initial_service_time=0.1),
+    }
+    options = {"classes": classes, "method_classes": {"agent.status": "status", "agent.message": "llm"}}
+    options.update(kwargs)
+    return AdmissionController(**options)
+
+
+async def hold(admission, method, client, started, release):
+    async with admission.admit(method, client):
+        started.set()
+        await release.wait()
+
+
+def test_client_is_rate_limited_per_class():
+    admission = controller(client_rate=0.01, client_burst=2)
+
+    async def scenario():
+        for _ in range(2):
+            async with admission.admit("mcp.query", "client-a"):
+                pass
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with admission.admit("mcp.query", "client-a"):
+                pass
+        assert rejected.value.retry_after > 0
+        # Other clients, and this client's status reads, have their own buckets
+        async with admission.admit("mcp.query", "client-b"):
+            pass
+        async with admission.admit("agent.status", "client-a"):
+            pass
+
+    asyncio.run(scenario())
+    assert admission.classes["data"].rate_limited == 1
+
+
+def test_call_is_shed_when_expected_wait_exceeds_target():
+    admission = controller()
+    llm = admission.classes["llm"]
+    llm.service_time = 1.0  # one queued call would wait ~1s against a 0.3s target
+
+    async def scenario():
+        started, release = asyncio.Event(), asyncio.Event()
+        running = asyncio.create_task(hold(admission, "agent.message", "a", started, release))
+        await started.wait()
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with admission.admit("agent.message", "b"):
+                pass
+        release.set()
+        await running
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert "latency target" in rejected.reason
+    assert llm.shed == 1
+    assert admission.inflight == 0
+
+
+def test_queued_call_is_shed_after_latency_target():
+    admission = controller()
+
+    async def scenario():
+        started, release = asyncio.Event(), asyncio.Event()
+        running = asyncio.create_task(hold(admission, "agent.message", "a", started, release))
+        await started.wait()
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with admission.admit("agent.message", "b"):
+                pass
+        release.set()
+        await running
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert "waited longer" in rejected.reason
+    assert admission.classes["llm"].waiting == 0
+
+
+def test_higher_priority_waiters_are_admitted_first():
+    admission = controller(max_inflight=1)
+    order = []
+
+    async def call(method, client):
+        async with admission.admit(method, client):
+            order.append(method)
+
+    async def scenario():
+        started, release = asyncio.Event(), asyncio.Event()
+        running = asyncio.create_task(hold(admission, "mcp.query", "a", started, release))
+        await started.wait()
+        waiting = [asyncio.create_task(call("mcp.query", "b")), asyncio.create_task(call("agent.status", "c"))]
+        await asyncio.sleep(0.01)  # both queued behind the global cap
+        release.set()
+        await asyncio.gather(running, *waiting)
+
+    asyncio.run(scenario())
+    assert order == ["agent.status", "mcp.query"]
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from supervisory_agent.tools.digest import DIGESTS, DigestCache
+from supervisory_agent.tools.data_store import domain_csv_path
+
+
+def rows(domain: str, count: int, seed: int) -> pd.DataFrame:
+    """`count` rows resampled from the shipped CSV, with some values perturbed."""
+    rng = np.random.default_rng(seed)
+    df = pd.read_csv(domain_csv_path(domain))
+    df = df.iloc[rng.integers(0, len(df), count)].reset_index(drop=True)
+    df["machine_id"] = rng.choice(["M001", "M002", "M007"], count)
+    column = "efficiency_score" if domain == "production" else "defect_rate"
+    df[column] = rng.normal(50, 10, count).round(2)
+    df.loc[rng.random(count) < 0.05, column] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("domain", ["production", "quality"])
+def test_appends_are_folded_in(domain_store, domain):
+    store = domain_store(**{domain: rows(domain, 200, seed=0)})
+    cache = DigestCache(store)
+    cache.get(domain)
+    for seed in (1, 2):
+        store.append(domain, rows(domain, 50, seed=seed))
+        folded = cache.get(domain)
+    assert cache.folds == 2
+    assert folded["rows"] == 300
+    full = DIGESTS[domain](store.frame(domain))
+    assert {k: folded[k] for k in full} == full
+
+
+def test_in_place_edit_rebuilds(domain_store):
+    store = domain_store(production=rows("production", 200, seed=0))
+    cache = DigestCache(store)
+    cache.get("production")
+
+    def edit(df):
+        df["efficiency_score"] = 1.0
+        return df, None
+
+    store.modify("production", edit)
+    assert cache.get("production")["avg_efficiency"] == 1.0
+    assert cache.folds == 0
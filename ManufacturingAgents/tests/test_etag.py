@@ -0,0 +1,54 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from status_hub import combine_etags, content_etag
+
+
+@pytest.fixture(scope="module")
+def client():
+    from adk_api_wrapper import app
+
+    # Without the context manager: no startup hooks (job workers, ingestion, retention)
+    return TestClient(app)
+
+
+def test_content_etag_ignores_volatile_keys():
+    first = content_etag({"status": "online", "timestamp": "2024-11-01T08:00:00"})
+    # Bodies differ in the timestamp under one tag, so the tag must be weak
+    assert first.startswith('W/"')
+    assert first == content_etag({"timestamp": "2024-11-01T09:00:00", "status": "online"})
+    assert first != content_etag({"status": "offline", "timestamp": "2024-11-01T08:00:00"})
+    assert combine_etags([first, '"a"']) != combine_etags(['"a"', first])
+
+
+@pytest.mark.parametrize("path", ["/health", "/api/agents", "/api/agents/production"])
+def test_matching_etag_revalidates_with_304(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    cached = client.get(path, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    assert client.get(path, headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+    assert client.get(path, headers={"If-None-Match": "*"}).status_code == 304
+    # Weak comparison: the same opaque tag matches with or without W/
+    assert client.get(path, headers={"If-None-Match": etag[2:]}).status_code == 304
+    assert client.get(path, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_unknown_agent_is_404(client):
+    assert client.get("/api/agents/nope").status_code == 404
+
+
+def test_mcp_status_reads_the_hub_snapshot(client):
+    batch = [
+        {"jsonrpc": "2.0", "id": i, "method": "agent.status", "params": {"agent_id": agent_id}}
+        for i, agent_id in enumerate(["production", "quality"])
+    ]
+    results = {r["id"]: r["result"] for r in client.post("/api/mcp", json=batch).json()}
+    assert results[0] == client.get("/api/agents/production").json()
+    assert results[1] == client.get("/api/agents/quality").json()
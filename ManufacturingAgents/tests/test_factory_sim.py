@@ -0,0 +1,26 @@
+import asyncio
+import inspect
+
+from supervisory_agent.tools import factory_sim
+
+
+def test_pool_sweep_matches_in_process_sweep(monkeypatch):
+    model = asyncio.run(asyncio.to_thread(factory_sim.build_model, 24.0))
+    models = [factory_sim.apply_scenario(model, {"name": n, "demand_factor": 1 + n / 10}) for n in range(6)]
+    in_process = asyncio.run(factory_sim.sweep(models, 2))
+
+    monkeypatch.setattr(factory_sim, "PARALLEL_MIN_RUNS", 0)
+    monkeypatch.setattr(factory_sim, "SIM_WORKERS", 2)
+    try:
+        pooled = asyncio.run(factory_sim.sweep(models, 2))
+    finally:
+        factory_sim._shutdown_pool()
+    assert pooled == in_process
+
+
+def test_simulate_factory_is_awaited():
+    assert inspect.iscoroutinefunction(factory_sim.simulate_factory)
+    result = asyncio.run(
+        factory_sim.simulate_factory([{"extra_orders": [{"quantity": 10, "due": "2025-01-01T00:00:00+00:00"}]}], 24, 2)
+    )
+    assert result["success"] and len(result["scenarios"]) == 2
@@ -0,0 +1,245 @@
+import asyncio
+import json
+import multiprocessing
+import threading
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from ingestion import Backpressure, Ingestor, SchemaError, parse_readings
+from supervisory_agent.tools.data_store import DomainStore, fcntl
+
+
+def readings(count: int, start: str = "2025-01-01 08:00:00", machine: str = "M001"):
+    return {
+        "timestamp": [str(t) for t in pd.date_range(start, periods=count, freq="s")],
+        "machine_id": [machine] * count,
+        "temperature": [80.5] * count,
+        "vibration_level": [2.5] * count,
+        "power_consumption": [20.0] * count,
+        "pressure": [5.0] * count,
+        "material_flow_rate": [20.0] * count,
+        "cycle_time": [120.0] * count,
+        "output_rate": [90.0] * count,
+        "quality_score": [20.0] * count,
+        "downtime_minutes": [1] * count,
+    }
+
+
+def body(payload) -> bytes:
+    return json.dumps(payload).encode()
+
+
+# ---------------------------------------------------------------------------
+# Validation
+# ---------------------------------------------------------------------------
+
+
+def test_all_payload_shapes_give_the_same_rows():
+    columns = readings(2)
+    records = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    shapes = [{"columns": columns}, {"readings": records}, records]
+    parsed = [parse_readings(body(shape), {"M001": "Welder"})[0] for shape in shapes]
+    for rows in parsed[1:]:
+        pd.testing.assert_frame_equal(rows, parsed[0])
+    single, _, _ = parse_readings(body(records[0]), {})
+    assert len(single) == 1
+
+
+def test_defaults_are_filled_and_offsets_normalized():
+    columns = readings(2, start="2025-01-01 07:59:59")
+    columns["timestamp"][1] = "2025-01-01T10:00:00+02:00"
+    rows, rejected, _ = parse_readings(body({"columns": columns}), {"M001": "Welder"})
+    assert rejected == 0
+    assert list(rows["timestamp"]) == ["2025-01-01 07:59:59", "2025-01-01 08:00:00"]
+    assert list(rows["shift"]) == ["night", "morning"]
+    assert list(rows["machine_type"]) == ["Welder", "Welder"]
+    assert list(rows["status"]) == ["operational", "operational"]
+
+
+def test_invalid_rows_are_rejected_with_reasons():
+    columns = readings(5)
+    columns["temperature"][0] = "hot"
+    columns["downtime_minutes"][1] = 1.5
+    columns["timestamp"][2] = "yesterday"
+    columns["status"] = ["operational", "operational", "operational", "broken", "maintenance"]
+    rows, rejected, errors = parse_readings(body({"columns": columns}), {})
+    assert rejected == 4
+    assert len(rows) == 1
+    assert rows["status"].iat[0] == "maintenance"
+    assert len(errors) == 4
+
+
+@pytest.mark.parametrize(
+    "payload, message",
+    [
+        (b"{not json", "Invalid JSON"),
+        (body({"columns": {"timestamp": ["2025-01-01"], "machine_id": []}}), "equal length"),
+        (body({**readings(1), "colour": ["red"]}), "Unknown column"),
+        (body({"timestamp": "2025-01-01", "machine_id": "M001"}), "Missing required"),
+        (body(42), "Expected"),
+    ],
+)
+def test_malformed_payloads_raise_schema_error(payload, message):
+    with pytest.raises(SchemaError, match=message):
+        parse_readings(payload, {})
+
+
+# ---------------------------------------------------------------------------
+# Buffering and writing
+# ---------------------------------------------------------------------------
+
+
+def test_submitted_rows_are_flushed_then_appended(domain_store):
+    store = domain_store(production=None)
+    before = len(store.frame("production"))
+    rewrites = store.rewrites("production")
+    notified = []
+    store.subscribe(notified.append)
+
+    async def scenario():
+        ingestor = Ingestor(store, batch_rows=10, flush_seconds=5, notify_seconds=0.01)
+        for start in ("2025-01-01 08:00:00", "2025-01-01 08:01:00"):
+            rows, _, _ = await ingestor.parse(body({"columns": readings(10, start=start)}))
+            await ingestor.submit(rows)
+        # Full batches go out without waiting for flush_seconds
+        for _ in range(100):
+            if ingestor.written == 20:
+                break
+            await asyncio.sleep(0.01)
+        written = ingestor.written
+        await ingestor.stop()
+        return written, ingestor.stats()
+
+    written, stats = asyncio.run(scenario())
+    assert written == 20
+    assert stats["flushes"] == 2
+    assert stats["buffered_rows"] == stats["inflight_rows"] == 0
+    assert 1 <= stats["notifications"] <= 2
+    assert "production" in notified
+
+    df = store.frame("production")
+    assert len(df) == before + 20
+    assert store.rewrites("production") == rewrites
+    assert len(pd.read_csv(store.files["production"])) == before + 20
+    assert df["timestamp"].iat[-1] == "2025-01-01 08:01:09"
+
+
+def test_failed_write_is_retried_not_dropped(domain_store):
+    store = domain_store(production=None)
+    before = len(store.frame("production"))
+    append = store.append
+    failures = []
+
+    def flaky_append(*args, **kwargs):
+        if not failures:
+            failures.append(1)
+            raise OSError("disk full")
+        return append(*args, **kwargs)
+
+    store.append = flaky_append
+
+    async def scenario():
+        ingestor = Ingestor(store, batch_rows=5, flush_seconds=0.01)
+        rows, _, _ = await ingestor.parse(body({"columns": readings(5)}))
+        await ingestor.submit(rows)
+        for _ in range(200):
+            if ingestor.written:
+                break
+            await asyncio.sleep(0.01)
+        await ingestor.stop()
+        return ingestor.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["write_errors"] == 1
+    assert stats["written"] == 5
+    assert stats["write_error"] is None
+    assert stats["lost_rows"] == 0
+    assert len(store.frame("production")) == before + 5
+
+
+def test_full_buffer_applies_backpressure(domain_store):
+    store = domain_store(production=None)
+    store.frame("production")
+    release = threading.Event()
+    append = store.append
+
+    def slow_append(*args, **kwargs):
+        release.wait(5)
+        return append(*args, **kwargs)
+
+    store.append = slow_append
+
+    async def scenario():
+        ingestor = Ingestor(store, batch_rows=5, flush_seconds=0.01, max_pending_rows=10, submit_timeout=0.05)
+        rows, _, _ = await ingestor.parse(body({"columns": readings(5)}))
+        await ingestor.submit(rows)
+        await ingestor.submit(rows)
+        with pytest.raises(Backpressure) as raised:
+            await ingestor.submit(rows)
+        release.set()
+        await ingestor.stop()
+        return raised.value, ingestor.stats()
+
+    backpressure, stats = asyncio.run(scenario())
+    assert backpressure.retry_after > 0
+    assert stats["backpressure_rejections"] == 1
+    assert stats["written"] == 10
+
+
+def test_http_maps_backpressure_to_429_and_schema_errors_to_422(monkeypatch):
+    import adk_api_wrapper
+
+    class FullIngestor(Ingestor):
+        async def submit(self, rows, rejected=0, wait=None):
+            raise Backpressure(retry_after=2.4)
+
+    ingestor = FullIngestor(DomainStore({}))
+    ingestor._machine_types = {}
+    monkeypatch.setattr(adk_api_wrapper, "get_ingestor", lambda: ingestor)
+    client = TestClient(adk_api_wrapper.app)
+
+    full = client.post("/api/ingest/production", json={"columns": readings(2)})
+    assert full.status_code == 429
+    assert full.headers["retry-after"] == "2"
+    assert client.post("/api/ingest/production", content=b"{oops").status_code == 422
+
+
+# ---------------------------------------------------------------------------
+# Several worker processes appending to one CSV
+# ---------------------------------------------------------------------------
+
+
+def append_batches(path, machine, batches, size):
+    store = DomainStore({"production": path})
+    columns = list(store.frame("production").columns)
+    for batch in range(batches):
+        rows, _, _ = parse_readings(body({"columns": readings(size, start=f"2025-02-0{batch + 1}", machine=machine)}), {})
+        store.append("production", rows.reindex(columns=columns))
+
+
+@pytest.mark.skipif(fcntl is None, reason="needs flock")
+def test_worker_appends_do_not_interleave_and_are_followed(domain_store):
+    store = domain_store(production=None)
+    before = store.frame("production")
+    rewrites = store.rewrites("production")
+    path = store.files["production"]
+
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=append_batches, args=(path, f"W{i}", 4, 20_000)) for i in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(120)
+        assert worker.exitcode == 0
+
+    on_disk = pd.read_csv(path)
+    assert len(on_disk) == len(before) + 3 * 4 * 20_000
+    assert on_disk["downtime_minutes"].notna().all()
+    # This process follows the appends by offset instead of reloading the file
+    df = store.frame("production")
+    assert len(df) == len(on_disk)
+    assert store.rewrites("production") == rewrites
+    assert store.followed_rows == 3 * 4 * 20_000
+    assert df["machine_id"].value_counts()[["W0", "W1", "W2"]].tolist() == [80_000] * 3
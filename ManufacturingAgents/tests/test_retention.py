@@ -0,0 +1,159 @@
+import multiprocessing
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from supervisory_agent.tools.data_store import DomainStore, domain_csv_path, fcntl
+from supervisory_agent.tools.retention import RetentionManager
+
+MACHINES = ("M001", "M002", "M003")
+
+
+def readings(start: str, hours: int, seed: int = 0) -> pd.DataFrame:
+    """One reading per machine every 10 minutes, in production_data.csv columns."""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start, periods=hours * 6, freq="10min").repeat(len(MACHINES))
+    n = len(times)
+    columns = pd.read_csv(domain_csv_path("production"), nrows=0).columns
+    df = pd.DataFrame({c: 0.0 for c in columns}, index=range(n))
+    df["timestamp"] = times.strftime("%Y-%m-%d %H:%M:%S")
+    df["machine_id"] = np.tile(MACHINES, n // len(MACHINES))
+    df["machine_type"] = "Welder"
+    df["status"] = "operational"
+    df["shift"] = "morning"
+    df["output_rate"] = rng.normal(90, 5, n).round(2)
+    df["downtime_minutes"] = rng.integers(0, 5, n)
+    return df[columns]
+
+
+def archived_count(manager: RetentionManager) -> int:
+    with sqlite3.connect(manager.path) as db:
+        return int(db.execute("SELECT COALESCE(SUM(output_rate_count), 0) FROM rollup_shift").fetchone()[0])
+
+
+@pytest.fixture
+def production(domain_store, tmp_path):
+    # Ends mid-shift (19:50): an hour appended after it does not move the compaction cutoff
+    raw = readings("2024-01-01", hours=92)
+    store = domain_store(production=raw)
+    manager = RetentionManager(str(tmp_path / "rollups.db"), store, raw_retention_hours=24)
+    return raw, store, manager
+
+
+def test_compaction_moves_old_rows_into_the_archive(production):
+    raw, store, manager = production
+    manager.sync()
+
+    kept = store.frame("production")
+    assert manager.compactions == 1
+    assert len(kept) + archived_count(manager) == len(raw)
+    assert pd.to_datetime(kept["timestamp"]).min() >= pd.Timestamp("2024-01-03 16:00")
+
+    # Bucket means over the whole range match a scan of the raw readings
+    result = manager.query(None, None, "1D", "", ["output_rate"])
+    series = result["series"].set_index("bucket")
+    expected = raw.groupby(pd.to_datetime(raw["timestamp"]).dt.floor("1D"))["output_rate"].agg(["sum", "count"])
+    assert (series["output_rate_count"] == expected["count"]).all()
+    assert np.allclose(series["output_rate_sum"], expected["sum"])
+
+
+def test_failed_csv_rewrite_does_not_double_count(production):
+    raw, store, manager = production
+    replace = store._replace
+
+    def failing_replace(domain, df):
+        raise OSError("disk full")
+
+    store._replace = failing_replace
+    with pytest.raises(OSError):
+        manager.sync()
+    assert archived_count(manager) == 0
+    assert len(store.frame("production")) == len(raw)
+
+    store._replace = replace
+    manager._stale = True
+    manager.sync()
+    assert archived_count(manager) + len(store.frame("production")) == len(raw)
+
+
+def test_appends_roll_in_without_rebuilding(production):
+    raw, store, manager = production
+    manager.sync()
+    rebuilds = manager.rebuilds
+
+    store.append("production", readings("2024-01-04 20:00", hours=1, seed=1))
+    assert manager.sync() == 6 * len(MACHINES)
+    assert manager.rebuilds == rebuilds
+
+
+def test_in_place_edit_rebuilds_the_live_tiers(production):
+    raw, store, manager = production
+    manager.sync()
+    rebuilds = manager.rebuilds
+
+    def edit(df):
+        df.loc[0, "output_rate"] = 1000.0
+        return df, None
+
+    store.modify("production", edit)
+    manager.sync()
+    assert manager.rebuilds == rebuilds + 1
+    first = store.frame("production")["timestamp"].iat[0]
+    result = manager.query(pd.Timestamp(first), None, "1h", "", ["output_rate"])
+    assert result["series"]["output_rate_max"].max() == 1000.0
+
+
+class RacingRetention(RetentionManager):
+    """Decides to compact only once every process has read the uncompacted file"""
+
+    def __init__(self, *args, barrier, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.barrier = barrier
+
+    def _compaction_due(self) -> bool:
+        due = super()._compaction_due()
+        self.barrier.wait(timeout=30)
+        return due
+
+
+def compact_in_process(csv_path, db_path, barrier):
+    store = DomainStore({"production": csv_path})
+    RacingRetention(db_path, store, raw_retention_hours=24, barrier=barrier).sync()
+
+
+def append_in_process(csv_path, batches):
+    store = DomainStore({"production": csv_path})
+    for batch in batches:
+        store.append("production", batch)
+        time.sleep(0.01)
+
+
+@pytest.mark.skipif(fcntl is None, reason="needs flock")
+def test_workers_compact_once_and_keep_concurrent_appends(tmp_path):
+    raw = readings("2024-01-01", hours=92)
+    csv_path = tmp_path / "production_data.csv"
+    raw.to_csv(csv_path, index=False)
+    db_path = str(tmp_path / "rollups.db")
+    # Same shift as the last reading, so the compaction cutoff does not move
+    extra = readings("2024-01-04 20:00", hours=2, seed=1)
+    batches = [extra.iloc[i : i + 6] for i in range(0, len(extra), 6)]
+
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(2)
+    processes = [context.Process(target=compact_in_process, args=(csv_path, db_path, barrier)) for _ in range(2)]
+    processes.append(context.Process(target=append_in_process, args=(csv_path, batches)))
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    kept = pd.read_csv(csv_path)
+    manager = RetentionManager(db_path, DomainStore({"production": csv_path}), raw_retention_hours=24)
+    cutoff = pd.Timestamp("2024-01-03 16:00")
+    assert archived_count(manager) == int((pd.to_datetime(raw["timestamp"]) < cutoff).sum())
+    assert len(kept) + archived_count(manager) == len(raw) + len(extra)
+    assert set(extra["timestamp"]) <= set(kept["timestamp"])
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from supervisory_agent.tools.root_cause import SENSOR_COLUMNS, RootCauseCache, align
+
+MACHINES = ("M001", "M002", "M003")
+
+
+def readings(start: str, count: int, seed: int) -> pd.DataFrame:
+    """A sensor reading per machine every 10 minutes."""
+    rng = np.random.default_rng(seed)
+    stamps = pd.date_range(start, periods=count, freq="10min").repeat(len(MACHINES))
+    n = len(stamps)
+    return pd.DataFrame(
+        {
+            "timestamp": stamps.strftime("%Y-%m-%d %H:%M:%S"),
+            "machine_id": np.tile(MACHINES, count),
+            **{column: rng.normal(50, 5, n).round(2) for column in SENSOR_COLUMNS},
+        }
+    )
+
+
+def inspections(start: str, count: int, seed: int) -> pd.DataFrame:
+    """An inspection every 7 minutes on a random machine."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range(start, periods=count, freq="7min").strftime("%Y-%m-%d %H:%M:%S"),
+            "batch_id": [f"B{seed}-{i}" for i in range(count)],
+            "machine_id": rng.choice(MACHINES, count),
+            "defect_type": rng.choice(["none", "dimension", "surface_defect"], count),
+            "rework_required": rng.integers(0, 2, count),
+        }
+    )
+
+
+def by_row(joined: pd.DataFrame) -> pd.DataFrame:
+    return joined.sort_values("_row").reset_index(drop=True)
+
+
+@pytest.fixture
+def tables(domain_store):
+    store = domain_store(
+        quality=inspections("2024-11-01 01:00", 100, seed=0), production=readings("2024-11-01", 80, seed=0)
+    )
+    cache = RootCauseCache(store)
+    cache.get(60.0)
+    return store, cache
+
+
+def test_appends_update_the_join_in_place(tables):
+    store, cache = tables
+    before = by_row(cache.get(60.0)["joined"])
+    # Readings that arrive late for earlier inspections, newer readings, and
+    # inspections both covered and not yet covered by readings
+    store.append("production", readings("2024-11-01 05:05", 6, seed=1))
+    late = by_row(cache.get(60.0)["joined"])
+    assert (late["temperature"] != before["temperature"]).any()
+    store.append("quality", inspections("2024-11-01 12:30", 30, seed=2))
+    store.append("production", readings("2024-11-01 14:25", 12, seed=3))
+    updated = cache.get(60.0)
+
+    assert (cache.builds, cache.updates) == (1, 2)
+    expected, _ = align(store.frame("quality"), store.frame("production"), 60.0)
+    pd.testing.assert_frame_equal(by_row(updated["joined"]), by_row(expected))
+
+
+def test_rewrite_rebuilds_the_join(tables):
+    store, cache = tables
+
+    def edit(df):
+        df["vibration_level"] = 1.0
+        return df, None
+
+    store.modify("production", edit)
+    joined = cache.get(60.0)["joined"]
+    assert cache.builds == 2
+    assert (joined["vibration_level"] == 1.0).all()
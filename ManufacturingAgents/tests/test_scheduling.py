@@ -0,0 +1,29 @@
+from datetime import datetime
+
+import pytest
+
+from supervisory_agent.tools.scheduling import parse_datetime, parse_jobs
+
+START = datetime(2025, 1, 1, 8, 0)
+
+
+@pytest.mark.parametrize(
+    "due, hours",
+    [
+        ("2025-01-01T12:00:00", 4.0),
+        ("2025-01-01T12:00:00+00:00", 4.0),
+        ("2025-01-01T14:00:00+02:00", 4.0),
+        ("2025-01-01T07:00:00-05:00", 4.0),
+        (6, 6.0),
+    ],
+)
+def test_due_offsets_are_compared_in_utc(due, hours):
+    (job,) = parse_jobs([{"quantity": 10, "due": due}], START, 168.0)
+    assert job.due == hours
+
+
+def test_parse_datetime_returns_naive_utc():
+    assert parse_datetime("2025-01-01T10:00:00+02:00") == datetime(2025, 1, 1, 8, 0)
+    assert parse_datetime("2025-01-01") == datetime(2025, 1, 1)
+    with pytest.raises(ValueError):
+        parse_datetime("soon")
@@ -0,0 +1,14 @@
+import pandas as pd
+
+from supervisory_agent.tools.data_store import domain_csv_path
+from supervisory_agent.tools.shifts import SHIFT_NAMES, shift_names, shift_of
+
+
+def test_calendar_matches_the_production_data():
+    df = pd.read_csv(domain_csv_path("production"))
+    hours = pd.to_datetime(df["timestamp"]).dt.hour
+    assert list(shift_names(hours.to_numpy())) == list(df["shift"])
+    assert [shift_of(hour) for hour in (0, 7, 8, 15, 16, 23)] == [
+        "night", "night", "morning", "morning", "afternoon", "afternoon"
+    ]
+    assert SHIFT_NAMES == {0: "night", 8: "morning", 16: "afternoon"}
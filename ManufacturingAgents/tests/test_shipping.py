@@ -0,0 +1,16 @@
+from supervisory_agent.tools.shipping import ShipmentIndex
+
+
+def test_lookup_rows_index_the_frame_they_came_from(domain_store):
+    store = domain_store(logistics=None)
+    index = ShipmentIndex(store)
+    df, days, rows = index.lookup(status=["scheduled"])
+    assert len(rows) and (df.iloc[rows]["status"] == "scheduled").all()
+
+    # A rewrite that reorders the file rebuilds the index for later calls only
+    store.modify("logistics", lambda frame: (frame.iloc[::-1].reset_index(drop=True), None))
+    rebuilt, _, moved = index.lookup(status=["scheduled"])
+    assert index.builds == 2
+    assert (rebuilt.iloc[moved]["status"] == "scheduled").all()
+    assert (df.iloc[rows]["status"] == "scheduled").all()
+    assert len(days) == len(df)
@@ -0,0 +1,113 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from supervisory_agent.tools.spc import SPCEngine
+
+MACHINES = ("M001", "M002")
+
+
+def inspections(count: int, start: str = "2024-11-01", seed: int = 0, batch_offset: int = 0) -> pd.DataFrame:
+    """`count` inspections alternating between machines, in quality_data.csv columns."""
+    rng = np.random.default_rng(seed)
+    defect_rate = rng.normal(10, 1, count).round(2)
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range(start, periods=count, freq="15min").strftime("%Y-%m-%d %H:%M:%S"),
+            "batch_id": [f"B{batch_offset + i:05d}" for i in range(count)],
+            "machine_id": [MACHINES[i % len(MACHINES)] for i in range(count)],
+            "product_id": "PX000",
+            "defect_rate": defect_rate,
+            "quality_score": (100 - defect_rate).round(2),
+            "defect_type": "none",
+            "inspection_status": np.where(rng.random(count) < 0.1, "failed", "passed"),
+            "inspector": "QC-01",
+            "rework_required": 0,
+        }
+    )
+
+
+def summaries(engine: SPCEngine):
+    return {key: state.summary() for key, state in engine.states("machine").items()}
+
+
+@pytest.fixture
+def quality(domain_store):
+    store = domain_store(quality=inspections(120))
+    return store, SPCEngine(store)
+
+
+def test_appends_are_applied_incrementally(quality):
+    store, engine = quality
+    assert engine.sync() == 120
+    replays = engine.replays
+
+    store.append("quality", inspections(30, start="2024-11-03", seed=1, batch_offset=120))
+    assert engine.sync() == 30
+    assert engine.replays == replays
+    assert summaries(engine) == summaries(SPCEngine(store))
+
+
+def test_in_place_edit_of_an_earlier_row_replays(quality):
+    store, engine = quality
+    engine.sync()
+    replays = engine.replays
+
+    def edit(df):
+        df.loc[3, "defect_rate"] = 95.0
+        return df, None
+
+    store.modify("quality", edit)
+    engine.sync()
+    assert engine.replays == replays + 1
+    assert summaries(engine) == summaries(SPCEngine(store))
+
+
+def test_shift_in_the_process_is_flagged(quality):
+    store, engine = quality
+    engine.sync()
+    shifted = inspections(40, start="2024-11-03", seed=2, batch_offset=120)
+    shifted["defect_rate"] += 5
+    store.append("quality", shifted)
+    engine.sync()
+
+    charts = {v["chart"] for state in engine.states("machine").values() for v in state.violations}
+    assert {"cusum", "xbar"} <= charts
+
+
+def test_states_are_a_copy(quality):
+    store, engine = quality
+    states = engine.states("machine")
+    states["M001"].inspections = -1
+    states.clear()
+    assert engine.states("machine")["M001"].inspections == 60
+
+
+def test_worker_syncs_on_change_and_reports_new_violations(domain_store):
+    from status_registry import StatusRegistry
+
+    store = domain_store(quality=inspections(120))
+    engine = SPCEngine(store, debounce=0.01)
+    engine.sync()
+    registry = StatusRegistry(store, debounce=0, extras={"quality": engine.overview})
+    reported, changed = [], []
+    engine.add_listener(reported.append)
+    engine.add_listener(lambda violations: registry.on_domain_changed("quality"))
+    registry.add_listener(changed.append)
+
+    shifted = inspections(40, start="2024-11-03", seed=2, batch_offset=120)
+    shifted["defect_rate"] += 5
+    store.append("quality", shifted)
+    deadline = time.monotonic() + 5
+    while "quality" not in changed and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # Nothing here called sync(): the worker applied the rows
+    assert engine._rows == 160
+    assert {"cusum", "xbar"} <= {v["chart"] for batch in reported for v in batch}
+    assert "quality" in changed
+    status = registry.get("quality")
+    assert status["metrics"]["spc_machines_out_of_control"] == 2
+    assert status["alerts"][0]["message"].startswith("SPC ")
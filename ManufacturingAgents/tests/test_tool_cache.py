@@ -0,0 +1,37 @@
+from supervisory_agent.tools.data_store import DomainStore
+from supervisory_agent.tools.tool_cache import ToolResultCache
+
+
+def test_equivalent_calls_hit_until_the_domain_changes():
+    cache = ToolResultCache(DomainStore({}))
+    calls = []
+
+    def compute(domain, intent, data):
+        calls.append(data)
+        return {"success": True, "rows": len(calls)}
+
+    cache.call("s", "production", "read", {"machine_id": "M001"}, compute)
+    hit = cache.call("s", " Production", "READ", {"machine_id": " M001 ", "limit": None}, compute)
+    assert hit["cache"]["hit"] and len(calls) == 1
+
+    cache.invalidate_domain("production")
+    assert "cache" not in cache.call("s", "production", "read", {"machine_id": "M001"}, compute)
+    assert len(calls) == 2
+
+
+def test_result_computed_across_an_invalidation_is_not_stored():
+    cache = ToolResultCache(DomainStore({}))
+    calls = []
+
+    def racing_compute(domain, intent, data):
+        calls.append(data)
+        if len(calls) == 1:
+            # The data changes after this call read it but before it returns
+            cache.invalidate_domain(domain)
+        return {"success": True, "rows": len(calls)}
+
+    first = cache.call("s", "production", "read", {}, racing_compute)
+    second = cache.call("s", "production", "read", {}, racing_compute)
+    assert first["rows"] == 1 and second["rows"] == 2
+    assert cache.stats("s")["hits"] == 0
+    assert cache.call("s", "production", "read", {}, racing_compute)["cache"]["hit"]
@@ -16,6 +16,7 @@ import {
   MessageSquare
 } from 'lucide-react';
 import AgentChat from './AgentChat';
+import { getDashboardSnapshot, pollAgents } from '../services/api';
 
 /**
  * Smart Factory Dashboard - Green & Grey Theme
@@ -28,6 +29,17 @@ import AgentChat from './AgentChat';
  * - Text: Dark grey on light backgrounds
  */
 
+const AGENT_IDS = ['production', 'inventory', 'logistics', 'maintenance', 'quality'];
+
+// Agent status from the API -> the fields the cards render
+const toCard = (status) => ({
+  status: status.status,
+  alerts: status.alert_count ?? (status.alerts || []).length,
+  efficiency: status.efficiency ?? 0,
+});
+
+const POLL_RETRY_MS = 5000;
+
 const GreenGreyDashboard = () => {
   const [activeTab, setActiveTab] = useState('overview');
   const [notifications, setNotifications] = useState([]);
@@ -42,28 +54,65 @@ const GreenGreyDashboard = () => {
     quality: { status: 'operational', alerts: 1, efficiency: 94 }
   });
 
-  // Simulate real-time updates
+  // Long-poll the agent list: the server answers when a status changes (or
+  // with 304 after the wait), so idle dashboards cost one request per 30s
   useEffect(() => {
-    const interval = setInterval(() => {
-      const agents = ['production', 'inventory', 'logistics', 'maintenance', 'quality'];
-      const randomAgent = agents[Math.floor(Math.random() * agents.length)];
-      
-      setAgentData(prev => ({
-        ...prev,
-        [randomAgent]: {
-          ...prev[randomAgent],
-          efficiency: Math.min(100, Math.max(70, prev[randomAgent].efficiency + (Math.random() - 0.5) * 5))
+    let cancelled = false;
+
+    const poll = async () => {
+      let etag = null;
+      while (!cancelled) {
+        try {
+          const result = await pollAgents(etag);
+          etag = result.etag;
+          if (result.agents && !cancelled) {
+            setAgentData(prev => {
+              const next = { ...prev };
+              result.agents
+                .filter(agent => AGENT_IDS.includes(agent.id))
+                .forEach(agent => { next[agent.id] = toCard(agent.status); });
+              return next;
+            });
+          }
+        } catch (error) {
+          console.error('Agent poll error:', error);
+          await new Promise(resolve => setTimeout(resolve, POLL_RETRY_MS));
         }
-      }));
-    }, 5000);
+      }
+    };
 
-    return () => clearInterval(interval);
+    poll();
+    return () => { cancelled = true; };
+  }, []);
+
+  // Every agent's status in one batched MCP request
+  const loadSnapshot = async () => {
+    const snapshot = await getDashboardSnapshot(AGENT_IDS);
+    setAgentData(prev => {
+      const next = { ...prev };
+      AGENT_IDS.forEach((agentId) => {
+        const status = snapshot[agentId];
+        if (status && !status.error) {
+          next[agentId] = toCard(status);
+        }
+      });
+      return next;
+    });
+  };
+
+  useEffect(() => {
+    loadSnapshot().catch((error) => console.error('Dashboard snapshot error:', error));
   }, []);
 
   const handleRefresh = async () => {
     setRefreshing(true);
-    await new Promise(resolve => setTimeout(resolve, 1000));
-    setRefreshing(false);
+    try {
+      await loadSnapshot();
+    } catch (error) {
+      console.error('Dashboard refresh error:', error);
+    } finally {
+      setRefreshing(false);
+    }
   };
 
   return (
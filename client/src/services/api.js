@@ -131,7 +131,7 @@ export const getAllAgentsStatus = async () => {
 /**
  * Execute agent action
  */
-export const executeAgentAction = async (agentId, action, params = {}) => {
+export const executeAgentAction = async (agentId, action, params = {}, idempotencyKey) => {
   try {
     const url = `${config.apiBaseUrl}${config.mcpEndpoint}`;
     const payload = {
@@ -142,6 +142,7 @@ export const executeAgentAction = async (agentId, action, params = {}) => {
         agent_id: agentId,
         action: action,
         parameters: params,
+        idempotency_key: idempotencyKey,
         timestamp: new Date().toISOString(),
       },
     };
@@ -213,8 +214,50 @@ export const getSystemAlerts = async (severity = 'all') => {
   }
 };
 
+/**
+ * MCP Protocol - Send several calls in one JSON-RPC batch
+ * `calls` is a list of { method, params }; results come back in the same order.
+ */
+export const sendMCPBatch = async (calls) => {
+  try {
+    const url = `${config.apiBaseUrl}${config.mcpEndpoint}`;
+    const baseId = Date.now();
+    const payload = calls.map((call, index) => ({
+      jsonrpc: '2.0',
+      id: baseId + index,
+      method: call.method,
+      params: call.params || {},
+    }));
+
+    const responses = await fetchWithTimeout(url, {
+      method: 'POST',
+      body: JSON.stringify(payload),
+    });
+
+    const byId = new Map(responses.map((response) => [response.id, response]));
+    return payload.map((call) => {
+      const response = byId.get(call.id) || {};
+      return response.error ? { error: response.error } : response.result;
+    });
+  } catch (error) {
+    console.error('MCP Batch Error:', error);
+    throw new Error(`Failed to send MCP batch: ${error.message}`);
+  }
+};
+
+/**
+ * Get the status of several agents in one round trip
+ */
+export const getDashboardSnapshot = async (agentIds) => {
+  const results = await sendMCPBatch(
+    agentIds.map((agentId) => ({ method: 'agent.status', params: { agent_id: agentId } }))
+  );
+  return Object.fromEntries(agentIds.map((agentId, index) => [agentId, results[index]]));
+};
+
 /**
  * Subscribe to agent updates (WebSocket)
+ * The callback always receives the full, merged agent status.
  */
 export const subscribeToAgentUpdates = (agentId, callback) => {
   // Use WebSocket URL (replace http with ws)
@@ -227,10 +270,21 @@ export const subscribeToAgentUpdates = (agentId, callback) => {
   // Final WebSocket URL
   const ws = new WebSocket(`${wsBase}/ws/agent/${agentId}`);
 
+  // Server pushes a full snapshot first, then only the changed keys
+  let status = {};
+
   ws.onmessage = (event) => {
     try {
       const data = JSON.parse(event.data);
-      callback(data);
+      if (data.type === 'snapshot') {
+        status = { ...data.status };
+      } else if (data.type === 'delta') {
+        status = { ...status, ...data.changes, timestamp: data.timestamp };
+        (data.removed || []).forEach((key) => delete status[key]);
+      } else {
+        status = data;
+      }
+      callback(status);
     } catch (error) {
       console.error('WebSocket message parse error:', error);
     }
@@ -247,6 +301,28 @@ export const subscribeToAgentUpdates = (agentId, callback) => {
   return ws;
 };
 
+/**
+ * Long-poll the agent list
+ * Pass the ETag from the previous call; resolves with { etag, agents } once
+ * something changed, or { etag, agents: null } after `waitSeconds` without change.
+ */
+export const pollAgents = async (etag = null, waitSeconds = 30) => {
+  const url = `${config.apiBaseUrl}/api/agents?wait=${waitSeconds}`;
+  const response = await fetch(url, {
+    headers: etag ? { 'If-None-Match': etag } : {},
+  });
+
+  if (response.status === 304) {
+    return { etag, agents: null };
+  }
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  const data = await response.json();
+  return { etag: response.headers.get('ETag'), agents: data.agents };
+};
+
 /**
  * Health check
  */
@@ -264,14 +340,53 @@ export const healthCheck = async () => {
 // Export config for testing/debugging
 export const getConfig = () => ({ ...config });
 
+/**
+ * Poll a queued agent action (job id returned by executeAgentAction)
+ */
+export const getActionStatus = async (jobId) => {
+  const url = `${config.apiBaseUrl}${config.mcpEndpoint}`;
+  const response = await fetchWithTimeout(url, {
+    method: 'POST',
+    body: JSON.stringify({
+      jsonrpc: '2.0',
+      id: Date.now(),
+      method: 'action.status',
+      params: { job_id: jobId },
+    }),
+  });
+  return response.result || response;
+};
+
+/**
+ * Recent agent actions, optionally filtered by agent and job status
+ */
+export const listActions = async ({ agentId, status, limit = 50 } = {}) => {
+  const url = `${config.apiBaseUrl}${config.mcpEndpoint}`;
+  const response = await fetchWithTimeout(url, {
+    method: 'POST',
+    body: JSON.stringify({
+      jsonrpc: '2.0',
+      id: Date.now(),
+      method: 'action.list',
+      params: { agent_id: agentId, status, limit },
+    }),
+  });
+  return response.result || response;
+};
+
 export default {
   sendMCPMessage,
+  sendMCPBatch,
   getAgentStatus,
+  getDashboardSnapshot,
   getAllAgentsStatus,
   executeAgentAction,
+  getActionStatus,
+  listActions,
   getAgentMetrics,
   getSystemAlerts,
   subscribeToAgentUpdates,
+  pollAgents,
   healthCheck,
   getConfig,
 };
\ No newline at end of file